@@ -70,6 +70,12 @@ import threading
 import time
 import datetime
 import gc
+import heapq
+import json
+import html
+import concurrent.futures
+import autogui_catalog
+import autogui_rescale
 
 
 # icon
@@ -107,53 +113,262 @@ find_number = '20'
 classicresults = True
 batchresults = True
 follow_symlinks = True
+use_catalog = True
+results_from_catalog = False
+filter_space_group = ''
+filter_resolution = ''
+filter_text = ''
+filter_cell = ''
 default_table_values = [['         ','         ','                                                ']]
 table_values = default_table_values
 include_commandline = True
 exclude_failed = False
 logtitle = "AutoGUI Logfiles"
 
-# Helper function to find last results
-def get_results(classicresults, batchresults,find_path,find_number, follow_symlinks):
+# folders that never contain AutoGUI results and are skipped when searching for logs
+results_prune_list = ['output-files', 'useful_files', 'tmpcbfs', 'tempcbfs', 'images', 'bl_processed', 'HTML']
+results_search_threads = 8
+results_csv_threads = 16
+results_export_chunk = 200       # runs read at once while exporting
+results_page_size = 100          # rows shown at once in the launcher's results table
+results_csv_cache = {}          # datasets.csv path -> (modification time, parsed rows)
+results_csv_cache_size = 20000
+results_csv_lock = threading.Lock()
+
+# helper function to list one folder while searching for results
+def scan_results_folder(scanpath, lognames, follow_symlinks, uid):
+    subfolders = []
+    hits = []
+    try:
+        with os.scandir(scanpath) as folder_entries:
+            for entry in folder_entries:
+                try:
+                    if entry.is_dir(follow_symlinks = follow_symlinks):
+                        if entry.name not in results_prune_list:
+                            if follow_symlinks == True:
+                                # remember the real folder, symbolic links may point back up the tree
+                                folder_stat = entry.stat()
+                                subfolders.append((entry.path, (folder_stat.st_dev, folder_stat.st_ino)))
+                            else:
+                                subfolders.append((entry.path, None))
+                    elif entry.name in lognames:
+                        file_stat = entry.stat(follow_symlinks = follow_symlinks)
+                        if file_stat.st_uid == uid:
+                            hits.append((file_stat.st_mtime, entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return [subfolders, hits]
+
+# helper function to turn the newest hits into table rows
+def make_result_rows(newest_hits, find_path):
     found_results = []
-    user = pwd.getpwuid(os.getuid()).pw_name
-    if classicresults == True and batchresults == False:
-        searchvar = "-name autogui_log.html"
-    elif classicresults == False and batchresults == True:
-        searchvar = "-name batchproc.html"
-    else:
-        searchvar = '-type f \( -name "autogui_log.html" -o -name "batchproc.html" \)' 
-    findcheck1 = re.compile("autogui_log.html")
-    findcheck2 = re.compile("batchproc.html")
+    for hit in sorted(newest_hits, reverse = True):
+        logdate = datetime.datetime.fromtimestamp(int(hit[0])).strftime('%x')
+        if os.path.basename(hit[1]) == "autogui_log.html":
+            logtype = "Classic"
+        else:
+            logtype = "Batch"
+        short_path = "./" + os.path.relpath(hit[1], find_path)
+        found_results.append([logdate, logtype, short_path])
+    return found_results
+
+# thread to find last results without spawning find/stat for every file.
+# With catalog_filters (space group, resolution, words, cell) all runs found are imported into the catalog first
+# (the folder was not searched before) and the results come from the catalog.
+def get_results_thread(window_search, classicresults, batchresults, find_path, find_number, follow_symlinks, stop_search, catalog_filters = None):
+    lognames = []
+    if classicresults == True:
+        lognames.append("autogui_log.html")
+    if batchresults == True:
+        lognames.append("batchproc.html")
+    try:
+        max_hits = max(int(find_number), 1)
+    except ValueError:
+        max_hits = 20
+    uid = os.getuid()
+    newest_hits = []        # heap of (modification time, path), keeps only the newest max_hits
+    all_hits = []           # everything found, only kept for importing into the catalog
+    seen_folders = set()
     if follow_symlinks == True:
-        find_par = "-L "
+        try:
+            root_stat = os.stat(find_path)
+            seen_folders.add((root_stat.st_dev, root_stat.st_ino))
+        except OSError:
+            pass
+    last_update = time.time()
+    changed = False
+    with concurrent.futures.ThreadPoolExecutor(max_workers = results_search_threads) as executor:
+        running = {executor.submit(scan_results_folder, find_path, lognames, follow_symlinks, uid)}
+        while running and not stop_search.is_set():
+            done, running = concurrent.futures.wait(running, timeout = 0.25, return_when = concurrent.futures.FIRST_COMPLETED)
+            for job in done:
+                subfolders, hits = job.result()
+                for subfolder in subfolders:
+                    if subfolder[1] != None:
+                        if subfolder[1] in seen_folders:
+                            continue
+                        seen_folders.add(subfolder[1])
+                    running.add(executor.submit(scan_results_folder, subfolder[0], lognames, follow_symlinks, uid))
+                if catalog_filters != None:
+                    all_hits.extend(hits)
+                for hit in hits:
+                    if len(newest_hits) < max_hits:
+                        heapq.heappush(newest_hits, hit)
+                        changed = True
+                    elif hit > newest_hits[0]:
+                        heapq.heapreplace(newest_hits, hit)
+                        changed = True
+            # stream what has been found so far into the table
+            if changed == True and (time.time() - last_update) > 0.5 and catalog_filters == None:
+                window_search.write_event_value('-RESULTSFOUND-', make_result_rows(newest_hits, find_path))
+                last_update = time.time()
+                changed = False
+        if stop_search.is_set():
+            for job in running:
+                job.cancel()
+    if stop_search.is_set() == True:
+        return
+    if catalog_filters == None:
+        window_search.write_event_value('-RESULTSDONE-', make_result_rows(newest_hits, find_path))
+        catalog_results(newest_hits)
+        return
+    # first search of this folder: import everything, then ask the catalog (the search index is needed for words)
+    space_group, resolution, text, cell = catalog_filters
+    imported = catalog_results(all_hits, index = (text.strip() != ''))
+    try:
+        # a folder with failed imports is crawled again on the next search
+        if imported == True:
+            autogui_catalog.mark_crawled(find_path)
+        found_results = autogui_catalog.find_runs(find_path, classicresults, batchresults, find_number, space_group, resolution, text = text, cell = cell)
+    except Exception:
+        print('Unable to read results catalog, showing the newest results found.')
+        found_results = make_result_rows(newest_hits, find_path)
+    window_search.write_event_value('-RESULTSDONE-', found_results)
+    if text.strip() == '':
+        catalog_results([], index_paths = [hit[1] for hit in all_hits])
+
+# helper function to add runs found on disk to the results catalog and its search index (skips runs that did not change).
+# index_paths: runs to index instead of the new hits (with index = False nothing is indexed). Returns False if the catalog could not be updated.
+def catalog_results(newest_hits, index = True, index_paths = None):
+    try:
+        known = autogui_catalog.known_runs([hit[1] for hit in newest_hits])
+        for hit in newest_hits:
+            if known.get(hit[1]) != hit[0]:
+                if os.path.basename(hit[1]) == "autogui_log.html":
+                    autogui_catalog.import_run(hit[1], "Classic")
+                else:
+                    autogui_catalog.import_run(hit[1], "Batch")
+        # their logs go into the search index right away
+        if index_paths == None and index == True:
+            index_paths = [hit[1] for hit in newest_hits]
+        if index_paths != None:
+            autogui_catalog.update_index(index_paths)
+    except Exception:
+        print('Unable to add found results to catalog!')
+        return False
+    return True
+
+# thread to update the search index of the catalogued runs (only new or changed logs are read)
+def index_thread(window_search, log_paths, stop_index):
+    try:
+        indexed = autogui_catalog.update_index(log_paths, stop_index = stop_index)
+    except Exception:
+        indexed = None
+    if stop_index.is_set() == False:
+        window_search.write_event_value('-INDEXDONE-', indexed)
+
+# helper function to update the search index
+def index_function(window_search, log_paths, stop_index):
+    threading.Thread(target=index_thread, args=(window_search, log_paths, stop_index,), daemon=True).start()
+
+# Helper function to find last results
+def get_results(window_search, classicresults, batchresults, find_path, find_number, follow_symlinks, stop_search, catalog_filters = None):
+    threading.Thread(target=get_results_thread, args=(window_search, classicresults, batchresults, find_path, find_number, follow_symlinks, stop_search, catalog_filters,), daemon=True).start()
+
+# thread to re-scale a finished run in its new run folder, output goes to log.txt there
+def rescale_thread(window_search, run_folder, integrated_path, param_cut):
+    rescale_command = autogui_rescale.rescale_command(integrated_path, param_cut) + " > log.txt 2>&1"
+    subprocess.run(rescale_command, cwd = run_folder, shell = True)
+    window_search.write_event_value('-RESCALEDONE-', (run_folder, autogui_rescale.collect_outputs(run_folder)))
+
+# helper function to re-scale a finished run
+def rescale_run(window_search, run_folder, integrated_path, param_cut):
+    threading.Thread(target=rescale_thread, args=(window_search, run_folder, integrated_path, param_cut,), daemon=True).start()
+
+# thread to filter and sort the found results away from the gui, only the newest request (generation) is shown
+def view_results_thread(window_search, result_rows, sort_column, sort_reverse, filter_text, generation):
+    filter_text = filter_text.strip().lower()
+    if filter_text != '':
+        view_rows = [row for row in result_rows if filter_text in ' '.join(row).lower()]
     else:
-        find_par = "-P "    
-    if sys.platform == 'darwin':
-        find_command = "find " + find_par + find_path + " " + searchvar + " -user " + user + " -exec stat -f '%m %N' {} \; | sort -nr | awk 'NR==1,NR==" + find_number +" {print $2}'" # darwin
+        view_rows = list(result_rows)
+    if sort_column != None:
+        if sort_column == 0:
+            view_rows.sort(key = results_date_key, reverse = sort_reverse)
+        else:
+            view_rows.sort(key = lambda row: row[sort_column], reverse = sort_reverse)
+    window_search.write_event_value('-RESULTSVIEW-', (generation, view_rows))
+
+# helper function to sort table dates (written with '%x') by date instead of text
+def results_date_key(row):
+    try:
+        return datetime.datetime.strptime(row[0], '%x')
+    except ValueError:
+        return datetime.datetime.min
+
+# Helper function to filter and sort found results
+def view_results(window_search, result_rows, sort_column, sort_reverse, filter_text, generation):
+    threading.Thread(target=view_results_thread, args=(window_search, result_rows, sort_column, sort_reverse, filter_text, generation,), daemon=True).start()
+
+# helper function to show one page of the results table, tk gets slow with thousands of rows
+def show_results_page(window_search, view_rows, results_page):
+    number_of_pages = max(1, (len(view_rows) + results_page_size - 1) // results_page_size)
+    results_page = min(max(results_page, 0), number_of_pages - 1)
+    window_search['-RESULTSTABLE-'].update(values = view_rows[results_page * results_page_size:(results_page + 1) * results_page_size])
+    window_search['-PAGE-'].update('Page ' + str(results_page + 1) + '/' + str(number_of_pages) + ' (' + str(len(view_rows)) + ')')
+    return results_page
+
+# helper function to read the datasets.csv rows of one run, cached by path and modification time
+def load_results_csv(absolute_table_path, mode):
+    path_with_stuff = os.path.dirname(absolute_table_path)
+    if mode == 'Classic':
+        path_to_csv = os.path.join(path_with_stuff, "useful_files/datasets.csv")
     else:
-        find_command = "find " + find_par + find_path + " " + searchvar + " -user " + user + " -exec stat -c '%Y %n' {} \; | sort -nr | awk 'NR==1,NR==" + find_number +" {print $2}'" # Linux
-    while True:
-        find_results = subprocess.Popen(find_command, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-        output = (find_results.stdout.readlines())
-        for line in output:
-            line = line.strip()
-            if findcheck1.search(line) != None or findcheck2.search(line) != None:
-                moddate = int(os.path.getmtime(line))
-                #print(moddate)
-                logdate = datetime.datetime.fromtimestamp(moddate).strftime('%x')
-                #print (line)
-                if findcheck1.search(line) != None:
-                    logtype = "Classic"
-                else: 
-                    logtype = "Batch"
-
-                short_path = "./" + os.path.relpath(line, find_path) 
-                found_result = [logdate, logtype, short_path]
-                found_results.append(found_result)
-        #print(found_results)       
-        return found_results
-        break  
+        path_to_csv = os.path.join(path_with_stuff, "datasets.csv")
+    try:
+        csv_mtime = os.stat(path_to_csv).st_mtime
+    except OSError:
+        csv_mtime = None
+    with results_csv_lock:
+        cached = results_csv_cache.get(path_to_csv)
+    if cached != None and cached[0] == csv_mtime:
+        return cached[1]
+    csv_read = None
+    try:
+        catalog_read = autogui_catalog.get_datasets(absolute_table_path)
+        if catalog_read != None and (csv_mtime == None or len(catalog_read) > 0):
+            csv_read = [tuple(line.split(';')) for line in catalog_read]
+    except Exception:
+        csv_read = None
+    if csv_read == None:
+        csv_read = []
+        if csv_mtime != None:
+            try:
+                with open (path_to_csv, 'rt') as csvfile:
+                    csvfile.readline()
+                    for line in csvfile:
+                        line = line.strip()
+                        if line != '':
+                            csv_read.append(tuple(line.split(';')))
+            except OSError:
+                csv_read = []
+    with results_csv_lock:
+        if len(results_csv_cache) > results_csv_cache_size:
+            results_csv_cache.clear()
+        results_csv_cache[path_to_csv] = (csv_mtime, csv_read)
+    return csv_read
 
 # Helper function to get screen info
 def screen_info():
@@ -178,280 +393,212 @@ def screen_info():
         return screenargs
         break  
 
+# helper function to read the datasets.csv rows of the selection chunk by chunk, memory use does not grow with the selection
+def export_chunks(table_values, find_path, exportpath):
+    #0=Date, 1=Mode, 2=Table path, 3=Absolute path, 4= Relative path, 5=CSV read
+    with concurrent.futures.ThreadPoolExecutor(max_workers = results_csv_threads) as executor:
+        for chunk_start in range(0, len(table_values), results_export_chunk):
+            chunk = table_values[chunk_start:chunk_start + results_export_chunk]
+            absolute_table_paths = [os.path.join(find_path,table_value[2].strip("./")) for table_value in chunk]
+            csv_reads = executor.map(load_results_csv, absolute_table_paths, [table_value[1] for table_value in chunk])
+            for table_value, absolute_table_path, csv_read in zip(chunk, absolute_table_paths, csv_reads):
+                relative_table_path = os.path.relpath(absolute_table_path, exportpath)
+                yield [table_value[0], table_value[1], table_value[2], absolute_table_path, relative_table_path, csv_read]
+
 # export results
 def export_results(exporttype, exportpath, filetoexport, find_path, table_values, theme_color, theme_color1, theme_color2, include_commandline, exclude_failed, logtitle):
-    exportlist = [] #0=Date, 1=Mode, 2=Table path, 3=Absolute path, 4= Relative path, 5=CSV read
     if theme_color1 == 'white':
         alt_theme_color1 = '#fafafa'
-    else:    
+    else:
         alt_theme_color1 = 'black'
 
-    for table_value in table_values:
-        absolute_table_path = os.path.join(find_path,table_value[2].strip("./"))
-        relative_table_path = os.path.relpath(absolute_table_path, exportpath)
-        table_value.append(absolute_table_path)
-        table_value.append(relative_table_path)
-        print(absolute_table_path)
-        path_with_stuff = re.split("/[^/]+$", absolute_table_path)[0]
-        csv_read = []
-        csv_item = ['N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A'] # Dataset ID;Successful processing;Space group;Cell dimensions [Å];Cell angles [°];Isotropic diffraction limit [Å];Anisotropic diffraction limits [Å];Autoproc command line
-        if table_value[1] == 'Classic':
-            path_to_csv = os.path.join(path_with_stuff, "useful_files/datasets.csv")
-        else:
-            path_to_csv = os.path.join(path_with_stuff, "datasets.csv")   
-        if os.path.exists(path_to_csv):
-            #print(path_to_csv, "found.")
-            with open (path_to_csv, 'rt') as csvfile:
-                for line in csvfile:
-                    #print(line, "line in csv")
-                    line = line.strip()
-                    csv_read.append(line)
-            csvfile.close()  
-            csv_read.pop(0)
-        else:
-            #print(path_to_csv, "does not exist.")
-            csv_read = []
-        table_value.append(csv_read)
-        exportlist.append(table_value)            
-
-    #print(exportlist)
     f = open(filetoexport, "w")
     if exporttype == ".csv":
-        f.write('#;Date;Processing mode;Path;Dataset ID;Successful processing;Space group;Cell dimensions [Å];Cell angles [°];Isotropic diffraction limit [Å];Anisotropic diffraction limits [Å];Autoproc command line\n')
+        f.write('#;Date;Processing mode;Path;Dataset ID;Successful processing;Space group;Cell dimensions [Å];Cell angles [°];Isotropic diffraction limit [Å];Anisotropic diffraction limits [Å];Autoproc command line;Cell cluster\n')
         exp_counter = 1
-        for exportvalue in exportlist:
+        for exportvalue in export_chunks(table_values, find_path, exportpath):
             csv_read = exportvalue[5]
             if len(csv_read) > 0:
                 content_counter = 1
                 for line in csv_read:
-                    #print(line)
-                    csv_item = (line.strip()).split(';')
-                    csv_item.pop(0)
+                    # Classic rows have no cell cluster (Batch only)
+                    csv_item = (list(line[1:]) + ['N/A'] * (9 - len(line[1:])))[:9]
                     csv_values = ';'.join(csv_item)
                     if len(csv_read) > 1:
                         ds_count = str(exp_counter) + "." + str(content_counter)
                     else:
-                        ds_count = str(exp_counter)    
+                        ds_count = str(exp_counter)
                     table_line = ds_count + ";" + exportvalue[0] + ";" + exportvalue[1] + ";" + exportvalue[3] + ";" + csv_values
                     table_line = table_line + "\n"
                     f.write(table_line)
-                    print(table_line)
                     content_counter = content_counter + 1
             else:
-                csv_item = ['N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A']
+                csv_item = ['N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A']
                 csv_values = ';'.join(csv_item)
                 table_line = str(exp_counter) + ";" + exportvalue[0] + ";" + exportvalue[1] + ";" + exportvalue[3] + ";" + csv_values
                 table_line = table_line + "\n"
-                f.write(table_line)      
+                f.write(table_line)
             exp_counter = exp_counter + 1
     else:
-        f.write('<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN"\n')
-        f.write('"http://www.w3.org/TR/html4/loose.dtd">\n')
+        # the page only holds a compact JSON list of runs, rows are drawn while scrolling (thousands of runs stay fast)
+        number_of_columns = 7
+        if exclude_failed == False:
+            number_of_columns = number_of_columns + 1
+        if include_commandline == True:
+            number_of_columns = number_of_columns + 1
+        f.write('<!DOCTYPE html>\n')
         f.write('<html>\n')
         f.write('<head>\n')
-        title = '    <title>Exported list of AutoGUI processing results</title>\n'
-        f.write(title)
+        f.write('<meta charset="utf-8">\n')
+        f.write('    <title>Exported list of AutoGUI processing results</title>\n')
         f.write('<style>\n')
-        f.write('    a:link {\n')
-        f.write(' font-family: arial, sans-serif;\n')
-        f.write(' border-collapse: collapse;\n')
-        f.write(' font-size:13px;\n')
-        f.write(' color: '+ theme_color2 +' ;\n')
-        f.write(' text-decoration: none;\n')
-        f.write('}\n')
-        f.write('    a:visited {\n')
-        f.write(' font-family: arial, sans-serif;\n')
-        f.write(' border-collapse: collapse;\n')
-        f.write(' font-size:13px;\n')
-        f.write(' color: '+ theme_color2 +' ;\n')
-        f.write(' text-decoration: none;\n')
-        f.write('}\n')    
-        f.write('a:hover {\n')
-        f.write(' color: ' + theme_color + ';\n')
-        f.write(' text-decoration: underline;\n')
-        f.write('}\n')
-        f.write('a:active {\n')
-        f.write(' color: '+ alt_theme_color1 +' ;\n')
-        f.write(' text-decoration: underline;\n')
-        f.write('}\n')			
-        f.write('table {\n')
-        f.write(' font-family: arial, sans-serif;\n')
-        f.write(' border-collapse: collapse;\n')
-        f.write(' width: 95%;\n')
-        f.write('}\n')
-        f.write('button {\n')
-        f.write('	font-size:13px;\n') 
-        f.write('	color: '+ theme_color1 +' ;\n') 
-        f.write('	background-color: ' + theme_color + ';\n') 
-        f.write('	border: none;\n')
-        f.write('	outline: none;\n')     
-        f.write('	padding: 4px 4px;\n') 
-        f.write('	cursor: pointer;\n') 
-        f.write('	border-color: ' + theme_color + ';\n')
-        f.write('	display: block;\n')
-        f.write('	width: 100%;\n')
-        f.write('	text-align: center;\n')
-        f.write('	position: relative;\n')
-        f.write('}\n')
-        f.write('button:hover {\n')
-        f.write('	color: ' + theme_color + ';\n') 
-        f.write('	background-color: '+ theme_color1+ ' ;\n');
-        f.write('	border: 1px solid ' + theme_color + ';\n');
-        f.write('	padding: 3px 3px;\n');
-        f.write('}\n')
-        f.write('table {\n')
-        f.write(' font-family: arial, sans-serif;\n')
-        f.write(' border-collapse: collapse;\n')
-        f.write(' width: 95%;\n')
-        f.write('}\n')
-        f.write('\n')
-        f.write('td, th {\n')
-        f.write(' border: 0px solid '+ theme_color1 +' ;\n')
-        f.write(' text-align: left;\n')
-        f.write(' padding: 8px;\n')
-        f.write(' font-size:13px;\n')
-        f.write('}\n')
-        f.write('\n')
-        f.write('td {\n')
-        f.write(' background-color: '+ theme_color1 +' ;\n')
-        f.write('}\n')
-        f.write('\n')
-        f.write('th {\n')
-        f.write('background-color: ' + theme_color + ';\n')
-        f.write('   color: '+ theme_color1 +' ; \n')
-        f.write('}\n')
+        f.write('body { background-color: ' + alt_theme_color1 + '; font-family: arial, sans-serif; font-size: 13px; margin: 0; }\n')
+        f.write('a:link, a:visited { color: ' + theme_color2 + '; text-decoration: none; }\n')
+        f.write('a:hover { color: ' + theme_color + '; text-decoration: underline; }\n')
+        f.write('a:active { color: ' + alt_theme_color1 + '; text-decoration: underline; }\n')
+        f.write('table { border-collapse: collapse; width: 100%; table-layout: fixed; }\n')
+        f.write('td, th { text-align: left; padding: 0px 8px; font-size: 13px; height: 32px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }\n')
+        f.write('th { background-color: ' + theme_color + '; color: white; }\n')
+        f.write('td { background-color: ' + theme_color1 + '; color: ' + theme_color2 + '; }\n')
+        f.write('.main { width: 95%; margin: 0 auto; }\n')
+        f.write('.logo { font-size: 6px; text-align: center; width: 40px; }\n')
+        f.write('.title { font-size: 20px; }\n')
+        f.write('.results { height: calc(100vh - 120px); overflow-y: auto; }\n')
+        f.write('.run td { font-weight: bold; }\n')
+        f.write('.run .log { color: ' + theme_color + '; text-decoration: underline; margin: 0px 24px; }\n')
+        f.write('.columns td { background-color: ' + theme_color + '; color: white; font-weight: bold; }\n')
+        f.write('.gap td { background-color: ' + alt_theme_color1 + '; }\n')
+        f.write('.ok { font-size: 25px; color: green; }\n')
+        f.write('.failed { font-size: 25px; color: red; }\n')
+        f.write('.commandline { font-size: 10px; }\n')
+        f.write('sup { font-size: 8px; color: #d0d0d0; }\n')
         f.write('</style>\n')
         f.write('</head>\n')
-        f.write('<body style="background-color:'+ alt_theme_color1 +';>\n')
-        f.write('<center>\n')
+        f.write('<body>\n')
         f.write('<div class="main">\n')
-        f.write('<center>\n')
         f.write('	<table>\n')
-        f.write("            <tr>\n")
-        f.write("            <th style='font-size:6px; text-align: center; color: white; background-color: "+ theme_color + "; width: 40px'><img src=\"data:image/png;base64,"+ ag_64 +" alt=\"AutoGUI Logo\" /><a> AutoGUI "+ version + "</a></td>\n")  
-        f.write("		        <th> </th>\n") 
-        f.write("		        <th style='color: white; font-size:20px'; colspan=\"3\">" + logtitle + "</th>\n")
+        f.write('            <tr>\n')
+        f.write('            <th class="logo"><img src="data:image/png;base64,' + ag_64 + '" alt="AutoGUI Logo" /><a> AutoGUI ' + version + '</a></th>\n')
+        f.write('		        <th class="title" colspan="3">' + html.escape(logtitle) + '</th>\n')
+        f.write('               <th>Searched in:<br>' + html.escape(find_path) + '</th>\n')
+        f.write('               <th style="width: 140px">Search date:<br>' + datetime.date.today().strftime("%m/%d/%y") + '</th>\n')
+        f.write('	       </tr>\n')
+        f.write('	</table>\n')
+        f.write('<div class="results" id="results"><table>\n')
         if exclude_failed == False:
-            f.write("		        <th> </th>\n")  
-        if include_commandline == True:
-            f.write("		        <th> </th>\n") 
-        f.write("               <th style='font-size:13px; text-align: left; color: white; background-color: "+ theme_color + "'>Searched in:<br>" + find_path + "</th>\n")    
-        f.write("               <th style='font-size:13px; text-align: left; color: white; background-color: "+ theme_color + "; width: 140px'>Search date:<br>"+ datetime.date.today().strftime("%m/%d/%y") + "</th>\n")    
-        f.write("	       </tr>\n")
-        f.write("         <tr>\n")
-        f.write("	<tr style = 'background-color: " + alt_theme_color1 + "'><td style = 'background-color: " + alt_theme_color1 + "'></td> </tr>\n")
-        f.write("	<tr style = 'background-color: " + alt_theme_color1 + "'><td style = 'background-color: " + alt_theme_color1 + "'></td> </tr>\n")
-        numberofexports = 0 
-        for exportvalue in exportlist:
+            f.write('<colgroup><col style="width: 60px"><col style="width: 60px">' + '<col>' * (number_of_columns - 2) + '</colgroup>\n')
+        else:
+            f.write('<colgroup><col style="width: 60px">' + '<col>' * (number_of_columns - 1) + '</colgroup>\n')
+        f.write('<tbody id="rows"></tbody></table></div>\n')
+        f.write('</div>\n')
+        # one compact JSON array per run: [number, date, mode, link, log path, done, failed, [[#, status, dataset, space group, cell, angles, iso, aniso, command line], ...]]
+        f.write('<script>\n')
+        f.write('var runs = [\n')
+        numberofexports = 0
+        for exportvalue in export_chunks(table_values, find_path, exportpath):
             failed_counter = 0
             success_counter = 0
-            failed_job = False
             csv_read = exportvalue[5]
-            if len(csv_read) > 0:
-                for line in csv_read:
-                    line = (line.strip()).split(';')
-                    if line[2] == "True":
-                        success_counter = success_counter + 1
-                    if line[2] == "False":
-                        failed_counter = failed_counter + 1    
+            for line in csv_read:
+                if len(line) > 2 and line[2] == "True":
+                    success_counter = success_counter + 1
+                if len(line) > 2 and line[2] == "False":
+                    failed_counter = failed_counter + 1
             if (success_counter == 0) and (failed_counter > success_counter):
                 failed_job = True
             else:
-                failed_job = False 
-            if (failed_job == False) or (exclude_failed == False):
-                numberofexports = numberofexports + 1     
-                f.write("         <tr  style='background-color: "+ alt_theme_color1 +"'>\n")   
-                if exporttype == "absolute links":
-                    f.write("		        <td style='font-size:13px; background-color: "+ theme_color1 +"'; colspan=\"2\"> <b><a href = " + exportvalue[3] + " target =\"_blank\">Date: " + exportvalue[0] + "</a></b></td>\n")
-                    f.write("		        <td style='font-size:13px; background-color: "+ theme_color1 +"'; colspan=\"1\"> <b><a href = " + exportvalue[3] + " target =\"_blank\">Mode: " + exportvalue[1] + "</a></b></td>\n")
-                    f.write("		        <td style='font-size:13px; color: " + theme_color + "; background-color: "+ theme_color1 +"'; colspan=\"3\"> <b><u><a href = " + exportvalue[3] + " target =\"_blank\">Processing log: " + exportvalue[3] + "</a></u></b></td>\n")
-                    if exclude_failed == False:
-                        f.write("		        <td style='font-size:13px; color: " + theme_color + "; background-color: "+ theme_color1 +"'> <b><u><a href = " + exportvalue[3] + " target =\"_blank\"> </a></u></b></td>\n")  
-                    if include_commandline == True:
-                        f.write("		        <td style='font-size:13px; color: " + theme_color + "; background-color: "+ theme_color1 +"'> <b><u><a href = " + exportvalue[3] + " target =\"_blank\"> </a></u></b></td>\n") 
-                    f.write("		        <td style='font-size:13px; background-color: "+ theme_color1 +"'; colspan=\"1\"> <b><a href = " + exportvalue[3] + " target =\"_blank\">Jobs: </a><a style='color: "+ theme_color2 + "'>" + str(success_counter+failed_counter) + "<sup style='font-size:8px; color: #d0d0d0'>total</sup></a><a style='color: green'>" + str(success_counter) + "<sup style='font-size:8px; color: #d0d0d0'>done</sup></a><a style='color: red'>" + str(failed_counter) + "<sup style='font-size:8px; color: #d0d0d0'>failed</sup></a></b></td>\n")
-                else:
-                    f.write("		        <td style='font-size:13px; background-color: "+ theme_color1 +"'; colspan=\"2\"> <b><a href = " + exportvalue[4] + " target =\"_blank\">Date: " + exportvalue[0] + "</a></b></td>\n")
-                    f.write("		        <td style='font-size:13px; background-color: "+ theme_color1 +"'; colspan=\"1\"> <b><a href = " + exportvalue[4] + " target =\"_blank\">Mode: " + exportvalue[1] + "</a></b></td>\n")
-                    f.write("		        <td style='font-size:13px; color: " + theme_color + "; background-color: "+ theme_color1 +"'; colspan=\"3\"> <b><u><a href = " + exportvalue[4] + " target =\"_blank\">Processing log: " + exportvalue[3] + "</a></u></b></td>\n")
-                    if exclude_failed == False:
-                        f.write("		        <td style='font-size:13px; color: " + theme_color + "; background-color: "+ theme_color1 +"'> <b><u><a href = " + exportvalue[4] + " target =\"_blank\"> </a></u></b></td>\n")  
-                    if include_commandline == True:
-                        f.write("		        <td style='font-size:13px; color: " + theme_color + "; background-color: "+ theme_color1 +"'> <b><u><a href = " + exportvalue[4] + " target =\"_blank\"> </a></u></b></td>\n") 
-                    f.write("		        <td style='font-size:13px; background-color: "+ theme_color1 +"'; colspan=\"1\"> <b><a href = " + exportvalue[4] + " target =\"_blank\">Jobs: </a><a style='color: "+ theme_color2 + "'>" + str(success_counter+failed_counter) + "<sup style='font-size:8px; color: #d0d0d0'>total</sup></a><a style='color: green'>" + str(success_counter) + "<sup style='font-size:8px; color: #d0d0d0'>done</sup></a><a style='color: red'>" + str(failed_counter) + "<sup style='font-size:8px; color: #d0d0d0'>failed</sup></a></b></td>\n")
-                f.write("         </tr>\n")
-                f.write("         <tr style='background-color: "+ theme_color +"'>\n")
-                f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>#</b></td>\n")
-                if exclude_failed == False:
-                    f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Status</b></td>\n")
-                f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Dataset</b></td>\n")
-                f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Space group</b></td>\n")
-                f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Cell dimensions [Å]</b></td>\n")
-                f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Cell angles [°]</b></td>\n")
-                f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Isotropic diffraction limit [Å]</b></td>\n")
-                f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Anisotropic diffraction limits [Å]</b></td>\n")
-                if include_commandline == True:
-                    f.write("		        <td style='font-size:13px; color: white; background-color: "+ theme_color +"'> <b>Autoproc command line</b></td>\n")
-                f.write("         </tr>\n")
-                csv_read = exportvalue[5]
-                if len(csv_read) > 0:
-                    content_counter = 1
-                    for line in csv_read:
-                        csv_item = (line.strip()).split(';')
-                        csv_item.pop(0)
-                        if (exclude_failed == False) or (csv_item[1] == "True"):
-                            f.write("         <tr style='background-color: "+ theme_color1 +"'>\n")
-                            if len(csv_read) > 1:
-                                ds_count = str(numberofexports) + "." + str(content_counter)
-                            else:
-                                ds_count = str(numberofexports) 
-                            #csv_item =  Dataset ID;Successful processing;Space group;Cell dimensions [Å];Cell angles [°];Isotropic diffraction limit [Å];Anisotropic diffraction limits [Å];Autoproc command line    
-                            f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + ds_count + "</a></td>\n") 
-                            try:
-                                if exclude_failed == False:
-                                    if csv_item[1] == "True":
-                                        f.write("		        <td style='font-size:25px; color: green; background-color: "+ theme_color1 +"'><a><b>&#10004;</b></a></td>\n")
-                                    else:
-                                        f.write("		        <td style='font-size:25px; color: red; background-color: "+ theme_color1 +"'><a><b>&#10008;</b></a></td>\n")     
-                                f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[0] + "</a></td>\n") 
-                                f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[2] + "</a></td>\n")
-                                f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[3] + "</a></td>\n")
-                                f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[4] + "</a></td>\n")
-                                f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[5] + "</a></td>\n") 
-                                f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[6] + "</a></td>\n")   
-                                if include_commandline == True:
-                                    f.write("		        <td style='font-size:10px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[7] + "</a></td>\n")        
-                            except:
-                                f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>N/A</a></td>\n") 
-                                print('Missing csv data!')
-                                print('')
-                            f.write("	        </tr>\n") 
-                            content_counter = content_counter + 1
-                else:
-                    f.write("         <tr style='background-color: "+ theme_color1 +"'>\n")
-                    csv_item = ['N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A']
-                    f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + str(numberofexports) + "</a></td>\n")
-                    if exclude_failed == False:
-                        f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[1] + "</a></td>\n") 
-                    f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[0] + "</a></td>\n") 
-                    f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[2] + "</a></td>\n")
-                    f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[3] + "</a></td>\n")
-                    f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[4] + "</a></td>\n")
-                    f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[5] + "</a></td>\n") 
-                    f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[6] + "</a></td>\n")   
-                    if include_commandline == True:
-                        f.write("		        <td style='font-size:13px; color: " + theme_color2 + "; background-color: "+ theme_color1 +"'> <a>" + csv_item[7] + "</a></td>\n") 
-                    f.write("	        </tr>\n")             
-                f.write("	<tr style = 'background-color: " + alt_theme_color1 + "'><td style = 'background-color: " + alt_theme_color1 + "'></td></tr>\n")
-                
-        f.write('	</table>\n')
-        f.write('\n')
-        f.write('</div>\n')
-        f.write('</center>\n')
+                failed_job = False
+            if (failed_job == True) and (exclude_failed == True):
+                continue
+            numberofexports = numberofexports + 1
+            dataset_rows = []
+            if len(csv_read) > 0:
+                content_counter = 1
+                for line in csv_read:
+                    csv_item = list(line[1:]) + ['N/A'] * (9 - len(line))
+                    if (exclude_failed == False) or (csv_item[1] == "True"):
+                        if len(csv_read) > 1:
+                            ds_count = str(numberofexports) + "." + str(content_counter)
+                        else:
+                            ds_count = str(numberofexports)
+                        dataset_rows.append([ds_count] + csv_item[1:2] + csv_item[0:1] + csv_item[2:8])
+                        content_counter = content_counter + 1
+            else:
+                dataset_rows.append([str(numberofexports), 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A'])
+            if exporttype == "absolute links":
+                link = exportvalue[3]
+            else:
+                link = exportvalue[4]
+            run_entry = [numberofexports, exportvalue[0], exportvalue[1], link, exportvalue[3], success_counter, failed_counter, dataset_rows]
+            f.write(json.dumps(run_entry, ensure_ascii = False, separators = (',', ':')).replace('</', '<\\/') + ',\n')
+        f.write('];\n')
+        f.write('var columns = ' + str(number_of_columns) + ';\n')
+        f.write('var showStatus = ' + str(exclude_failed == False).lower() + ';\n')
+        f.write('var showCommandline = ' + str(include_commandline == True).lower() + ';\n')
+        f.write('''var rowHeight = 32;
+var lines = [];
+for (var r = 0; r < runs.length; r++) {
+    lines.push([0, r]);
+    lines.push([1, r]);
+    for (var d = 0; d < runs[r][7].length; d++) { lines.push([2, r, d]); }
+    lines.push([3, r]);
+}
+function esc(text) {
+    return String(text).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
+function cell(text, cls) {
+    return '<td' + (cls ? ' class="' + cls + '"' : '') + ' title="' + esc(text) + '">' + esc(text) + '</td>';
+}
+function drawLine(line) {
+    var run = runs[line[1]];
+    if (line[0] == 0) {
+        var link = '<a href="' + esc(run[3]) + '" target="_blank">';
+        return '<tr class="run"><td colspan="' + columns + '">' + link + 'Date: ' + esc(run[1]) + '</a>' +
+               '<span class="log">' + link + 'Mode: ' + esc(run[2]) + '</a></span>' +
+               '<span class="log">' + link + 'Processing log: ' + esc(run[4]) + '</a></span>' +
+               link + 'Jobs: </a>' + (run[5] + run[6]) + '<sup>total</sup><span style="color: green">' + run[5] + '</span><sup>done</sup><span style="color: red">' + run[6] + '</span><sup>failed</sup></td></tr>';
+    }
+    if (line[0] == 1) {
+        var head = '<tr class="columns"><td>#</td>' + (showStatus ? '<td>Status</td>' : '') +
+                   '<td>Dataset</td><td>Space group</td><td>Cell dimensions [&Aring;]</td><td>Cell angles [&deg;]</td><td>Isotropic diffraction limit [&Aring;]</td><td>Anisotropic diffraction limits [&Aring;]</td>';
+        return head + (showCommandline ? '<td>Autoproc command line</td>' : '') + '</tr>';
+    }
+    if (line[0] == 2) {
+        var row = run[7][line[2]];
+        var html = '<tr>' + cell(row[0]);
+        if (showStatus) {
+            if (row[1] == 'True') { html += '<td class="ok"><b>&#10004;</b></td>'; }
+            else if (row[1] == 'False') { html += '<td class="failed"><b>&#10008;</b></td>'; }
+            else { html += cell(row[1]); }
+        }
+        for (var c = 2; c < 8; c++) { html += cell(row[c]); }
+        if (showCommandline) { html += cell(row[8], 'commandline'); }
+        return html + '</tr>';
+    }
+    return '<tr class="gap"><td colspan="' + columns + '"></td></tr>';
+}
+var results = document.getElementById('results');
+var body = document.getElementById('rows');
+function draw() {
+    var first = Math.max(0, Math.floor(results.scrollTop / rowHeight) - 20);
+    var last = Math.min(lines.length, first + Math.ceil(results.clientHeight / rowHeight) + 40);
+    var html = '<tr style="height: ' + (first * rowHeight) + 'px"></tr>';
+    for (var i = first; i < last; i++) { html += drawLine(lines[i]); }
+    html += '<tr style="height: ' + ((lines.length - last) * rowHeight) + 'px"></tr>';
+    body.innerHTML = html;
+}
+var pending = false;
+results.addEventListener('scroll', function () {
+    if (!pending) { pending = true; window.requestAnimationFrame(function () { pending = false; draw(); }); }
+});
+window.addEventListener('resize', draw);
+draw();
+''')
+        f.write('</script>\n')
         f.write('</body>\n')
         f.write('</html>\n')
     f.close()
-    print("Wrote", filetoexport)        
+    print("Wrote", filetoexport)
 
 # thread for generic long function to keep gui working
 def browser_thread(window):
@@ -1006,7 +1153,7 @@ while True:
                                     [sg.InputText(default_text=find_path,key='-LOGROOT-',size=(33,1))],
                                     [sg.Text("Processing results to recover:"), sg.InputText(default_text=find_number,key='-LOGMAXNUM-',size=(6,2))],
                                     [sg.Checkbox("Follow symbolic links", key = '-SYMLINKS-', default= follow_symlinks)],
-                                    [sg.Text('')] 
+                                    [sg.Checkbox("Use results catalog", key = '-USECATALOG-', default= use_catalog, tooltip = 'Look up finished runs in the results catalog instead of searching the file tree.\nThe first search below a folder adds all runs found there, later runs are added when they finish.\nUncheck to search the file tree (found runs are added to the catalog).')]
                                     ], size = (230, 160)),
                                     sg.Col ([[sg.Text('')],
                                     [sg.FolderBrowse(initial_folder = find_path, button_text = 'Browse', tooltip = 'Speed up things by narrowing down the file-tree for log-file search', target = '-LOGROOT-', size = (5,1))],
@@ -1017,9 +1164,13 @@ while True:
                             ], title='Search for previous results',title_color=theme_color, relief=sg.RELIEF_GROOVE, vertical_alignment ="center")],
                             [sg.Frame(layout=[
                                 [sg.Col([
-                                    [sg.Table(table_values, ['Date','Type','Path'], num_rows=10,  def_col_width = 10, auto_size_columns = True, max_col_width = 50, enable_events= True, font = "Helvetica 9", justification = "left", key = '-RESULTSTABLE-' )],
-                                    [sg.Button('Show selected result', key = '-SHOWRES-', disabled = True), sg.Button('Export results as CSV', key = '-EXPORTCSV-', disabled = True), sg.Button('Export results as HTML', key = '-EXPORTHTML-', disabled = True)]
-                                ], size = (555, 250))]
+                                    [sg.Text('Space group:'), sg.InputText(default_text=filter_space_group,key='-FILTERSG-',size=(12,1)), sg.Text('Resolution better than [Å]:'), sg.InputText(default_text=filter_resolution,key='-FILTERRES-',size=(6,1), tooltip = 'Filters are applied to results from the results catalog.')],
+                                    [sg.Text('Words in logs:'), sg.InputText(default_text=filter_text,key='-FILTERTEXT-',size=(20,1), tooltip = 'Runs with all of these words in their logs or datasets.csv,\ne.g. "ice rings". "ice*" finds words starting with ice.'),
+                                     sg.Text('Cell axis [Å]:'), sg.InputText(default_text=filter_cell,key='-FILTERCELL-',size=(10,1), tooltip = 'A cell axis of a dataset (of the space group above, if given),\ne.g. 140 (+- 1 %) or 138-142.')],
+                                    [sg.Table(table_values, ['Date','Type','Path'], num_rows=7,  def_col_width = 10, auto_size_columns = True, max_col_width = 50, enable_events= True, enable_click_events = True, font = "Helvetica 9", justification = "left", key = '-RESULTSTABLE-', tooltip = 'Click on a column title to sort.' )],
+                                    [sg.Button('<', key = '-PREVPAGE-'), sg.Text('Page 1/1', key = '-PAGE-', size = (16,1)), sg.Button('>', key = '-NEXTPAGE-'), sg.Text('Filter table:'), sg.InputText(default_text='',key='-FILTERTABLE-',size=(22,1), enable_events = True)],
+                                    [sg.Button('Show selected result', key = '-SHOWRES-', disabled = True), sg.Button('Re-scale', key = '-RESCALERES-', disabled = True, tooltip = 'Scale the integrated data of the selected Classic result\nagain with new high resolution cutoff criteria.'), sg.Button('Export results as CSV', key = '-EXPORTCSV-', disabled = True), sg.Button('Export results as HTML', key = '-EXPORTHTML-', disabled = True)]
+                                ], size = (555, 280))]
                             ], title='Table of found results',title_color=theme_color, relief=sg.RELIEF_GROOVE, vertical_alignment ="center")],
                             [sg.StatusBar('\u2691  Ready.', key = '-STATUSBAR-', size = (60,1), font = ("Arial 8"))]
                             ]           
@@ -1027,9 +1178,20 @@ while True:
         #time.sleep(0.10)
         window_findconfig['-RESULTSTABLE-'].update(values = [])
 
+        stop_search = threading.Event()
+        result_rows = []
+        results_page = 0
+        results_sort_column = None
+        results_sort_reverse = False
+        results_generation = 0
+        # bring the search index up to date in the background
+        stop_index = threading.Event()
+        index_function(window_findconfig, None, stop_index)
         while True:
             event_findconfig, values_findconfig = window_findconfig.read()
             if event_findconfig == sg.WIN_CLOSED or event_findconfig == 'Close':
+                stop_search.set()
+                stop_index.set()
                 window_findconfig.close()
                 #layout_findconfig = None
                 #window_findconfig = None
@@ -1047,6 +1209,11 @@ while True:
                 classicresults = values_findconfig['-CLASSICRESULTS-']
                 batchresults = values_findconfig['-BATCHRESULTS-']
                 follow_symlinks = values_findconfig['-SYMLINKS-']
+                use_catalog = values_findconfig['-USECATALOG-']
+                filter_space_group = values_findconfig['-FILTERSG-']
+                filter_resolution = values_findconfig['-FILTERRES-']
+                filter_text = values_findconfig['-FILTERTEXT-']
+                filter_cell = values_findconfig['-FILTERCELL-']
                 if classicresults == False and batchresults == False:
                     classicresults = True
                     batchresults = True
@@ -1055,37 +1222,120 @@ while True:
                 stat = 'Searching for up to ' + find_number + ' results. Please wait...'
                 print(stat)
                 window_findconfig['-STATUSBAR-'].update(stat)
+                table_values = []
+                result_rows = []
+                results_page = 0
+                results_generation = results_generation + 1
+                results_page = show_results_page(window_findconfig, table_values, results_page)
+                window_findconfig['Search'].update(disabled = True)
+                window_findconfig['-SHOWRES-'].update(disabled = True)
+                window_findconfig['-RESCALERES-'].update(disabled = True)
+                window_findconfig['-EXPORTCSV-'].update(disabled = True)
+                window_findconfig['-EXPORTHTML-'].update(disabled = True)
                 window_findconfig.refresh()
-                found_results = get_results(classicresults,batchresults,find_path,find_number, follow_symlinks)
+                stop_search = threading.Event()
+                catalog_rows = None
+                catalog_filters = None
+                if use_catalog == True:
+                    try:
+                        if autogui_catalog.folder_crawled(find_path) == True:
+                            catalog_rows = autogui_catalog.find_runs(find_path, classicresults, batchresults, find_number, filter_space_group, filter_resolution, text = filter_text, cell = filter_cell)
+                        else:
+                            # first search below this folder: runs from before the catalog existed are imported while searching
+                            catalog_filters = [filter_space_group, filter_resolution, filter_text, filter_cell]
+                            stat = 'First search here, adding all runs to the results catalog...'
+                            print(stat)
+                            window_findconfig['-STATUSBAR-'].update(stat)
+                    except Exception:
+                        print('Unable to read results catalog, searching the file tree instead.')
+                        catalog_rows = None
+                        catalog_filters = None
+                results_from_catalog = (catalog_rows != None or catalog_filters != None)
+                if catalog_rows != None:
+                    window_findconfig.write_event_value('-RESULTSDONE-', catalog_rows)
+                else:
+                    get_results(window_findconfig, classicresults, batchresults, find_path, find_number, follow_symlinks, stop_search, catalog_filters)
+
+            if event_findconfig == '-INDEXDONE-':
+                if values_findconfig['-INDEXDONE-'] == None:
+                    stat = 'Unable to update the search index of the results catalog.'
+                else:
+                    stat = 'Search index up to date (' + str(values_findconfig['-INDEXDONE-']) + ' new or changed files).'
+                print(stat)
+                window_findconfig['-STATUSBAR-'].update(stat)
+
+            # results come in while the search is still running
+            if event_findconfig == '-RESULTSFOUND-':
+                result_rows = values_findconfig['-RESULTSFOUND-']
+                results_generation = results_generation + 1
+                view_results(window_findconfig, result_rows, results_sort_column, results_sort_reverse, values_findconfig['-FILTERTABLE-'], results_generation)
+                stat = 'Searching... ' + str(len(result_rows)) + ' results found so far.'
+                window_findconfig['-STATUSBAR-'].update(stat)
+
+            if event_findconfig == '-RESULTSDONE-':
+                found_results = values_findconfig['-RESULTSDONE-']
+                window_findconfig['Search'].update(disabled = False)
                 if len(found_results) > 0:
                     stat = 'Found ' + str(len(found_results)) + ' results from previous jobs.'
+                    if results_from_catalog == True:
+                        stat = 'Found ' + str(len(found_results)) + ' results in the results catalog.'
                     print(stat)
                     window_findconfig['-STATUSBAR-'].update(stat)
-                    table_values = []
-                    for found_result in found_results:
-                        table_values.append(found_result)
-                    window_findconfig['-RESULTSTABLE-'].update(values = table_values)
+                    result_rows = found_results
+                    results_generation = results_generation + 1
+                    view_results(window_findconfig, result_rows, results_sort_column, results_sort_reverse, values_findconfig['-FILTERTABLE-'], results_generation)
                     window_findconfig['-SHOWRES-'].update(disabled = False)
+                    window_findconfig['-RESCALERES-'].update(disabled = False)
                     window_findconfig['-EXPORTCSV-'].update(disabled = False)
                     window_findconfig['-EXPORTHTML-'].update(disabled = False)
                     window_findconfig.refresh()
                     #print(table_values)
                 else:
                     stat = 'Found no results from previous jobs.'
+                    if results_from_catalog == True:
+                        stat = 'Found no results in the results catalog.'
                     print(stat)
                     window_findconfig['-STATUSBAR-'].update(stat)
                     table_values = []
-                    window_findconfig['-RESULTSTABLE-'].update(values = [])
+                    result_rows = []
+                    results_generation = results_generation + 1
+                    results_page = show_results_page(window_findconfig, table_values, 0)
                     window_findconfig['-SHOWRES-'].update(disabled = True)
+                    window_findconfig['-RESCALERES-'].update(disabled = True)
                     window_findconfig['-EXPORTCSV-'].update(disabled = True)
                     window_findconfig['-EXPORTHTML-'].update(disabled = True)
                     window_findconfig.refresh()
-            
+
+            # filtered and sorted rows are ready, exports use what is shown in the table
+            if event_findconfig == '-RESULTSVIEW-':
+                if values_findconfig['-RESULTSVIEW-'][0] == results_generation:
+                    table_values = values_findconfig['-RESULTSVIEW-'][1]
+                    results_page = show_results_page(window_findconfig, table_values, results_page)
+
+            # sort by clicked column title, filter while typing
+            if isinstance(event_findconfig, tuple) and event_findconfig[0] == '-RESULTSTABLE-':
+                if event_findconfig[2][0] == -1 and event_findconfig[2][1] != None:
+                    if results_sort_column == event_findconfig[2][1]:
+                        results_sort_reverse = not results_sort_reverse
+                    else:
+                        results_sort_column = event_findconfig[2][1]
+                        results_sort_reverse = (results_sort_column == 0)
+                    results_generation = results_generation + 1
+                    view_results(window_findconfig, result_rows, results_sort_column, results_sort_reverse, values_findconfig['-FILTERTABLE-'], results_generation)
+            if event_findconfig == '-FILTERTABLE-':
+                results_page = 0
+                results_generation = results_generation + 1
+                view_results(window_findconfig, result_rows, results_sort_column, results_sort_reverse, values_findconfig['-FILTERTABLE-'], results_generation)
+            if event_findconfig == '-PREVPAGE-':
+                results_page = show_results_page(window_findconfig, table_values, results_page - 1)
+            if event_findconfig == '-NEXTPAGE-':
+                results_page = show_results_page(window_findconfig, table_values, results_page + 1)
+
             # select stuff in table
             if event_findconfig == '-RESULTSTABLE-':
                 try:
                     rowlist = values_findconfig['-RESULTSTABLE-'][0]
-                    table_path = (table_values[rowlist][2])
+                    table_path = (table_values[results_page * results_page_size + rowlist][2])
                     window_findconfig['-STATUSBAR-'].update(table_path)
                 except:
                     #print("Something went wrong...")
@@ -1108,6 +1358,52 @@ while True:
                 window_findconfig['-STATUSBAR-'].update(stat)
                 open_browser(browser, browser_target)
                 
+            # re-scale selected Classic result with new cutoff criteria
+            if event_findconfig == '-RESCALERES-':
+                try:
+                    rescale_row = table_values[results_page * results_page_size + values_findconfig['-RESULTSTABLE-'][0]]
+                except (IndexError, TypeError):
+                    rescale_row = None
+                if rescale_row == None or rescale_row[1] != "Classic":
+                    stat = 'Select a Classic result to re-scale.'
+                    window_findconfig['-STATUSBAR-'].update(stat)
+                else:
+                    rescale_source = os.path.dirname(os.path.join(find_path, rescale_row[2].strip("./")))
+                    layout_rescale = [[sg.Text('High resolution cutoff criteria for re-scaling:')],
+                                      [sg.Combo(autogui_rescale.cutoff_selections, default_value = autogui_rescale.cutoff_selections[0], key = '-RESCALECUT-', readonly = True, size = (45, 1))],
+                                      [sg.Text('I/sig(I) >='), sg.InputText('2.0', size = (4, None), key = '-RESCALEISIG-'), sg.Text('CC(1/2) >='), sg.InputText('0.3', size = (4, None), key = '-RESCALECC-'),
+                                       sg.Text('Rpim <='), sg.InputText('0.6', size = (4, None), key = '-RESCALERPIM-')],
+                                      [sg.Button('Run'), sg.Button('Cancel')]]
+                    window_rescale = sg.Window('Re-scale ' + os.path.basename(rescale_source), layout_rescale, no_titlebar=False, grab_anywhere=False, finalize = True, location = (window.current_location()[0] + 250, window.current_location()[1] + 100 ))
+                    while True:
+                        event_rescale, values_rescale = window_rescale.read(timeout = 100)
+                        if event_rescale == sg.WIN_CLOSED or event_rescale == 'Cancel':
+                            break
+                        if event_rescale == 'Run':
+                            param_cut = autogui_rescale.cutoff_parameters(values_rescale['-RESCALECUT-'], values_rescale['-RESCALEISIG-'], values_rescale['-RESCALECC-'], values_rescale['-RESCALERPIM-'])[0]
+                            try:
+                                rescale_folder, rescale_number, integrated_path = autogui_rescale.prepare_rescale(rescale_source)
+                                rescale_run(window_findconfig, rescale_folder, integrated_path, param_cut)
+                                stat = 'Re-scaling in ' + rescale_folder + ' ...'
+                            except (ValueError, OSError) as rescale_error:
+                                stat = str(rescale_error)
+                            print(stat)
+                            window_findconfig['-STATUSBAR-'].update(stat)
+                            break
+                    window_rescale.close()
+                    layout_rescale = None
+                    window_rescale = None
+                    gc.collect()
+
+            if event_findconfig == '-RESCALEDONE-':
+                rescale_folder, rescaled_files = values_findconfig['-RESCALEDONE-']
+                if rescaled_files == []:
+                    stat = 'Re-scaling in ' + rescale_folder + ' failed, see log.txt there.'
+                else:
+                    stat = 'Re-scaling done: ' + ', '.join(os.path.basename(rescaled_file) for rescaled_file in rescaled_files) + ' in ' + rescale_folder
+                print(stat)
+                window_findconfig['-STATUSBAR-'].update(stat)
+
             #export results table as CSV
             if event_findconfig == '-EXPORTCSV-':
                 layout_export_csv = [[sg.Text('Export found results as CSV')],
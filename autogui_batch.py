@@ -23,6 +23,7 @@ version = 'v.20250307'                             # current version
 # Dependencies required:
 # FreeSimpleGUI (pip install FreeSimpleGUI)
 # psutil (pip install psutil)
+# numpy (pip install numpy)
 # Working installation of GPhL AutoPROC (www.globalphasing.com/autoproc/)
 # Working installation of CCP4i (www.ccp4.ac.uk)
 # Working installation of Adxv for Image viewing (www.scripps.edu/tainer/arvai/adxv.html)
@@ -38,6 +39,8 @@ preplist = 'refine coot phaser xtriage autobuild pdb_deposit ccp4 pymol' # list
 dark_theme = False                                    # use dark or light theme 
 prepfolder_classic = True                             # prepare subfolders in classic mode?
 prepfolder_batch = True                               # prepare subfolders in batch mode?
+check_all_cbfs = False                                # decode every converted mini-cbf file instead of a sample before processing?
+cbf_check_samples = 25                                # converted mini-cbf files decoded per dataset if not all are checked
 
 theme_highlight_color = '#458eaf'
 dark_theme_color = '#2b2a32' 
@@ -58,6 +61,14 @@ import shutil
 import copy
 import gc
 import faulthandler
+import concurrent.futures
+import autogui_catalog
+import autogui_cbf
+import autogui_masks
+import autogui_results
+import autogui_ccp4
+import autogui_shells
+import autogui_cluster
 
 # icon
 ag_64 = 'iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAAmeXpUWHRSYXcgcHJvZmlsZSB0eXBlIGV4aWYAAHjarZxrlhy5jqT/+ypmCc43uRw+z5kdzPLnM9BTUune7unuM6WSMhXp4UEnAIMZAOrZ/+d/n+d/8V/Lzj8xlZpbzi//xRab73xT3/vf/ereaH/af/H7EX//x+vPrx94Xgp8DfeveX/Xd15Pv99Qvje48c/XnzK/+9TvRt8Pfm4Y9Mmeb77r6nej4O/r7vv707739fjH43y/43Lue9N9rL//XtiMlbhf8I/fwYWXP7MuCPrtQ+dr408XMhfxJ98He8Xrun+3d8+vb//avF/f/bV3b/9eD//ciufN3wX5rz36Xnfp3++d7dCfK3K/P/kfPyjJ/zLo33t3zqrn7Pt0PWZ2Kj/fQ/08in3HhYOtDPa2zK/C78T3xX41flUecWKxhTUHv+bjmvPs9nHRLdfdcdu+TjdZYvTbF756P32w12oovvkZZIKoX+74ghnWEyqWmFgt8LL/tRZnn9vs86arfPJyXOkdN3Nm2b9+Pf/uxf/Jr183Okeui8PVX3vFurxcj2XIcvqTqzCBO9+eJttf+/X84TfvH4YNWDDZNlcesL/j3mIk99u3gtk5cF164/OFsyvruwFbxGcnFuMCFnizC8ll9xbvi3PsY8U+nZX7EP3AAi4lv9xzsE0gEoqvXp/Ne4qza33y92WgBUMkAqVgGgIFY8WY8J8SKz7UU0jxSSnlVFJNLfUccswp51yyMKqXUGJJJZdSamml11BjTTXXUmtttTffAhCWWm7labW11jsf2rl1592dK3offoQRRxp5lFFHG33iPjPONPMss842+/IrLMJ/5VWeVVdbfbuNK+2408677Lrb7gdfO+HEk04+5dTTTv9ltc+q/7Sa+8ty/7nV3Gc1WSzadeW31Xi5lJ9bOMFJks2wmI8OixdZAIf2stlbXYxelpPN3uYJiuSxmksyznKyGBaM2/l03C/b/bbcf2q3J8X/lt38f2S5R6b7/2G5R6b7LPevdvs3VlvdMkowAykKtadvOAAbF+zafe3KSf/9r4NPKovoPzzAbGed08bOeQOha9SZw5qnL7A7J8c+Vp4wnRE315281yx58tNUuFWvxz1sWjjAwsa8Z7hyemH5Y6+A6+xU91xjlHy4RwmnjBM7Tw9wd1vWr6/P3y/8j74ezH/emsfSmt4+WYg2bLGmxG83AovqpYWdTitjrDZCW2evxS3CZFPi3M2RUtrDorlJ3eWctEc/I5/3lDXwnNMT+9B0WS5tcok7ue+W54j+jFAan9qCnhyr1eD22Cfh2bhI24cMMgKeQuLGF13rgygDiWvsB6Oc2lhsK7Z3rHeHsllhfbQevDlszDXSHKvzlrBtnb0Utn4OoHrPPlba85B/zHS4TWyyg9P3fj643MJx93te3Z33xYkZ/Wu3ysQPD5JZ/2huLqJiDJ44HXJYZkUE7bIdfohxEOK6wGopbT1EModox1717u7fmn6dyU6kbSuKk2371jPOg9unssNiH9nN8ufWV6K54Xi1hhkWgIoHneq2NjMQMlxJHGsZXE6ILEI0npq+z8dxTxOQsUeEWbTPJPzPCix08o39JBKkfmgrsLMezX7C62VlH3j11Dp2b7yJLXjDhjMUUg7Bg0/5HOrULe/2d/u46bFpfvgUrlxmy9a4uoMGHgCDTPAq7yJ51claxg2lwScSaZUIxQPOgYEQmOG5m8Wqhu9pLkDvgHVlBMA/AU/281iqS5W3H/ASN+T518YNiQTdhB1IT9+Z55U3H1CvaV0Ju8yppw/YJTT9qOOofo/p+b4ojnADPLrgkvcxnuJWF3Byv8bLBM7kxzUAbGDasr8BXtpCssUZs7bpMBm02pwEvqx7Y34ckBWOk+cJilFh8wg5m5tlPAFnFHYEYtuLhQltjiIxFh5QAOPw76dyJ1aWyx5e71V8ull+RdMaMoQ7kdeWguBt0acX4+6Go9Ulz2nTP8mlhZutMF25S61geJGpnTxgJO3uwR7E4W+IU2D0BA0ki5LnkkPUSAYITf8LX1N3PWduDF7xUJstG5jQETmPcIZg3yvF7euYIDWxOQsr6XENkhXvOjxjWZvFpXrkYG2y5LA8pOEl9wEfT0m5zwzqjEBKBt/36tzr7HjwAx4G8/NQnn1a8NWknTYncdx7E3LB7Lyes8DFd3mCBHSUI7HBTTAz3e/V8j6eia1j44K8vZRN3J036z68ZTyLnAyHq5t8k6F3mGHGjAUhwmRtHiRrdw1VuX/ewXywEEib5erCsXGgJ8shssCShIa/OxyZdJbzEUXPYOJ2CRDKo21kRSLd8QglwgZXIoPg86DHmQ+mzXI4OEBnu3nKN9btV2sWHfAA0CsuaAHp0LOBiInJe4nLwDMXtqrxdvJaLeklyLX8ckLG/ZqSUuxoXS7WclF3biZp3jZFVXonypANJ+iBUw+jt2ev+MKX8C/QTfkVDMeehLVhzfD2NfUNW6tLH9mCkhCmUnYnMY/F/8gs6MsqimNiqeFhMllYWH1iB5j0AExGilCxCKnJqc8SMwhG+hKu1ZU3LAZRA3rgbDLI2YU7rURwxwJvA0jYXEWzcJwM+wWg7LZuOrNgJNOO8QgRO0wqbWJtwHGc2RlnE+/ISbzE8RAkA4A7KZXXQIifIU+y6EQV1wNmrw3xEofbuWeWP2YHAXNvOxlWgmfY6qIzSKEFAXX6MoUwVUCNQ6L0tugQJiXT7kBCJAO9yQL1/Y+/JmKGaFEw2M4+8AsFr0WDfC+TV3FW4OMu/MR6tEigbzpFHgFRBXRrENMvhvYKGiSEMRbF9MXn8/ZRI9l5NdfwXZ558qEwG5HesjpPAr2Tv9mbSGXYv8cn14GS1ed9ny8OZDtCVrTPZ3GQZOXiDTUC8pSaZGYi355EdIqgRf+yX4IOoQwwBBFnHe9oHo0G5MTd8QGgkL8ssz+3M/zF8omFkJZgbKEnB9q0dwNYrWd8tucFzYF14HBZZEjrK055pslMsAQZXNcoKszLxhOUHFcFn4NIFEbg8y7/aQCIgkVLgGIRJtkNyIwyx4RGiPL1m20gWot00yNEkQ+em0jWW4F5eFzqIy2SG0od5s+WIyac3G3EINUisLXb4Gn1MU4Qb1ZPb5mXfcTNYzVn2b4TNMulcgBlEgwgNhp+irQptZMAucF7gvCoZ2MVKyM+GrroiGhyD+c7OXOyCbxFkWK2JDliGSDtdLYoD9dSAHkeEAsnvAlG6TPgVeR+DP0l/gy4wZTBgpoKnsu1XvA1NtQYc9t+7sMeDUAjKt+QAvXB+BcQkppAcnQlGGDV8z28UMDXwFFkI7jrGk/W9ps9fhTLBPIy+RJLEqOvJFBF4ZVrdnLQuYQepihmkXBpHjU0RcASJKL8fXtmlsCpchGAPbBWQgvNYQQdkqK38vj1iCiSUnj0JHzFvQiU98NRCHsQ8RJNQcyBM4O3YXF4GJJxaFmXs4mmkoawMFloVkuD5NcpzBpSeCTIxh0goqlDwoAHV9CIUiAEWIZx7YJPxcFTd6g/YSsagc0HzkH84amAg7FauLGiTDBKNh/imC3u9W9l0EpWrQrDHqmBsnJehcrjuuCPDQjbYh6uYrIhfPiw8wcfeMMHH4p7UrkUzNyQGt4vLbJZ3xBYXr5sCDx1jwFMFfBDtGH1L+FvAzh5SZABeUsJ+HUuDwzdKF5vBXj2E8esShfCHeU3MQXujV9UnItPsOuHNBhJAZbOBiPT5yMYT4gAqA+Xwt8K+Vl09ICnWrMoDOvZQZgRZbg+JjiMOlfMNM81ZcdHcaXAZwfGjfxLFyUSjkOzF10Ivz7kXkGMwH4meA/7zIpglSw69keZwBktwp2GsTjbAZaAhWoRRuOhOTQ4MpTNOzJrrkvZRLRph5ouh/yVYhyx5SxjyUZV5hGykUBxoko04rq4Cupbq8io8okXWGofOT/EXRqCNChzcGZZ5TfVSzJpYAGFhLGHjMd3xQYjwY+3TMtWlXhMpSRzyB991KHAbJ9fBmcIgon66IoTFCmfZvyDRAw0stls4c91xisfw0epbz8gQ50kmMxrRQHikDg45l9wqRfv5PFQzoQxWDmE5B8r5UaX8A1lJ5I8kc19NmlHsnTLdHDLyc+UBJqlRONLC64edywl+L5U9iEjgiHw+qDMi0gf4jkE3nJkk4VTBGNdJAn2GK5igFtf5fcXJjT3JT1gNuoOrgdpYddeQjlny4FLObxoZRsdS8JAiYlHsQ+gN3hzFVRqdW0ncYwk0RZj9wtVSgbF/I57b/+bqbAzIADcJQNEjvQL/pB7WXlYMT34EEos/uYrRXUt0w1tf3i53yTNgP/xofuFF8vb4HsgU7uJxj834TqzbSbTkKonwUqOEPO4ST6XPHFMpKYnm8AcyPkpNHIXy+a5XRvvI9pAGBLBSs/zh96g1CFnUCWzE+EiPOZ+R3CAIJDik3YepiEgpMTaJL14ch5MCTHR5VaozRjx/WmqBRSOoUgXvURHB0EhPFNElx27xDv1J7D/xPvhasI5eQF4MbVaBfiJtzlteTp8ohKpVSBkE3VqBLpLEhaEFEfBHasV1IoX5+hW2HjJORgUYgaYiVgV+OYxYgS6m6wV90hR9ajzQFrP5SAqv8Ex2Z3eIlsZcpheVa/V0W5VKQA9DqaTxqMlvyIEK8PA+eGtJUPqGxx/kIRfqMTmtkcbJLZXbkiMSGYN0n7a8GoEVDvejEqu8Zj8U6FQYNuIoBPwhCyt53vxw990RBp+ZUuE0jpfvHoMJ4qpFa1nyLaIme6yqJ5iSbG5LwIsuQYCF1bwSoFmLYG3sVNf7OjypSILARoszakyxjN5Endjiem8SciiShyQC8e6xSe+sOW62L/y8K1iHkHyfBRLdRClWdDSaXPQdFIADsJThlXljJsorFiXrVe5hmQDlLKv5emjpK2qYhIG3E+926t4g7hNp0IFlgSO+OPF78F3OOISdJGt7YbIdflcrwT5CaxWF4G9PKvxSnSlklGxEoTyULD9ExdzSQSAn46BeAgPuM8bVeYlQnnyE2FPMFIyzvitTIECrBkhcEdYk4SY+PH5YVALhMSEHe9eKGLMNlge7so2iYDv10IBbcJPwM7tpTTXp4mMxQWTEyE/3wP8VE1IgpBtgPG1RxPqDSuu/UHRBKTiZ1YmeuOFvsey2AtfQznXn1TJrtcqWXXrN/0YxAbVJMAQsXRSV74K6asyPahBuRZAEFezxBOG0QuDInk8W+xEbOCnwUoRYO1Aj06y9xEsDajVfEQcxXIgwR0pOIAh7ZaAFlzjBgJHH8nYRZ4GkDcl31hL6xuqHutsKus8cazcqqpD0Xl1F1Rxasa0avrKl1gOIJLJ93WKdIs4b2FX+TD3nvTIre7vE/MF8iB25GwLDcWLf3kQbQ2rVx1jJYUMBB9W4WYGQCJSFDv5fCN8vWGSctTRCNLzQ9XBKmJ9MDS8G1ZMWl3ZWBvoxgJJT0Vwh0N+0p6kGrFbN8r/Ect1iSVepiIPy2RTPDuz3gnbx6VhwsACNOogaozeVSvDYYWtghKLJZaMf+FABhzHgMOEP/HNJ2MJt+t6EZJSJE/z5jyJoCGNiAKxRS0JAW4pRiWK0dkgoLyFiz5r9+oTGIcDQZTIy/PxSELivhAQJZgDQkmgf+jHDrLOFxKPVIHUekuWG1MChRlOv/tm69Snacr9RaU0q3NftbgkznA54CC+bTlpRK4AsvyKby8udhValNuIgaA4niUgRWE5XY4TYHtvUNNnozfZJQsWAjnF+iqHstEd9RvYo9UhZo40ZBULlZPzw90rYao8LQm5g0qIfojdBdVpj6pdhGOr6LsBq3ZT2QxaAOIFsa8taqBHyyMDBh0KiLd5NMfSLh7zlZpdMa6jcF1LakTO7ZTx17G84Ug4aBZV2FXlGSLhQ94Eh+SpYwKz5IjVECnfsk+EEt6q8pL/b9Q8KxAcodcGUS/+lrE1XqaOEOjoG9l1vx0B7Lp102qIGJCYP7AscR6rT1h5XBxGur8M0VDYt3OvymX2aVMboEKWJBKmj9sogES03qwSoTQCHk84nv4+fIQgYkv7Han9bH2mDZsjLyyIK8x8ew+H54lVQBUiIbng5dCnVgHlJlpDfMLMYTLYFfwQiYUqmcA6RYyaXZeMFWAHJM6Vh/jWllMbUgzpnSerQMO7KpKbnRDQRHOQvVRx98XqCWF8VSqQB69Gqv1y1KZ2UPTP2x2eFabrLCO0EoKxBh6+fGCR2NofsPgTK1LyJQNscWaPXmMtc9dmypkMpOYe2/j+LmNXZW1FE8C81bMAp9icoA5ouJZjYeCREF7AmtW68UfPoAJ2RLIDgIh1NlzL3gngAPVFIchQX421JUFY2PsBXW8lBoHAZ8E9QV2vj0f9GQbNV/mUiJGsON6Yomm2DiTAIQqMvZVndNW7rTtQhEg1FV/QBNzQWhCqvCE4lgpaGKEp9pYtxiuQ8BUII7rhyeJ5wEVXK8hK9pbbtC7L7/XXs6uRz7NKskEHQhoiXThvFVlajxPpVOC7PSBtXihQ2/bRWjJSXdYpsA6ESAMeBvqAYjz0gOQZi8kuPeDaVsmHLOusFytEUVUQTBLL2aYtUH0NKg/fbCr5EHkROOHplQ8hK7M/sH/VSHHuP8hhV9ceo6tzoW22VlRXDXi1FnwiP0wsi8/fhMmuKmilcKwE/JeeV37Y6ruqvm3Frn11rKiyOrZVJVRkotTfY61ybmSVHBA/HIfaLdYBIdtCIe5bhVMR9Iw5O+5buorB9SbWF2H2qO+mFgaU7GpbERCkf5VGZmEGaO9FBRELMmMxtTpUcrFVmBc/qs2TLlh9k9Qc5p7q5E3Viry0s6BEOgQsF5A0kow6HCrxRdKCzDMC6ohEJykvC9/YvHLdhBiqX7REHQ3tJL+jeY0DjIO4OUApAqLcb2H6YTYEUJeSudQuxEQKJDhaU+eSR1s1+lsVWexe9w5HsB4muV/kmh0BeGaXBZP8CKbaCCLYba+3UkCgdgkPaa3fayUH1pbNWy8ZhcWWW886l3eYaN2TpO3EO8AYrR+2LLoNbT5ElHh8m/JtgiE/xGeW8zYrPKnMVazgPSMWTtFc8IpcAPPFaDeDbJVI+aWy2UbUJaI/KrqtoMQ3+RstmDYNQPJWWRGGBEQ5telVFY3gRbh4gXyonU9FQvCtlRIFaCpddsf2IX3Vgc/mx9VdyB0JlqrikzX/bIJGlUYR4hTUpl+qLskNo3V7M8xzvcafp8gOlFM/RLq6bQVhxCfuIt8NPBWbpITjkKLeG8FQI8CH+LMlhPtVQkfwg4VfkQ0AIfEjPY8jL/LT13664dkazVTht0vWT8Sv4QYZzZEjh2oap8773K2jd9Q0wGRO0K4KlLOEb4MDTZ1Xp7ZZvgMDtyEgsZAhdTG3InRThS3I6S6vA9e4C2AsBHDluWmvirEBt4nsnKwD38pbuExVeFV8ZaKgG6vHmMivXdoHvLgSdoUHQYMxb/lL7fUiJFC2QhT7LACCO4inS/i1O9YAkE+lESJDbEscNcP8mz7q46qyJRH5JYAqfJRnqiNB3ELVHXBWUrZGyVCzTlkCuVPUFluWhC8oTml7UfC1b0eNe6oqqnafQk4y/1wiv37KGrtUSYie4COwzBU9KXzOSi5VsaGJUR7rEKrfYh5GTpDS4E8AIEfSgCa08J63P0An6WKJivq2cFFr5bVbqlLvZ/uvKggdq4KlBLnfuFFQfcvvKoxO45mGyS2LSKmiYK24pVI7PEH1UNXx2FuR8aGnr0NN9aPyyNhRoYvl3H6Auw6nORpgIKM70RDUcvsKCzBo2ItX/xX+QD7rcKDydrVPRPnl7VEzNo/3vxpJf3aL3lFqvZMif/0E7ZKXcqPY+dJYBPE+q+rZ4s0YcEgPprm2lzCD+6o0/GdnCZebqYmDgexCU+sOmtfxaHKiAQFbgAEMjMQMjqgqrkZVvQNYFbrtBwrxVKt6BxtSkNaQEFShAHUEurDKYlMvKu22Rvz6/W61ARcWJmzUOUT3DGNFcCB1n/A3uMTbolVR27FpaBUZlN82AaYePz45oc5e6QIEOwLddAmEh3QIYuKL5FarH3HLK63CRmxSEtKQiNJIUnURxbsIkQorEcN527CAOJLfW1yABxqwkeI0FaE+mcGIPNBaZcIVnhtNJ2WDtAf9cCAP0KBe2Ct5paUmEszScI01YGHaKanoe8T88QR3tvX5zg/jgEyQyjWQxs5DsTQmU346zKZ8IiHcbqnx0SiPupxRuTcoQE32KKqVEOX/vyvIcBJVMOFD71Q53PP4l5B4cn9Qj1c98hMumc0nGyWJCI9eeRSWWJSBATEvPonQWeoZXRy1usl5CAr2JkjfK7CGlROrlRMHCstQVuR2GLn9xhraDLzGXkv0oChz88DIrgXSWTV66awUq0IDwk8PsSykPcn6dyEWVkpuU0UqWllTUwY5PF8dOUmg2yBeU9Oxf50gVq0+lwpTgjGQD+IzyYM7aZLUo0JIb+BoetY3brl7qNXL3nmpEGDjk+L+EAR+DAOGN3itVy3rkG4C/SbOjqSodT7/nFBLGj1NE0Iz51TF48qreKu2bn2zY85+oLDSD9wjrazoYFXIFvf7vb8uuVeElmex4bubS+q7+DCPV/d3Q1AfS1nBRw9Gta8sGtVh5pFLhYYox3aNvJvMPSZz1VAkPWg4yKY9SG0P6W/rPcqlS4XdoNBR1YBlbvUNnDn+MZp23iV2pzEJzW0FUmGIGU3mnqBpj0tx84ik52MTmeMOD17xuVU49Lc+K6KOcm4xARQrqh+UhDGPOrLkPhPjx1qLuFwgzxWJGdiGCRP0yzdvGLtGR8rPpRHCFCW5HqjxNFbBc1iZYiarxiZl+R7UYTxQkmYjUMSs3M6sx2v9CHqb0VXTIpev/mLXBr1o/qDkLGyNYCEohUhCNkqjAT1SEJbQJBoAm8fqzPtyW3QDpPYVvtdtYDFEEPQBft+6W7m1d0SZpsGKplcgheDSo3EdssdUV5zYmipQz29wDeUOS0h13d5suKPF1p6SFnX3OYtKjPHRMIhktQ2DaChVo0fKIgtpfUYURsCFraCd1WTAtrhg0pQk8SsFOLjteroAVJxoHpu0Hdn3uYz6Vo2/vdzDisHg1DBhRNYL6omobitmQDr0LT44BJw8vRX0hSA4MegMQNdk444aQPg9yXqj7q0aAjAvj/5navNxahrBmyGsmotcDoOu7aINVt7BCV1tUapb3CD/x03sFs8LynVYOnrVsNtjVBibebYNs7JfBJBv3/irPK0aiKzC7kkdn95SfNDRtWs2pBK7+PL1p59HAeZ5lyZYl84LiQn8m5sAWfWBui+yvSa7wYhp7boljQOZBJ2r1S2Ln+oH1YuBOoyDzkboGa1TnzYj/KwIYoU7VKtrBsPaVkIlqawKlYneRrNIBBrZgelrJOpkhCRgYdPWUpC3c61pRnhECS+pQrit4QpN/qjJh2WXhj/U+5P4UAPjFfHeqmxFzbvD2DSMG4mN/F35/v62Assq19p4nklrCSZVqtvXpuEHoA+6uDzqBYkf3Fp8+1tshkiUzApd4pu5YWokz3Ero0FUC7+c6naKjBbrfcGTvCG1g5aoT2rlympV8jtEZ0oXxt6D+rQCf7bTthqvesJv8qtJfn9EFuct2GqwSGOJ/JaDQ6KlEXHUqclbFXIt4BEEuT8OkRqLzj8FlesSuKlJin00jDDhVT/pyPmpoQfhnA3CwBOs46fWtXqQ2aZuoUJKkupzfMcSIuARLOtvO5WQ7lDSq6kXcEKhir4BIQkriMRt1I3zzVXYZInWQlzMCs/QKPfPWBo2Vq+Z2Fcp+WstlJ/WAiobp4v8HMDT1BFOEraHRobZgb54Ma6QOmtg90nj6EksHmZQI0jF2QRPsVm/y+CItgTdJr7TK4cwm6Q7JGyoYzO7qk5vYYumC+xpbEgnzSfUjgsRPL3AIawQsjx/dGi0hctQuGiW2/rrH0cyFl/vaQDS/Y7h+V1Yg3kXrdq6BnOEnm2Oe9g4DAykaChSULPuLODHRZINCvfHegk2KaXm+Br/YBy+LhtE838xkdxfF6taoCJTGlgVPfZ/co5gaXS3fpupdyUrJw2svOp5seimlnO0Ovmv0YLzCEW4ciegTEuPVl8VTQtXN5oa8RVZRWTYyZwIKvf105vOdyhTfRHZIP6zCkJodyf5dH5pkNmwobJYM+rDixqe0ry4JiL1aCrCqWjY7hyhXIgE3SVqoDUvaneqLLu1v+vVdBDJmMtYW0G9djXLEw5JukuBLVIoOu0EYoYtbpgLybZVl5qqR2jb1G4UkQI9Qt6fiG1WS30k1MYGS5G7NvhIQNWhsfpvJvJeZ4pug73FqBNZW+MGNmlB5spHVT+bARUHserOdGXAyILGp+HrHgug4uH/dmNNwl1qJ8qsEfal6VUdqlBpp6mZo5jRSYBxq5hSPbnc/sywQSGNzWlaeJw7CSxNHm8NlMz8kKdcPh+LuUMYqrP8OudjdjR6c0/6CH5U/BdnI5VoQlH1aBibVdyuDr+e0V4AUjo6uru2S5eLyahhh2/8uoxDUwPDtqQ9Y1Wk0TIIh/Da8aA/hnXtwIWKys2SHGnPan0qyCzyV2jbemC+S64rF+0CNGoyW7eI+6pr8PX1HaquKq0qtJqm86iJrJKOZuw0x6Pu+gAhPzEZ487qtUBrIBSYTCJiQ4q9ygNLTT2bRNw8tnpaq5s1frpa+JFa9yN8veKfiR8Wpcu37MTHCIDrHRNkm6G7N5hExG3MMtiUhoYhDynia7uzOTavMYlMxRL5OHeSto0lKlvD5jXMooga47LFE+ITbwcXdTlyDV2ZSOPK6vCuLwQumeB5PZFSjFRq3tX/zLvaVU+75xSWGmqx+x1AiOpb9kgb8DeATjhHeglPCE0FD9/dnIGter0NDHI6XPfUVbNv8825SUUNm45+lX/ZsbCt0EFeUl+G7cQfCw+qmV8NxUlSqHUClj+6wJQFIor8Iz344lEoXLa44y9pfhJTs/3wh6bZoWYtal4bU5VNou7RWK7V+Ob51YCWF07DQwx7O3z1DhBglqWB2qL+tnWoM9ZdHXEs/2tedOx2E/3LY7A0KHy6AwWwU2l6DWXYLNPvXoD3dbQAw0IdP15DmWxQFLfTlIAdNLJ6rnuPKpHrJqEYrewk1qxKCjpHU8ka1LSu7pOtDoMxjQKJFWlmldWS34agksgLUT6zLyeyIfzLRE613sftZkWVsLTNfAZbiAzAOQP0wt1TbLiInWzwGvpdGgtWr9b/ugGKU8T1Ng8gruNicbI6h32aVSB+mJV+fhvM+rcI2AfYABnCKJnKMBplcJ9Vlmk/TVv6YoeABD6/adnUOO7ReDYbgNc20lxcqd3ZvvQ+9/iRcmgmRtAhxlzBol1tZNXmem1GrdkcvaaRG2g3tI4rCvmsUJ657vnCZJNDBy4swKvOCt4vSt/reLh/i4EvBFATAAaEqilLu9vcoyY0TUneBwgJ0rhqI9h1Spo0GEn02Q5V2tlAHQG5KoUcpr6eBiCNJz2fAkpsgBakCX65g6SsfFmRcXSUhBXFWym9KpcFkpONTGheJj08cPZzqrevaUObNXLjBsYKd0LUWmQem+oQkvWRQJNuiHisgIU3PHbQyORtLNMqp3P+yycnS01BNZbt2812lzQjhpIVtZ+s8HZO2q7ktIkP99XWB2H8yv/tMJEGCu5cafk9V/rH9j53wEAS46KwBpPscZQl87RxjiLONu75tWL+901isbH11iXcc0/35lfpTx+PNcjc/3kVMWkWReezhBSoN5ZyNA195y/CxaPjrT7KhvJ5XQnFYr+V8h0OsiHq4++Ao06H6jhlO89PycJdtSIbbMtgqlVArfOI6jQ58ZXU3dsJEh1CU7YAib/Rhu4eBeitGN3BdCuvTLiEjnre/QVi7kHfX7QqXLoE2ODbr824PbPfkd92Sx42A3V1Hw/HTSv27arDppsINH+lKt6tq6ulohOlIz197bYALnWESekRhkKoNyd9AvIiMhHafAZo7IdNcsV7jFYllaGBLRG9up9iU1wE4/51zPb2sobrOryiViL5BwohV8qVVJcJXxWzV15bOSOKTj56LDs38+3BDUHI1EBrz3h0zkFK8taxTINofLJZt21pzgKJlwZaRI2w850w3j+HKKbqVeU7eWFaL5jWK019jBfMc/uerzU4XOF9fh1x8codaV0AMoRSFeSn0dJDcX1+fICQTWLyAu1gR6VU0Dzf6Ug2eOj4lxxIk2vtrlLD7Yg8lUPb7fXZEWOdktCgn1NSEAQ8OnWhPbolVY19+OGzrjjNDvi6cM8X/axtJbZF5RggBrJBCiJ6e9HUmI79bvO42nRA8JscvbJS3f5BliNhuWauN3UkxBIvxOgev515PAInPMcGitB/7IzK8ZKdoYoO2eH89deqyEj4Xw864XdEFn15OmKjaGD0Hjh87+i7Dklrul5CqQgH0Bj+oxvmkeGrvCPe5MClPqo1CGCzT3bO9D6WTYdoVNDGQ5zmMfIFnGQFex2CEeCqVXu7qs+/pFLNavmNHrFzlLi0Rs0l9bZaeS8JS527rzoRbu62A97DThqBPk2jEE4n1NqHkSorq9ysoShjtpgEMgMav2XrmPyU15rQc48qHq9VdtdNeEGyxwC5386DEqYD5fYaSHiVThuk/assePdNrD7v//uA4d9fFQGHDdZgwrk5hRtt7U37SoOXQN0BZZtmCiasyRVVc706CKVsjWncN8l+a5Ft5Ef1FTxp/ToHBck9qq+sluwfKphF/36ESqFAlW3Um21eQQ3BjB0GW1770/xQ96PpOLHoBa4vh9YWE09dwgDKp0koAe+pauJ1+zcxpOaKYYDKgQ/f9BvvpFQyeT7qqIMWIhTrFWnu2U6Qf/PZhkfJtscmfj+kerJd584t7gaVJTRfaH2qATSqLuO+XeRRwm3r3/lxJeyos+RxQ9iPqgoboCixnjuVPa21p3NC9yCBzzaKCCscdoR87PRZK95RSvbtSRLFPKTmFusdWm6/m3f/pbQLBxz9gTqPgZaJMIml5NFVNHs1Mauy3TcFeQ9lKQt/h5KIVOIbH+8qKYx77MxHd/8ZC01RuW/QQ+fPsurKbACB6DW1bm2z/dX/JcZt3Omef3qkVrcOGtxy2O9zdezFf+mf9zB5gtX+L6tc1QZBy1PIAAAQcmlUWHRYTUw6Y29tLmFkb2JlLnhtcAAAAAAAPD94cGFja2V0IGJlZ2luPSLvu78iIGlkPSJXNU0wTXBDZWhpSHpyZVN6TlRjemtjOWQiPz4KPHg6eG1wbWV0YSB4bWxuczp4PSJhZG9iZTpuczptZXRhLyIgeDp4bXB0az0iWE1QIENvcmUgNC40LjAtRXhpdjIiPgogPHJkZjpSREYgeG1sbnM6cmRmPSJodHRwOi8vd3d3LnczLm9yZy8xOTk5LzAyLzIyLXJkZi1zeW50YXgtbnMjIj4KICA8cmRmOkRlc2NyaXB0aW9uIHJkZjphYm91dD0iIgogICAgeG1sbnM6aXB0Y0V4dD0iaHR0cDovL2lwdGMub3JnL3N0ZC9JcHRjNHhtcEV4dC8yMDA4LTAyLTI5LyIKICAgIHhtbG5zOnhtcE1NPSJodHRwOi8vbnMuYWRvYmUuY29tL3hhcC8xLjAvbW0vIgogICAgeG1sbnM6c3RFdnQ9Imh0dHA6Ly9ucy5hZG9iZS5jb20veGFwLzEuMC9zVHlwZS9SZXNvdXJjZUV2ZW50IyIKICAgIHhtbG5zOnBsdXM9Imh0dHA6Ly9ucy51c2VwbHVzLm9yZy9sZGYveG1wLzEuMC8iCiAgICB4bWxuczpHSU1QPSJodHRwOi8vd3d3LmdpbXAub3JnL3htcC8iCiAgICB4bWxuczpkYz0iaHR0cDovL3B1cmwub3JnL2RjL2VsZW1lbnRzLzEuMS8iCiAgICB4bWxuczpleGlmPSJodHRwOi8vbnMuYWRvYmUuY29tL2V4aWYvMS4wLyIKICAgIHhtbG5zOnRpZmY9Imh0dHA6Ly9ucy5hZG9iZS5jb20vdGlmZi8xLjAvIgogICAgeG1sbnM6eG1wPSJodHRwOi8vbnMuYWRvYmUuY29tL3hhcC8xLjAvIgogICB4bXBNTTpEb2N1bWVudElEPSJnaW1wOmRvY2lkOmdpbXA6YWE1YmZkYTUtZGEzMy00OWI4LWI5ODktOGNjMWRhNWNhYjYxIgogICB4bXBNTTpJbnN0YW5jZUlEPSJ4bXAuaWlkOjdjMzZhMWRhLTZmMzEtNDU0My05ZGIxLWIzNzVmYWFmYTA2MyIKICAgeG1wTU06T3JpZ2luYWxEb2N1bWVudElEPSJ4bXAuZGlkOjQ1ODg3YWUxLTA0MTEtNDVkNy1iNDFlLWM4YjJjM2Q1ZjgwMCIKICAgR0lNUDpBUEk9IjIuMCIKICAgR0lNUDpQbGF0Zm9ybT0iTWFjIE9TIgogICBHSU1QOlRpbWVTdGFtcD0iMTY2MzMzOTE3MDAzNjYzNyIKICAgR0lNUDpWZXJzaW9uPSIyLjEwLjYiCiAgIGRjOkZvcm1hdD0iaW1hZ2UvcG5nIgogICBleGlmOkNvbG9yU3BhY2U9IjEiCiAgIGV4aWY6UGl4ZWxYRGltZW5zaW9uPSIyOTk5IgogICBleGlmOlBpeGVsWURpbWVuc2lvbj0iMTY4NyIKICAgdGlmZjpPcmllbnRhdGlvbj0iMSIKICAgdGlmZjpSZXNvbHV0aW9uVW5pdD0iMiIKICAgdGlmZjpYUmVzb2x1dGlvbj0iMjI1IgogICB0aWZmOllSZXNvbHV0aW9uPSIyMjUiCiAgIHhtcDpDcmVhdG9yVG9vbD0iR0lNUCAyLjEwIj4KICAgPGlwdGNFeHQ6TG9jYXRpb25DcmVhdGVkPgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6TG9jYXRpb25DcmVhdGVkPgogICA8aXB0Y0V4dDpMb2NhdGlvblNob3duPgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6TG9jYXRpb25TaG93bj4KICAgPGlwdGNFeHQ6QXJ0d29ya09yT2JqZWN0PgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6QXJ0d29ya09yT2JqZWN0PgogICA8aXB0Y0V4dDpSZWdpc3RyeUlkPgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6UmVnaXN0cnlJZD4KICAgPHhtcE1NOkhpc3Rvcnk+CiAgICA8cmRmOlNlcT4KICAgICA8cmRmOmxpCiAgICAgIHN0RXZ0OmFjdGlvbj0ic2F2ZWQiCiAgICAgIHN0RXZ0OmNoYW5nZWQ9Ii8iCiAgICAgIHN0RXZ0Omluc3RhbmNlSUQ9InhtcC5paWQ6ZmFmOTA0YWYtMmYyMC00MTg0LWI3ZjAtYWIxNzQxZGE2MzczIgogICAgICBzdEV2dDpzb2Z0d2FyZUFnZW50PSJHaW1wIDIuMTAgKE1hYyBPUykiCiAgICAgIHN0RXZ0OndoZW49IjIwMjItMDktMTZUMTY6Mzk6MzArMDI6MDAiLz4KICAgIDwvcmRmOlNlcT4KICAgPC94bXBNTTpIaXN0b3J5PgogICA8cGx1czpJbWFnZVN1cHBsaWVyPgogICAgPHJkZjpTZXEvPgogICA8L3BsdXM6SW1hZ2VTdXBwbGllcj4KICAgPHBsdXM6SW1hZ2VDcmVhdG9yPgogICAgPHJkZjpTZXEvPgogICA8L3BsdXM6SW1hZ2VDcmVhdG9yPgogICA8cGx1czpDb3B5cmlnaHRPd25lcj4KICAgIDxyZGY6U2VxLz4KICAgPC9wbHVzOkNvcHlyaWdodE93bmVyPgogICA8cGx1czpMaWNlbnNvcj4KICAgIDxyZGY6U2VxLz4KICAgPC9wbHVzOkxpY2Vuc29yPgogIDwvcmRmOkRlc2NyaXB0aW9uPgogPC9yZGY6UkRGPgo8L3g6eG1wbWV0YT4KICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgIAo8P3hwYWNrZXQgZW5kPSJ3Ij8+IMG9ZQAAAAZiS0dEAAAAAAAA+UO7fwAAAAlwSFlzAAAimgAAIpoBvt37KgAAAAd0SU1FB+YJEA4nHeKdlGcAABbwSURBVHja7VtpdBTXlf6qq6q7el/U3ZK6taMdIbAQSAYBYrFZbBzbOMbByYkdEmeZzJyxjyeZiWcmM8cOjteZOJl4EgeCAcdOvOAYYxZjB2ywWY0BgQRoQRJaW2r1vlR1Vc0P/MrVWC1hx0vmHNc5fdSIVtW737v3u9+99zXw5fXl9eX1RVzXXXfddAAz1a+SkpKrNm7caP4810F91g84c+YM88gjjyx64YUXGu12eyPDMLUjtNlryS8FRVHgLHZQGg0SwTFIkojYyAC0w51BmqZPOhyOo5FI5O3ly5e/+etf/zr4/wqAysrKuaIorg1G418x1S1xWPNLYMjKBmexQ8OwE/6tLElIhscQGx1GqK8LUvtxxEb6Xmtqanru3nvvfbGhoSH2NwnA2bNncfPNN38zHo//WCydXZU9tR7m3AJoGBZWSkQBBxRYtMhzmGEz6WHSa6FjNAAAUaYQF0QkBREDYxFcGI3gXFDAYIqCLEmI+vrhO3sCscOvjc6aNes3U6dOfWzdunX+vxkA1qxZs2rfvn3rTHNuKM+eOgs6ix1OKoVpVg3qi90oyHXBYDBAp9OBZVlIkgSapiFJEmRZBkVdWorBYEAsFoMkSUgmk/CNBdHW58c7F/xoi0kQYhH4zp5A4vBr4aqykofuvPPOx1etWhX/wgC45pprPGfPnn1SLpt9Q/G8FdBZ7ChheCzIN2NGRRGysrLAMAyi0SgoikIqlYLJZAJFUcq/1T/NZjNaW1tRVFQEWZZB0zQoioIgCOjsHcDeswP4y1ACfCyCvmNvgWs/eH7lypXfW7du3ZufOwDNzc3Xdw6NbXItXm13lFTBSwu4rsSKGZUlsFqtoGkaqVQKNE2nP5SiIMsyJEmCRnMpBMjnOI5DJBKBLMtgGAY0TSse0tbWBofDAUGmse14F/YOxRAZuojhPX9EZY71oSeffPLfCwoK+M8FgBUrVjxwbFS4r/L6b8BoNOFaF4Vls6pgNpvBcRwoioIoioqxajcn7yVJUu6XSCRgt9shiiJ4nk/bfYqioNFoIIpiGiAnzndjw5EeXAxF0fnWq6imxg6sXbt21apVq4Y+UwDsdvtvbVdf950pC29EDitjzdQs1E2rBsteYvdAIACbzQZZlj9kdlmGKIrKjl8OgiRJsFqtSCQSSCaTitcQ0AhvUBSlcIdGo0EwEsWWt8/gL30h9B8/gNJwe/eKFSuav/vd7174TACYM2fOJn9e3TfyGhaiSifi67OLMaWkWNkZYjQxjKIoBINBdHZ2IhKJIBgMgud5xXitVguj0QiDwYDy8nLo9Xpl54kXAIBGo0n7PQAwDANJkiBJEl49fBabzwxi6PRR2Nv3X7zjjjsW3HnnnZ2fKgDTpk37TbJ8zl2Fc5Zihl7AN+dPhdvtVnZVvcPk36dPn8b3H3gCxoo6MJzhkksrhgCymLoEnCRirKsNdy+tx5IlS2A2m8EwjOIpGo0m7d4sy37Ei/a3dOIXh7sxdOowpgTaeu666675y5cv757IJuZjEN7dFzjPXaVXX4PpnIA7FtTA4XAoZCbLshKn5IpGo7jv4V8hf8XXoaEnf5S9sBxb/vA4ysrKUFRUBL1er+w8ATSVSoHjOCVrEC/TaDSYX1sKWQaeAHD2WKLgxRdffK21tXV2VVVVNNMz6Ssx/pZbbpnXFZb+UHDtrVSJDvj2/Epku92K0ZcbT9z05ZdfxkldATir4woZiULH+XOYNcULq9UKvV4PURTBsqySJdTkeHlWoSgKhdl26FNJdFA2HD72noseGyh/6623ns/0SM1ka9JoNIbDR45syWq+WZOlY7FmRi7cLpfikiTuCUERlxwZGcEjL70Ji7foY3GM0ZWLQCCQ5vo8zyvPoigKiUQCfr8fqVRKIVfyEwBW1JdjcYEDUxZ+Bc+9suuWjRs3fusTAzBz5syHbItvLzDaXfjqFCNqqqsUtr88LmVZRiqVgiAI2Lp1Kwqaln/sDMNZHBgeHkY0GkUqlVJILhAIKDuv0+nAMEyaB6g9QkNRuH1uJXKtZtgX3YqdO3f+4uTJk96PDUBhYWHVqMb8d+6qOjRZJcydWQuapsEwDDQajZKuyGIoigLLshgcHMTGwx0wONwfHwCrA9FoVNlVjuNA0zRsNluacDKZTGn8QLyFgGG3mPDDpgpY86fgYEBj2r59+6MfmwRdLtdDdNNKys5SWD1/OjwezxUZ8dhjjyF/9sJPJLB0ZhvE0S7YbDZ4vV7o9fpPrFQbp5Vhaccwko1LsHPn07ft3bv3v5ubmw9dEQCrV6+ue6s3vLLGW4SleTrkeT0QBEGJQ5KL1SpPlmW0tLTgld4E8uqtn2jRrMGErqNdGB0dRSQSUbhFLYrU79XKkKyJeIEsy1jVUI5dF0ZwIasCBw8e/E8Ay64IgPb29nvy5t8GGyVidkU+4vG4wsRE4qZSKcVVBUEAz/P4+aOPI2fGyowG9h3dB3NuYUZypLU6HDvXjY6ODpjNZlit1rRiyWAwQKvVKmsg4ceyrKISSZhIkgSHicPSQgf+HJiFffteWvr+++/XzJgxo2VCDrj//vudUYq71eotRmMWjdycnLSihej8eDwOURQhSRJ4nsfRo0dx3lgMRje+2/LRMC5s24D42PCEXqAtqEQymUQikYAoikgmk4quEAQBsVgMPM9DFEXEYjGlfhBFUfkbkpopisKSmgJwNidORrV49913vzcpCe7Zs+cmTUUDS2toNJR5FHYHAJ7nFeGj1WoVVxNFEU//cStclVdlNGzw5EFct2wp+EhoQgBM2V74fD6lL0B21mw2K4CnUimkUiloNBoIgqCkQPWayLqKsu2YYtYhZ9psdHZ2runv76cnBOD06dM32ArLUMIKyPfkKEiSB6hLWZIFdu3ahbHiWdAw40dVMjQGx8XjKC0tRWRkYGIitNjh9/sRCoWQSCSUDUilUojH44oYImk4kUgoXiiKogKSmheurciFJa8Yu3btsvf19V2bEYCNGzcyvN62yJDlxjSXHjqdThE3amTJApLJJEZHR7Fl59uwF5ZnNOri0X2YOnUqrFYrtMPdE4eA0YqRkRGEw2EEAgEkEgkIgqBwwOWltcFgAE3TYFlWMZ6E69mzZ0FRFEpzbGB0evhMeTh+/Pg1GQHYvHlzo7N2joGiNKjIdSgylCgxdaEjCAIEQcDu3buhnd4MSjO+rIiP+ZA71g632w2j0YjKgmxIKWECMWRDb28vent70dXVheHhYWVnScFFnp1MJtMU4eXrLCsrgyiKyHPZYKA1yCqrgc/nW5wRgGQyWW/KyYeRkpDrsiuKT51q1NVZKBTCL3cegsVTmNGgnoNvoLq6GmazGbIsw+FwgI9FMqdCoxmxWAyCIKCrqwstLS1pJTYxNJFIIB6PQ6fTKetR84I6I9AaDa722mDIyobf76/t7e3VjwtAa2trFWd1wEmLMJvNCrpqMiIhIYoitm7disK5yzIaE/X1o1T0wel0Qq/Xw+FwwGazgY9kbvNraAY+yqjIYa1Wi3g8DkmSlFBIpVLYsGEDBEFQ0rGaoEnThISKJEkodBjBWexoa2uD3++vHheAioqKGp3ZhmyOhl6vB8uyCrrEaEKA3d3deKFtBHq7M/Puv7Mb1dXVcDgc4DhOkbHCBB4AALqcQrAsC4fDgZKSEgV8kt5omsbq1athsVjSJLJWq1W0AakjSEjk2kzQGi3YuXMn4vH4tHEBOHLkiE5D08gy6hSjyQ2Ii5EiZdOmTfDUNWU0ItR/AdMMPBwOB5xOJ2w2G7RaLWw2GxKhsUmqQi8SiQQcDgdMJlNaA4R4ZXZ2NvR6fVrqI8XY5V0pANCyNCiahkTR8Pl8pnEBmD59epbWaIFJ+2ErKpFIKDfSarXQarVobW3FO3ELtEZLhvGOjP53d6OyshJ2ux02m025n8vlQmxkcOKiyOZAOBxWMg0xjnikVqtVNoh4JqlSyQYRQUQ+4zQbAADmoirE4/HicQEoLS0tBEWBZRlFU1+e+1OpFJ58aj1yps3OaECgtwOzsi/FPGmbURSFZDIJh8MxKQBaowWxWAwURUGv1yuVZjKZVEhY1bNQZgcajQYMwyjviQ0Mw4CUEiZPIVKp1PgeEI1GoyS/qomPMCpFUThy5Ag6rWWgtboMsz0RQwe2o7KyEk6nE2azGSzLgqYv8YokSai1aQBVuvooAGaEw2HwPK8YQ2KcTI1IRiBFEfEAQoKEM8jvyCVEw5mlcHd390WRTyIlSmlFCAGD53n812+fRlZ5bcbFj104h4YiF+x2O1wulxI2DMOA4zjE43FwHAc+Fs5MgiYrhn0+CIKgpDlisCzLyuyArI3EO9mkSzv+4TyB53lEEpe4IXChDQaDITEuAB0dHdFUIoZAUkzr9BCSef311xErvzpjk1MSU/AfeBVTpkyBzWaD3W6HxWJBMplUFJtWq0V2djZS8diE/cFBxqGQMJkp8jwPmqYVRUi4QC2NWZZVMoEoisoGhKKXRojC6AA4jusaF4C5c+cOpJIJ+KO84loE/WAwiMee+TPsBWUZ1+1vP40F08vhdruRk5MDnU4HSZKUNlY8HofNZkNZWRn4aHhCHjBkexEKhcDzvBIK6rmiOsbVPUkSHmS0RjJClBchxCOoqqqCxWKJZuKAc8lIEANJWSlESEy9+uqrMF21EKDGHyeIAo/E0V2oqKhATk4OTCYTdDodaJpW3NhkMkEURRgMBiSCoxMD4MhWKj2GYZS6hOy4emiiluhknqAezVEUhYv+MIToJQA4jjs5LgCSJL0XHe5Dv0AhEPywbO3v78fj29+FKSc/44J9bccxv74WNpsNLpcLFosFLMuCZVlwHAetVguapmEymeB2u5EIBSYEQG93IhgMKuKL9CLJmIzEN8kQ6rhXF0skM5waDCI25kN5eTmysrLaxu0IVVdXH3zlxBnkNyxG70gI2W4XZFnG5s2bUXD1koyLFfkkOnb9CbOWNaOnpwfJZFKJQ5qm05oa8XgcPp8Pcf/wpKkw2BNMEzZE9Kh3Vn3WQD1EUSvCGJ9CWyCO8EAPPFW17YWFhcFxAVi/fn1HcXFxrxCP5rf1j6G+Gujs7MRL7UEUzsnKzFk0jam3fh+nAJyKA7ggABiv4tNeeumtKLh6+qT9waGhIfA8j2AwqBAfMZSkaHWfkEyPiHYgV+eAH7Iso+/oPni+vmzvhD1Bp9P5aqj/wvffMRmwKh7H+g2/R+70qyceoNAMbAWln+o5I63RjBG/H+FwGDabDQzDpNUmRBQR1ye9QSKbSdVIURSOd/sQGx3Egpop8Hg8r03YEZoxY8Yrvtbj8IsUNrywHQdiJmiNn+vpNeUaMuSC4zh4vV7FeNKFMhqNSnok4Kgbo0rTRhDxSvsQ/J2tmDdvXszj8eye0AOeeuqpnQ0NDX3xsRHvr3b+CTW33IUv6jI4c8EwDJxOJ3Jzc9MY/0qvYyfaIQoCut/egfJVD75UVFQUnXQyFI1GHz/1/P/CW78ANKv9wgDQ27KU9lgymYQgCEgkEoouINUpqQLJe8IFCV7As0faEeg+j9uXN6O4uPg3VzQXaG5u3v7MX448llVSjS/y4mxZ6Ovrw8WLF8GyLAwGw7iHJ9TESEQQALzT1ouuQBQdb76MH/7oB4fr6+v3XxEAZ86c+VHpNbeAojNP0Me6zyHY0/5XGWgvroQ1r2TCUdloX5vS6lJXgOqfRCOo5XssKeDpo10Y7TiNG2ZVoaqq6j+uaDZYVlZWdRGWOwsnYPVUMg762A5867qlacUKAAiCoOyAuo64fMwViUSw8dCJCQFg9UYMDw8rYzkiavr7+2GxWGA0GtOm1MQzZFnGy0fOYygYQs+u5/BPP/u3NxsbG3dcEQB6vX6dafaSCY/PDJ8+hpVNjSguLkZeXp4yxFTP6dVzQ7Xbqvv2T+54Z0IPYTgD+od8aWWxJElwOp0fmUyTo3WyLOPkhSFsPTeEnoN78L01N/OVlZX/cEXT4UWLFjV1anNvzHZ7My5KiEWQ1XsMhXNXw+PxoLi4OK1lRXZbXYerjVefJpmXb8HYJGEybPIimUwqoKlTnPqUCnn2UCCCJ94+C3/HGUxJ9GHBgq89WFdXd/qKzgf09PQ8WtC4eMIFDZ48hIXNC+DxeJSKj9T76hf5nVarVRoipDQl+bukpGTSBqnRmYNgMKi0utQepa4INRoNInEeT+w5hcHhQYzu2oQ77rhjf01Nzf1XdELk+uuvX0PXLWvQWewZF5MMBzF84gDMdidcLhesVqvSr1NLz8sbFGqpqj7QUFRUhFQiNsmozIaxsTGFB9T3Vb9C0QQefu09tAz4cPLZ/8Hdf/+Di7W1tV/zeDzipACsX7+ePt7a/tPc2oYJF9N3bB8sBWXY1hEAT7HKzpLxFXFFIk/Ji6QscraPAOB2u5GcZFjKWRwIBALKWSECMOEbSZIQjiXx6K73cXJwBC0vrcd931kTa2pqurmmpubihBKevNm0adMP7E03lLMGU8YPx8dGkB/qQqr9PYR4EY+/cwEnO/uVsbS6P0+YWT1FIkdd1anMZrMhOUmLXGe2IRgMpj2DZBFJktA3GsJPtx3F8Z5+nHr+t7h71TWxefPmLZs5c+aRydKwQoJDY+F7PcvrJvxw76E3cPeNN8Jut+N36zegX8vhZxSD1RUhXF9fCq2qk0zIjpSp6smyuqubk5ODZGTiL4NoPjh3RKa/BDyj0YSD5/rwq0MdCA71o+3ZJ/CTH3470tTUtKKxsfHtK9EhDABcddVV08OFdQWZurwAEB7owYIcLbxeLyoqKg7fc/c/PrJly5bftQz2WJ8VF+K9gSDWzilHqdeZFvPjsbS6W2u32xH19U92gFBpe5P7+oJRPP12K94dCMDXdhz8gRfx85/c011XV7esvr6+7UqFGAMAlZWVF3YePNDD6LgPQCBkdimPR4b6MEMfx7yVK5GTkyObzeYf33TTTXt37Nhx9I033nj+98/8sj627Fb8cyiBxfl2fGXmFHiyPhxZERDG0wYcx2Ht/Fps2bsNnNWuGAx8cOZYFCG0n8Di6xeCYRgEogm8caYfm09dRCLoR8ebL2O+14ivPvDAtsrKym9MnTr1Y323SKHttra2pR0dHTv7+/uV8/okjen1elgsFjgcDuTk5DxcUVHxY4UU+/qYbdu23bdjx45/OZWy6vJmNUNnsWOBx4rFU/NQ6nGCpTVpu67OFuSozYkTJ9Dd3Y1IJJJ2/I4ckQskJAyJehyO0hD5JIZajkB+fzfWrl0bbGxsvGfevHkbPokUpy5rid+YSCRuS6VSebIsGz/4/7hGowmyLNup0+m2mkym193uj57/O3z4cPnu3bsf3LNnz809pgLkTGuA0eWBTUtjUZETNflOFLptsJv0SgyrFWM4HEYoFEIoFALLsghE4ugbDeH8UBAnhyMYkzVIJRPwd7Yhfmg7bl9zm9zY2PhUaWnpv1ZXV/s+aS3yqX9rbP/+/Q379++/t6Wl5ZbXTnbBO3M+LLkF0GdlX3J5mkKd2wKXiYPTxIGiPqgXQGE0EsNQKI4zIxH4+UtnkhKBUUSGLmKw5TAKxDGsXLkyUVtb+0xJScnDtbW15/7a9X5mX5traWnJO3HixNrOzs7VLS0tVS/uehPe2Ytgys6H3u4CzbLQmqxp4cBHwxD5JOLBUcR8Axg8dQhX5Tsxf/58FBcXv1tWVvacx+N5pqKiYvTTWudn/sXJDw5dFfX09Czt6emZ6/f7a3ierx0YGKB9Pl/aeQOj0Qiv1wun0xk3Go2nXC7X8dzc3LfcbvcbFRUVQ5/F2j4XAMbVFL29WbFYrDAajVJktG00GiWO487n5+dH8OX1+Vz/B+mjxi9ohWOlAAAAAElFTkSuQmCC'
@@ -125,20 +136,23 @@ debug = False
 show_errors = False
 reroute_out = True
 datasaving = True
+automask = False
+pointless = "pointless"                     # path to/ command to run Pointless
 current_mode = "Fast"
 modeselector = {"fast": False, "normal": True, "problematic": True}
 silent = True
 previous_failed = ['']
 failed_processing = ['']
-csv_header = ['Date', 'Dataset', 'Success', 'Space group', 'Cell dimensions [Å]', 'Cell angles [°]', 'Isotropic diffraction limit [Å]', 'Anisotropic diffraction limits [Å]', 'Autoproc command line']
-csv_entry = [] # 0 = proc_date, 1 = image template, 2 = success, 3 = spacegroup, 4 = cell dimensions, 5 = cell angles, 6 = isotropic diff limit, 7 = anisotropic diff limits, 8 = command line for autoproc
+csv_header = ['Date', 'Dataset', 'Success', 'Space group', 'Cell dimensions [Å]', 'Cell angles [°]', 'Isotropic diffraction limit [Å]', 'Anisotropic diffraction limits [Å]', 'Autoproc command line', 'Cell cluster']
+csv_entry = [] # 0 = proc_date, 1 = image template, 2 = success, 3 = spacegroup, 4 = cell dimensions, 5 = cell angles, 6 = isotropic diff limit, 7 = anisotropic diff limits, 8 = command line for autoproc, 9 = cell cluster (added after the batch)
+cell_clusters = [] # table lines for batchproc.html
 csv_content = []
 ds_name = ''
 proc_date = ''
 #rec_date = '' not implemented yet
 old_cutoff_param = 'ScaleAnaISigmaCut_123="0.1:0.1 0.5:0.5 0.5:1.0 1.0:2.0" ScaleAnaRpimallCut_123="99.9999:99.9999 0.9:0.9 0.8:0.8 0.6:0.6" ScaleAnaCChalfCut_123="-1.0:-1.0 0.0:0.0 0.1:0.1 0.3:0.3"' # as used until autoPROCVersion20220608          
-cleanup_args = '-not -name "*.html" -not -name "*.htm" -not -name "*.HTML" -not -name "*.png" -not -name "*.jpg" -not -name "HTM" -not -name "*.LP" -not -name "*.log" -not -name "failed.txt" -not -name "autobatch_done.txt" -print0 | xargs -I {} -0 rm "{}"'
-useful_files_to_copy = ["CORRECT.LP", "aimless.log", "xscale_XSCALE.LP", "XDS.INP", "XDS_ASCII.HKL", "INTEGRATE.HKL", "remark200.pdb", "staraniso_remark200.pdb"]
+cleanup_args = '-not -name "*.html" -not -name "*.htm" -not -name "*.HTML" -not -name "*.png" -not -name "*.jpg" -not -name "HTM" -not -name "*.LP" -not -name "*.log" -not -name "*.xml" -not -name "failed.txt" -not -name "autobatch_done.txt" -print0 | xargs -I {} -0 rm "{}"'
+useful_files_to_copy = ["CORRECT.LP", "aimless.log", "xscale_XSCALE.LP", "XDS.INP", "XDS_ASCII.HKL", "INTEGRATE.HKL", "remark200.pdb", "staraniso_remark200.pdb", "autoPROC.xml", "autoPROC_staraniso.xml"]
 
 # thread for autoproc function 
 def autoproc_function(param, procpath):
@@ -224,6 +238,100 @@ def cbfconversion_function(cbffolder, infolder, masterfile, dumppath):
             break  
 
 
+# helper function to check the converted mini-cbf files (broken files make autoPROC fail late). Empty files are found for all
+# images, decoding is done for the first, the last and evenly spaced images in between (all with check_all_cbfs = Yes in autogui.cfg).
+def check_cbf_conversion(cbffolder, dumppath):
+    proc_console = os.path.join(dumppath, "HTML/proc_console.html")
+    proc_log = os.path.join(dumppath, "HTML/proc_log.html")
+    cbffiles = sorted([os.path.join(cbffolder, cbffile) for cbffile in os.listdir(cbffolder) if cbffile.endswith('.cbf')])
+    brokenfiles = [cbffile for cbffile in cbffiles if os.path.getsize(cbffile) == 0]
+    if check_all_cbfs == True or len(cbffiles) <= cbf_check_samples:
+        checkfiles = cbffiles
+    else:
+        stride = len(cbffiles) / (cbf_check_samples - 1)
+        checkfiles = sorted(set(cbffiles[min(int(round(number * stride)), len(cbffiles) - 1)] for number in range(cbf_check_samples)))
+    checkfiles = [cbffile for cbffile in checkfiles if cbffile not in brokenfiles]
+    with concurrent.futures.ThreadPoolExecutor(max_workers = 4) as executor:
+        cbfchecks = list(executor.map(autogui_cbf.check_cbf, checkfiles))
+    brokenfiles = sorted(brokenfiles + [cbffile for cbffile, cbfcheck in zip(checkfiles, cbfchecks) if cbfcheck == False])
+    if len(checkfiles) == len(cbffiles):
+        checked = "Checked " + str(len(cbffiles)) + " converted mini-cbf files"
+    else:
+        checked = "Checked " + str(len(cbffiles)) + " converted mini-cbf files (" + str(len(checkfiles)) + " decoded)"
+    if len(brokenfiles) == 0:
+        message = checked + ": all images can be read."
+    else:
+        message = "WARNING: " + checked + ", " + str(len(brokenfiles)) + " can't be read: " + ", ".join([os.path.basename(brokenfile) for brokenfile in brokenfiles[:10]])
+        if len(brokenfiles) > 10:
+            message = message + ", ..."
+    print(message)
+    print('')
+    f1 = open(proc_console, "a")
+    f1.write(message + '\r')
+    f1.close()
+    f2 = open(proc_log, "a")
+    f2.write(message + '\r')
+    f2.close()
+    return brokenfiles
+
+# helper function to detect beam stop and shadows on a few images of a dataset, returns the autoPROC parameters for XDS UNTRUSTED_* regions
+def detect_dataset_masks(dataset, dumppath):
+    proc_console = os.path.join(dumppath, "HTML/proc_console.html")
+    proc_log = os.path.join(dumppath, "HTML/proc_log.html")
+    mask_param = ''
+    try:
+        first_image = int(dataset[3])
+        last_image = int(dataset[4])
+        if dataset[2].endswith('_master.h5'):
+            header_image = os.path.join(dataset[1], dataset[2])
+            sweep_images = sorted([os.path.join(dataset[1], datafile) for datafile in os.listdir(dataset[1]) if datafile.startswith(dataset[2][:-len('master.h5')] + 'data_') and datafile.endswith('.h5')])
+            summed_frame = autogui_masks.read_sweep_sum(sweep_images, last_image)
+        else:
+            digits = dataset[2].count('#')
+            sweep_images = [os.path.join(dataset[1], dataset[2].replace('#' * digits, str(image_number).zfill(digits))) for image_number in range(first_image, last_image + 1)]
+            header_image = sweep_images[0]
+            summed_frame = autogui_masks.read_sweep_sum(sweep_images, len(sweep_images))
+        # a beam centre given as extra parameter wins over the image header
+        beam_param = re.search(r'beam="?\s*([-\d.]+)[\s,]+([-\d.]+)', dataset[9])
+        if beam_param != None:
+            beamcentre = (float(beam_param.group(1)), float(beam_param.group(2)))
+        else:
+            beamcentre = autogui_masks.header_beamcentre(header_image)
+        if summed_frame is None or beamcentre == None:
+            message = "Automatic masking skipped for " + dataset[0] + ": images or beamcentre can't be read."
+        else:
+            mask_proposals = autogui_masks.detect_shadows(summed_frame, beamcentre)
+            mask_param = autogui_masks.untrusted_parameters(mask_proposals)
+            message = "Automatic masking for " + dataset[0] + ": " + str(len(mask_proposals['ellipses'])) + " ellipse(s), " + str(len(mask_proposals['rectangles'])) + " rectangle(s), " + str(len(mask_proposals['quads'])) + " quadrilateral(s)."
+    except Exception as mask_error:
+        message = "Automatic masking failed for " + dataset[0] + ": " + str(mask_error)
+    print(message)
+    print('')
+    f1 = open(proc_console, "a")
+    f1.write(message + '\r')
+    f1.close()
+    f2 = open(proc_log, "a")
+    f2.write(message + '\r')
+    f2.close()
+    return mask_param
+
+# post-processing step: check the space group of the scaled MTZs with POINTLESS, runs next to the following dataset
+def pointless_post_step(dataset_id, procpath, dumppath):
+    proc_console = os.path.join(dumppath, "HTML/proc_console.html")
+    proc_log = os.path.join(dumppath, "HTML/proc_log.html")
+    mtz_paths = [mtz_path for mtz_path in (os.path.join(procpath, "isotropic.mtz"), os.path.join(procpath, "anisotropic.mtz")) if os.path.exists(mtz_path)]
+    verdicts = autogui_ccp4.validate_space_groups(mtz_paths, pointless, os.path.join(procpath, "output-files"))
+    messages = [dataset_id + ": " + autogui_ccp4.verdict_text(verdict) for verdict in verdicts]
+    for message in messages:
+        print(message)
+    f1 = open(proc_console, "a")
+    f1.write('\r'.join(messages) + '\r')
+    f1.close()
+    f2 = open(proc_log, "a")
+    f2.write('\r'.join(messages) + '\r')
+    f2.close()
+    return verdicts
+
 # thread for generic long function to keep gui working
 def utility_thread(utility_command, silent):
     if silent == False:
@@ -826,6 +934,12 @@ def HTML_batch(start_t, job_t, PID, screenid, screenstatus, refresh_main, dumppa
     for item in item_list:
         f.write(item)
     f.write('	</table>\n')
+    if cell_clusters != []:
+        f.write('	<br>\n')
+        f.write('	<table>\n')
+        for line in cell_clusters:
+            f.write(line + '\n')
+        f.write('	</table>\n')
     f.write('\n')
     f.write('</div>\n')
     f.write('<br>\n')
@@ -1204,78 +1318,70 @@ def progress_thread(window):
 def progress_function(dumppath, ds_output, theme_color, theme_color1, theme_color2):
     threading.Thread(target=progress_thread, args=(window,), daemon=True).start()      
 
+# helper function to group the successful datasets of a batch by unit cell: adds the cluster to the CSV rows, returns table lines for batchproc.html
+def cluster_batch_cells(csv_content, theme_color, theme_color1, theme_color2):
+    cells = []
+    clustered_rows = []
+    for entry in csv_content:
+        cell = autogui_cluster.parse_cell(entry[4], entry[5]) if entry[2] == 'True' else None
+        if cell != None:
+            cells.append(cell)
+            clustered_rows.append(entry)
+        entry.append('N/A')
+    if cells == []:
+        return []
+    clusters = autogui_cluster.cluster_cells(cells, space_groups = [entry[3] for entry in clustered_rows])
+    for entry, cluster in zip(clustered_rows, clusters):
+        entry[9] = str(cluster)
+    lines = []
+    lines.append("         <tr>")
+    lines.append("                 <th style='background-color: "+ theme_color1 +"; color: "+ theme_color +"' colspan=\"4\">Unit cell clusters (single linkage, relative G6 distance <= " + str(autogui_cluster.cluster_threshold) + ")</th>")
+    lines.append("         </tr>")
+    lines.append("         <tr>")
+    lines.append("		        <th>Cluster</th>")
+    lines.append("		        <th>Datasets</th>")
+    lines.append("		        <th>Mean cell</th>")
+    lines.append("		        <th>Members</th>")
+    lines.append("         </tr>")
+    for cluster, count, mean_cell in autogui_cluster.cluster_summary(cells, clusters):
+        members = [entry[1] for entry, entry_cluster in zip(clustered_rows, clusters) if entry_cluster == cluster]
+        if len(members) > 20:
+            members = members[:20] + ['...']
+        lines.append("         <tr>")
+        lines.append("		        <td style='font-size:13px; color: "+ theme_color2 +"'>" + str(cluster) + "</td>")
+        lines.append("		        <td style='font-size:13px; color: "+ theme_color2 +"'>" + str(count) + "</td>")
+        lines.append("		        <td style='font-size:13px; color: "+ theme_color2 +"'>" + ', '.join(str(value) for value in mean_cell[:3]) + " Å, " + ', '.join(str(value) for value in mean_cell[3:]) + "°</td>")
+        lines.append("		        <td style='font-size:13px; color: "+ theme_color2 +"'>" + ', '.join(members) + "</td>")
+        lines.append("         </tr>")
+    return lines
+
 # helper function to extract dataset infos       
-def dataset_infos(dumppath, ds_log):
+def dataset_infos(dumppath, ds_log, procpath):
     ds_infos =[]
-    log_pattern1 = re.compile("\s*===== finishing processed and scaled data from XDS")
-    log_pattern2 = re.compile("\s*Spacegroup name\s+")
-    log_pattern3 = re.compile("\s*Unit cell parameters\s+")
-    log_pattern4 = re.compile("\s*High resolution limit\s+")
-    log_pattern5 = re.compile("\s*Diffraction limits & principal axes of ellipsoid fitted to diffraction cut-off surface:")
-    process_list = []
-    process_no = 0
-    process_hit_cntr = 0
-    log_check = 1
-    log_line = 0
-    hit_line = 0
-    finish_message = []
     ds_stats = []
-    file = os.path.join(dumppath, ds_log)
-    log = open (file, 'rt')
-    process_list = re.findall(log_pattern1, log.read())
-    process_no = len(process_list)
-    log.close()
-    
-    with open (file, 'rt') as log:
-        for line in log:
-            log_line += 1
-            if log_check == 1 :
-                if log_pattern1.search(line) != None:  # If pattern search finds a match
-                    process_hit_cntr += 1
-                    #print(str(process_hit_cntr))
-                    if process_hit_cntr == process_no:
-                        log_check = 2
-            if log_check == 2 :
-                if log_pattern2.search(line) != None:
-                    mval = re.split(log_pattern2, (line.rstrip('\n')))
-                    finish_message.append(mval[1])
-                    log_check = 3
-            if log_check == 3 :
-                if log_pattern3.search(line) != None:
-                    mval = re.split(log_pattern3, (line.rstrip('\n')))
-                    mvals = re.split('\s+', mval[1])
-                    finish_message.append(mvals[0])
-                    finish_message.append(mvals[1])
-                    finish_message.append(mvals[2])
-                    finish_message.append(mvals[3])
-                    finish_message.append(mvals[4])
-                    finish_message.append(mvals[5])
-                    log_check = 4
-            if log_check == 4 :
-                if log_pattern4.search(line) != None:
-                    mval = re.split(log_pattern4, (line.rstrip('\n')))
-                    mvals = re.split('\s+', mval[1])
-                    finish_message.append(mvals[2])
-                    log_check = 5
-            if log_check == 5 :
-                if log_pattern5.search(line) != None:
-                    hit_line = log_line + 4
-                if (log_line) < hit_line and log_line > (hit_line - 4):
-                    mvals = re.split('\s+', (line.rstrip('\n')))
-                    finish_message.append(mvals[1])              
-                             
-        # gather infos
-        try:
-            sg = finish_message[0]
-            cell = finish_message[1] + ' Å, ' + finish_message[2] + ' Å, ' + finish_message[3] + ' Å, ' + finish_message[4] + '°, ' + finish_message[5] + '°, ' + finish_message[6] + '°'
-            iso = finish_message[7] + ' Å'
-            aniso = finish_message[8] + ' Å, ' + finish_message[9] + ' Å, ' + finish_message[10] + ' Å'
-            ds_infos = [sg, cell, iso, aniso]
-            ds_stats = [sg, (finish_message[1] + ', ' + finish_message[2] + ', ' + finish_message[3]), (finish_message[4] + ', ' + finish_message[5] + ', ' + finish_message[6]), finish_message [7], (finish_message[8] + ', ' + finish_message[9] + ', ' + finish_message[10])]
-        except:
-            ds_infos = ["ERROR","ERROR","ERROR","ERROR"]   
-            ds_stats = ['N/A', 'N/A', 'N/A','N/A','N/A'] 
-        log.close()
+    # structured summaries from autoPROC, the dataset log if they are missing
+    results = autogui_results.processing_results(os.path.join(procpath, "output-files"), os.path.join(dumppath, ds_log))
+    if results != None:
+        sg = results.space_group
+        lengths = ', '.join(autogui_results.result_text(value) for value in results.cell[:3])
+        angles = ', '.join(autogui_results.result_text(value) for value in results.cell[3:])
+        cell = ' Å, '.join(autogui_results.result_text(value) for value in results.cell[:3]) + ' Å, ' + '°, '.join(autogui_results.result_text(value) for value in results.cell[3:]) + '°'
+        iso = autogui_results.result_text(results.resolution)
+        if len(results.ellipsoid_limits) == 3:
+            aniso = ', '.join(autogui_results.result_text(limit) for limit, direction in results.ellipsoid_limits)
+            aniso_info = ' Å, '.join(autogui_results.result_text(limit) for limit, direction in results.ellipsoid_limits) + ' Å'
+        else:
+            aniso = 'N/A'
+            aniso_info = 'N/A'
+        ds_infos = [sg, cell, iso + ' Å', aniso_info]
+        ds_stats = [sg, lengths, angles, iso, aniso]
+        for shell_name, shell_text in (('overall', 'Overall'), ('outerShell', 'Outer shell')):
+            if shell_name in results.shells:
+                shell = results.shells[shell_name]
+                print(shell_text + ': completeness', autogui_results.result_text(shell.completeness, 1), '%, CC(1/2)', autogui_results.result_text(shell.cc_half), ', Rpim', autogui_results.result_text(shell.rpim), ', I/sig(I)', autogui_results.result_text(shell.i_over_sigma, 1))
+    else:
+        ds_infos = ["ERROR","ERROR","ERROR","ERROR"]   
+        ds_stats = ['N/A', 'N/A', 'N/A','N/A','N/A'] 
     return [ds_infos, ds_stats]
 
 # Helper function to get screen info
@@ -1317,6 +1423,14 @@ def export_csv(dumppath, csv_header, csv_content):
         print('')
         print('Unable to export CSV!')
         print('')
+    # add the run to the results catalog, so the launcher finds it without searching
+    try:
+        autogui_catalog.add_run(os.path.join(dumppath, "batchproc.html"), "Batch", csv_content)
+        print('Added results to catalog:', autogui_catalog.catalog_location())
+        print('')
+    except Exception:
+        print('Unable to add results to catalog!')
+        print('')
 
 # Helper function for collapsible sections (collapsed)
 def collapse(layout, key):
@@ -1351,6 +1465,7 @@ if os.path.exists(config_path) == True:
     cfg_prepclassic = re.compile("prepfolder_classic = ")
     cfg_prepbatch = re.compile("prepfolder_batch = ")
     cfg_dark = re.compile("dark_theme = ")  
+    cfg_checkcbfs = re.compile("check_all_cbfs = ")
     with open (config_path, 'rt') as config:
         for line in config:
             line = line.strip()
@@ -1384,6 +1499,8 @@ if os.path.exists(config_path) == True:
                     prepfolder_batch = True
                 else:
                     prepfolder_batch = False                   
+            if cfg_checkcbfs.search(line) != None and line.startswith('#') == False:
+                check_all_cbfs = (re.split(cfg_checkcbfs, line))[-1].strip() in ("True", "true", "TRUE", "y", "Y", "yes", "Yes", "YES")
     config.close()
 else:
     print('')
@@ -1579,7 +1696,9 @@ layout = [[sg.Frame(layout= [
                         ], title='Selected dataset options',title_color=theme_color, relief=sg.RELIEF_GROOVE)],
                          
                     [sg.Column([[sg.Button('Run',key ='-RUN-', disabled = True, button_color ='white on green', tooltip = 'GoGoGo'), sg.Button('Quit', button_color = 'yellow on red', tooltip = 'Bail out!'),
-                                 sg.Button('Kill previous job',key ='-KILL-', visible = kill_visible, mouseover_colors = "yellow on red", tooltip = 'Kill stuck previous job via PID')]],
+                                 sg.Button('Kill previous job',key ='-KILL-', visible = kill_visible, mouseover_colors = "yellow on red", tooltip = 'Kill stuck previous job via PID'),
+                                 sg.Checkbox("Mask beamstop and shadows automatically", key = '-AUTOMASK-', enable_events=True, default = automask,
+                                tooltip = 'A few images of every dataset are summed to find the beamstop, its arm and other shadows.\nThey are masked for XDS (UNTRUSTED_ELLIPSE/RECTANGLE/QUADRILATERAL).')]],
                                size = (650, 40), vertical_alignment ="top", justification ="left", element_justification ="left"),
                      sg.Column([[sg.Text('\u2691  Ready.', text_color = theme_color, key = '-STATUS-', font = 'Arial 12', justification = 'right', size = (32, None), tooltip = "Program status")]], size = (305, 40), vertical_alignment ="top")],
                     [sg.HorizontalSeparator()],
@@ -2011,6 +2130,10 @@ while True:
         window['-EXTRAPARS-'].update(value = '')
 
 
+        # enable/disable automatic masking of beam stop and shadows
+    if event == '-AUTOMASK-':
+        automask = values['-AUTOMASK-']
+
         # enable/disable data saving mode
     if (event == '-CLEANUP-') and (values['-CLEANUP-'] == True):
         datasaving = True
@@ -2371,6 +2494,8 @@ if runflag == True:
         print('Processing log in webbrowser refreshes every 30 sec.')
         print('')
 
+    # POINTLESS checks of finished datasets, one at a time in the background
+    postprocessing = concurrent.futures.ThreadPoolExecutor(max_workers = 1)
     for dataset in datasets:
         job_t = time.time()
         csv_entry = ['N/A','N/A','False','N/A','N/A','N/A','N/A','N/A','N/A',]
@@ -2408,6 +2533,7 @@ if runflag == True:
             print("Converting HDF5 to mini-cbf for", dataset[0], "number", str(j), "of", str(len(datasets)), "datasets.")
             cbffolder = os.path.join(dataset[6], "tmpcbfs")
             cbfconversion_function(cbffolder, dataset[1], dataset[2], dumppath)
+            check_cbf_conversion(cbffolder, dumppath)
             dataset[1] = cbffolder
             dataset[2] = "image_######.cbf"
             item_list.pop()
@@ -2420,6 +2546,9 @@ if runflag == True:
             else:
                 print("Processing goes to:", procmainpath)
                 break
+        mask_param = ''
+        if automask == True:
+            mask_param = detect_dataset_masks(dataset, dumppath)
         if prepfolder_batch == True:
             prepfolder_list = re.split("[\s,;]+", preplist)
             for prepitem in prepfolder_list:
@@ -2459,9 +2588,9 @@ if runflag == True:
             text_log = os.path.join(procpath, "log.txt")
             sweepset = (",".join([dataset[0], dataset[1], dataset[2], dataset[3], dataset[4]]))
             if oldcutoffmode == True:
-                param = ((' '.join(["process", "-Id", sweepset, "-d output-files", dataset[7], dataset[9]])).strip(' ')) + " -nthreads " + batchprocs + " " + old_cutoff_param + " | tee -a " + ds_log + " " + text_log + " " + proc_console + " " + proc_log
+                param = ((' '.join(["process", "-Id", sweepset, "-d output-files", dataset[7], dataset[9], mask_param])).strip(' ')) + " -nthreads " + batchprocs + " " + old_cutoff_param + " | tee -a " + ds_log + " " + text_log + " " + proc_console + " " + proc_log
             else:
-                param = ((' '.join(["process", "-Id", sweepset, "-d output-files", dataset[7], dataset[9]])).strip(' ')) + " -nthreads " + batchprocs + " | tee -a " + ds_log + " " + text_log + " " + proc_console + " " + proc_log
+                param = ((' '.join(["process", "-Id", sweepset, "-d output-files", dataset[7], dataset[9], mask_param])).strip(' ')) + " -nthreads " + batchprocs + " | tee -a " + ds_log + " " + text_log + " " + proc_console + " " + proc_log
             csv_entry[8] = re.split("\|", param)[0]
             print('Executing autoPROC with:\n',param)
             HTML_log(j, procpath, refresh, theme_color, theme_color1, theme_color2)
@@ -2555,7 +2684,7 @@ if runflag == True:
                 print('')
                 print('Processing of "' + dataset[0] + '", number', str(j), 'of', str(len(datasets)), 'datasets is done!')
                 print ('Output has been written to '+ procpath)
-                ds_info_stuff = dataset_infos(dumppath, ds_log)
+                ds_info_stuff = dataset_infos(dumppath, ds_log, procpath)
                 ds_infos = ds_info_stuff[0]
                 ds_info_csv = ds_info_stuff[1]
                 csv_entry[3] = ds_info_csv[0]
@@ -2602,6 +2731,13 @@ if runflag == True:
                     HTML_batch(start_t, job_t, PID, screenid, screenstatus, refresh_main, dumppath, num_sets, item_list, theme_color, theme_color1, theme_color2)
                     success = True
                     csv_entry[2] = 'True'
+                    postprocessing.submit(pointless_post_step, dataset[0], procpath, dumppath)
+                    # resolution shell statistics of all datasets of this batch in one file
+                    try:
+                        if autogui_shells.add_dataset(os.path.join(dumppath, autogui_shells.store_name), dataset[0], procpath) > 0:
+                            print('Resolution shell statistics added to', autogui_shells.store_name)
+                    except (OSError, ValueError) as store_error:
+                        print('Resolution shell statistics could not be stored:', store_error)
                     previous_failed  = ['']
                     failed_processing = ['']
                     # clean up your shit
@@ -2669,6 +2805,11 @@ if runflag == True:
         j += 1
         time.sleep(30)
         
+    postprocessing.shutdown(wait = True)
+    cell_clusters = cluster_batch_cells(csv_content, theme_color, theme_color1, theme_color2)
+    if cell_clusters != []:
+        print('')
+        print('Unit cell clusters:', ', '.join(sorted(set(entry[9] for entry in csv_content if entry[9] != 'N/A'), key = int)))
     print('')
     print(separator)
     print('')
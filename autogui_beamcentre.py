@@ -0,0 +1,307 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Automatic beam centre refinement for the image viewer of AutoGUI classic.
+# Starting from the header beam centre, the radial profile of the image is searched for rings (powder, ice,
+# solvent). In narrow angular sectors the radius of every ring is measured (intensity-weighted, background
+# subtracted) and one circle centre is fitted to all ring points by linear least squares. Without rings, points
+# where the direct beam scatter around the beam stop falls to a given level are fitted instead.
+# Coordinates are in pixels from the detector corner (x = column, y = row) like in the viewer graph and the masks:
+# pixel i spans i to i + 1, its centre is at i + 0.5.
+# Run "python autogui_beamcentre.py" for a test and a benchmark on a 16M sized frame.
+
+import math
+import time
+import numpy as np
+
+
+# helper function to get the radius of every pixel of a (sub-sampled) frame
+def pixel_radii(frame_shape, centre, step = 1):
+    x = np.arange(0, frame_shape[1], step, dtype = np.float32) + np.float32(0.5 - centre[0])
+    y = np.arange(0, frame_shape[0], step, dtype = np.float32) + np.float32(0.5 - centre[1])
+    return np.sqrt(y[:, None] ** 2 + x[None, :] ** 2)
+
+# helper function to calculate the azimuthally averaged profile in 1 pixel bins. Pixels without data (< 0) and
+# overloaded pixels are left out, every step-th pixel is used. Counts are clipped at twice the 99.5 % level,
+# so a few Bragg spots do not show up as rings.
+def radial_profile(frame, centre, overload = None, step = 2):
+    counts = frame[::step, ::step]
+    radii = pixel_radii(frame.shape, centre, step).astype(np.int32)
+    usable = counts >= 0
+    if overload != None:
+        usable &= counts < overload
+    counts = counts[usable]
+    if counts.size == 0:
+        return np.full(1, np.nan), np.zeros(1, dtype = np.int64)
+    clip = 2 * float(np.partition(counts, int(counts.size * 0.995))[int(counts.size * 0.995)]) + 1
+    pixels = np.bincount(radii[usable], minlength = 1)
+    sums = np.bincount(radii[usable], weights = np.minimum(counts, clip), minlength = 1)
+    profile = np.full(pixels.size, np.nan)
+    profile[pixels > 0] = sums[pixels > 0] / pixels[pixels > 0]
+    return profile, pixels
+
+# helper function to estimate the smooth background below rings: running median over +- window pixels
+def profile_background(profile, window = 15):
+    filled = profile.copy()
+    missing = np.isnan(filled)
+    if missing.all():
+        return filled
+    filled[missing] = np.interp(np.flatnonzero(missing), np.flatnonzero(~missing), filled[~missing])
+    padded = np.pad(filled, window, mode = 'edge')
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1), axis = 1)
+
+# helper function to find the strongest rings of a radial profile: [(radius, half width, height above background), ...]
+def find_rings(profile, pixels, min_radius, max_rings = 3):
+    background = profile_background(profile)
+    excess = np.nan_to_num(profile - background)
+    # only radii with enough pixels for a stable average (not the detector corners)
+    excess[pixels < 0.25 * np.median(pixels[pixels > 0])] = 0
+    excess[:min_radius] = 0
+    # noise of every radius bin: counting statistics of the averaged pixels, scaled to the observed scatter
+    noise = np.sqrt(np.maximum(np.nan_to_num(background), 1) / np.maximum(pixels, 1))
+    significance = excess / noise
+    used = significance != 0
+    if not used.any():
+        return [], background
+    noise = noise * 1.4826 * np.median(np.abs(significance[used]))
+    peaks = np.flatnonzero((excess[1:-1] > excess[:-2]) & (excess[1:-1] >= excess[2:])) + 1
+    peaks = peaks[excess[peaks] > np.maximum(6 * noise[peaks], 1e-9)]
+    rings = []
+    for peak in peaks[np.argsort(excess[peaks])[::-1]]:
+        if any(abs(peak - ring[0]) < 3 * ring[1] for ring in rings):
+            continue
+        # half width where the ring falls to half its height
+        left = peak
+        while left > 0 and excess[left] > 0.5 * excess[peak]:
+            left = left - 1
+        right = peak
+        while right < excess.size - 1 and excess[right] > 0.5 * excess[peak]:
+            right = right + 1
+        rings.append((float(peak), max(3.0, float(right - left)), float(excess[peak])))
+        if len(rings) == max_rings:
+            break
+    return rings, background
+
+# helper function to measure the radius of a ring in angular sectors. In every sector the background subtracted profile
+# across the ring is built (Bragg spots clipped), its maximum is searched and the radius is the intensity-weighted mean
+# within one ring width around the maximum. Sectors without a clear ring (gaps, shadows) are left out.
+# Returns x, y of the ring points.
+def ring_points(frame, centre, ring, background, overload = None, sectors = 72):
+    radius, half_width, height = ring
+    band = int(math.ceil(2 * half_width)) + 2
+    top = max(0, int(centre[1] - radius - band))
+    bottom = min(frame.shape[0], int(centre[1] + radius + band) + 2)
+    left = max(0, int(centre[0] - radius - band))
+    right = min(frame.shape[1], int(centre[0] + radius + band) + 2)
+    part = frame[top:bottom, left:right]
+    x = np.arange(left, right, dtype = np.float32) + np.float32(0.5 - centre[0])
+    y = np.arange(top, bottom, dtype = np.float32) + np.float32(0.5 - centre[1])
+    radii = np.sqrt(y[:, None] ** 2 + x[None, :] ** 2)
+    inside = (radii >= radius - band) & (radii < radius + band) & (part >= 0)
+    if overload != None:
+        inside &= part < overload
+    rows, columns = np.nonzero(inside)
+    pixel_radius = radii[rows, columns]
+    excess = part[rows, columns] - np.interp(pixel_radius, np.arange(background.size), background)
+    excess = np.clip(excess, -3 * height, 3 * height)
+    sector = ((np.arctan2(y[rows], x[columns]) + math.pi) / (2 * math.pi) * sectors).astype(np.int32) % sectors
+    bins = 2 * band
+    index = sector * bins + (pixel_radius - (radius - band)).astype(np.int32)
+    pixels = np.bincount(index, minlength = sectors * bins).reshape(sectors, bins)
+    sums = np.bincount(index, weights = excess, minlength = sectors * bins).reshape(sectors, bins)
+    sector_profile = sums / np.maximum(pixels, 1)
+    smoothed = np.copy(sector_profile)
+    smoothed[:, 1:-1] = (sector_profile[:, :-2] + sector_profile[:, 1:-1] + sector_profile[:, 2:]) / 3
+    peak = np.argmax(smoothed, axis = 1)
+    # noise of a smoothed bin from the scatter of all bins
+    noise = 1.4826 * np.median(np.abs(sector_profile - np.median(sector_profile))) / math.sqrt(3)
+    good = (smoothed[np.arange(sectors), peak] > 4 * noise) & (pixels.min(axis = 1) > 0)
+    good &= (peak > 0) & (peak < bins - 1)
+    # weighted mean radius around the maximum
+    window = int(math.ceil(half_width))
+    offsets = np.arange(-window, window + 1)
+    window_bins = np.clip(peak[:, None] + offsets[None, :], 0, bins - 1)
+    window_weight = np.maximum(sector_profile[np.arange(sectors)[:, None], window_bins], 0)
+    window_radius = radius - band + window_bins + 0.5
+    total_weight = window_weight.sum(axis = 1)
+    good &= total_weight > 0
+    point_radius = (window_weight * window_radius).sum(axis = 1)[good] / total_weight[good]
+    angle = (np.flatnonzero(good) + 0.5) / sectors * 2 * math.pi - math.pi
+    return centre[0] + point_radius * np.cos(angle), centre[1] + point_radius * np.sin(angle)
+
+# helper function to find points where the direct beam scatter falls to the level of the profile at a radius
+def scatter_points(frame, centre, level_radius, profile, overload = None, sectors = 72, width = 20):
+    level = profile[int(level_radius)]
+    top = max(0, int(centre[1] - level_radius - width))
+    bottom = min(frame.shape[0], int(centre[1] + level_radius + width) + 2)
+    left = max(0, int(centre[0] - level_radius - width))
+    right = min(frame.shape[1], int(centre[0] + level_radius + width) + 2)
+    part = frame[top:bottom, left:right]
+    x = np.arange(left, right, dtype = np.float32) + np.float32(0.5 - centre[0])
+    y = np.arange(top, bottom, dtype = np.float32) + np.float32(0.5 - centre[1])
+    radii = np.sqrt(y[:, None] ** 2 + x[None, :] ** 2)
+    inside = (radii > level_radius - width) & (radii < level_radius + width) & (part >= 0)
+    if overload != None:
+        inside &= part < overload
+    rows, columns = np.nonzero(inside)
+    pixel_radius = radii[rows, columns]
+    sector = ((np.arctan2(y[rows], x[columns]) + math.pi) / (2 * math.pi) * sectors).astype(np.int32) % sectors
+    radius_bin = (pixel_radius - (level_radius - width)).astype(np.int32)
+    bins = 2 * width
+    index = sector * bins + radius_bin
+    pixels = np.bincount(index, minlength = sectors * bins).reshape(sectors, bins)
+    sums = np.bincount(index, weights = part[rows, columns], minlength = sectors * bins).reshape(sectors, bins)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        sector_profile = sums / pixels
+    # first bin below the level going outwards, interpolated between this and the bin before
+    below = sector_profile < level
+    crossing = np.argmax(below, axis = 1)
+    good = below.any(axis = 1) & (crossing > 0) & (pixels.min(axis = 1) > 0)
+    sector_number = np.flatnonzero(good)
+    inner = sector_profile[sector_number, crossing[good] - 1]
+    outer = sector_profile[sector_number, crossing[good]]
+    point_radius = level_radius - width + crossing[good] - 0.5 + (inner - level) / (inner - outer)
+    angle = (sector_number + 0.5) / sectors * 2 * math.pi - math.pi
+    return centre[0] + point_radius * np.cos(angle), centre[1] + point_radius * np.sin(angle)
+
+# helper function to fit one circle centre to points of several rings: x^2 + y^2 = 2 a x + 2 b y + c (c per ring).
+# Returns centre, uncertainty (standard errors) and the residual of every point in pixels.
+def fit_centre(point_sets):
+    number_of_rings = len(point_sets)
+    x = np.concatenate([points[0] for points in point_sets])
+    y = np.concatenate([points[1] for points in point_sets])
+    ring = np.concatenate([np.full(points[0].size, ring_number) for ring_number, points in enumerate(point_sets)])
+    # shifted coordinates keep the equations well conditioned
+    x0 = x.mean()
+    y0 = y.mean()
+    design = np.zeros((x.size, 2 + number_of_rings))
+    design[:, 0] = 2 * (x - x0)
+    design[:, 1] = 2 * (y - y0)
+    design[np.arange(x.size), 2 + ring] = 1
+    target = (x - x0) ** 2 + (y - y0) ** 2
+    solution, residual_sum, rank, singular = np.linalg.lstsq(design, target, rcond = None)
+    centre = (solution[0] + x0, solution[1] + y0)
+    ring_radius = np.sqrt(np.maximum(solution[2 + ring] + solution[0] ** 2 + solution[1] ** 2, 0))
+    residuals = np.hypot(x - centre[0], y - centre[1]) - ring_radius
+    degrees_of_freedom = max(1, x.size - design.shape[1])
+    variance = np.sum((design @ solution - target) ** 2) / degrees_of_freedom
+    covariance = variance * np.linalg.pinv(design.T @ design)
+    return centre, (math.sqrt(covariance[0, 0]), math.sqrt(covariance[1, 1])), residuals
+
+# refine the beam centre of a frame. mode: 'auto' (rings, direct beam scatter if there are none), 'rings' or 'scatter'.
+# Returns a dictionary with centre, uncertainty, method, rings (radii) and points, None if nothing could be fitted.
+def refine_beamcentre(frame, centre, overload = None, mode = 'auto', min_radius = 30, cycles = 5, sectors = 72):
+    centre = (float(centre[0]), float(centre[1]))
+    result = None
+    # rings (or the scatter level) are found once, the radial profile hardly changes with small centre shifts
+    profile, pixels = radial_profile(frame, centre, overload)
+    rings = []
+    if mode != 'scatter':
+        rings, background = find_rings(profile, pixels, min_radius)
+    if rings != []:
+        method = 'rings'
+    elif mode != 'rings':
+        # level radius: where the scatter has fallen halfway from its maximum (at the beam stop edge) to the outer background
+        valid = np.flatnonzero(~np.isnan(profile[min_radius:])) + min_radius
+        if valid.size < 50:
+            return result
+        strongest = valid[np.argmax(profile[valid])]
+        inner = profile[strongest]
+        outer = np.median(profile[valid[-valid.size // 4:]])
+        falling = valid[(profile[valid] < 0.5 * (inner + outer)) & (valid > strongest + 20)]
+        if falling.size == 0 or inner <= outer:
+            return result
+        rings = [(float(falling[0]), 20.0, 0.0)]
+        method = 'direct beam scatter'
+    else:
+        return result
+    for cycle in range(cycles):
+        if method == 'rings':
+            point_sets = [ring_points(frame, centre, ring, background, overload, sectors) for ring in rings]
+        else:
+            point_sets = [scatter_points(frame, centre, rings[0][0], profile, overload, sectors)]
+        point_sets = [points for points in point_sets if points[0].size >= 6]
+        if point_sets == []:
+            return result
+        new_centre, uncertainty, residuals = fit_centre(point_sets)
+        # one round of outlier rejection (spots or shadows inside a sector)
+        limit = 3 * 1.4826 * np.median(np.abs(residuals))
+        if limit > 0 and (np.abs(residuals) > limit).any():
+            keep = np.abs(residuals) <= limit
+            start = 0
+            cleaned = []
+            for points in point_sets:
+                selected = keep[start:start + points[0].size]
+                start = start + points[0].size
+                if selected.sum() >= 6:
+                    cleaned.append((points[0][selected], points[1][selected]))
+            if cleaned != []:
+                point_sets = cleaned
+                new_centre, uncertainty, residuals = fit_centre(point_sets)
+        shift = math.hypot(new_centre[0] - centre[0], new_centre[1] - centre[1])
+        centre = new_centre
+        result = {'centre': centre, 'uncertainty': uncertainty, 'method': method, 'rings': [ring[0] for ring in rings], 'points': sum(points[0].size for points in point_sets)}
+        if shift < 0.05:
+            break
+    return result
+
+
+# test and benchmark
+if __name__ == '__main__':
+    random = np.random.default_rng(3)
+    true_centre = (2071.37, 2213.81)
+    start_centre = (2075.0, 2209.0)
+    rows, columns = np.mgrid[0:4371, 0:4150].astype(np.float32) + np.float32(0.5)
+    radius = np.hypot(columns - true_centre[0], rows - true_centre[1])
+    # solvent background, two ice rings, Bragg spots, module gaps, beam stop shadow and its arm
+    expected = 20 * np.exp(-radius / 1500) + 2
+    for ring_radius, ring_height in ((900.0, 8.0), (1040.0, 5.0)):
+        expected += ring_height * np.exp(-0.5 * ((radius - ring_radius) / 2.5) ** 2)
+    frame = random.poisson(expected).astype(np.int32)
+    frame[random.integers(0, 4371, 20000), random.integers(0, 4150, 20000)] = random.integers(50, 5000, 20000)
+    frame[:, 1028:1040] = -1
+    frame[550:588, :] = -1
+    frame[radius < 60] = 0
+    frame[2200:2230, 2071:] = 0
+    start = time.time()
+    result = refine_beamcentre(frame, start_centre)
+    refine_time = time.time() - start
+    print('Rings:', result['method'], [round(ring) for ring in result['rings']], result['points'], 'points')
+    print('Refined:', round(result['centre'][0], 2), round(result['centre'][1], 2), '+-', round(result['uncertainty'][0], 2), round(result['uncertainty'][1], 2), 'true:', true_centre)
+    print('Time:', round(refine_time, 2), 's')
+    assert math.hypot(result['centre'][0] - true_centre[0], result['centre'][1] - true_centre[1]) < 0.3
+    # direct beam scatter only
+    frame = random.poisson(200 * np.exp(-radius / 120) + 2).astype(np.int32)
+    frame[radius < 60] = 0
+    frame[:, 1028:1040] = -1
+    start = time.time()
+    result = refine_beamcentre(frame, start_centre)
+    refine_time = time.time() - start
+    print('Scatter:', result['method'], [round(ring) for ring in result['rings']], result['points'], 'points')
+    print('Refined:', round(result['centre'][0], 2), round(result['centre'][1], 2), '+-', round(result['uncertainty'][0], 2), round(result['uncertainty'][1], 2), 'true:', true_centre)
+    print('Time:', round(refine_time, 2), 's')
+    # the scatter points are noisy, the error is checked against the uncertainty of the fit
+    assert math.hypot(result['centre'][0] - true_centre[0], result['centre'][1] - true_centre[1]) < 3 * math.hypot(*result['uncertainty'])
+    # pixel centres at i + 0.5: a ring around the middle of an even sized frame is centred between the middle pixels
+    rows, columns = np.mgrid[0:1000, 0:1000].astype(np.float32) + np.float32(0.5)
+    radius = np.hypot(columns - 500.0, rows - 500.0)
+    frame = random.poisson(50 * np.exp(-0.5 * ((radius - 300.0) / 2.5) ** 2) + 10).astype(np.int32)
+    result = refine_beamcentre(frame, (502.0, 497.0))
+    print('Middle of a 1000x1000 frame:', round(result['centre'][0], 3), round(result['centre'][1], 3))
+    assert abs(result['centre'][0] - 500.0) < 0.05 and abs(result['centre'][1] - 500.0) < 0.05
+    print('Beam centre refinement OK.')
@@ -0,0 +1,405 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Results catalog for AutoGUI.
+# Every finished Classic or Batch run adds its datasets.csv rows to a small SQLite database,
+# so the launcher can list, filter and export previous results without crawling the file system.
+# By default the catalog is per user (~/.autogui_catalog.db). A site-wide catalog can be set
+# with "catalog_path = " in autogui.cfg (it has to be writable for all users).
+# The catalog also keeps an inverted index (token -> file) of the processing logs and datasets.csv files of the
+# catalogued runs, and the cells of all datasets, so runs can be found by words in their logs and by cell axes.
+# update_index only reads files that are new or changed (size / modification time) since they were indexed.
+
+import sqlite3
+import os
+import re
+import time
+import datetime
+import glob
+import autogui_cluster
+
+
+catalog_config = os.path.join(os.path.dirname(__file__), 'autogui.cfg')
+default_catalog = os.path.join(os.path.expanduser('~'), ".autogui_catalog.db")
+
+catalog_schema = '''
+CREATE TABLE IF NOT EXISTS runs (
+    log_path TEXT PRIMARY KEY,
+    mode TEXT,
+    run_date REAL,
+    owner INTEGER
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    log_path TEXT,
+    row_number INTEGER,
+    dataset TEXT,
+    success TEXT,
+    space_group TEXT,
+    space_group_key TEXT,
+    resolution REAL,
+    csv_line TEXT,
+    PRIMARY KEY (log_path, row_number)
+);
+CREATE TABLE IF NOT EXISTS crawled_folders (
+    folder TEXT,
+    owner INTEGER,
+    crawl_date REAL,
+    PRIMARY KEY (folder, owner)
+);
+CREATE INDEX IF NOT EXISTS runs_date ON runs (owner, run_date);
+CREATE INDEX IF NOT EXISTS datasets_space_group ON datasets (space_group_key);
+CREATE INDEX IF NOT EXISTS datasets_resolution ON datasets (resolution);
+CREATE TABLE IF NOT EXISTS cells (
+    log_path TEXT,
+    row_number INTEGER,
+    a REAL,
+    b REAL,
+    c REAL,
+    alpha REAL,
+    beta REAL,
+    gamma REAL,
+    PRIMARY KEY (log_path, row_number)
+);
+CREATE INDEX IF NOT EXISTS cells_a ON cells (a);
+CREATE INDEX IF NOT EXISTS cells_b ON cells (b);
+CREATE INDEX IF NOT EXISTS cells_c ON cells (c);
+CREATE TABLE IF NOT EXISTS indexed_files (
+    file_id INTEGER PRIMARY KEY,
+    file_path TEXT UNIQUE,
+    log_path TEXT,
+    size INTEGER,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS indexed_files_run ON indexed_files (log_path);
+CREATE TABLE IF NOT EXISTS tokens (
+    token TEXT,
+    file_id INTEGER,
+    PRIMARY KEY (token, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tokens_file ON tokens (file_id);
+'''
+
+
+# helper function to find the catalog file (autogui.cfg may point to a site-wide catalog)
+def catalog_location():
+    catalog_path = default_catalog
+    cfg_catalog = re.compile("catalog_path = ")
+    try:
+        with open(catalog_config, 'rt') as config:
+            for line in config:
+                line = line.strip()
+                if line.startswith('#') == False and cfg_catalog.search(line) != None:
+                    catalog_path = os.path.expanduser((re.split(cfg_catalog, line))[-1].strip())
+    except OSError:
+        pass
+    return catalog_path
+
+# helper function to open the catalog and create tables if needed
+def open_catalog(catalog_path = None):
+    if catalog_path == None:
+        catalog_path = catalog_location()
+    connection = sqlite3.connect(catalog_path, timeout = 30)
+    connection.executescript(catalog_schema)
+    return connection
+
+# tokens are words starting with a letter (2-32 characters, lower case), numbers are found with the cell and resolution filters
+token_pattern = re.compile(rb'(?<![A-Za-z0-9_])[A-Za-z][A-Za-z0-9_]{1,31}(?![A-Za-z0-9_])')
+token_read_size = 4 * 1024 * 1024
+cell_tolerance = 0.01                   # relative tolerance for a single cell axis value
+
+# helper function to make space groups comparable ("P 21 21 21" == "p212121")
+def space_group_key(space_group):
+    return re.sub(r"\s", "", space_group).upper()
+
+# helper function to get a sortable number from "1.85" / "N/A"
+def resolution_value(resolution):
+    try:
+        return float(resolution)
+    except ValueError:
+        return None
+
+# helper function to add (or replace) one finished run and its datasets.csv rows
+def add_run(log_path, mode, csv_rows, catalog_path = None):
+    log_path = os.path.abspath(log_path)
+    try:
+        log_stat = os.stat(log_path)
+        run_date = log_stat.st_mtime
+        owner = log_stat.st_uid
+    except OSError:
+        run_date = time.time()
+        owner = os.getuid()
+    connection = open_catalog(catalog_path)
+    try:
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)', (log_path, mode, run_date, owner))
+            connection.execute('DELETE FROM datasets WHERE log_path = ?', (log_path,))
+            connection.execute('DELETE FROM cells WHERE log_path = ?', (log_path,))
+            row_number = 0
+            for csv_row in csv_rows:
+                # Date;Dataset;Success;Space group;Cell dimensions;Cell angles;Isotropic limit;Anisotropic limits;Command line
+                csv_row = list(csv_row) + ['N/A'] * (9 - len(csv_row))
+                connection.execute('INSERT INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                   (log_path, row_number, csv_row[1], csv_row[2], csv_row[3], space_group_key(csv_row[3]), resolution_value(csv_row[6]), ';'.join(csv_row)))
+                cell = autogui_cluster.parse_cell(csv_row[4], csv_row[5])
+                if cell != None:
+                    connection.execute('INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?, ?, ?)', [log_path, row_number] + cell)
+                row_number = row_number + 1
+    finally:
+        connection.close()
+
+# helper function for the datasets.csv of a run
+def run_csv(log_path, mode):
+    if mode == 'Classic':
+        return os.path.join(os.path.dirname(log_path), "useful_files/datasets.csv")
+    return os.path.join(os.path.dirname(log_path), "datasets.csv")
+
+# helper function to add a run that was found on disk (e.g. finished before the catalog existed)
+def import_run(log_path, mode, catalog_path = None):
+    path_to_csv = run_csv(log_path, mode)
+    csv_rows = []
+    try:
+        with open(path_to_csv, 'rt') as csvfile:
+            csvfile.readline()
+            for line in csvfile:
+                line = line.strip()
+                if line != '':
+                    csv_rows.append(line.split(';'))
+    except OSError:
+        csv_rows = []
+    add_run(log_path, mode, csv_rows, catalog_path)
+
+# helper function to list run dates already in the catalog (to skip unchanged runs when importing)
+def known_runs(log_paths, catalog_path = None):
+    known = {}
+    connection = open_catalog(catalog_path)
+    try:
+        for log_path in log_paths:
+            row = connection.execute('SELECT run_date FROM runs WHERE log_path = ?', (os.path.abspath(log_path),)).fetchone()
+            if row != None:
+                known[log_path] = row[0]
+    finally:
+        connection.close()
+    return known
+
+# helper function to check if the file tree below find_path (or a folder above) was searched once and its runs imported.
+# Runs that finish later are added by Classic and Batch themselves.
+def folder_crawled(find_path, catalog_path = None):
+    root = os.path.abspath(os.path.expanduser(find_path)).rstrip('/')
+    connection = open_catalog(catalog_path)
+    try:
+        for (folder,) in connection.execute('SELECT folder FROM crawled_folders WHERE owner = ?', (os.getuid(),)):
+            if root == folder or root.startswith(folder.rstrip('/') + '/'):
+                return True
+    finally:
+        connection.close()
+    return False
+
+# helper function to remember that all runs below find_path have been imported
+def mark_crawled(find_path, catalog_path = None):
+    root = os.path.abspath(os.path.expanduser(find_path)).rstrip('/')
+    connection = open_catalog(catalog_path)
+    try:
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO crawled_folders VALUES (?, ?, ?)', (root, os.getuid(), time.time()))
+    finally:
+        connection.close()
+
+# helper function to get the newest runs below find_path as launcher table rows
+# text: words that all have to be in the logs or datasets.csv of a run ("ice*" for words starting with ice).
+# cell: a cell axis, "140" (+- 1 %) or "138-142", of a dataset (of the space group, if one is given).
+def find_runs(find_path, classicresults, batchresults, find_number, space_group = '', resolution = '', catalog_path = None, text = '', cell = ''):
+    root = os.path.abspath(os.path.expanduser(find_path)).rstrip('/')
+    modes = []
+    if classicresults == True:
+        modes.append('Classic')
+    if batchresults == True:
+        modes.append('Batch')
+    try:
+        max_hits = max(int(find_number), 1)
+    except ValueError:
+        max_hits = 20
+    # all paths below root sort between "root/" and "root0" ('0' follows '/'), so the primary key index can be used
+    query = 'SELECT log_path, mode, run_date FROM runs WHERE owner = ? AND log_path > ? AND log_path < ? AND mode IN (' + ','.join('?' * len(modes)) + ')'
+    args = [os.getuid(), root + '/', root + '0'] + modes
+    if space_group.strip() != '':
+        query = query + ' AND log_path IN (SELECT log_path FROM datasets WHERE space_group_key = ?)'
+        args.append(space_group_key(space_group))
+    if resolution_value(resolution.strip()) != None:
+        query = query + ' AND log_path IN (SELECT log_path FROM datasets WHERE resolution <= ?)'
+        args.append(resolution_value(resolution.strip()))
+    for token, prefix in query_tokens(text):
+        if prefix == True:
+            query = query + ' AND log_path IN (SELECT indexed_files.log_path FROM tokens JOIN indexed_files USING (file_id) WHERE token >= ? AND token < ?)'
+            args.extend([token, token + '\uffff'])
+        else:
+            query = query + ' AND log_path IN (SELECT indexed_files.log_path FROM tokens JOIN indexed_files USING (file_id) WHERE token = ?)'
+            args.append(token)
+    cell_range = cell_axis_range(cell)
+    if cell_range != None:
+        cell_query = []
+        for axis in ('a', 'b', 'c'):
+            axis_query = 'SELECT cells.log_path FROM cells'
+            axis_args = []
+            if space_group.strip() != '':
+                axis_query = axis_query + ' JOIN datasets USING (log_path, row_number) WHERE datasets.space_group_key = ? AND '
+                axis_args.append(space_group_key(space_group))
+            else:
+                axis_query = axis_query + ' WHERE '
+            cell_query.append(axis_query + 'cells.' + axis + ' BETWEEN ? AND ?')
+            args.extend(axis_args + list(cell_range))
+        query = query + ' AND log_path IN (' + ' UNION '.join(cell_query) + ')'
+    query = query + ' ORDER BY run_date DESC LIMIT ?'
+    args.append(max_hits)
+    found_results = []
+    connection = open_catalog(catalog_path)
+    try:
+        for log_path, mode, run_date in connection.execute(query, args):
+            logdate = datetime.datetime.fromtimestamp(int(run_date)).strftime('%x')
+            found_results.append([logdate, mode, "./" + os.path.relpath(log_path, find_path)])
+    finally:
+        connection.close()
+    return found_results
+
+# helper function to get the datasets.csv lines (without header) of a run, None if the run is not in the catalog
+def get_datasets(log_path, catalog_path = None):
+    log_path = os.path.abspath(log_path)
+    connection = open_catalog(catalog_path)
+    try:
+        if connection.execute('SELECT 1 FROM runs WHERE log_path = ?', (log_path,)).fetchone() == None:
+            return None
+        return [row[0] for row in connection.execute('SELECT csv_line FROM datasets WHERE log_path = ? ORDER BY row_number', (log_path,))]
+    finally:
+        connection.close()
+
+# helper function to get the cells of all successful datasets (optionally of one space group): [(log_path, dataset, space group, cell lengths, cell angles), ...]
+def dataset_cells(space_group = '', catalog_path = None):
+    query = "SELECT log_path, dataset, space_group, csv_line FROM datasets WHERE success = 'True'"
+    args = []
+    if space_group.strip() != '':
+        query = query + ' AND space_group_key = ?'
+        args.append(space_group_key(space_group))
+    connection = open_catalog(catalog_path)
+    try:
+        cells = []
+        for log_path, dataset, dataset_space_group, csv_line in connection.execute(query + ' ORDER BY log_path, row_number', args):
+            csv_row = csv_line.split(';')
+            cells.append((log_path, dataset, dataset_space_group, csv_row[4], csv_row[5]))
+        return cells
+    finally:
+        connection.close()
+
+# helper function to get the search tokens of a text: [(token, prefix), ...]
+def query_tokens(text):
+    tokens = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        for token in token_pattern.findall(word.rstrip('*').encode('utf-8', errors = 'replace')):
+            tokens.append((token.decode('ascii').lower(), False))
+        # only the last word part is a prefix ("ice-ring*" -> ice, ring*)
+        if prefix == True and tokens != []:
+            tokens[-1] = (tokens[-1][0], True)
+    return tokens
+
+# helper function to get the range of a cell axis filter: "140" (+- cell_tolerance) or "138-142", None if empty or not a number
+def cell_axis_range(cell):
+    cell = cell.replace('Å', '').strip()
+    try:
+        if re.fullmatch(r'[\d.]+\s*-\s*[\d.]+', cell) != None:
+            low, high = (float(value) for value in cell.split('-'))
+            return (min(low, high), max(low, high))
+        value = float(cell)
+        return (value * (1 - cell_tolerance), value * (1 + cell_tolerance))
+    except ValueError:
+        return None
+
+# helper function to read the tokens of a file (in chunks, logs can be large)
+def read_tokens(file_path):
+    tokens = set()
+    rest = b''
+    with open(file_path, 'rb') as token_file:
+        while True:
+            chunk = token_file.read(token_read_size)
+            if chunk == b'':
+                break
+            # words are not cut at chunk borders, the last line goes with the next chunk
+            chunk = rest + chunk
+            line_end = chunk.rfind(b'\n') + 1
+            rest = chunk[line_end:]
+            tokens.update(token_pattern.findall(chunk, 0, line_end))
+    tokens.update(token_pattern.findall(rest))
+    return set(token.decode('ascii').lower() for token in tokens)
+
+# helper function for the files of a run that are indexed: processing log(s) and datasets.csv
+def run_files(log_path, mode):
+    if mode == 'Classic':
+        log_files = [os.path.join(os.path.dirname(log_path), "log.txt")]
+    else:
+        log_files = sorted(glob.glob(os.path.join(glob.escape(os.path.dirname(log_path)), "*_log.txt")))
+    return log_files + [run_csv(log_path, mode)]
+
+# update the search index of runs in the catalog (all runs of the user if log_paths is None). Only new or changed files
+# are read, files that are gone are removed. Changed datasets.csv files are imported again. Returns the number of files indexed.
+def update_index(log_paths = None, catalog_path = None, stop_index = None):
+    connection = open_catalog(catalog_path)
+    indexed = 0
+    try:
+        if log_paths == None:
+            runs = connection.execute('SELECT log_path, mode FROM runs WHERE owner = ?', (os.getuid(),)).fetchall()
+        else:
+            runs = []
+            for log_path in log_paths:
+                row = connection.execute('SELECT log_path, mode FROM runs WHERE log_path = ?', (os.path.abspath(log_path),)).fetchone()
+                if row != None:
+                    runs.append(row)
+        for log_path, mode in runs:
+            if stop_index != None and stop_index.is_set():
+                break
+            known = {}
+            for file_id, file_path, size, mtime in connection.execute('SELECT file_id, file_path, size, mtime FROM indexed_files WHERE log_path = ?', (log_path,)):
+                known[file_path] = (file_id, size, mtime)
+            for file_path in run_files(log_path, mode):
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                previous = known.pop(file_path, None)
+                if previous != None and previous[1] == file_stat.st_size and previous[2] == file_stat.st_mtime:
+                    continue
+                try:
+                    tokens = read_tokens(file_path)
+                    if file_path == run_csv(log_path, mode):
+                        import_run(log_path, mode, catalog_path)
+                except OSError:
+                    continue
+                # one transaction per file, searches are not blocked for long
+                with connection:
+                    if previous != None:
+                        connection.execute('DELETE FROM tokens WHERE file_id = ?', (previous[0],))
+                        connection.execute('DELETE FROM indexed_files WHERE file_id = ?', (previous[0],))
+                    file_id = connection.execute('INSERT INTO indexed_files (file_path, log_path, size, mtime) VALUES (?, ?, ?, ?)',
+                                                 (file_path, log_path, file_stat.st_size, file_stat.st_mtime)).lastrowid
+                    connection.executemany('INSERT INTO tokens VALUES (?, ?)', ((token, file_id) for token in tokens))
+                indexed = indexed + 1
+            # files that are gone
+            with connection:
+                for file_id, size, mtime in known.values():
+                    connection.execute('DELETE FROM tokens WHERE file_id = ?', (file_id,))
+                    connection.execute('DELETE FROM indexed_files WHERE file_id = ?', (file_id,))
+    finally:
+        connection.close()
+    return indexed
@@ -0,0 +1,214 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Mini-cbf reading and writing for AutoGUI (image viewer, checks of converted images).
+# The "x-CBF_BYTE_OFFSET" compression stores the difference to the previous pixel in one byte.
+# Larger differences are escaped: 0x80 + 2 bytes, 0x80 0x0080 + 4 bytes, 0x80 0x0080 0x00000080 + 8 bytes
+# (all little endian). Decoding and encoding are done with NumPy array operations.
+# Run "python autogui_cbf.py" for a round-trip test and a benchmark on a PILATUS 6M sized frame.
+
+import re
+import gzip
+import bz2
+import time
+import numpy as np
+
+
+cbf_binary_start = b'\x0c\x1a\x04\xd5'
+
+
+# helper function to read little endian integers of a given size at many byte positions
+def gather_integers(raw, positions, size):
+    offsets = positions[:, None] + np.arange(size)
+    return raw[offsets].copy().view('<i' + str(size))[:, 0]
+
+# helper function to decode the x-CBF_BYTE_OFFSET compression
+def decode_byte_offset(data, number_of_elements):
+    raw = np.frombuffer(data, dtype=np.uint8)
+    padded = np.concatenate((raw, np.zeros(16, dtype=np.uint8)))
+    candidates = np.flatnonzero(raw == 0x80)
+    if candidates.size == 0:
+        return np.cumsum(raw[:number_of_elements].view(np.int8), dtype = np.int32)
+
+    # length of every candidate if it was a real escape
+    short = gather_integers(padded, candidates + 1, 2)
+    middle = gather_integers(padded, candidates + 3, 4)
+    lengths = np.where(short != -0x8000, 3, np.where(middle != -0x80000000, 7, 15))
+
+    # 0x80 bytes can also be part of a wide difference. The first candidate is a real escape, and the next real escape
+    # after a real one is the first candidate behind its last byte. A candidate with no other candidate in the 15 bytes
+    # before it is always a real escape; if all are, nothing has to be resolved. Otherwise the chain of real escapes is
+    # followed from the first one with jumps that double in length every round (noisy frames can have an escape at
+    # almost every pixel, this takes about log2(number of escapes) rounds over the candidates).
+    if (np.diff(candidates) >= 15).all():
+        real = np.ones(candidates.size, dtype=bool)
+    else:
+        # the last entry stands for "no more candidates"
+        jump = np.append(np.searchsorted(candidates, candidates + lengths), candidates.size)
+        real = np.zeros(candidates.size + 1, dtype=bool)
+        real[0] = True
+        reached = np.zeros(1, dtype=np.int64)
+        while True:
+            following = jump[reached]
+            following = following[~real[following]]
+            if following.size == 0:
+                break
+            real[following] = True
+            reached = np.concatenate((reached, following))
+            jump = jump[jump]
+        real = real[:-1]
+    escapes = candidates[real]
+    escape_length = lengths[real]
+
+    # value of every escape
+    wide = np.empty(escapes.size, dtype=np.int64)
+    for length, offset, size in ((3, 1, 2), (7, 3, 4), (15, 7, 8)):
+        selected = escape_length == length
+        if selected.any():
+            wide[selected] = gather_integers(padded, escapes[selected] + offset, size)
+
+    # bytes that belong to an escape (but are not its first byte) are not pixels.
+    # Sums are done in 32 bit: values wrap around like the detector's signed 32-bit integers.
+    payload = np.zeros(raw.size + 16, dtype=bool)
+    for length in (3, 7, 15):
+        selected = escapes[escape_length == length]
+        if selected.size > 0:
+            payload[(selected + 1)[:, None] + np.arange(length - 1)] = True
+    deltas = raw.view(np.int8).astype(np.int32)
+    deltas[escapes] = wide.astype(np.int32)
+    deltas = deltas[~payload[:raw.size]][:number_of_elements]
+    if deltas.size < number_of_elements:
+        raise ValueError('CBF data is truncated: ' + str(deltas.size) + ' of ' + str(number_of_elements) + ' pixels')
+    return np.cumsum(deltas, dtype = np.int32)
+
+# helper function to encode pixel values with the x-CBF_BYTE_OFFSET compression
+def encode_byte_offset(values):
+    values = np.asarray(values, dtype=np.int64).ravel()
+    deltas = np.diff(values, prepend = 0)
+    sizes = np.where(np.abs(deltas) <= 127, 1, np.where(np.abs(deltas) <= 32767, 3, np.where(np.abs(deltas) <= 2147483647, 7, 15)))
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    encoded = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    one = sizes == 1
+    encoded[starts[one]] = deltas[one].astype(np.int8).view(np.uint8)
+    escaped = starts[~one]
+    encoded[escaped] = 0x80
+    for size, offset, value_size in ((3, 1, 2), (7, 3, 4), (15, 7, 8)):
+        selected = sizes == size
+        if selected.any():
+            positions = starts[selected]
+            # 0x0080 (and 0x00000080) announce the wider difference
+            if size >= 7:
+                encoded[positions + 2] = 0x80
+            if size == 15:
+                encoded[positions + 6] = 0x80
+            value_bytes = deltas[selected].astype('<i' + str(value_size)).view(np.uint8).reshape(-1, value_size)
+            encoded[(positions + offset)[:, None] + np.arange(value_size)] = value_bytes
+    return encoded.tobytes()
+
+# helper function to read the file content of a (gzip/bzip2 compressed) cbf file
+def read_content(image_path):
+    if image_path.endswith('.gz'):
+        with gzip.open(image_path, 'rb') as imagefile:
+            return imagefile.read()
+    if image_path.endswith('.bz2'):
+        with bz2.open(image_path, 'rb') as imagefile:
+            return imagefile.read()
+    with open(image_path, 'rb') as imagefile:
+        return imagefile.read()
+
+# helper function to read a mini-cbf file, None if the file is not a byte-offset compressed cbf
+def read_cbf(image_path):
+    content = read_content(image_path)
+    binary_start = content.find(cbf_binary_start)
+    if binary_start < 0:
+        return None
+    header = content[:binary_start].decode('latin-1')
+    if re.search('x-CBF_BYTE_OFFSET', header) == None:
+        return None
+    fastest = int(re.search(r'X-Binary-Size-Fastest-Dimension:\s*(\d+)', header).group(1))
+    second = int(re.search(r'X-Binary-Size-Second-Dimension:\s*(\d+)', header).group(1))
+    binary_size = int(re.search(r'X-Binary-Size:\s*(\d+)', header).group(1))
+    data = content[binary_start + 4:binary_start + 4 + binary_size]
+    if len(data) < binary_size:
+        raise ValueError('CBF file is truncated: ' + image_path)
+    return decode_byte_offset(data, fastest * second).reshape(second, fastest)
+
+# helper function to write a minimal mini-cbf file (no detector header)
+def write_cbf(image_path, frame):
+    data = encode_byte_offset(frame)
+    header = ('###CBF: VERSION 1.5\r\n'
+              'data_autogui\r\n'
+              '_array_data.data\r\n'
+              ';\r\n'
+              '--CIF-BINARY-FORMAT-SECTION--\r\n'
+              'Content-Type: application/octet-stream;\r\n'
+              '     conversions="x-CBF_BYTE_OFFSET"\r\n'
+              'Content-Transfer-Encoding: BINARY\r\n'
+              'X-Binary-Size: ' + str(len(data)) + '\r\n'
+              'X-Binary-ID: 1\r\n'
+              'X-Binary-Element-Type: "signed 32-bit integer"\r\n'
+              'X-Binary-Element-Byte-Order: LITTLE_ENDIAN\r\n'
+              'X-Binary-Number-of-Elements: ' + str(frame.size) + '\r\n'
+              'X-Binary-Size-Fastest-Dimension: ' + str(frame.shape[1]) + '\r\n'
+              'X-Binary-Size-Second-Dimension: ' + str(frame.shape[0]) + '\r\n'
+              'X-Binary-Size-Padding: 4095\r\n'
+              '\r\n')
+    with open(image_path, 'wb') as imagefile:
+        imagefile.write(header.encode('latin-1') + cbf_binary_start + data + b'\x00' * 4095 + b'\r\n--CIF-BINARY-FORMAT-SECTION----\r\n;\r\n')
+
+# helper function to check if a cbf file can be decoded completely
+def check_cbf(image_path):
+    try:
+        return read_cbf(image_path) is not None
+    except Exception:
+        return False
+
+
+# round-trip test and benchmark
+if __name__ == '__main__':
+    random = np.random.default_rng(1)
+    # edge cases around every escape size
+    edges = [0, 127, 0, -128, 0, 128, -127, 32767, 0, -32768, 0, 32768, -32767, 2147483647, 0, -2147483647, 0, -2147483648]
+    assert (decode_byte_offset(encode_byte_offset(edges), len(edges)) == np.array(edges, dtype=np.int32)).all()
+    # PILATUS 6M sized frame: weak background, strong spots, module gaps (-1) and a few dead pixels (-2)
+    frame = random.poisson(3, (2527, 2463)).astype(np.int32)
+    rows = random.integers(0, 2527, 5000)
+    columns = random.integers(0, 2463, 5000)
+    frame[rows, columns] = random.integers(100, 1000000, 5000)
+    frame[:, 487:494] = -1
+    frame[195:212, :] = -1
+    frame[random.integers(0, 2527, 50), random.integers(0, 2463, 50)] = -2
+    start = time.time()
+    data = encode_byte_offset(frame)
+    encode_time = time.time() - start
+    decode_times = []
+    for repeat in range(5):
+        start = time.time()
+        decoded = decode_byte_offset(data, frame.size).reshape(frame.shape)
+        decode_times.append(time.time() - start)
+    assert (decoded == frame).all()
+    print('Frame:', frame.shape[1], 'x', frame.shape[0], 'pixels,', len(data), 'bytes compressed')
+    print('Encoding:', round(encode_time * 1000), 'ms')
+    print('Decoding:', round(min(decode_times) * 1000), 'ms (best of 5)')
+    # noisy frame with an escape at almost every pixel (long chains of close 0x80 candidates)
+    noisy = random.integers(-5000, 5000, (1000, 1000)).astype(np.int32)
+    noisy_data = encode_byte_offset(noisy)
+    start = time.time()
+    assert (decode_byte_offset(noisy_data, noisy.size).reshape(noisy.shape) == noisy).all()
+    print('Decoding noisy 1000 x 1000 frame:', round((time.time() - start) * 1000), 'ms')
+    print('Round trip OK.')
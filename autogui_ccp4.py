@@ -0,0 +1,141 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# CCP4 program runs for AutoGUI classic and batch.
+# run_program is the shared process runner: keyword input on stdin, output captured and written to a log,
+# RuntimeError with the end of the output if the program can't be started or fails.
+# Space group validation with POINTLESS: the isotropic and the anisotropic MTZ are checked at the same time, each
+# run has its own log, which is parsed into a PointlessVerdict (space group from HKLIN, best solution, reindex operator,
+# probabilities). If POINTLESS finds a different space group, its output is kept as "<space group>_<name>.mtz".
+# Run "python autogui_ccp4.py <log>" to parse a POINTLESS log.
+
+import os
+import re
+import sys
+import shutil
+import subprocess
+import collections
+import concurrent.futures
+
+
+# mtz: checked file. input_space_group / space_group: from HKLIN / best solution (no spaces). solution: 'space group' or 'point group'.
+# changed: best solution differs from the input. output_mtz: reindexed MTZ from POINTLESS ('' if not kept).
+# summary: lines of the best solution block. error: '' if POINTLESS ran and its log could be read.
+PointlessVerdict = collections.namedtuple('PointlessVerdict', ['mtz', 'input_space_group', 'space_group', 'solution', 'reindex', 'laue_probability',
+                                                               'absence_probability', 'total_probability', 'confidence', 'changed', 'output_mtz', 'summary', 'error'])
+
+pointless_values = {'Reindex operator:': 'reindex', 'Laue group probability:': 'laue_probability', 'Systematic absence probability:': 'absence_probability',
+                    'Total probability:': 'total_probability', 'Space group confidence:': 'confidence'}
+
+
+# shared runner for external programs: returns the output, raises RuntimeError if the program fails
+def run_program(arguments, folder, keywords = '', log_path = None):
+    try:
+        program_process = subprocess.run(arguments, input = keywords, capture_output = True, text = True, cwd = folder)
+    except OSError as program_error:
+        raise RuntimeError(arguments[0] + ' could not be started: ' + str(program_error))
+    output = program_process.stdout + program_process.stderr
+    if log_path != None:
+        with open(log_path, 'wt') as log:
+            log.write(output)
+    if program_process.returncode != 0:
+        raise RuntimeError(arguments[0] + ' failed (exit code ' + str(program_process.returncode) + '):\n' + '\n'.join(output.strip().splitlines()[-15:]))
+    return output
+
+# helper function to convert a number from the log, None if it is missing
+def to_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+# parse the output of POINTLESS into a dict with the PointlessVerdict fields found
+def parse_pointless(output):
+    verdict = {'input_space_group': '', 'space_group': '', 'solution': '', 'reindex': '', 'summary': []}
+    block = 0
+    for line in output.splitlines():
+        if line.strip().startswith('Space group from HKLIN file'):
+            verdict['input_space_group'] = ''.join(line.split(':', 1)[1].split())
+        elif line.strip().startswith('Best Solution'):
+            # the last "Best Solution" wins, with the values in the lines after it
+            solution = re.search(r'(space group|point group)\s+(.+)', line)
+            if solution != None:
+                verdict['solution'] = solution.group(1)
+                verdict['space_group'] = ''.join(solution.group(2).split())
+            verdict['summary'] = [line.rstrip()]
+            block = 10
+        elif block > 0:
+            block -= 1
+            verdict['summary'].append(line.rstrip())
+            for label, field in pointless_values.items():
+                if line.strip().startswith(label):
+                    value = line.split(':', 1)[1].strip()
+                    verdict[field] = value if field == 'reindex' else to_float(value)
+    return verdict
+
+# check the space group of one MTZ with POINTLESS. Never raises, problems are reported in the verdict's error field.
+def check_space_group(mtz_path, program = 'pointless', log_path = None):
+    folder, mtz_name = os.path.split(os.path.abspath(mtz_path))
+    pointless_mtz = os.path.join(folder, 'pointless_' + mtz_name)
+    verdict = {field: None for field in PointlessVerdict._fields}
+    verdict.update({'mtz': mtz_path, 'changed': False, 'output_mtz': '', 'summary': [], 'error': ''})
+    try:
+        output = run_program([program, 'hklin', mtz_name, 'hklout', pointless_mtz], folder, log_path = log_path)
+        verdict.update(parse_pointless(output))
+        if verdict['input_space_group'] == '' or verdict['space_group'] == '':
+            verdict['error'] = 'no space group found in the POINTLESS output'
+        elif verdict['input_space_group'] != verdict['space_group']:
+            verdict['changed'] = True
+            if os.path.exists(pointless_mtz):
+                verdict['output_mtz'] = os.path.join(folder, verdict['space_group'] + '_' + mtz_name)
+                shutil.move(pointless_mtz, verdict['output_mtz'])
+    except (RuntimeError, OSError) as pointless_error:
+        verdict['error'] = str(pointless_error)
+    if os.path.exists(pointless_mtz):
+        os.remove(pointless_mtz)
+    return PointlessVerdict(**verdict)
+
+# check several MTZ files at the same time: [PointlessVerdict, ...] in the order of mtz_paths.
+# Logs are written to log_folder as "<prefix><name>.log" (no logs if log_folder is None).
+def validate_space_groups(mtz_paths, program = 'pointless', log_folder = None, log_prefix = 'pointless_'):
+    log_paths = [None if log_folder == None else os.path.join(log_folder, log_prefix + os.path.splitext(os.path.basename(mtz_path))[0] + '.log') for mtz_path in mtz_paths]
+    with concurrent.futures.ThreadPoolExecutor(max_workers = max(len(mtz_paths), 1)) as executor:
+        return list(executor.map(lambda checked: check_space_group(checked[0], program, checked[1]), zip(mtz_paths, log_paths)))
+
+# helper function for a one line message about a verdict
+def verdict_text(verdict):
+    name = os.path.basename(verdict.mtz)
+    if verdict.error != '':
+        return 'POINTLESS check of ' + name + ' failed: ' + verdict.error.splitlines()[0]
+    if verdict.total_probability != None:
+        probability = ' (total probability ' + str(verdict.total_probability) + ')'
+    else:
+        probability = ''
+    if verdict.changed == False:
+        return 'POINTLESS agrees with ' + verdict.input_space_group + ' for ' + name + probability + '.'
+    return 'POINTLESS suggests ' + verdict.solution + ' ' + verdict.space_group + ' instead of ' + verdict.input_space_group + ' for ' + name + probability + ', reindex ' + str(verdict.reindex) + '.'
+
+
+# parse a POINTLESS log given on the command line
+if __name__ == '__main__':
+    with open(sys.argv[1], 'rt', errors = 'replace') as pointless_log:
+        parsed = parse_pointless(pointless_log.read())
+    for field, value in parsed.items():
+        if field != 'summary':
+            print(field + ':', value)
+    print('\n'.join(parsed['summary']))
@@ -24,6 +24,8 @@ version = 'v.20250307'                             # current version
 # FreeSimpleGUI (pip install FreeSimpleGUI)
 # psutil (pip install psutil)
 # PIL (pip install Pillow)
+# numpy (pip install numpy)
+# h5py, hdf5plugin (pip install h5py hdf5plugin) for viewing EIGER images without Adxv (optional)
 # Working installation of GPhL AutoPROC (www.globalphasing.com/autoproc/)
 # Working installation of CCP4i (www.ccp4.ac.uk)
 # Working installation of Adxv for Image viewing (www.scripps.edu/tainer/arvai/adxv.html)
@@ -73,6 +75,17 @@ import gc
 import faulthandler
 from PIL import Image
 import math
+import autogui_catalog
+import autogui_images
+import autogui_beamcentre
+import autogui_masks
+import autogui_results
+import autogui_mtz
+import autogui_freer
+import autogui_ccp4
+import autogui_rescale
+import autogui_scan
+import autogui_logview
 
 # icon
 ag_icon = b'iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAAmeXpUWHRSYXcgcHJvZmlsZSB0eXBlIGV4aWYAAHjarZxrlhy5jqT/+ypmCc43uRw+z5kdzPLnM9BTUune7unuM6WSMhXp4UEnAIMZAOrZ/+d/n+d/8V/Lzj8xlZpbzi//xRab73xT3/vf/ereaH/af/H7EX//x+vPrx94Xgp8DfeveX/Xd15Pv99Qvje48c/XnzK/+9TvRt8Pfm4Y9Mmeb77r6nej4O/r7vv707739fjH43y/43Lue9N9rL//XtiMlbhf8I/fwYWXP7MuCPrtQ+dr408XMhfxJ98He8Xrun+3d8+vb//avF/f/bV3b/9eD//ciufN3wX5rz36Xnfp3++d7dCfK3K/P/kfPyjJ/zLo33t3zqrn7Pt0PWZ2Kj/fQ/08in3HhYOtDPa2zK/C78T3xX41flUecWKxhTUHv+bjmvPs9nHRLdfdcdu+TjdZYvTbF756P32w12oovvkZZIKoX+74ghnWEyqWmFgt8LL/tRZnn9vs86arfPJyXOkdN3Nm2b9+Pf/uxf/Jr183Okeui8PVX3vFurxcj2XIcvqTqzCBO9+eJttf+/X84TfvH4YNWDDZNlcesL/j3mIk99u3gtk5cF164/OFsyvruwFbxGcnFuMCFnizC8ll9xbvi3PsY8U+nZX7EP3AAi4lv9xzsE0gEoqvXp/Ne4qza33y92WgBUMkAqVgGgIFY8WY8J8SKz7UU0jxSSnlVFJNLfUccswp51yyMKqXUGJJJZdSamml11BjTTXXUmtttTffAhCWWm7labW11jsf2rl1592dK3offoQRRxp5lFFHG33iPjPONPMss842+/IrLMJ/5VWeVVdbfbuNK+2408677Lrb7gdfO+HEk04+5dTTTv9ltc+q/7Sa+8ty/7nV3Gc1WSzadeW31Xi5lJ9bOMFJks2wmI8OixdZAIf2stlbXYxelpPN3uYJiuSxmksyznKyGBaM2/l03C/b/bbcf2q3J8X/lt38f2S5R6b7/2G5R6b7LPevdvs3VlvdMkowAykKtadvOAAbF+zafe3KSf/9r4NPKovoPzzAbGed08bOeQOha9SZw5qnL7A7J8c+Vp4wnRE315281yx58tNUuFWvxz1sWjjAwsa8Z7hyemH5Y6+A6+xU91xjlHy4RwmnjBM7Tw9wd1vWr6/P3y/8j74ezH/emsfSmt4+WYg2bLGmxG83AovqpYWdTitjrDZCW2evxS3CZFPi3M2RUtrDorlJ3eWctEc/I5/3lDXwnNMT+9B0WS5tcok7ue+W54j+jFAan9qCnhyr1eD22Cfh2bhI24cMMgKeQuLGF13rgygDiWvsB6Oc2lhsK7Z3rHeHsllhfbQevDlszDXSHKvzlrBtnb0Utn4OoHrPPlba85B/zHS4TWyyg9P3fj643MJx93te3Z33xYkZ/Wu3ysQPD5JZ/2huLqJiDJ44HXJYZkUE7bIdfohxEOK6wGopbT1EModox1717u7fmn6dyU6kbSuKk2371jPOg9unssNiH9nN8ufWV6K54Xi1hhkWgIoHneq2NjMQMlxJHGsZXE6ILEI0npq+z8dxTxOQsUeEWbTPJPzPCix08o39JBKkfmgrsLMezX7C62VlH3j11Dp2b7yJLXjDhjMUUg7Bg0/5HOrULe/2d/u46bFpfvgUrlxmy9a4uoMGHgCDTPAq7yJ51claxg2lwScSaZUIxQPOgYEQmOG5m8Wqhu9pLkDvgHVlBMA/AU/281iqS5W3H/ASN+T518YNiQTdhB1IT9+Z55U3H1CvaV0Ju8yppw/YJTT9qOOofo/p+b4ojnADPLrgkvcxnuJWF3Byv8bLBM7kxzUAbGDasr8BXtpCssUZs7bpMBm02pwEvqx7Y34ckBWOk+cJilFh8wg5m5tlPAFnFHYEYtuLhQltjiIxFh5QAOPw76dyJ1aWyx5e71V8ull+RdMaMoQ7kdeWguBt0acX4+6Go9Ulz2nTP8mlhZutMF25S61geJGpnTxgJO3uwR7E4W+IU2D0BA0ki5LnkkPUSAYITf8LX1N3PWduDF7xUJstG5jQETmPcIZg3yvF7euYIDWxOQsr6XENkhXvOjxjWZvFpXrkYG2y5LA8pOEl9wEfT0m5zwzqjEBKBt/36tzr7HjwAx4G8/NQnn1a8NWknTYncdx7E3LB7Lyes8DFd3mCBHSUI7HBTTAz3e/V8j6eia1j44K8vZRN3J036z68ZTyLnAyHq5t8k6F3mGHGjAUhwmRtHiRrdw1VuX/ewXywEEib5erCsXGgJ8shssCShIa/OxyZdJbzEUXPYOJ2CRDKo21kRSLd8QglwgZXIoPg86DHmQ+mzXI4OEBnu3nKN9btV2sWHfAA0CsuaAHp0LOBiInJe4nLwDMXtqrxdvJaLeklyLX8ckLG/ZqSUuxoXS7WclF3biZp3jZFVXonypANJ+iBUw+jt2ev+MKX8C/QTfkVDMeehLVhzfD2NfUNW6tLH9mCkhCmUnYnMY/F/8gs6MsqimNiqeFhMllYWH1iB5j0AExGilCxCKnJqc8SMwhG+hKu1ZU3LAZRA3rgbDLI2YU7rURwxwJvA0jYXEWzcJwM+wWg7LZuOrNgJNOO8QgRO0wqbWJtwHGc2RlnE+/ISbzE8RAkA4A7KZXXQIifIU+y6EQV1wNmrw3xEofbuWeWP2YHAXNvOxlWgmfY6qIzSKEFAXX6MoUwVUCNQ6L0tugQJiXT7kBCJAO9yQL1/Y+/JmKGaFEw2M4+8AsFr0WDfC+TV3FW4OMu/MR6tEigbzpFHgFRBXRrENMvhvYKGiSEMRbF9MXn8/ZRI9l5NdfwXZ558qEwG5HesjpPAr2Tv9mbSGXYv8cn14GS1ed9ny8OZDtCVrTPZ3GQZOXiDTUC8pSaZGYi355EdIqgRf+yX4IOoQwwBBFnHe9oHo0G5MTd8QGgkL8ssz+3M/zF8omFkJZgbKEnB9q0dwNYrWd8tucFzYF14HBZZEjrK055pslMsAQZXNcoKszLxhOUHFcFn4NIFEbg8y7/aQCIgkVLgGIRJtkNyIwyx4RGiPL1m20gWot00yNEkQ+em0jWW4F5eFzqIy2SG0od5s+WIyac3G3EINUisLXb4Gn1MU4Qb1ZPb5mXfcTNYzVn2b4TNMulcgBlEgwgNhp+irQptZMAucF7gvCoZ2MVKyM+GrroiGhyD+c7OXOyCbxFkWK2JDliGSDtdLYoD9dSAHkeEAsnvAlG6TPgVeR+DP0l/gy4wZTBgpoKnsu1XvA1NtQYc9t+7sMeDUAjKt+QAvXB+BcQkppAcnQlGGDV8z28UMDXwFFkI7jrGk/W9ps9fhTLBPIy+RJLEqOvJFBF4ZVrdnLQuYQepihmkXBpHjU0RcASJKL8fXtmlsCpchGAPbBWQgvNYQQdkqK38vj1iCiSUnj0JHzFvQiU98NRCHsQ8RJNQcyBM4O3YXF4GJJxaFmXs4mmkoawMFloVkuD5NcpzBpSeCTIxh0goqlDwoAHV9CIUiAEWIZx7YJPxcFTd6g/YSsagc0HzkH84amAg7FauLGiTDBKNh/imC3u9W9l0EpWrQrDHqmBsnJehcrjuuCPDQjbYh6uYrIhfPiw8wcfeMMHH4p7UrkUzNyQGt4vLbJZ3xBYXr5sCDx1jwFMFfBDtGH1L+FvAzh5SZABeUsJ+HUuDwzdKF5vBXj2E8esShfCHeU3MQXujV9UnItPsOuHNBhJAZbOBiPT5yMYT4gAqA+Xwt8K+Vl09ICnWrMoDOvZQZgRZbg+JjiMOlfMNM81ZcdHcaXAZwfGjfxLFyUSjkOzF10Ivz7kXkGMwH4meA/7zIpglSw69keZwBktwp2GsTjbAZaAhWoRRuOhOTQ4MpTNOzJrrkvZRLRph5ouh/yVYhyx5SxjyUZV5hGykUBxoko04rq4Cupbq8io8okXWGofOT/EXRqCNChzcGZZ5TfVSzJpYAGFhLGHjMd3xQYjwY+3TMtWlXhMpSRzyB991KHAbJ9fBmcIgon66IoTFCmfZvyDRAw0stls4c91xisfw0epbz8gQ50kmMxrRQHikDg45l9wqRfv5PFQzoQxWDmE5B8r5UaX8A1lJ5I8kc19NmlHsnTLdHDLyc+UBJqlRONLC64edywl+L5U9iEjgiHw+qDMi0gf4jkE3nJkk4VTBGNdJAn2GK5igFtf5fcXJjT3JT1gNuoOrgdpYddeQjlny4FLObxoZRsdS8JAiYlHsQ+gN3hzFVRqdW0ncYwk0RZj9wtVSgbF/I57b/+bqbAzIADcJQNEjvQL/pB7WXlYMT34EEos/uYrRXUt0w1tf3i53yTNgP/xofuFF8vb4HsgU7uJxj834TqzbSbTkKonwUqOEPO4ST6XPHFMpKYnm8AcyPkpNHIXy+a5XRvvI9pAGBLBSs/zh96g1CFnUCWzE+EiPOZ+R3CAIJDik3YepiEgpMTaJL14ch5MCTHR5VaozRjx/WmqBRSOoUgXvURHB0EhPFNElx27xDv1J7D/xPvhasI5eQF4MbVaBfiJtzlteTp8ohKpVSBkE3VqBLpLEhaEFEfBHasV1IoX5+hW2HjJORgUYgaYiVgV+OYxYgS6m6wV90hR9ajzQFrP5SAqv8Ex2Z3eIlsZcpheVa/V0W5VKQA9DqaTxqMlvyIEK8PA+eGtJUPqGxx/kIRfqMTmtkcbJLZXbkiMSGYN0n7a8GoEVDvejEqu8Zj8U6FQYNuIoBPwhCyt53vxw990RBp+ZUuE0jpfvHoMJ4qpFa1nyLaIme6yqJ5iSbG5LwIsuQYCF1bwSoFmLYG3sVNf7OjypSILARoszakyxjN5Endjiem8SciiShyQC8e6xSe+sOW62L/y8K1iHkHyfBRLdRClWdDSaXPQdFIADsJThlXljJsorFiXrVe5hmQDlLKv5emjpK2qYhIG3E+926t4g7hNp0IFlgSO+OPF78F3OOISdJGt7YbIdflcrwT5CaxWF4G9PKvxSnSlklGxEoTyULD9ExdzSQSAn46BeAgPuM8bVeYlQnnyE2FPMFIyzvitTIECrBkhcEdYk4SY+PH5YVALhMSEHe9eKGLMNlge7so2iYDv10IBbcJPwM7tpTTXp4mMxQWTEyE/3wP8VE1IgpBtgPG1RxPqDSuu/UHRBKTiZ1YmeuOFvsey2AtfQznXn1TJrtcqWXXrN/0YxAbVJMAQsXRSV74K6asyPahBuRZAEFezxBOG0QuDInk8W+xEbOCnwUoRYO1Aj06y9xEsDajVfEQcxXIgwR0pOIAh7ZaAFlzjBgJHH8nYRZ4GkDcl31hL6xuqHutsKus8cazcqqpD0Xl1F1Rxasa0avrKl1gOIJLJ93WKdIs4b2FX+TD3nvTIre7vE/MF8iB25GwLDcWLf3kQbQ2rVx1jJYUMBB9W4WYGQCJSFDv5fCN8vWGSctTRCNLzQ9XBKmJ9MDS8G1ZMWl3ZWBvoxgJJT0Vwh0N+0p6kGrFbN8r/Ect1iSVepiIPy2RTPDuz3gnbx6VhwsACNOogaozeVSvDYYWtghKLJZaMf+FABhzHgMOEP/HNJ2MJt+t6EZJSJE/z5jyJoCGNiAKxRS0JAW4pRiWK0dkgoLyFiz5r9+oTGIcDQZTIy/PxSELivhAQJZgDQkmgf+jHDrLOFxKPVIHUekuWG1MChRlOv/tm69Snacr9RaU0q3NftbgkznA54CC+bTlpRK4AsvyKby8udhValNuIgaA4niUgRWE5XY4TYHtvUNNnozfZJQsWAjnF+iqHstEd9RvYo9UhZo40ZBULlZPzw90rYao8LQm5g0qIfojdBdVpj6pdhGOr6LsBq3ZT2QxaAOIFsa8taqBHyyMDBh0KiLd5NMfSLh7zlZpdMa6jcF1LakTO7ZTx17G84Ug4aBZV2FXlGSLhQ94Eh+SpYwKz5IjVECnfsk+EEt6q8pL/b9Q8KxAcodcGUS/+lrE1XqaOEOjoG9l1vx0B7Lp102qIGJCYP7AscR6rT1h5XBxGur8M0VDYt3OvymX2aVMboEKWJBKmj9sogES03qwSoTQCHk84nv4+fIQgYkv7Han9bH2mDZsjLyyIK8x8ew+H54lVQBUiIbng5dCnVgHlJlpDfMLMYTLYFfwQiYUqmcA6RYyaXZeMFWAHJM6Vh/jWllMbUgzpnSerQMO7KpKbnRDQRHOQvVRx98XqCWF8VSqQB69Gqv1y1KZ2UPTP2x2eFabrLCO0EoKxBh6+fGCR2NofsPgTK1LyJQNscWaPXmMtc9dmypkMpOYe2/j+LmNXZW1FE8C81bMAp9icoA5ouJZjYeCREF7AmtW68UfPoAJ2RLIDgIh1NlzL3gngAPVFIchQX421JUFY2PsBXW8lBoHAZ8E9QV2vj0f9GQbNV/mUiJGsON6Yomm2DiTAIQqMvZVndNW7rTtQhEg1FV/QBNzQWhCqvCE4lgpaGKEp9pYtxiuQ8BUII7rhyeJ5wEVXK8hK9pbbtC7L7/XXs6uRz7NKskEHQhoiXThvFVlajxPpVOC7PSBtXihQ2/bRWjJSXdYpsA6ESAMeBvqAYjz0gOQZi8kuPeDaVsmHLOusFytEUVUQTBLL2aYtUH0NKg/fbCr5EHkROOHplQ8hK7M/sH/VSHHuP8hhV9ceo6tzoW22VlRXDXi1FnwiP0wsi8/fhMmuKmilcKwE/JeeV37Y6ruqvm3Frn11rKiyOrZVJVRkotTfY61ybmSVHBA/HIfaLdYBIdtCIe5bhVMR9Iw5O+5buorB9SbWF2H2qO+mFgaU7GpbERCkf5VGZmEGaO9FBRELMmMxtTpUcrFVmBc/qs2TLlh9k9Qc5p7q5E3Viry0s6BEOgQsF5A0kow6HCrxRdKCzDMC6ohEJykvC9/YvHLdhBiqX7REHQ3tJL+jeY0DjIO4OUApAqLcb2H6YTYEUJeSudQuxEQKJDhaU+eSR1s1+lsVWexe9w5HsB4muV/kmh0BeGaXBZP8CKbaCCLYba+3UkCgdgkPaa3fayUH1pbNWy8ZhcWWW886l3eYaN2TpO3EO8AYrR+2LLoNbT5ElHh8m/JtgiE/xGeW8zYrPKnMVazgPSMWTtFc8IpcAPPFaDeDbJVI+aWy2UbUJaI/KrqtoMQ3+RstmDYNQPJWWRGGBEQ5telVFY3gRbh4gXyonU9FQvCtlRIFaCpddsf2IX3Vgc/mx9VdyB0JlqrikzX/bIJGlUYR4hTUpl+qLskNo3V7M8xzvcafp8gOlFM/RLq6bQVhxCfuIt8NPBWbpITjkKLeG8FQI8CH+LMlhPtVQkfwg4VfkQ0AIfEjPY8jL/LT13664dkazVTht0vWT8Sv4QYZzZEjh2oap8773K2jd9Q0wGRO0K4KlLOEb4MDTZ1Xp7ZZvgMDtyEgsZAhdTG3InRThS3I6S6vA9e4C2AsBHDluWmvirEBt4nsnKwD38pbuExVeFV8ZaKgG6vHmMivXdoHvLgSdoUHQYMxb/lL7fUiJFC2QhT7LACCO4inS/i1O9YAkE+lESJDbEscNcP8mz7q46qyJRH5JYAqfJRnqiNB3ELVHXBWUrZGyVCzTlkCuVPUFluWhC8oTml7UfC1b0eNe6oqqnafQk4y/1wiv37KGrtUSYie4COwzBU9KXzOSi5VsaGJUR7rEKrfYh5GTpDS4E8AIEfSgCa08J63P0An6WKJivq2cFFr5bVbqlLvZ/uvKggdq4KlBLnfuFFQfcvvKoxO45mGyS2LSKmiYK24pVI7PEH1UNXx2FuR8aGnr0NN9aPyyNhRoYvl3H6Auw6nORpgIKM70RDUcvsKCzBo2ItX/xX+QD7rcKDydrVPRPnl7VEzNo/3vxpJf3aL3lFqvZMif/0E7ZKXcqPY+dJYBPE+q+rZ4s0YcEgPprm2lzCD+6o0/GdnCZebqYmDgexCU+sOmtfxaHKiAQFbgAEMjMQMjqgqrkZVvQNYFbrtBwrxVKt6BxtSkNaQEFShAHUEurDKYlMvKu22Rvz6/W61ARcWJmzUOUT3DGNFcCB1n/A3uMTbolVR27FpaBUZlN82AaYePz45oc5e6QIEOwLddAmEh3QIYuKL5FarH3HLK63CRmxSEtKQiNJIUnURxbsIkQorEcN527CAOJLfW1yABxqwkeI0FaE+mcGIPNBaZcIVnhtNJ2WDtAf9cCAP0KBe2Ct5paUmEszScI01YGHaKanoe8T88QR3tvX5zg/jgEyQyjWQxs5DsTQmU346zKZ8IiHcbqnx0SiPupxRuTcoQE32KKqVEOX/vyvIcBJVMOFD71Q53PP4l5B4cn9Qj1c98hMumc0nGyWJCI9eeRSWWJSBATEvPonQWeoZXRy1usl5CAr2JkjfK7CGlROrlRMHCstQVuR2GLn9xhraDLzGXkv0oChz88DIrgXSWTV66awUq0IDwk8PsSykPcn6dyEWVkpuU0UqWllTUwY5PF8dOUmg2yBeU9Oxf50gVq0+lwpTgjGQD+IzyYM7aZLUo0JIb+BoetY3brl7qNXL3nmpEGDjk+L+EAR+DAOGN3itVy3rkG4C/SbOjqSodT7/nFBLGj1NE0Iz51TF48qreKu2bn2zY85+oLDSD9wjrazoYFXIFvf7vb8uuVeElmex4bubS+q7+DCPV/d3Q1AfS1nBRw9Gta8sGtVh5pFLhYYox3aNvJvMPSZz1VAkPWg4yKY9SG0P6W/rPcqlS4XdoNBR1YBlbvUNnDn+MZp23iV2pzEJzW0FUmGIGU3mnqBpj0tx84ik52MTmeMOD17xuVU49Lc+K6KOcm4xARQrqh+UhDGPOrLkPhPjx1qLuFwgzxWJGdiGCRP0yzdvGLtGR8rPpRHCFCW5HqjxNFbBc1iZYiarxiZl+R7UYTxQkmYjUMSs3M6sx2v9CHqb0VXTIpev/mLXBr1o/qDkLGyNYCEohUhCNkqjAT1SEJbQJBoAm8fqzPtyW3QDpPYVvtdtYDFEEPQBft+6W7m1d0SZpsGKplcgheDSo3EdssdUV5zYmipQz29wDeUOS0h13d5suKPF1p6SFnX3OYtKjPHRMIhktQ2DaChVo0fKIgtpfUYURsCFraCd1WTAtrhg0pQk8SsFOLjteroAVJxoHpu0Hdn3uYz6Vo2/vdzDisHg1DBhRNYL6omobitmQDr0LT44BJw8vRX0hSA4MegMQNdk444aQPg9yXqj7q0aAjAvj/5navNxahrBmyGsmotcDoOu7aINVt7BCV1tUapb3CD/x03sFs8LynVYOnrVsNtjVBibebYNs7JfBJBv3/irPK0aiKzC7kkdn95SfNDRtWs2pBK7+PL1p59HAeZ5lyZYl84LiQn8m5sAWfWBui+yvSa7wYhp7boljQOZBJ2r1S2Ln+oH1YuBOoyDzkboGa1TnzYj/KwIYoU7VKtrBsPaVkIlqawKlYneRrNIBBrZgelrJOpkhCRgYdPWUpC3c61pRnhECS+pQrit4QpN/qjJh2WXhj/U+5P4UAPjFfHeqmxFzbvD2DSMG4mN/F35/v62Assq19p4nklrCSZVqtvXpuEHoA+6uDzqBYkf3Fp8+1tshkiUzApd4pu5YWokz3Ero0FUC7+c6naKjBbrfcGTvCG1g5aoT2rlympV8jtEZ0oXxt6D+rQCf7bTthqvesJv8qtJfn9EFuct2GqwSGOJ/JaDQ6KlEXHUqclbFXIt4BEEuT8OkRqLzj8FlesSuKlJin00jDDhVT/pyPmpoQfhnA3CwBOs46fWtXqQ2aZuoUJKkupzfMcSIuARLOtvO5WQ7lDSq6kXcEKhir4BIQkriMRt1I3zzVXYZInWQlzMCs/QKPfPWBo2Vq+Z2Fcp+WstlJ/WAiobp4v8HMDT1BFOEraHRobZgb54Ma6QOmtg90nj6EksHmZQI0jF2QRPsVm/y+CItgTdJr7TK4cwm6Q7JGyoYzO7qk5vYYumC+xpbEgnzSfUjgsRPL3AIawQsjx/dGi0hctQuGiW2/rrH0cyFl/vaQDS/Y7h+V1Yg3kXrdq6BnOEnm2Oe9g4DAykaChSULPuLODHRZINCvfHegk2KaXm+Br/YBy+LhtE838xkdxfF6taoCJTGlgVPfZ/co5gaXS3fpupdyUrJw2svOp5seimlnO0Ovmv0YLzCEW4ciegTEuPVl8VTQtXN5oa8RVZRWTYyZwIKvf105vOdyhTfRHZIP6zCkJodyf5dH5pkNmwobJYM+rDixqe0ry4JiL1aCrCqWjY7hyhXIgE3SVqoDUvaneqLLu1v+vVdBDJmMtYW0G9djXLEw5JukuBLVIoOu0EYoYtbpgLybZVl5qqR2jb1G4UkQI9Qt6fiG1WS30k1MYGS5G7NvhIQNWhsfpvJvJeZ4pug73FqBNZW+MGNmlB5spHVT+bARUHserOdGXAyILGp+HrHgug4uH/dmNNwl1qJ8qsEfal6VUdqlBpp6mZo5jRSYBxq5hSPbnc/sywQSGNzWlaeJw7CSxNHm8NlMz8kKdcPh+LuUMYqrP8OudjdjR6c0/6CH5U/BdnI5VoQlH1aBibVdyuDr+e0V4AUjo6uru2S5eLyahhh2/8uoxDUwPDtqQ9Y1Wk0TIIh/Da8aA/hnXtwIWKys2SHGnPan0qyCzyV2jbemC+S64rF+0CNGoyW7eI+6pr8PX1HaquKq0qtJqm86iJrJKOZuw0x6Pu+gAhPzEZ487qtUBrIBSYTCJiQ4q9ygNLTT2bRNw8tnpaq5s1frpa+JFa9yN8veKfiR8Wpcu37MTHCIDrHRNkm6G7N5hExG3MMtiUhoYhDynia7uzOTavMYlMxRL5OHeSto0lKlvD5jXMooga47LFE+ITbwcXdTlyDV2ZSOPK6vCuLwQumeB5PZFSjFRq3tX/zLvaVU+75xSWGmqx+x1AiOpb9kgb8DeATjhHeglPCE0FD9/dnIGter0NDHI6XPfUVbNv8825SUUNm45+lX/ZsbCt0EFeUl+G7cQfCw+qmV8NxUlSqHUClj+6wJQFIor8Iz344lEoXLa44y9pfhJTs/3wh6bZoWYtal4bU5VNou7RWK7V+Ob51YCWF07DQwx7O3z1DhBglqWB2qL+tnWoM9ZdHXEs/2tedOx2E/3LY7A0KHy6AwWwU2l6DWXYLNPvXoD3dbQAw0IdP15DmWxQFLfTlIAdNLJ6rnuPKpHrJqEYrewk1qxKCjpHU8ka1LSu7pOtDoMxjQKJFWlmldWS34agksgLUT6zLyeyIfzLRE613sftZkWVsLTNfAZbiAzAOQP0wt1TbLiInWzwGvpdGgtWr9b/ugGKU8T1Ng8gruNicbI6h32aVSB+mJV+fhvM+rcI2AfYABnCKJnKMBplcJ9Vlmk/TVv6YoeABD6/adnUOO7ReDYbgNc20lxcqd3ZvvQ+9/iRcmgmRtAhxlzBol1tZNXmem1GrdkcvaaRG2g3tI4rCvmsUJ657vnCZJNDBy4swKvOCt4vSt/reLh/i4EvBFATAAaEqilLu9vcoyY0TUneBwgJ0rhqI9h1Spo0GEn02Q5V2tlAHQG5KoUcpr6eBiCNJz2fAkpsgBakCX65g6SsfFmRcXSUhBXFWym9KpcFkpONTGheJj08cPZzqrevaUObNXLjBsYKd0LUWmQem+oQkvWRQJNuiHisgIU3PHbQyORtLNMqp3P+yycnS01BNZbt2812lzQjhpIVtZ+s8HZO2q7ktIkP99XWB2H8yv/tMJEGCu5cafk9V/rH9j53wEAS46KwBpPscZQl87RxjiLONu75tWL+901isbH11iXcc0/35lfpTx+PNcjc/3kVMWkWReezhBSoN5ZyNA195y/CxaPjrT7KhvJ5XQnFYr+V8h0OsiHq4++Ao06H6jhlO89PycJdtSIbbMtgqlVArfOI6jQ58ZXU3dsJEh1CU7YAib/Rhu4eBeitGN3BdCuvTLiEjnre/QVi7kHfX7QqXLoE2ODbr824PbPfkd92Sx42A3V1Hw/HTSv27arDppsINH+lKt6tq6ulohOlIz197bYALnWESekRhkKoNyd9AvIiMhHafAZo7IdNcsV7jFYllaGBLRG9up9iU1wE4/51zPb2sobrOryiViL5BwohV8qVVJcJXxWzV15bOSOKTj56LDs38+3BDUHI1EBrz3h0zkFK8taxTINofLJZt21pzgKJlwZaRI2w850w3j+HKKbqVeU7eWFaL5jWK019jBfMc/uerzU4XOF9fh1x8codaV0AMoRSFeSn0dJDcX1+fICQTWLyAu1gR6VU0Dzf6Ug2eOj4lxxIk2vtrlLD7Yg8lUPb7fXZEWOdktCgn1NSEAQ8OnWhPbolVY19+OGzrjjNDvi6cM8X/axtJbZF5RggBrJBCiJ6e9HUmI79bvO42nRA8JscvbJS3f5BliNhuWauN3UkxBIvxOgev515PAInPMcGitB/7IzK8ZKdoYoO2eH89deqyEj4Xw864XdEFn15OmKjaGD0Hjh87+i7Dklrul5CqQgH0Bj+oxvmkeGrvCPe5MClPqo1CGCzT3bO9D6WTYdoVNDGQ5zmMfIFnGQFex2CEeCqVXu7qs+/pFLNavmNHrFzlLi0Rs0l9bZaeS8JS527rzoRbu62A97DThqBPk2jEE4n1NqHkSorq9ysoShjtpgEMgMav2XrmPyU15rQc48qHq9VdtdNeEGyxwC5386DEqYD5fYaSHiVThuk/assePdNrD7v//uA4d9fFQGHDdZgwrk5hRtt7U37SoOXQN0BZZtmCiasyRVVc706CKVsjWncN8l+a5Ft5Ef1FTxp/ToHBck9qq+sluwfKphF/36ESqFAlW3Um21eQQ3BjB0GW1770/xQ96PpOLHoBa4vh9YWE09dwgDKp0koAe+pauJ1+zcxpOaKYYDKgQ/f9BvvpFQyeT7qqIMWIhTrFWnu2U6Qf/PZhkfJtscmfj+kerJd584t7gaVJTRfaH2qATSqLuO+XeRRwm3r3/lxJeyos+RxQ9iPqgoboCixnjuVPa21p3NC9yCBzzaKCCscdoR87PRZK95RSvbtSRLFPKTmFusdWm6/m3f/pbQLBxz9gTqPgZaJMIml5NFVNHs1Mauy3TcFeQ9lKQt/h5KIVOIbH+8qKYx77MxHd/8ZC01RuW/QQ+fPsurKbACB6DW1bm2z/dX/JcZt3Omef3qkVrcOGtxy2O9zdezFf+mf9zB5gtX+L6tc1QZBy1PIAAAQcmlUWHRYTUw6Y29tLmFkb2JlLnhtcAAAAAAAPD94cGFja2V0IGJlZ2luPSLvu78iIGlkPSJXNU0wTXBDZWhpSHpyZVN6TlRjemtjOWQiPz4KPHg6eG1wbWV0YSB4bWxuczp4PSJhZG9iZTpuczptZXRhLyIgeDp4bXB0az0iWE1QIENvcmUgNC40LjAtRXhpdjIiPgogPHJkZjpSREYgeG1sbnM6cmRmPSJodHRwOi8vd3d3LnczLm9yZy8xOTk5LzAyLzIyLXJkZi1zeW50YXgtbnMjIj4KICA8cmRmOkRlc2NyaXB0aW9uIHJkZjphYm91dD0iIgogICAgeG1sbnM6aXB0Y0V4dD0iaHR0cDovL2lwdGMub3JnL3N0ZC9JcHRjNHhtcEV4dC8yMDA4LTAyLTI5LyIKICAgIHhtbG5zOnhtcE1NPSJodHRwOi8vbnMuYWRvYmUuY29tL3hhcC8xLjAvbW0vIgogICAgeG1sbnM6c3RFdnQ9Imh0dHA6Ly9ucy5hZG9iZS5jb20veGFwLzEuMC9zVHlwZS9SZXNvdXJjZUV2ZW50IyIKICAgIHhtbG5zOnBsdXM9Imh0dHA6Ly9ucy51c2VwbHVzLm9yZy9sZGYveG1wLzEuMC8iCiAgICB4bWxuczpHSU1QPSJodHRwOi8vd3d3LmdpbXAub3JnL3htcC8iCiAgICB4bWxuczpkYz0iaHR0cDovL3B1cmwub3JnL2RjL2VsZW1lbnRzLzEuMS8iCiAgICB4bWxuczpleGlmPSJodHRwOi8vbnMuYWRvYmUuY29tL2V4aWYvMS4wLyIKICAgIHhtbG5zOnRpZmY9Imh0dHA6Ly9ucy5hZG9iZS5jb20vdGlmZi8xLjAvIgogICAgeG1sbnM6eG1wPSJodHRwOi8vbnMuYWRvYmUuY29tL3hhcC8xLjAvIgogICB4bXBNTTpEb2N1bWVudElEPSJnaW1wOmRvY2lkOmdpbXA6YWE1YmZkYTUtZGEzMy00OWI4LWI5ODktOGNjMWRhNWNhYjYxIgogICB4bXBNTTpJbnN0YW5jZUlEPSJ4bXAuaWlkOjdjMzZhMWRhLTZmMzEtNDU0My05ZGIxLWIzNzVmYWFmYTA2MyIKICAgeG1wTU06T3JpZ2luYWxEb2N1bWVudElEPSJ4bXAuZGlkOjQ1ODg3YWUxLTA0MTEtNDVkNy1iNDFlLWM4YjJjM2Q1ZjgwMCIKICAgR0lNUDpBUEk9IjIuMCIKICAgR0lNUDpQbGF0Zm9ybT0iTWFjIE9TIgogICBHSU1QOlRpbWVTdGFtcD0iMTY2MzMzOTE3MDAzNjYzNyIKICAgR0lNUDpWZXJzaW9uPSIyLjEwLjYiCiAgIGRjOkZvcm1hdD0iaW1hZ2UvcG5nIgogICBleGlmOkNvbG9yU3BhY2U9IjEiCiAgIGV4aWY6UGl4ZWxYRGltZW5zaW9uPSIyOTk5IgogICBleGlmOlBpeGVsWURpbWVuc2lvbj0iMTY4NyIKICAgdGlmZjpPcmllbnRhdGlvbj0iMSIKICAgdGlmZjpSZXNvbHV0aW9uVW5pdD0iMiIKICAgdGlmZjpYUmVzb2x1dGlvbj0iMjI1IgogICB0aWZmOllSZXNvbHV0aW9uPSIyMjUiCiAgIHhtcDpDcmVhdG9yVG9vbD0iR0lNUCAyLjEwIj4KICAgPGlwdGNFeHQ6TG9jYXRpb25DcmVhdGVkPgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6TG9jYXRpb25DcmVhdGVkPgogICA8aXB0Y0V4dDpMb2NhdGlvblNob3duPgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6TG9jYXRpb25TaG93bj4KICAgPGlwdGNFeHQ6QXJ0d29ya09yT2JqZWN0PgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6QXJ0d29ya09yT2JqZWN0PgogICA8aXB0Y0V4dDpSZWdpc3RyeUlkPgogICAgPHJkZjpCYWcvPgogICA8L2lwdGNFeHQ6UmVnaXN0cnlJZD4KICAgPHhtcE1NOkhpc3Rvcnk+CiAgICA8cmRmOlNlcT4KICAgICA8cmRmOmxpCiAgICAgIHN0RXZ0OmFjdGlvbj0ic2F2ZWQiCiAgICAgIHN0RXZ0OmNoYW5nZWQ9Ii8iCiAgICAgIHN0RXZ0Omluc3RhbmNlSUQ9InhtcC5paWQ6ZmFmOTA0YWYtMmYyMC00MTg0LWI3ZjAtYWIxNzQxZGE2MzczIgogICAgICBzdEV2dDpzb2Z0d2FyZUFnZW50PSJHaW1wIDIuMTAgKE1hYyBPUykiCiAgICAgIHN0RXZ0OndoZW49IjIwMjItMDktMTZUMTY6Mzk6MzArMDI6MDAiLz4KICAgIDwvcmRmOlNlcT4KICAgPC94bXBNTTpIaXN0b3J5PgogICA8cGx1czpJbWFnZVN1cHBsaWVyPgogICAgPHJkZjpTZXEvPgogICA8L3BsdXM6SW1hZ2VTdXBwbGllcj4KICAgPHBsdXM6SW1hZ2VDcmVhdG9yPgogICAgPHJkZjpTZXEvPgogICA8L3BsdXM6SW1hZ2VDcmVhdG9yPgogICA8cGx1czpDb3B5cmlnaHRPd25lcj4KICAgIDxyZGY6U2VxLz4KICAgPC9wbHVzOkNvcHlyaWdodE93bmVyPgogICA8cGx1czpMaWNlbnNvcj4KICAgIDxyZGY6U2VxLz4KICAgPC9wbHVzOkxpY2Vuc29yPgogIDwvcmRmOkRlc2NyaXB0aW9uPgogPC9yZGY6UkRGPgo8L3g6eG1wbWV0YT4KICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAKICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgIAogICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgICAgCiAgICAgICAgICAgICAgICAgICAgICAgICAgIAo8P3hwYWNrZXQgZW5kPSJ3Ij8+IMG9ZQAAAAZiS0dEAAAAAAAA+UO7fwAAAAlwSFlzAAAimgAAIpoBvt37KgAAAAd0SU1FB+YJEA4nHeKdlGcAABbwSURBVHja7VtpdBTXlf6qq6q7el/U3ZK6taMdIbAQSAYBYrFZbBzbOMbByYkdEmeZzJyxjyeZiWcmM8cOjteZOJl4EgeCAcdOvOAYYxZjB2ywWY0BgQRoQRJaW2r1vlR1Vc0P/MrVWC1hx0vmHNc5fdSIVtW737v3u9+99zXw5fXl9eX1RVzXXXfddAAz1a+SkpKrNm7caP4810F91g84c+YM88gjjyx64YUXGu12eyPDMLUjtNlryS8FRVHgLHZQGg0SwTFIkojYyAC0w51BmqZPOhyOo5FI5O3ly5e/+etf/zr4/wqAysrKuaIorg1G418x1S1xWPNLYMjKBmexQ8OwE/6tLElIhscQGx1GqK8LUvtxxEb6Xmtqanru3nvvfbGhoSH2NwnA2bNncfPNN38zHo//WCydXZU9tR7m3AJoGBZWSkQBBxRYtMhzmGEz6WHSa6FjNAAAUaYQF0QkBREDYxFcGI3gXFDAYIqCLEmI+vrhO3sCscOvjc6aNes3U6dOfWzdunX+vxkA1qxZs2rfvn3rTHNuKM+eOgs6ix1OKoVpVg3qi90oyHXBYDBAp9OBZVlIkgSapiFJEmRZBkVdWorBYEAsFoMkSUgmk/CNBdHW58c7F/xoi0kQYhH4zp5A4vBr4aqykofuvPPOx1etWhX/wgC45pprPGfPnn1SLpt9Q/G8FdBZ7ChheCzIN2NGRRGysrLAMAyi0SgoikIqlYLJZAJFUcq/1T/NZjNaW1tRVFQEWZZB0zQoioIgCOjsHcDeswP4y1ACfCyCvmNvgWs/eH7lypXfW7du3ZufOwDNzc3Xdw6NbXItXm13lFTBSwu4rsSKGZUlsFqtoGkaqVQKNE2nP5SiIMsyJEmCRnMpBMjnOI5DJBKBLMtgGAY0TSse0tbWBofDAUGmse14F/YOxRAZuojhPX9EZY71oSeffPLfCwoK+M8FgBUrVjxwbFS4r/L6b8BoNOFaF4Vls6pgNpvBcRwoioIoioqxajcn7yVJUu6XSCRgt9shiiJ4nk/bfYqioNFoIIpiGiAnzndjw5EeXAxF0fnWq6imxg6sXbt21apVq4Y+UwDsdvtvbVdf950pC29EDitjzdQs1E2rBsteYvdAIACbzQZZlj9kdlmGKIrKjl8OgiRJsFqtSCQSSCaTitcQ0AhvUBSlcIdGo0EwEsWWt8/gL30h9B8/gNJwe/eKFSuav/vd7174TACYM2fOJn9e3TfyGhaiSifi67OLMaWkWNkZYjQxjKIoBINBdHZ2IhKJIBgMgud5xXitVguj0QiDwYDy8nLo9Xpl54kXAIBGo0n7PQAwDANJkiBJEl49fBabzwxi6PRR2Nv3X7zjjjsW3HnnnZ2fKgDTpk37TbJ8zl2Fc5Zihl7AN+dPhdvtVnZVvcPk36dPn8b3H3gCxoo6MJzhkksrhgCymLoEnCRirKsNdy+tx5IlS2A2m8EwjOIpGo0m7d4sy37Ei/a3dOIXh7sxdOowpgTaeu666675y5cv757IJuZjEN7dFzjPXaVXX4PpnIA7FtTA4XAoZCbLshKn5IpGo7jv4V8hf8XXoaEnf5S9sBxb/vA4ysrKUFRUBL1er+w8ATSVSoHjOCVrEC/TaDSYX1sKWQaeAHD2WKLgxRdffK21tXV2VVVVNNMz6Ssx/pZbbpnXFZb+UHDtrVSJDvj2/Epku92K0ZcbT9z05ZdfxkldATir4woZiULH+XOYNcULq9UKvV4PURTBsqySJdTkeHlWoSgKhdl26FNJdFA2HD72noseGyh/6623ns/0SM1ka9JoNIbDR45syWq+WZOlY7FmRi7cLpfikiTuCUERlxwZGcEjL70Ji7foY3GM0ZWLQCCQ5vo8zyvPoigKiUQCfr8fqVRKIVfyEwBW1JdjcYEDUxZ+Bc+9suuWjRs3fusTAzBz5syHbItvLzDaXfjqFCNqqqsUtr88LmVZRiqVgiAI2Lp1Kwqaln/sDMNZHBgeHkY0GkUqlVJILhAIKDuv0+nAMEyaB6g9QkNRuH1uJXKtZtgX3YqdO3f+4uTJk96PDUBhYWHVqMb8d+6qOjRZJcydWQuapsEwDDQajZKuyGIoigLLshgcHMTGwx0wONwfHwCrA9FoVNlVjuNA0zRsNluacDKZTGn8QLyFgGG3mPDDpgpY86fgYEBj2r59+6MfmwRdLtdDdNNKys5SWD1/OjwezxUZ8dhjjyF/9sJPJLB0ZhvE0S7YbDZ4vV7o9fpPrFQbp5Vhaccwko1LsHPn07ft3bv3v5ubmw9dEQCrV6+ue6s3vLLGW4SleTrkeT0QBEGJQ5KL1SpPlmW0tLTgld4E8uqtn2jRrMGErqNdGB0dRSQSUbhFLYrU79XKkKyJeIEsy1jVUI5dF0ZwIasCBw8e/E8Ay64IgPb29nvy5t8GGyVidkU+4vG4wsRE4qZSKcVVBUEAz/P4+aOPI2fGyowG9h3dB3NuYUZypLU6HDvXjY6ODpjNZlit1rRiyWAwQKvVKmsg4ceyrKISSZhIkgSHicPSQgf+HJiFffteWvr+++/XzJgxo2VCDrj//vudUYq71eotRmMWjdycnLSihej8eDwOURQhSRJ4nsfRo0dx3lgMRje+2/LRMC5s24D42PCEXqAtqEQymUQikYAoikgmk4quEAQBsVgMPM9DFEXEYjGlfhBFUfkbkpopisKSmgJwNidORrV49913vzcpCe7Zs+cmTUUDS2toNJR5FHYHAJ7nFeGj1WoVVxNFEU//cStclVdlNGzw5EFct2wp+EhoQgBM2V74fD6lL0B21mw2K4CnUimkUiloNBoIgqCkQPWayLqKsu2YYtYhZ9psdHZ2runv76cnBOD06dM32ArLUMIKyPfkKEiSB6hLWZIFdu3ahbHiWdAw40dVMjQGx8XjKC0tRWRkYGIitNjh9/sRCoWQSCSUDUilUojH44oYImk4kUgoXiiKogKSmheurciFJa8Yu3btsvf19V2bEYCNGzcyvN62yJDlxjSXHjqdThE3amTJApLJJEZHR7Fl59uwF5ZnNOri0X2YOnUqrFYrtMPdE4eA0YqRkRGEw2EEAgEkEgkIgqBwwOWltcFgAE3TYFlWMZ6E69mzZ0FRFEpzbGB0evhMeTh+/Pg1GQHYvHlzo7N2joGiNKjIdSgylCgxdaEjCAIEQcDu3buhnd4MSjO+rIiP+ZA71g632w2j0YjKgmxIKWECMWRDb28vent70dXVheHhYWVnScFFnp1MJtMU4eXrLCsrgyiKyHPZYKA1yCqrgc/nW5wRgGQyWW/KyYeRkpDrsiuKT51q1NVZKBTCL3cegsVTmNGgnoNvoLq6GmazGbIsw+FwgI9FMqdCoxmxWAyCIKCrqwstLS1pJTYxNJFIIB6PQ6fTKetR84I6I9AaDa722mDIyobf76/t7e3VjwtAa2trFWd1wEmLMJvNCrpqMiIhIYoitm7disK5yzIaE/X1o1T0wel0Qq/Xw+FwwGazgY9kbvNraAY+yqjIYa1Wi3g8DkmSlFBIpVLYsGEDBEFQ0rGaoEnThISKJEkodBjBWexoa2uD3++vHheAioqKGp3ZhmyOhl6vB8uyCrrEaEKA3d3deKFtBHq7M/Puv7Mb1dXVcDgc4DhOkbHCBB4AALqcQrAsC4fDgZKSEgV8kt5omsbq1athsVjSJLJWq1W0AakjSEjk2kzQGi3YuXMn4vH4tHEBOHLkiE5D08gy6hSjyQ2Ii5EiZdOmTfDUNWU0ItR/AdMMPBwOB5xOJ2w2G7RaLWw2GxKhsUmqQi8SiQQcDgdMJlNaA4R4ZXZ2NvR6fVrqI8XY5V0pANCyNCiahkTR8Pl8pnEBmD59epbWaIFJ+2ErKpFIKDfSarXQarVobW3FO3ELtEZLhvGOjP53d6OyshJ2ux02m025n8vlQmxkcOKiyOZAOBxWMg0xjnikVqtVNoh4JqlSyQYRQUQ+4zQbAADmoirE4/HicQEoLS0tBEWBZRlFU1+e+1OpFJ58aj1yps3OaECgtwOzsi/FPGmbURSFZDIJh8MxKQBaowWxWAwURUGv1yuVZjKZVEhY1bNQZgcajQYMwyjviQ0Mw4CUEiZPIVKp1PgeEI1GoyS/qomPMCpFUThy5Ag6rWWgtboMsz0RQwe2o7KyEk6nE2azGSzLgqYv8YokSai1aQBVuvooAGaEw2HwPK8YQ2KcTI1IRiBFEfEAQoKEM8jvyCVEw5mlcHd390WRTyIlSmlFCAGD53n812+fRlZ5bcbFj104h4YiF+x2O1wulxI2DMOA4zjE43FwHAc+Fs5MgiYrhn0+CIKgpDlisCzLyuyArI3EO9mkSzv+4TyB53lEEpe4IXChDQaDITEuAB0dHdFUIoZAUkzr9BCSef311xErvzpjk1MSU/AfeBVTpkyBzWaD3W6HxWJBMplUFJtWq0V2djZS8diE/cFBxqGQMJkp8jwPmqYVRUi4QC2NWZZVMoEoisoGhKKXRojC6AA4jusaF4C5c+cOpJIJ+KO84loE/WAwiMee+TPsBWUZ1+1vP40F08vhdruRk5MDnU4HSZKUNlY8HofNZkNZWRn4aHhCHjBkexEKhcDzvBIK6rmiOsbVPUkSHmS0RjJClBchxCOoqqqCxWKJZuKAc8lIEANJWSlESEy9+uqrMF21EKDGHyeIAo/E0V2oqKhATk4OTCYTdDodaJpW3NhkMkEURRgMBiSCoxMD4MhWKj2GYZS6hOy4emiiluhknqAezVEUhYv+MIToJQA4jjs5LgCSJL0XHe5Dv0AhEPywbO3v78fj29+FKSc/44J9bccxv74WNpsNLpcLFosFLMuCZVlwHAetVguapmEymeB2u5EIBSYEQG93IhgMKuKL9CLJmIzEN8kQ6rhXF0skM5waDCI25kN5eTmysrLaxu0IVVdXH3zlxBnkNyxG70gI2W4XZFnG5s2bUXD1koyLFfkkOnb9CbOWNaOnpwfJZFKJQ5qm05oa8XgcPp8Pcf/wpKkw2BNMEzZE9Kh3Vn3WQD1EUSvCGJ9CWyCO8EAPPFW17YWFhcFxAVi/fn1HcXFxrxCP5rf1j6G+Gujs7MRL7UEUzsnKzFk0jam3fh+nAJyKA7ggABiv4tNeeumtKLh6+qT9waGhIfA8j2AwqBAfMZSkaHWfkEyPiHYgV+eAH7Iso+/oPni+vmzvhD1Bp9P5aqj/wvffMRmwKh7H+g2/R+70qyceoNAMbAWln+o5I63RjBG/H+FwGDabDQzDpNUmRBQR1ye9QSKbSdVIURSOd/sQGx3Egpop8Hg8r03YEZoxY8Yrvtbj8IsUNrywHQdiJmiNn+vpNeUaMuSC4zh4vV7FeNKFMhqNSnok4Kgbo0rTRhDxSvsQ/J2tmDdvXszj8eye0AOeeuqpnQ0NDX3xsRHvr3b+CTW33IUv6jI4c8EwDJxOJ3Jzc9MY/0qvYyfaIQoCut/egfJVD75UVFQUnXQyFI1GHz/1/P/CW78ANKv9wgDQ27KU9lgymYQgCEgkEoouINUpqQLJe8IFCV7As0faEeg+j9uXN6O4uPg3VzQXaG5u3v7MX448llVSjS/y4mxZ6Ovrw8WLF8GyLAwGw7iHJ9TESEQQALzT1ouuQBQdb76MH/7oB4fr6+v3XxEAZ86c+VHpNbeAojNP0Me6zyHY0/5XGWgvroQ1r2TCUdloX5vS6lJXgOqfRCOo5XssKeDpo10Y7TiNG2ZVoaqq6j+uaDZYVlZWdRGWOwsnYPVUMg762A5867qlacUKAAiCoOyAuo64fMwViUSw8dCJCQFg9UYMDw8rYzkiavr7+2GxWGA0GtOm1MQzZFnGy0fOYygYQs+u5/BPP/u3NxsbG3dcEQB6vX6dafaSCY/PDJ8+hpVNjSguLkZeXp4yxFTP6dVzQ7Xbqvv2T+54Z0IPYTgD+od8aWWxJElwOp0fmUyTo3WyLOPkhSFsPTeEnoN78L01N/OVlZX/cEXT4UWLFjV1anNvzHZ7My5KiEWQ1XsMhXNXw+PxoLi4OK1lRXZbXYerjVefJpmXb8HYJGEybPIimUwqoKlTnPqUCnn2UCCCJ94+C3/HGUxJ9GHBgq89WFdXd/qKzgf09PQ8WtC4eMIFDZ48hIXNC+DxeJSKj9T76hf5nVarVRoipDQl+bukpGTSBqnRmYNgMKi0utQepa4INRoNInEeT+w5hcHhQYzu2oQ77rhjf01Nzf1XdELk+uuvX0PXLWvQWewZF5MMBzF84gDMdidcLhesVqvSr1NLz8sbFGqpqj7QUFRUhFQiNsmozIaxsTGFB9T3Vb9C0QQefu09tAz4cPLZ/8Hdf/+Di7W1tV/zeDzipACsX7+ePt7a/tPc2oYJF9N3bB8sBWXY1hEAT7HKzpLxFXFFIk/Ji6QscraPAOB2u5GcZFjKWRwIBALKWSECMOEbSZIQjiXx6K73cXJwBC0vrcd931kTa2pqurmmpubihBKevNm0adMP7E03lLMGU8YPx8dGkB/qQqr9PYR4EY+/cwEnO/uVsbS6P0+YWT1FIkdd1anMZrMhOUmLXGe2IRgMpj2DZBFJktA3GsJPtx3F8Z5+nHr+t7h71TWxefPmLZs5c+aRydKwQoJDY+F7PcvrJvxw76E3cPeNN8Jut+N36zegX8vhZxSD1RUhXF9fCq2qk0zIjpSp6smyuqubk5ODZGTiL4NoPjh3RKa/BDyj0YSD5/rwq0MdCA71o+3ZJ/CTH3470tTUtKKxsfHtK9EhDABcddVV08OFdQWZurwAEB7owYIcLbxeLyoqKg7fc/c/PrJly5bftQz2WJ8VF+K9gSDWzilHqdeZFvPjsbS6W2u32xH19U92gFBpe5P7+oJRPP12K94dCMDXdhz8gRfx85/c011XV7esvr6+7UqFGAMAlZWVF3YePNDD6LgPQCBkdimPR4b6MEMfx7yVK5GTkyObzeYf33TTTXt37Nhx9I033nj+98/8sj627Fb8cyiBxfl2fGXmFHiyPhxZERDG0wYcx2Ht/Fps2bsNnNWuGAx8cOZYFCG0n8Di6xeCYRgEogm8caYfm09dRCLoR8ebL2O+14ivPvDAtsrKym9MnTr1Y323SKHttra2pR0dHTv7+/uV8/okjen1elgsFjgcDuTk5DxcUVHxY4UU+/qYbdu23bdjx45/OZWy6vJmNUNnsWOBx4rFU/NQ6nGCpTVpu67OFuSozYkTJ9Dd3Y1IJJJ2/I4ckQskJAyJehyO0hD5JIZajkB+fzfWrl0bbGxsvGfevHkbPokUpy5rid+YSCRuS6VSebIsGz/4/7hGowmyLNup0+m2mkym193uj57/O3z4cPnu3bsf3LNnz809pgLkTGuA0eWBTUtjUZETNflOFLptsJv0SgyrFWM4HEYoFEIoFALLsghE4ugbDeH8UBAnhyMYkzVIJRPwd7Yhfmg7bl9zm9zY2PhUaWnpv1ZXV/s+aS3yqX9rbP/+/Q379++/t6Wl5ZbXTnbBO3M+LLkF0GdlX3J5mkKd2wKXiYPTxIGiPqgXQGE0EsNQKI4zIxH4+UtnkhKBUUSGLmKw5TAKxDGsXLkyUVtb+0xJScnDtbW15/7a9X5mX5traWnJO3HixNrOzs7VLS0tVS/uehPe2Ytgys6H3u4CzbLQmqxp4cBHwxD5JOLBUcR8Axg8dQhX5Tsxf/58FBcXv1tWVvacx+N5pqKiYvTTWudn/sXJDw5dFfX09Czt6emZ6/f7a3ierx0YGKB9Pl/aeQOj0Qiv1wun0xk3Go2nXC7X8dzc3LfcbvcbFRUVQ5/F2j4XAMbVFL29WbFYrDAajVJktG00GiWO487n5+dH8OX1+Vz/B+mjxi9ohWOlAAAAAElFTkSuQmCC'
@@ -113,6 +126,9 @@ linkcommands = ''
 imglinkcommands = ''
 proclinkcommands = ''
 custpars = ''
+scan_grid = ''                                      # parameter variants for scan mode, see autogui_scan.py
+scan_runs = []
+log_page_lines = 30                                 # lines per page in the log viewer
 separator = '==============================================================================================================================='
 folder = inpath
 runnumber = 1
@@ -161,6 +177,8 @@ pixelsizey = "n/a"
 nopixelx = "n/a"
 nopixely = "n/a"
 headertwotheta = 0
+headeroverload = 'n/a'
+prefetch_generation = 0
 untrusted_rectangles = []
 untrusted_ellipses = []
 untrusted_rectangle_coords = []
@@ -182,8 +200,8 @@ csv_entry = [] # 0 = proc_date, 1 = image template, 2 = success, 3 = space group
 ds_name = ''
 proc_date = ''
 #rec_date = '' not implemented yet
-cleanup_args = '-not -name "*.html" -not -name "*.htm" -not -name "*.HTML" -not -name "*.png" -not -name "*.jpg" -not -name "HTM" -not -name "*.LP" -not -name "*.log" -print0 | xargs -I {} -0 rm "{}"'
-useful_files_to_copy = ["CORRECT.LP", "aimless.log", "xscale_XSCALE.LP", "XDS.INP", "XDS_ASCII.HKL", "INTEGRATE.HKL", "remark200.pdb", "staraniso_remark200.pdb"]
+cleanup_args = '-not -name "*.html" -not -name "*.htm" -not -name "*.HTML" -not -name "*.png" -not -name "*.jpg" -not -name "HTM" -not -name "*.LP" -not -name "*.log" -not -name "*.xml" -print0 | xargs -I {} -0 rm "{}"'
+useful_files_to_copy = ["CORRECT.LP", "aimless.log", "xscale_XSCALE.LP", "XDS.INP", "XDS_ASCII.HKL", "INTEGRATE.HKL", "remark200.pdb", "staraniso_remark200.pdb", "autoPROC.xml", "autoPROC_staraniso.xml"]
 beamcentreactions = ["header", "try possible transformations", "guess", "specified below"]
 beamcentreactions_eiger = ["header", "specified below"]
 iceringranges = [3.890,3.657,3.435,2.665,2.247,2.066,1.946,1.914,1.880,1.717,1.522,1.472,1.442,1.370,1.365,1.298,1.275,1.260,1.223,1.170,1.123] # ice rings according to M.Kumai, 1967
@@ -257,6 +275,23 @@ def autoproc_thread(window):
 def autoproc_function(bash_command):
     threading.Thread(target=autoproc_thread, args=(window,), daemon=True).start()
 
+# thread for parameter scan: all variants run at the same time, finished ones are reported on the console
+def scan_thread(window):
+    time.sleep(0.5)
+    scan_processes = autogui_scan.start_scan(scan_runs)
+    running = list(range(len(scan_processes)))
+    while running != []:
+        time.sleep(1)
+        for number in list(running):
+            if scan_processes[number].poll() is not None:
+                running.remove(number)
+                window.write_event_value('-AUTOPROCLINE-', 'Scan variant ' + str(number + 1) + ' of ' + str(len(scan_runs)) + ' (' + scan_runs[number][0] + ') has finished.')
+    window.write_event_value('-SCANDONE-', '')
+
+# helper function to start parameter scan thread
+def scan_function():
+    threading.Thread(target=scan_thread, args=(window,), daemon=True).start()
+
 # thread for mini-cbf conversion function to keep gui working
 def cbfconversion_thread(window):
     time.sleep(0.5)
@@ -416,16 +451,23 @@ def list_thread(window):
 def list_function(m_list_par):
     threading.Thread(target=list_thread, args=(window,), daemon=True).start()
 
-# thread for log function to keep gui working        
-def log_thread(window):
-    time.sleep(0.2)
-    file = open(filename)
-    log = file.read()
-    window2['-LOG-'].print(log)  
-
-# helper function to run log thread
-def log_read(filename):
-    threading.Thread(target=log_thread, args=(window,), daemon=True).start()
+# helper function to show one page of the log viewer, only the visible lines are read from the log
+def log_page(window2, log, first_line, match_line):
+    lines, indexed = autogui_logview.line_count(log)
+    first_line = max(min(first_line, lines - log_page_lines), 0)
+    window2['-LOG-'].update(value = '')
+    page = autogui_logview.page_text(log, first_line, log_page_lines)
+    for line_number, line in enumerate(page.split('\n')):
+        if first_line + line_number == match_line:
+            window2['-LOG-'].print(line, background_color = 'yellow')
+        else:
+            window2['-LOG-'].print(line)
+    position = 'Lines ' + str(first_line + 1) + ' - ' + str(min(first_line + log_page_lines, lines)) + ' of ' + str(lines)
+    if indexed == False:
+        position = position + ' (indexing...)'
+    window2['-LPOS-'].update(value = position)
+    window2['-LSLIDE-'].update(value = first_line, range = (0, max(lines - log_page_lines, 0)))
+    return first_line
 
 # thread for running adxv and keeping gui working        
 def adxv_thread(window):
@@ -579,178 +621,71 @@ def find_sweeps(imgpath, EIGER):
             return hits
             break
 
-# helper function to run pointless, parse and check log
+# helper function to run pointless on both MTZs at the same time and show the verdicts
 def pointless_function():
     time.sleep(0.5)
-    plhits = []
-    inspg = ''
-    outspg = ''
-    pllinenum = 0
-    plhitline = 0
-    plpattern1 = re.compile("Space group from HKLIN file")
-    plpattern2 = re.compile("Best Solution")
-    pl_command = pointless + ' hklin isotropic.mtz hklout pointless_isotropic.mtz > ./output-files/re-pointless.log; pointless hklin anisotropic.mtz hklout pointless_anisotropic.mtz'
-    pl_process = subprocess.Popen(pl_command, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-    while True:
-        return_code = pl_process.poll()
-        if return_code is not None:
-            with open ('./output-files/re-pointless.log', 'rt') as pointlessout:
-                for line in pointlessout:
-                    #print(line)
-                    pllinenum += 1
-                    if plpattern1.search(line) != None:  
-                        inspg = (line.rstrip('\n'))               
-                    if plpattern2.search(line) != None:  
-                        plhitline = pllinenum + 10
-                        outspg = (line.rstrip('\n')) 
-                    if pllinenum < plhitline:
-                        plhits.append(line.rstrip('\n'))
-
-            inspg = " ".join(inspg.split())
-
-            window_ptless['-POINTLESS-'].print(inspg)
-            print('')
-            print('POINTLESS says:')
-            print(inspg)
-
-            for plhit in plhits:
+    verdicts = autogui_ccp4.validate_space_groups(['isotropic.mtz', 'anisotropic.mtz'], pointless, './output-files', 're-pointless_')
+    print('')
+    print('POINTLESS says:')
+    for verdict in verdicts:
+        window_ptless['-POINTLESS-'].print(os.path.basename(verdict.mtz) + ':')
+        if verdict.error != '':
+            window_ptless['-POINTLESS-'].print(verdict.error)
+        else:
+            window_ptless['-POINTLESS-'].print('Space group from HKLIN file:', verdict.input_space_group)
+            for plhit in verdict.summary:
                 window_ptless['-POINTLESS-'].print(plhit)
-                #print(plhit)
-
-            inspg = "".join(((inspg.split(":"))[1]).split())
-            outspg = "".join(((outspg.split("group"))[1]).split())
-            
+        window_ptless['-POINTLESS-'].print('')
+        print(autogui_ccp4.verdict_text(verdict))
+    window_ptless['-POINTLESS-'].print('--------------------------------------------------------------------------')
+    changed = [verdict for verdict in verdicts if verdict.changed == True]
+    if [verdict for verdict in verdicts if verdict.error == ''] == []:
+        window_ptless['-PL_STAT-'].update(value = "POINTLESS could not check the MTZs. \nSee the logs in output-files!", text_color = "white", background_color = "dark red")
+    elif changed == []:
+        window_ptless['-POINTLESS-'].print('')
+        window_ptless['-POINTLESS-'].print("It seems that your space group is already correct")
+        print("It seems that your space group is already correct.")
+        window_ptless['-PL_STAT-'].update(value = "No different space group found. \nCarry on, nothing to see here!", text_color = "white", background_color = "dark green")
+    else:
+        for verdict in changed:
             window_ptless['-POINTLESS-'].print('')
-            window_ptless['-POINTLESS-'].print('--------------------------------------------------------------------------')
-
-            if inspg == outspg:
-                window_ptless['-POINTLESS-'].print('')
-                window_ptless['-POINTLESS-'].print("It seems that your space group is already correct")
-                print("It seems that your space group is already correct.")
-                window_ptless['-PL_STAT-'].update(value = "No different space group found. \nCarry on, nothing to see here!", text_color = "white", background_color = "dark green")
-                os.remove("pointless_isotropic.mtz")
-                os.remove("pointless_anisotropic.mtz")
-                
-            else:
-                outfileiso = outspg + "_isotropic.mtz"
-                outfileaniso = outspg + "_anisotropic.mtz"
-                window_ptless['-POINTLESS-'].print('')
-                window_ptless['-POINTLESS-'].print("Isotropic MTZ with space group from POINTLESS is:", outfileiso)
-                window_ptless['-POINTLESS-'].print('')
-                window_ptless['-POINTLESS-'].print("Anisotropic MTZ with space group from POINTLESS is:", outfileaniso)
-                print("Isotropic MTZ with space group from POINTLESS is:", outfileiso)
-                print("Anisotropic MTZ with space group from POINTLESS is:", outfileaniso)
-                message = "Different space group " + outspg + " found! \nProceed with the corresponding MTZs or reprocess data!"
-                print("")
-                print(message)
-                window_ptless['-PL_STAT-'].update(value = message, text_color = "white", background_color = "dark red")
-                copy_cmd = "cp pointless_isotropic.mtz " + outfileiso + "; cp pointless_anisotropic.mtz " + outfileaniso
-                os.system(copy_cmd)
-                os.remove("pointless_isotropic.mtz")
-                os.remove("pointless_anisotropic.mtz")
-            break        
+            window_ptless['-POINTLESS-'].print(os.path.basename(verdict.mtz), "with space group from POINTLESS is:", os.path.basename(verdict.output_mtz))
+            print(os.path.basename(verdict.mtz), "with space group from POINTLESS is:", os.path.basename(verdict.output_mtz))
+        message = "Different space group " + changed[0].space_group + " found! \nProceed with the corresponding MTZs or reprocess data!"
+        print("")
+        print(message)
+        window_ptless['-PL_STAT-'].update(value = message, text_color = "white", background_color = "dark red")
 
 # thread to expand freeR flags in Reference MTZ to high resolution
 def refmtzexpand_thread(mtzfilein, refmtzout, set_reso):
     try:
-        dmp_command = 'mtzdmp ' + mtzfilein +' > ./mtzdmp.tmp'
-        dmp_process = subprocess.Popen(dmp_command, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-        mtz_spg_pattern = re.compile(' * Space group = ')
-        mtz_cell_pattern = re.compile(' * Cell Dimensions :')
-        mtz_reso_pattern = re.compile(' *  Resolution Range :')
-        mtz_columns_pattern = re.compile(' * Column Labels :')
-        mtz_spg = ''
-        mtz_cell = ''
-        mtz_free_label = ''
-        linenum = 0
-        celllinetogo = None
-        labellinetogo = None
-        while True:
-            return_code = dmp_process.poll()
-            if return_code is not None:
-                with open ('./mtzdmp.tmp', 'rt') as mtzdmp:
-                    for line in mtzdmp:
-                        linenum += 1
-                        if mtz_spg_pattern.search(line) != None:  # If pattern search finds a match,
-                            mtz_spg = ((re.split(r'\'', line))[1])
-                            print('Space group:')
-                            print(mtz_spg)
-                        if mtz_cell_pattern.search(line) != None:  # If pattern search finds a match,
-                            celllinetogo = linenum +2
-                        if linenum == celllinetogo:
-                            print("Cell:")
-                            mtz_cell = (re.sub(r'^\s+', '', line)).strip()
-                            mtz_cell = re.sub(r'\s+', ' ', mtz_cell)
-                            print(mtz_cell) 
-                        if mtz_columns_pattern.search(line) != None:  # If pattern search finds a match,
-                            labellinetogo = linenum +2
-                        if linenum == labellinetogo:
-                            print("Free-R label:")
-                            labels = line.split()
-                            for label in labels:
-                                freehit = re.search('free|FREE|Free', label)
-                                if freehit != None:
-                                    mtz_free_label = label.strip()
-                            print(mtz_free_label)         
-                mtzdmp.close
-                os.remove("./mtzdmp.tmp")
-                break
+        # space group, cell and free R label straight from the MTZ header
+        mtz_header = autogui_mtz.read_mtz_header(mtzfilein)
+        mtz_spg = mtz_header.space_group
+        print('Space group:')
+        print(mtz_spg)
+        mtz_cell = autogui_mtz.cell_text(mtz_header)
+        print("Cell:")
+        print(mtz_cell)
+        mtz_free_label = autogui_mtz.free_r_label(mtz_header)
+        print("Free-R label:")
+        print(mtz_free_label)
 
         print('Expand to', set_reso, 'Å')
         print('')
-        unique_command = """unique HKLOUT UNIQUE_temp.mtz << EOF
-        TITLE  Reference MTZ expansion via AutoGUI
-        LABOUT F=FUNI SIGF=SIGFUNI
-        SYMMETRY '""" + mtz_spg + """'
-        RESOL """ + set_reso + """
-        CELL """ + mtz_cell + """
-        EOF"""
-        unique_process = subprocess.Popen(unique_command, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-        while True:
-            return_code = unique_process.poll()
-            if return_code is not None:
-                print('unique: done.')
-                break    
-
-        cad_command = """cad HKLIN2 ./UNIQUE_temp.mtz HKLIN1 """ + mtzfilein + """ HKLOUT CAD_temp.mtz << EOF
-
-        LABIN FILE 1 ALLIN
-        LABIN FILE 2 ALLIN
-        END
-        EOF"""
-        cad_process = subprocess.Popen(cad_command, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-        while True:
-            return_code = cad_process.poll()
-            if return_code is not None:
-                print('cad: done.')
-                break     
-
-        freer_command = """freerflag HKLIN ./CAD_temp.mtz HKLOUT FREER_temp.mtz << EOF
-        COMPLETE FREE="""+ mtz_free_label +"""
-        END
-        EOF"""
-        freer_process = subprocess.Popen(freer_command, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-        while True:
-            return_code = freer_process.poll()
-            if return_code is not None:
-                print('freerflag: done.')
-                break    
-
-        mtzutils_command = """mtzutils HKLIN ./FREER_temp.mtz HKLOUT """ + refmtzout + """ << EOF
-        EXCLUDE FUNI SIGFUNI
-        END
-        EOF"""
-        mtzutils_process = subprocess.Popen(mtzutils_command, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-        while True:
-            return_code = mtzutils_process.poll()
-            if return_code is not None:
-                print('mtzutils: done.')
-                break
-        time.sleep(0.2)    
-        os.remove("./UNIQUE_temp.mtz")
-        os.remove("./CAD_temp.mtz")
-        os.remove("./FREER_temp.mtz")
-        print('Temporary files removed.')
+        # in-process expansion, the CCP4 programs only if it fails (e.g. unknown symmetry)
+        try:
+            reflections_before, reflections_added, flag_values = autogui_freer.expand_free_flags(mtzfilein, refmtzout, float(set_reso))
+            print('Reflections in input MTZ:', reflections_before)
+            print('Reflections added:', reflections_added, '(free R flags 0 -', str(flag_values - 1) + ')')
+        except (ValueError, OSError, IndexError) as expand_error:
+            print('In-process expansion not possible:', expand_error)
+            print('Expanding with unique, cad, freerflag and mtzutils...')
+            autogui_freer.expand_free_flags_ccp4(mtzfilein, refmtzout, set_reso)
+            print('CCP4 expansion: done.')
+    except RuntimeError as ccp4_error:
+        print('There was an error processing your input MTZ!')
+        print(ccp4_error)
     except:
         print('There was an error processing your input MTZ!')         
     window_makeref.write_event_value('-REFMTZDONE-', True)
@@ -1019,72 +954,24 @@ def collapse(layout, key):
 def finish_popup(runnumber, dumppath, folder, cutmod, success):
     time.sleep(1)
     if success == True:
-        log_pattern1 = re.compile("\s*===== finishing processed and scaled data from XDS")
-        log_pattern2 = re.compile("\s*Spacegroup name\s+")
-        log_pattern3 = re.compile("\s*Unit cell parameters\s+")
-        log_pattern4 = re.compile("\s*High resolution limit\s+")
-        log_pattern5 = re.compile("\s*Diffraction limits & principal axes of ellipsoid fitted to diffraction cut-off surface:")
-        process_list = []
-        process_no = 0
-        process_hit_cntr = 0
-        log_check = 1
-        log_line = 0
-        hit_line = 0
         finish_message = []
-        file = os.path.join(dumppath, "log.txt")
-        log = open (file, 'rt')
-        process_list = re.findall(log_pattern1, log.read())
-        process_no = len(process_list)
-        log.close()
-        
-        with open (file, 'rt') as log:
-            for line in log:
-                log_line += 1
-                if log_check == 1 :
-                    if log_pattern1.search(line) != None:  # If pattern search finds a match
-                        process_hit_cntr += 1
-                        #print(str(process_hit_cntr))
-                        if process_hit_cntr == process_no:
-                            log_check = 2
-                if log_check == 2 :
-                    if log_pattern2.search(line) != None:
-                        mval = re.split(log_pattern2, (line.rstrip('\n')))
-                        finish_message.append(mval[1])
-                        log_check = 3
-                if log_check == 3 :
-                    if log_pattern3.search(line) != None:
-                        mval = re.split(log_pattern3, (line.rstrip('\n')))
-                        mvals = re.split('\s+', mval[1])
-                        finish_message.append(mvals[0])
-                        finish_message.append(mvals[1])
-                        finish_message.append(mvals[2])
-                        finish_message.append(mvals[3])
-                        finish_message.append(mvals[4])
-                        finish_message.append(mvals[5])
-                        log_check = 4
-                if log_check == 4 :
-                    if log_pattern4.search(line) != None:
-                        mval = re.split(log_pattern4, (line.rstrip('\n')))
-                        mvals = re.split('\s+', mval[1])
-                        finish_message.append(mvals[2])
-                        log_check = 5
-                if log_check == 5 :
-                    if log_pattern5.search(line) != None:
-                        hit_line = log_line + 4
-                    if (log_line) < hit_line and log_line > (hit_line - 4):
-                        mvals = re.split('\s\s+', (line.rstrip('\n')))
-                        anisocomp = mvals[5]
-                        #anisocomp = re.sub('\s*', '', mvals[5])
-                        anisocomp = re.sub("_", "", anisocomp)
-                        finish_message.append('{:<26s}'.format(anisocomp))
-                        finish_message.append('{:>5s}'.format(mvals[1]))                 
+        # structured summaries from autoPROC, the log if they are missing
+        results = autogui_results.processing_results(os.path.join(dumppath, "output-files"), os.path.join(dumppath, "log.txt"))
+        if results != None and len(results.ellipsoid_limits) == 3:
+            finish_message.append(results.space_group)
+            for cell_value in results.cell:
+                finish_message.append(autogui_results.result_text(cell_value))
+            finish_message.append(autogui_results.result_text(results.resolution))
+            for ellipsoid_limit, ellipsoid_direction in results.ellipsoid_limits:
+                finish_message.append('{:<26s}'.format(ellipsoid_direction))
+                finish_message.append('{:>5s}'.format(autogui_results.result_text(ellipsoid_limit)))
                              
         # print(finish_message)
         print('')
         print('===============================================================================================================================')
         print('')
-        if process_no >= 2:
-            success_status = 'Data processing of job no. '+ str(runnumber)+ ' in\n'+ dumppath+ '\nhas finished.\n\nResults from processing of ' + str(process_no - 1) + ' sweeps:'
+        if results != None and results.sweeps >= 2:
+            success_status = 'Data processing of job no. '+ str(runnumber)+ ' in\n'+ dumppath+ '\nhas finished.\n\nResults from processing of ' + str(results.sweeps) + ' sweeps:'
         else:
             success_status = 'Data processing of job no. '+ str(runnumber)+ ' in\n'+ dumppath+ '\nhas finished.'
         print(success_status)
@@ -1114,10 +1001,13 @@ def finish_popup(runnumber, dumppath, folder, cutmod, success):
             print('Anisotropic diffraction limits (local I/sig(I) >= 1.2):')
             print(success_aniso)
             csv_entry.append((finish_message[9] + ', ' + finish_message[11] + ', ' + finish_message[13]))
+            for shell_name, shell_text in (('overall', 'Overall'), ('innerShell', 'Inner shell'), ('outerShell', 'Outer shell')):
+                if shell_name in results.shells:
+                    shell = results.shells[shell_name]
+                    print(shell_text + ': completeness', autogui_results.result_text(shell.completeness, 1), '%, CC(1/2)', autogui_results.result_text(shell.cc_half), ', Rpim', autogui_results.result_text(shell.rpim), ', I/sig(I)', autogui_results.result_text(shell.i_over_sigma, 1))
             print('')
             print('===============================================================================================================================')
             print('')
-            log.close
 
             layout_success = [[sg.Frame(layout=[
                               [sg.Text("")],
@@ -1192,13 +1082,19 @@ def finish_popup(runnumber, dumppath, folder, cutmod, success):
 
 #export csv table
 def export_csv(dumppath, csv_header, csv_entry):
+    export_csv_rows(dumppath, csv_header, [csv_entry])
+
+# export csv table with several rows (e.g. the variants of a parameter scan)
+def export_csv_rows(dumppath, csv_header, csv_rows):
     filetoexport = os.path.join(dumppath, "useful_files/datasets.csv")
     try:
+        os.makedirs(os.path.dirname(filetoexport), exist_ok = True)
         f = open(filetoexport, "w")
         line = ';'.join(csv_header)
         f.write(line +'\n')
-        table_line = ';'.join(csv_entry)
-        f.write(table_line +'\n')
+        for csv_row in csv_rows:
+            table_line = ';'.join(csv_row)
+            f.write(table_line +'\n')
         f.close()
         print('')
         print('Exported metadata CSV to:', filetoexport)
@@ -1207,6 +1103,14 @@ def export_csv(dumppath, csv_header, csv_entry):
         print('')
         print('Unable to export CSV!')
         print('')
+    # add the run to the results catalog, so the launcher finds it without searching
+    try:
+        autogui_catalog.add_run(os.path.join(dumppath, "autogui_log.html"), "Classic", csv_rows)
+        print('Added results to catalog:', autogui_catalog.catalog_location())
+        print('')
+    except Exception:
+        print('Unable to add results to catalog!')
+        print('')
 
 # helper function to display found datasets in folder
 def show_sets(show_eiger, findimgpath):
@@ -1346,33 +1250,162 @@ def show_sets(show_eiger, findimgpath):
 
     return len(sweeps)
 
-# thread for image conversion function to keep gui working
-def imgconv_thread(imgconv_command_1,imgconv_command_2,imgconv_command_3,conv_first_image):
+# helper function for image conversion with adxv and ImageMagick (formats that can't be read in-process)
+def imgconv_adxv(imgconv_command_1,imgconv_command_2,imgconv_command_3):
     imgconv_process_1 = subprocess.Popen(imgconv_command_1, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-    while True:
-        return_code = imgconv_process_1.poll()
-        if return_code is not None:
-            time.sleep(0.5)
-            break
+    imgconv_process_1.wait()
     print('Adxv export done.')    
     imgconv_process_2 = subprocess.Popen(imgconv_command_2, stdout=subprocess.PIPE, universal_newlines=True, shell=True)
-    while True:
-        return_code = imgconv_process_2.poll()
-        if return_code is not None:
-            time.sleep(0.5)
-            break
+    imgconv_process_2.wait()
     print('Image conversion done.')      
     os.remove(imgconv_command_3)
+    converted_image = Image.open('out.png')
+    converted_image.load()
+    os.remove('out.png')
     print('Temporary files removed.')
-    time.sleep(1)
+    return converted_image
+
+# thread for image conversion function to keep gui working
+def imgconv_thread(imgconv_command_1,imgconv_command_2,imgconv_command_3,conv_first_image,render_image,render_number,render_slabs,render_overload):
+    render_start = time.time()
+    rendered_data = None
+    try:
+        rendered_data = autogui_images.load_display(render_image, render_number, render_slabs, render_overload)
+        if rendered_data != None:
+            print('Image rendered in', round(time.time() - render_start, 2), 's.')
+    except Exception as render_error:
+        print('Unable to read image directly, using Adxv instead:', render_error)
+        rendered_data = None
+    if rendered_data == None:
+        rendered_image = imgconv_adxv(imgconv_command_1,imgconv_command_2,imgconv_command_3)
+        rendered_data = (autogui_images.image_data(rendered_image), rendered_image.size)
     if conv_first_image == True:
-        window.write_event_value('-IMGCONVDONE-', True)
+        window.write_event_value('-IMGCONVDONE-', rendered_data)
     else:
-        window_imageview.write_event_value('-IMGCONVDONE-', True)    
+        window_imageview.write_event_value('-IMGCONVDONE-', rendered_data)    
 
 # helper function to run image conversion thread
-def imgconv_function(imgconv_command_1,imgconv_command_2,imgconv_command_3,conv_first_image):
-    threading.Thread(target=imgconv_thread, args=(imgconv_command_1,imgconv_command_2,imgconv_command_3,conv_first_image,), daemon=True).start()   
+def imgconv_function(imgconv_command_1,imgconv_command_2,imgconv_command_3,conv_first_image,render_image,render_number,render_slabs,render_overload):
+    threading.Thread(target=imgconv_thread, args=(imgconv_command_1,imgconv_command_2,imgconv_command_3,conv_first_image,render_image,render_number,render_slabs,render_overload,), daemon=True).start()   
+
+# thread for loading the images next to the shown one into the image cache, stops as soon as another image is requested
+def prefetch_thread(generation, prefetch_images):
+    for prefetch_image in prefetch_images:
+        if generation != prefetch_generation:
+            return
+        try:
+            if autogui_images.load_display(prefetch_image[0], prefetch_image[1], prefetch_image[2], prefetch_image[3]) == None:
+                return
+        except:
+            return
+
+# helper function to run image prefetch thread
+def prefetch_function(prefetch_images):
+    global prefetch_generation
+    prefetch_generation = prefetch_generation + 1
+    threading.Thread(target=prefetch_thread, args=(prefetch_generation, prefetch_images,), daemon=True).start()
+
+# helper function to cancel running prefetches
+def prefetch_cancel():
+    global prefetch_generation
+    prefetch_generation = prefetch_generation + 1
+
+# helper function to list the images (or slabs) next to the shown one: next, previous and the one after next
+def neighbour_images(image_index, nslabs, overload_value):
+    neighbours = []
+    for neighbour_index in (int(image_index) + 1, int(image_index) - 1, int(image_index) + 2):
+        if neighbour_index < 1 or neighbour_index > int(ds_numimgs):
+            continue
+        if EIGER == True:
+            neighbours.append((img_hit_list, max(1, neighbour_index - (nslabs - 1)), nslabs, overload_value))
+        elif neighbour_index <= len(img_hit_list):
+            neighbours.append((img_hit_list[neighbour_index - 1], 1, 1, overload_value))
+    return neighbours
+
+# thread for rendering a zoomed part of the diffraction image
+def imgview_thread(view_image, image_view, canvas_size):
+    try:
+        rendered_data = autogui_images.load_view(view_image[0], view_image[1], view_image[2], view_image[3], image_view, canvas_size)
+    except Exception as render_error:
+        print('Unable to render zoomed image:', render_error)
+        rendered_data = None
+    window_imageview.write_event_value('-IMGVIEWDONE-', (rendered_data, image_view))
+
+# helper function to run zoomed image thread
+def imgview_function(view_image, image_view, canvas_size):
+    threading.Thread(target=imgview_thread, args=(view_image, image_view, canvas_size,), daemon=True).start()
+
+# thread for automatic beam centre refinement on the shown image
+def beamcentre_thread(view_image, start_centre):
+    refine_start = time.time()
+    try:
+        frame = autogui_images.load_frame(view_image[0], view_image[1], view_image[2], view_image[3])
+        refine_overload = view_image[3]
+        # summed EIGER frames carry their own overload marks
+        if refine_overload != None and not isinstance(view_image[0], str):
+            refine_overload = autogui_images.overloaded_value
+        if frame is None:
+            refined_beamcentre = None
+        else:
+            refined_beamcentre = autogui_beamcentre.refine_beamcentre(frame, start_centre, refine_overload)
+            print('Beamcentre refined in', round(time.time() - refine_start, 2), 's.')
+    except Exception as refine_error:
+        print('Unable to refine beamcentre:', refine_error)
+        refined_beamcentre = None
+    window_imageview.write_event_value('-BEAMREFINED-', refined_beamcentre)
+
+# helper function to run beam centre refinement thread
+def beamcentre_function(view_image, start_centre):
+    threading.Thread(target=beamcentre_thread, args=(view_image, start_centre,), daemon=True).start()
+
+# thread for automatic beam stop and shadow detection on a few summed images of the sweep
+def masks_thread(sweep_images, number_of_images, beamcentre):
+    detect_start = time.time()
+    try:
+        summed_frame = autogui_masks.read_sweep_sum(sweep_images, number_of_images)
+        if summed_frame is None:
+            mask_proposals = None
+        else:
+            mask_proposals = autogui_masks.detect_shadows(summed_frame, beamcentre)
+            print('Shadows detected in', round(time.time() - detect_start, 2), 's.')
+    except Exception as detect_error:
+        print('Unable to detect shadows:', detect_error)
+        mask_proposals = None
+    window_imageview.write_event_value('-MASKSFOUND-', mask_proposals)
+
+# helper function to run shadow detection thread
+def masks_function(sweep_images, number_of_images, beamcentre):
+    threading.Thread(target=masks_thread, args=(sweep_images, number_of_images, beamcentre,), daemon=True).start()
+
+# helper function to get the detector area [x0, y0, x1, y1] shown at a zoom factor. The detector point stays at the
+# given fraction of the canvas (e.g. under the mouse), the area is kept on the detector.
+def zoom_view(zoom, point, fraction, imagewidth, imageheight):
+    view_width = imagewidth / zoom
+    view_height = imageheight / zoom
+    view_x = min(max(0, point[0] - fraction[0] * view_width), imagewidth - view_width)
+    view_y = min(max(0, point[1] - fraction[1] * view_height), imageheight - view_height)
+    return [view_x, view_y, view_x + view_width, view_y + view_height]
+
+# helper function to switch the image viewer to another detector area. All figures keep their detector coordinates
+# (tkinter scales and moves them), new figures and clicks use the new area.
+def change_image_view(image_graph, old_view, new_view):
+    canvas_size = image_graph.CanvasSize
+    scale_x = (old_view[2] - old_view[0]) / (new_view[2] - new_view[0])
+    scale_y = (old_view[3] - old_view[1]) / (new_view[3] - new_view[1])
+    image_graph.TKCanvas.scale('all', 0, 0, scale_x, scale_y)
+    image_graph.TKCanvas.move('all', (old_view[0] - new_view[0]) * canvas_size[0] / (new_view[2] - new_view[0]), (old_view[1] - new_view[1]) * canvas_size[1] / (new_view[3] - new_view[1]))
+    image_graph.change_coordinates((new_view[0], new_view[3]), (new_view[2], new_view[1]))
+
+# helper function to get the overload value used for displaying images
+def display_overload(values):
+    if (values['-OVERLOADBOX-'] == True) and (values['-OVERLOAD-'] != 'n/a' and values['-OVERLOAD-'] != ''):
+        overload_value = values['-OVERLOAD-']
+    else:
+        overload_value = headeroverload
+    try:
+        return float(overload_value)
+    except ValueError:
+        return None
 
 # image info retrieval
 def imginfo_function(info_image):
@@ -1764,10 +1797,13 @@ custom_column = [[sg.Checkbox('Set parameters', key = '-CUSTPAR-', tooltip = 'Yo
 
 extra_column = [[sg.Checkbox("Supply additional arguments:", key = '-PARSON-', enable_events=True, default = False,
                     tooltip = 'Everything in this line is added to the command line as is.\nParameters are usualy given in the format variable="value"\nPlease separate multiple parameters by spaces.\ne.g. beam="1532 1543" symm="P21"\nCheck autoPROC documentation for usage by clicking on "Help"'),
-                 sg.InputText(default_text='', key = '-EXTRAPARS-', size = (65, None), disabled = True,
+                 sg.InputText(default_text='', key = '-EXTRAPARS-', size = (43, None), disabled = True,
                     tooltip = 'Everything in this line is added to the command line as is.\nParameters are usualy given in the format variable="value"\nPlease separate multiple parameters by spaces.\ne.g. beam="1532 1543" symm="P21"\nCheck autoPROC documentation for usage by clicking on "Help"'),
                  sg.Text('(Help)', text_color = theme_color, font = "Courier 6 bold", key='-WEB-', enable_events=True, tooltip='Click here to open autoPROC parameter list in browser.'),]]
 
+scan_column = [[sg.Checkbox('Scan', key = '-SCANON-', enable_events = True, default = False, tooltip = 'Run several variants of this job (beam centre, space group,\nresolution limits, macro) at the same time in separate run folders.'),
+                 sg.Button('Variants', key = '-SCANEDIT-', disabled = True, tooltip = 'Define the parameter variants to scan')]]
+
 cleanup_column = [[sg.Checkbox("Clean up output files", key = '-CLEANUP-', enable_events=True, default = True,
                     tooltip = 'Disk usage will be reduced by deleting output files that are unlikely to be required\nAll files required for the HTML-log and all .log and .LP files will be preserved.')]]
 
@@ -1819,7 +1855,8 @@ options_tab_2 = [[sg.Frame(layout=[
                    [sg.Frame(layout=[[sg.Column(processor_column, size = (154, 45))]],title='Parallel threads',title_color=theme_color, relief=sg.RELIEF_GROOVE),
                     sg.Frame(layout=[[sg.Column(image_column, size = (430, 45))]],title='Image range',title_color=theme_color, relief=sg.RELIEF_GROOVE),
                     sg.Frame(layout=[[sg.Column(custom_column, size = (286, 45))]],title='Custom parameters',title_color=theme_color, relief=sg.RELIEF_GROOVE)],
-                   [sg.Frame(layout=[[sg.Column(extra_column, size = (720, 45))]],title='Append arguments to command line',title_color=theme_color, relief=sg.RELIEF_GROOVE),
+                   [sg.Frame(layout=[[sg.Column(extra_column, size = (540, 45))]],title='Append arguments to command line',title_color=theme_color, relief=sg.RELIEF_GROOVE),
+                    sg.Frame(layout=[[sg.Column(scan_column, size = (170, 45))]],title='Parameter scan',title_color=theme_color, relief=sg.RELIEF_GROOVE),
                     sg.Frame(layout=[[sg.Column(cleanup_column, size = (210, 45))]],title='Reduce size on disk',title_color=theme_color, relief=sg.RELIEF_GROOVE)],
                     ],title= None,title_color=theme_color, relief=None, border_width = 0, pad = (0,0,0,0))]]
 
@@ -1848,10 +1885,11 @@ layout = [[sg.Frame(layout= [
            sg.Col([[sg.Text('', key =('-TMSG-'), size = (15,1), justification = "left", text_color = theme_color, tooltip = 'Is it still doing something?'), sg.Text('', key =('-TIME-'), size = (8,1), justification = "left",text_color = theme_color, tooltip = 'time for a coffee...'), sg.Text(progword, key='-PW-', size = (51,1), justification = "right", text_color = theme_color, tooltip = 'Processing status\n\nStatus and progress-bar updates will not be shown\nif the dataset consists of more than one scan / sweep')]],
                     size = (592, 40),vertical_alignment ="bottom", justification ="center"), sg.Col([[ sg.Button('Check images in Adxv', tooltip = 'Launches external diffraction image viewer')]],
                     size = (170,40), vertical_alignment ="top", justification = "right", element_justification = "right")],
-          [sg.Col([[sg.Button('Show live-processing in browser', tooltip = 'self refreshing version of AutoPROC\'s HTML output', disabled = False, key = '-LOGBROWSER-'),sg.Button('Abort processing', button_color = 'yellow on red', tooltip = 'Mayday!!! Mayday!!!'),
+          [sg.Col([[sg.Button('Show live-processing in browser', tooltip = 'self refreshing version of AutoPROC\'s HTML output', disabled = False, key = '-LOGBROWSER-'),sg.Button('Log', tooltip = 'Processing log in a new window, follows the log while the job is running', key = '-LOGVIEW-'),sg.Button('Abort processing', button_color = 'yellow on red', tooltip = 'Mayday!!! Mayday!!!'),
            sg.Col([[sg.Col([[sg.Combo(("Display log (new window)", "HTML processing log", "PDF report (isotropic)", "PDF report (anisotropic)"), default_value = "---Results---",
                     key = '-RESMEN-', size=(24,6), readonly = True, change_submits = True, enable_events = True, font = "Arial 12")]], size = (403, 40), justification ="left", vertical_alignment = "bottom"),
-                    sg.Button('Re-run POINTLESS', key = '-PTLESS-', tooltip = 'Send finalized data to POINTLESS. Useful for missed screw axes from in-house data.')]], key='-RESBUTS-', visible= False, justification = "left", size = (562, 40))]],key='-COL4-', visible= False),
+                    sg.Button('Re-run POINTLESS', key = '-PTLESS-', tooltip = 'Send finalized data to POINTLESS. Useful for missed screw axes from in-house data.'),
+                    sg.Button('Re-scale only', key = '-RESCALE-', tooltip = 'Scale the integrated data of this job again with the current\nhigh resolution cutoff criteria, in a new run folder.')]], key='-RESBUTS-', visible= False, justification = "left", size = (562, 40))]],key='-COL4-', visible= False),
           sg.Col([[sg.Text('')]], size = (None,40), key='-COLX4-', visible= True)],
           [sg.Col([[sg.HorizontalSeparator(color = '#D0D0D0')],
                    [sg.StatusBar(' \u2691  Ready.', text_color = theme_color, background_color= theme_color1, key = '-STAT-', size = (132,1))]], size = (925, 35))]]
@@ -2208,6 +2246,39 @@ while True:
             window['-CCHALFVAL-'].update(disabled=False)
             window['-RPIMVAL-'].update(disabled=False)
         
+    # define parameter variants for scan mode
+    if event == '-SCANON-':
+        window['-SCANEDIT-'].update(disabled = not values['-SCANON-'])
+    if event == '-SCANEDIT-' or (event == '-SCANON-' and values['-SCANON-'] == True and scan_grid.strip() == ''):
+        layout_scan = [[sg.Text('One line per parameter, values to try separated by "|" ("-" keeps the value of the job).\nParameters: beam, symm, cell, R, M (macro), extra (appended as is). At most ' + str(autogui_scan.max_variants) + ' combinations.')],
+                       [sg.Multiline(size=(80,8), key='-SCANGRID-', font="Courier 9", default_text = scan_grid if scan_grid != '' else 'beam: - | 1532 1543\nsymm: - | P21212\n')],
+                       [sg.Text('', key = '-SCANINFO-', size = (80, 1), text_color = 'red')],
+                       [sg.Button('Accept', button_color ="white on green"), sg.Button('Cancel', button_color = "white on red")]]
+        window_scan = sg.Window('Parameter scan', layout_scan, no_titlebar=False, grab_anywhere=False, finalize = True, location = (window.current_location()[0] + 200, window.current_location()[1] + 50 ))
+        while True:
+            event_scan, values_scan = window_scan.read(timeout = 100)
+            if event_scan == sg.WIN_CLOSED or event_scan == 'Cancel':
+                break
+            if event_scan == 'Accept':
+                try:
+                    scan_variants = autogui_scan.parse_scan_grid(values_scan['-SCANGRID-'])
+                except ValueError as scan_error:
+                    window_scan['-SCANINFO-'].update(value = str(scan_error))
+                    continue
+                scan_grid = values_scan['-SCANGRID-']
+                print('')
+                print('Parameter scan with', len(scan_variants), 'variants:')
+                for scan_variant in scan_variants:
+                    print('  ' + autogui_scan.variant_label(scan_variant))
+                break
+        window_scan.close()
+        layout_scan = None
+        window_scan = None
+        gc.collect()
+        if scan_grid.strip() == '':
+            window['-SCANON-'].update(value = False)
+            window['-SCANEDIT-'].update(disabled = True)
+
     if event == '-PARSON-' and values['-PARSON-'] == True:
         sg.popup('Everything added here will be appended to the command line "as is"!\n\nMake sure you know what you are doing!\n', title = "Caution!", location = (window.current_location()[0] + 200, window.current_location()[1] + 50 ))
         window['-EXTRAPARS-'].update(disabled=False)
@@ -2678,14 +2749,16 @@ while True:
             imgconv_command_3 = "./out.jpg"
             #print (imgconv_command_3)
             conv_first_image = True
-            imgconv_function(imgconv_command_1,imgconv_command_2,imgconv_command_3, conv_first_image)
+            if EIGER == True:
+                imgconv_function(imgconv_command_1,imgconv_command_2,imgconv_command_3, conv_first_image, img_hit_list, 1, 1, display_overload(values))
+            else:
+                imgconv_function(imgconv_command_1,imgconv_command_2,imgconv_command_3, conv_first_image, adxvimage, 1, 1, display_overload(values))
     if event == '-IMGCONVDONE-':
         print("Image loaded.")
         print('')
         status = ' \u2691  Ready.'
         window['-STAT-'].update(value = status, text_color = theme_color, background_color = theme_color1)
-        im = Image.open('out.png')
-        diffractionimagesize = im.size
+        diffractionimagedata, diffractionimagesize = values['-IMGCONVDONE-']
         # correct beam position offset due to 2-theta angle
         if headertwotheta != 0:     #calculates pixel shift of x-beam due to 2 theta not zero
             htemp = (float(headerdist)) * (1 - (math.cos(math.radians(abs(headertwotheta) * 0.5))))
@@ -2738,12 +2811,23 @@ while True:
         pointdisplay = []
         pointdisplayshadows = []
         image_index = '1'
+        # the graph spans the pixel edges (0 to number of pixels), so a click maps to the pixel under the mouse
+        imagewidth = toprightx + 1
+        imageheight = bottomlefty + 1
+        image_view = [0, 0, imagewidth, imageheight]
+        requested_view = image_view
+        image_zoom = 1
+        pan_start = None
+        image_loading = False
+        if EIGER == True:
+            shown_image = (img_hit_list, 1, 1, display_overload(values))
+        else:
+            shown_image = (img_hit_list[0], 1, 1, display_overload(values))
         modified_beamcenter =""
-        diffractionimagesize = im.size
         crosshairsize = (toprightx/50)/2               
         listvals_none= ["n/a"]
-        listvals_beamcentre = ["Fit beamcentre from circle (3 clicks)", "Click to set beamcentre"]
-        listvals_mask = ["Quadrilateral mask (4 clicks)", "Rectangular mask (2 clicks)", "Circular mask (3 clicks)", "Oval mask (2 clicks)", "Click on masks to delete"]                  
+        listvals_beamcentre = ["Fit beamcentre from circle (3 clicks)", "Click to set beamcentre", "Refine beamcentre automatically"]
+        listvals_mask = ["Quadrilateral mask (4 clicks)", "Rectangular mask (2 clicks)", "Circular mask (3 clicks)", "Oval mask (2 clicks)", "Detect beamstop and shadows automatically", "Masked fraction and mask export", "Click on masks to delete"]                  
         old_untrusted_rectangle_coords = untrusted_rectangle_coords[:]
         old_untrusted_ellipse_coords = untrusted_ellipse_coords[:]
         old_untrusted_quad_coords = untrusted_quad_coords[:]
@@ -2779,23 +2863,33 @@ while True:
                 [sg.Button('<', key = '-PREVIMG-', highlight_colors = (theme_color, theme_color), tooltip = 'load previous image', size = (1, 1), enable_events = True),
                  sg.Button('>', key = '-NEXTIMG-', highlight_colors = (theme_color, theme_color), tooltip = 'load next image', size = (1, 1), enable_events = True),
                  sg.Input(image_index, key = '-GOTOIMGNO-', tooltip = 'image number to display', size = (6, None)), 
-                 sg.Combo(("1 slab", "5 slabs", "10 slabs", "20 slabs"), default_value = "1 slab", key ="-SLABS-", size = (8,4), readonly = True, change_submits = True, enable_events = True, visible = EIGER),
+                 sg.Combo(("1 slab", "5 slabs", "10 slabs", "20 slabs", "50 slabs"), default_value = "1 slab", key ="-SLABS-", size = (8,5), tooltip = 'number of frames to sum (any number can be entered)', readonly = False, change_submits = True, enable_events = True, visible = EIGER),
                  sg.Button("Load image", key = '-GOTOIMG-', highlight_colors = (theme_color, theme_color), tooltip = 'load given image', enable_events = True),
                  sg.Text('', size = (2, 1)),
+                 sg.Button('+', key = '-ZOOMIN-', highlight_colors = (theme_color, theme_color), tooltip = 'zoom in (mouse wheel zooms at the mouse position, drag with the right mouse button to move)', size = (1, 1), enable_events = True),
+                 sg.Button('-', key = '-ZOOMOUT-', highlight_colors = (theme_color, theme_color), tooltip = 'zoom out', size = (1, 1), enable_events = True),
+                 sg.Button('Fit', key = '-ZOOMFIT-', highlight_colors = (theme_color, theme_color), tooltip = 'show the whole image', enable_events = True),
+                 sg.Text('', size = (2, 1)),
                  sg.Checkbox("Show resolution rings", key = '-SHOWRINGS-', default = False, enable_events = True), sg.Spin(values = ('1','2','3','4','5','6','7','8','9','10'), initial_value= "5", key='-NUMRINGS-',size=(4,1), text_color = 'black', enable_events = True, readonly = True),
                  sg.Checkbox("Mark regions of potential ice rings", key = '-ICERINGS-', default = False, enable_events = True, tooltip =' Ice ring regions according to Kumai, M. (1967)')],
                 [sg.Frame(layout=[
-                [sg.Graph(canvas_size = diffractionimagesize, graph_bottom_left = (0,bottomlefty), graph_top_right = (toprightx,0), enable_events = True, drag_submits = True, key = '-IMGAREA-')]
+                [sg.Graph(canvas_size = diffractionimagesize, graph_bottom_left = (0,imageheight), graph_top_right = (imagewidth,0), enable_events = True, drag_submits = True, key = '-IMGAREA-')]
                 ],title= 'Diffraction image', title_color=theme_color, relief=sg.RELIEF_GROOVE, element_justification = "left", vertical_alignment='center')],
                 [sg.Button('Accept', highlight_colors = (theme_color, theme_color)), sg.Button('Cancel', highlight_colors = (theme_color, theme_color))]
                 ], title= None, title_color=theme_color, relief= None, element_justification = "left", pad = (0,0), vertical_alignment='center')]]
                
         # draw stuff
         window_imageview = sg.Window('Fit beamcentre & mask regions', layout_imageview, no_titlebar=False, grab_anywhere=False, finalize = True, location = (window.current_location()[0] + 200, window.current_location()[1] + 50 ))
-        diffractionimage = window_imageview['-IMGAREA-'].draw_image(filename = 'out.png', location = (0,0))
+        diffractionimage = window_imageview['-IMGAREA-'].draw_image(data = diffractionimagedata, location = (0,0))
         imagebeamcentrex = window_imageview['-IMGAREA-'].draw_line(point_from =((x_imgval-crosshairsize), y_imgval ), point_to =((x_imgval+crosshairsize), y_imgval), color = 'blue', width = 2)
         imagebeamcentrey = window_imageview['-IMGAREA-'].draw_line(point_from =(x_imgval, (y_imgval-crosshairsize)), point_to =(x_imgval, (y_imgval+crosshairsize)), color = 'blue', width = 2)
         graphbbox = window_imageview['-IMGAREA-'].TKCanvas.bbox(diffractionimage)
+        fullgraphbbox = graphbbox
+        window_imageview['-IMGAREA-'].bind('<MouseWheel>', '+WHEEL')
+        window_imageview['-IMGAREA-'].bind('<Button-4>', '+WHEEL')
+        window_imageview['-IMGAREA-'].bind('<Button-5>', '+WHEEL')
+        window_imageview['-IMGAREA-'].bind('<ButtonPress-3>', '+PANSTART')
+        window_imageview['-IMGAREA-'].bind('<ButtonRelease-3>', '+PANEND')
         if dectris_gap_coords != []:
             for gap in dectris_gap_coords:
                 gap = window_imageview['-IMGAREA-'].DrawRectangle((gap[0],gap[2]), (gap[1],gap[3]), fill_color = 'yellow', line_color = None, line_width = 0)
@@ -2840,7 +2934,7 @@ while True:
             event_imageview, values_imageview = window_imageview.read(timeout=100)
 
             # Move to other images
-            if event_imageview == '-PREVIMG-' or event_imageview == '-NEXTIMG-' or event_imageview == '-GOTOIMG-':  
+            if event_imageview == '-PREVIMG-' or event_imageview == '-NEXTIMG-' or event_imageview == '-GOTOIMG-' or event_imageview == '-SLABS-':  
                 if event_imageview == '-PREVIMG-':
                     if int(image_index) > 1:
                         image_index = str(int(image_index) - 1)
@@ -2868,37 +2962,45 @@ while True:
                 window_imageview['-PREVIMG-'].update(disabled = True)
                 window_imageview['-NEXTIMG-'].update(disabled = True)
                 if EIGER == True:
-                    slab = 0
-                    if values_imageview['-SLABS-'] == "10 slabs":
-                        nslabs = 10
-                    elif values_imageview['-SLABS-'] == "5 slabs":
-                        nslabs = 5
-                    elif values_imageview['-SLABS-'] == "20 slabs":
-                        nslabs = 20
+                    # frames from image_index - (nslabs - 1) up to image_index are summed (from the first image at the start)
+                    slab_number = re.search(r'\d+', values_imageview['-SLABS-'])
+                    if slab_number != None and int(slab_number.group(0)) >= 1:
+                        nslabs = min(int(slab_number.group(0)), int(ds_numimgs))
                     else:
-                        nslabs = 1           
-                    container = 0
-                    slab_counter = int(image_index)
-                    while (slab_counter) > 1000:
-                        container = container + 1
-                        slab_counter = slab_counter - 1000
-                        #print(str(slab_counter))
-                    if slab_counter > nslabs:
-                        slab_counter = slab_counter - (nslabs-1)   
+                        nslabs = 1
+                    first_slab_image = max(1, int(image_index) - (nslabs - 1))
+                    try:
+                        adxvimage, slab_counter = autogui_images.eiger_frame_location(img_hit_list, first_slab_image)
+                        slab_counter = slab_counter + 1
+                    except:
+                        adxvimage = None
+                    if adxvimage == None:
+                        container = 0
+                        slab_counter = first_slab_image
+                        while (slab_counter) > 1000:
+                            container = container + 1
+                            slab_counter = slab_counter - 1000
+                        adxvimage = img_hit_list[int(container)]
                     slab = str(slab_counter)
-                    #print(slab)
-                    adxvimage = img_hit_list[int(container)]
                     adxvoptions ="-slab " + slab + " -slabs " + str(nslabs)
                     if nslabs > 1:
-                        print('Opening container:', img_hit_list[int(container)], '\nSlabs:', slab, '-', (str(slab_counter + (nslabs-1))))
+                        print('Opening container:', adxvimage, '\nSlabs:', slab, '-', (str(slab_counter + (nslabs-1))), '(images', first_slab_image, '-', str(first_slab_image + (nslabs-1)) + ')')
                     else:         
-                        print('Opening container:', img_hit_list[int(container)], '\nSlab:', slab)
+                        print('Opening container:', adxvimage, '\nSlab:', slab)
                     print('')
                 else:    
                     adxvimage = img_hit_list[int(image_index)-1]
                     adxvoptions =""
                     print('Opening image:', img_hit_list[int(image_index)-1])
                     print('')
+                # other images are loaded as a whole
+                if image_view != [0, 0, imagewidth, imageheight]:
+                    change_image_view(window_imageview['-IMGAREA-'], image_view, [0, 0, imagewidth, imageheight])
+                    image_view = [0, 0, imagewidth, imageheight]
+                    image_zoom = 1
+                    graphbbox = fullgraphbbox
+                requested_view = image_view
+                image_loading = True
                 window_imageview['-IMGAREA-'].DeleteFigure(diffractionimage)
                 waitbox = window_imageview['-IMGAREA-'].DrawRectangle((0,bottomlefty),(toprightx,0), fill_color = theme_color, line_color = theme_color , line_width = 1)
                 waitmessage = window_imageview['-IMGAREA-'].DrawText('\u231b  Loading image, this might take a few seconds...',(float(toprightx)/2,float(bottomlefty)/2), font=('Arial 14 bold'), color= theme_color1)
@@ -2919,27 +3021,79 @@ while True:
                     imgconv_command_2 = "magick out.jpg -resize 800x800 out.png" # needs ImageMagick
                     imgconv_command_3 = "./out.jpg"
                     conv_first_image = False
-                    imgconv_function(imgconv_command_1,imgconv_command_2,imgconv_command_3, conv_first_image)
+                    prefetch_cancel()
+                    if EIGER == True:
+                        shown_image = (img_hit_list, first_slab_image, nslabs, display_overload(values))
+                    else:
+                        shown_image = (adxvimage, 1, 1, display_overload(values))
+                    imgconv_function(imgconv_command_1,imgconv_command_2,imgconv_command_3, conv_first_image, shown_image[0], shown_image[1], shown_image[2], shown_image[3])
             if event_imageview == '-IMGCONVDONE-':
                 window_imageview['-IMGAREA-'].DeleteFigure(diffractionimage)
-                time.sleep(1)
                 print("Image loaded.")
                 print('')
                 status = ' \u2691  Ready.'
                 window['-STAT-'].update(value = status, text_color = theme_color, background_color = theme_color1)
                 image_window_open = True
-                im = Image.open('out.png')
-                diffractionimage = window_imageview['-IMGAREA-'].draw_image(filename = 'out.png', location = (0,0))
+                diffractionimagedata = values_imageview['-IMGCONVDONE-'][0]
+                diffractionimage = window_imageview['-IMGAREA-'].draw_image(data = diffractionimagedata, location = (0,0))
                 window_imageview['-IMGAREA-'].send_figure_to_back(diffractionimage)
                 window_imageview['-IMGAREA-'].DeleteFigure(waitmessage)
                 window_imageview['-IMGAREA-'].DeleteFigure(waitbox)
                 window_imageview['-GOTOIMG-'].update(disabled = False)
                 window_imageview['-PREVIMG-'].update(disabled = False)
                 window_imageview['-NEXTIMG-'].update(disabled = False)
+                image_loading = False
+                prefetch_function(neighbour_images(image_index, nslabs, display_overload(values)))
+
+            # zoom and move the diffraction image, only the shown part is rendered (from the image pyramid)
+            if event_imageview == '-IMGAREA-+PANSTART':
+                pan_start = window_imageview['-IMGAREA-'].user_bind_event
+            if event_imageview in ('-ZOOMIN-', '-ZOOMOUT-', '-ZOOMFIT-', '-IMGAREA-+WHEEL', '-IMGAREA-+PANEND') and image_loading == False:
+                canvas_size = window_imageview['-IMGAREA-'].CanvasSize
+                new_zoom = image_zoom
+                zoom_point = ((image_view[0] + image_view[2]) / 2, (image_view[1] + image_view[3]) / 2)
+                zoom_fraction = (0.5, 0.5)
+                if event_imageview == '-ZOOMIN-':
+                    new_zoom = image_zoom * 2
+                if event_imageview == '-ZOOMOUT-':
+                    new_zoom = image_zoom / 2
+                if event_imageview == '-ZOOMFIT-':
+                    new_zoom = 1
+                if event_imageview == '-IMGAREA-+WHEEL':
+                    wheel = window_imageview['-IMGAREA-'].user_bind_event
+                    zoom_fraction = (wheel.x / canvas_size[0], wheel.y / canvas_size[1])
+                    zoom_point = (image_view[0] + zoom_fraction[0] * (image_view[2] - image_view[0]), image_view[1] + zoom_fraction[1] * (image_view[3] - image_view[1]))
+                    if wheel.num == 4 or wheel.delta > 0:
+                        new_zoom = image_zoom * 2
+                    else:
+                        new_zoom = image_zoom / 2
+                if event_imageview == '-IMGAREA-+PANEND' and pan_start != None:
+                    pan_end = window_imageview['-IMGAREA-'].user_bind_event
+                    zoom_point = (zoom_point[0] - (pan_end.x - pan_start.x) * (image_view[2] - image_view[0]) / canvas_size[0], zoom_point[1] - (pan_end.y - pan_start.y) * (image_view[3] - image_view[1]) / canvas_size[1])
+                    pan_start = None
+                new_zoom = min(max(new_zoom, 1), 64)
+                new_view = zoom_view(new_zoom, zoom_point, zoom_fraction, imagewidth, imageheight)
+                if new_view != requested_view:
+                    requested_view = new_view
+                    imgview_function(shown_image, requested_view, canvas_size)
+            # only the last requested area is shown
+            if event_imageview == '-IMGVIEWDONE-' and values_imageview['-IMGVIEWDONE-'][1] == requested_view:
+                if values_imageview['-IMGVIEWDONE-'][0] == None:
+                    print('Zooming is only available for images AutoGUI can read directly (mini-cbf, EIGER HDF5).')
+                    requested_view = image_view
+                else:
+                    change_image_view(window_imageview['-IMGAREA-'], image_view, requested_view)
+                    image_view = requested_view
+                    image_zoom = imagewidth / (image_view[2] - image_view[0])
+                    graphbbox = (fullgraphbbox[0], fullgraphbbox[1], fullgraphbbox[2] * image_zoom, fullgraphbbox[3] * image_zoom)
+                    window_imageview['-IMGAREA-'].DeleteFigure(diffractionimage)
+                    diffractionimage = window_imageview['-IMGAREA-'].draw_image(data = values_imageview['-IMGVIEWDONE-'][0][0], location = (image_view[0], image_view[1]))
+                    window_imageview['-IMGAREA-'].send_figure_to_back(diffractionimage)
   
 
             #Cancel and remove stored masks if chosen
             if event_imageview == sg.WIN_CLOSED or event_imageview == 'Cancel':
+                prefetch_cancel()
                 window_imageview.close()
                 layout_imageview = None
                 window_imageview = None
@@ -2949,7 +3103,6 @@ while True:
                 untrusted_quads = []
                 dectris_gaps = []
                 modified_beamcenter =""
-                os.remove("./out.png")
                 
                 layout_cancelimg = [[sg.Text("Also delete all existing overlays (masks/gaps)?", justification = "center")],
                                    [sg.Button('Yes', highlight_colors = (theme_color, theme_color)),sg.Button('No', highlight_colors = (theme_color, theme_color))]]
@@ -2990,11 +3143,11 @@ while True:
 
             #Update settings from image
             if event_imageview == 'Accept':
+                prefetch_cancel()
                 window_imageview.close()
                 layout_imageview = None
                 window_imageview = None
                 gc.collect()
-                os.remove("./out.png")
                 print('')
                 print("Updated settings from image")
                 print(separator)
@@ -3263,6 +3416,138 @@ while True:
                             circlecoord2set = False
                     #print(imgcoord)
 
+            # Refine beamcentre automatically from rings or direct beam scatter, starting at the current beamcentre
+            if event_imageview == '-FITWHAT-' and values_imageview['-FITWHAT-'] == "Refine beamcentre automatically":
+                print('')
+                print("Refining beamcentre, starting at", round(x_imgval, 1), round(y_imgval, 1), "px ...")
+                if headertwotheta != 0:
+                    print("Attention: the refinement assumes an untilted detector (2Θ = 0), rings of a tilted detector are ellipses!")
+                status = ' \u231b  Refining beamcentre...'
+                window['-STAT-'].update(value = status, text_color = 'black', background_color = 'yellow')
+                beamcentre_function(shown_image, (x_imgval, y_imgval))
+            if event_imageview == '-BEAMREFINED-':
+                status = ' \u2691  Ready.'
+                window['-STAT-'].update(value = status, text_color = theme_color, background_color = theme_color1)
+                refined_beamcentre = values_imageview['-BEAMREFINED-']
+                if refined_beamcentre == None:
+                    print("No rings or direct beam scatter found for refinement (only images AutoGUI can read directly can be used).")
+                else:
+                    refined_x, refined_y = refined_beamcentre['centre']
+                    refined_text = "Beamcentre: " + str("%.2f" % refined_x) + " ± " + str("%.2f" % refined_beamcentre['uncertainty'][0]) + ", " + str("%.2f" % refined_y) + " ± " + str("%.2f" % refined_beamcentre['uncertainty'][1]) + " px"
+                    print(refined_text)
+                    print("Fitted to", refined_beamcentre['points'], "points of", refined_beamcentre['method'], "at radii", ', '.join(str(round(ring)) for ring in refined_beamcentre['rings']), "px")
+                    # show the fitted rings around the refined beamcentre
+                    refined_rings = []
+                    for ring_radius in refined_beamcentre['rings']:
+                        refined_ring = window_imageview['-IMGAREA-'].draw_circle(center_location = (refined_x, refined_y), radius = ring_radius, fill_color = None, line_color = 'orange', line_width = 2)
+                        refined_rings.append(refined_ring)
+                    layout_refined = [[sg.Text(refined_text + "\n(" + refined_beamcentre['method'] + ", " + str(refined_beamcentre['points']) + " points)", justification = "center")],
+                                      [sg.Text("Use the refined beamcentre?", justification = "center")],
+                                      [sg.Button('Yes', highlight_colors = (theme_color, theme_color)),sg.Button('No', highlight_colors = (theme_color, theme_color))]]
+                    window_refined = sg.Window('Refined beamcentre', layout_refined, no_titlebar=False, grab_anywhere=False, finalize = True, location = (window_imageview.current_location()[0] + 200, window_imageview.current_location()[1] + 50 ))
+                    while True:
+                        event_refined, values_refined = window_refined.read(timeout=100)
+                        if event_refined == 'Yes':
+                            crosshairoffsetx = (refined_x - x_imgval)
+                            crosshairoffsety = (refined_y - y_imgval)
+                            window_imageview['-IMGAREA-'].MoveFigure(imagebeamcentrex, crosshairoffsetx, crosshairoffsety)
+                            window_imageview['-IMGAREA-'].MoveFigure(imagebeamcentrey, crosshairoffsetx, crosshairoffsety)
+                            x_imgval = refined_x
+                            y_imgval = refined_y
+                            window_imageview['-XIMGVAL-'].update(value = round(x_imgval, 1))
+                            window_imageview['-YIMGVAL-'].update(value = round(y_imgval, 1))
+                            modified_beamcenter = [round(x_imgval + xoffset, 1), round(y_imgval, 1)]
+                            print("Refined beamcentre accepted.")
+                        if event_refined == sg.WIN_CLOSED or event_refined == 'Yes' or event_refined == 'No':
+                            window_refined.close()
+                            layout_refined = None
+                            window_refined = None
+                            gc.collect()
+                            break
+                    for refined_ring in refined_rings:
+                        window_imageview['-IMGAREA-'].DeleteFigure(refined_ring)
+
+            # Detect beam stop and shadows automatically on a few summed images, proposals are shown before they are used
+            if event_imageview == '-FITWHAT-' and values_imageview['-FITWHAT-'] == "Detect beamstop and shadows automatically":
+                print('')
+                print("Detecting beamstop and shadows around beamcentre", round(x_imgval, 1), round(y_imgval, 1), "px ...")
+                status = ' \u231b  Detecting shadows...'
+                window['-STAT-'].update(value = status, text_color = 'black', background_color = 'yellow')
+                masks_function(img_hit_list, int(ds_numimgs), (x_imgval, y_imgval))
+            if event_imageview == '-MASKSFOUND-':
+                status = ' \u2691  Ready.'
+                window['-STAT-'].update(value = status, text_color = theme_color, background_color = theme_color1)
+                mask_proposals = values_imageview['-MASKSFOUND-']
+                if mask_proposals == None:
+                    print("No shadows detected (only images AutoGUI can read directly can be used).")
+                elif mask_proposals['ellipses'] == [] and mask_proposals['rectangles'] == [] and mask_proposals['quads'] == []:
+                    print("No shadows detected.")
+                else:
+                    print("Proposed masks:", len(mask_proposals['ellipses']), "ellipse(s),", len(mask_proposals['rectangles']), "rectangle(s),", len(mask_proposals['quads']), "quadrilateral(s)")
+                    # preview the proposals in orange
+                    proposal_figures = []
+                    for ellipse in mask_proposals['ellipses']:
+                        proposal_figures.append(window_imageview['-IMGAREA-'].draw_oval((ellipse[0], ellipse[2]), (ellipse[1], ellipse[3]), fill_color = None, line_color = 'orange', line_width = 3))
+                    for rectangle in mask_proposals['rectangles']:
+                        proposal_figures.append(window_imageview['-IMGAREA-'].DrawRectangle((rectangle[0], rectangle[2]), (rectangle[1], rectangle[3]), fill_color = None, line_color = 'orange', line_width = 3))
+                    for xds_coords in mask_proposals['quads']:
+                        for line_start, line_end in ((0, 1), (1, 3), (3, 2), (2, 0)):
+                            proposal_figures.append(window_imageview['-IMGAREA-'].draw_line(xds_coords[line_start], xds_coords[line_end], color = 'orange', width = 3))
+                    layout_proposals = [[sg.Text("Masks proposed for beamstop and shadows are shown in orange.", justification = "center")],
+                                        [sg.Text("Use the proposed masks?", justification = "center")],
+                                        [sg.Button('Yes', highlight_colors = (theme_color, theme_color)),sg.Button('No', highlight_colors = (theme_color, theme_color))]]
+                    window_proposals = sg.Window('Proposed masks', layout_proposals, no_titlebar=False, grab_anywhere=False, finalize = True, location = (window_imageview.current_location()[0] + 200, window_imageview.current_location()[1] + 50 ))
+                    while True:
+                        event_proposals, values_proposals = window_proposals.read(timeout=100)
+                        if event_proposals == 'Yes':
+                            for ellipse in mask_proposals['ellipses']:
+                                untrusted_ellipse = window_imageview['-IMGAREA-'].draw_oval((ellipse[0], ellipse[2]), (ellipse[1], ellipse[3]), fill_color = None, line_color = 'red', line_width = 3)
+                                untrusted_ellipses.append(untrusted_ellipse)
+                                untrusted_ellipse_coords.append(ellipse)
+                            for rectangle in mask_proposals['rectangles']:
+                                untrusted_rectangle = window_imageview['-IMGAREA-'].DrawRectangle((rectangle[0], rectangle[2]), (rectangle[1], rectangle[3]), fill_color = None, line_color = 'red', line_width = 3)
+                                untrusted_rectangles.append(untrusted_rectangle)
+                                untrusted_rectangle_coords.append(rectangle)
+                            for xds_coords in mask_proposals['quads']:
+                                quad_line_1 = window_imageview['-IMGAREA-'].draw_line(xds_coords[0], xds_coords[1], color = 'red', width = 3)
+                                quad_line_2 = window_imageview['-IMGAREA-'].draw_line(xds_coords[1], xds_coords[3], color = 'red', width = 3)
+                                quad_line_3 = window_imageview['-IMGAREA-'].draw_line(xds_coords[3], xds_coords[2], color = 'red', width = 3)
+                                quad_line_4 = window_imageview['-IMGAREA-'].draw_line(xds_coords[2], xds_coords[0], color = 'red', width = 3)
+                                untrusted_quad = [quad_line_1, quad_line_2, quad_line_3, quad_line_4]
+                                untrusted_quads.append(untrusted_quad)
+                                untrusted_quad_coords.append(xds_coords)
+                            print("Proposed masks accepted.")
+                        if event_proposals == sg.WIN_CLOSED or event_proposals == 'Yes' or event_proposals == 'No':
+                            window_proposals.close()
+                            layout_proposals = None
+                            window_proposals = None
+                            gc.collect()
+                            break
+                    for proposal_figure in proposal_figures:
+                        window_imageview['-IMGAREA-'].DeleteFigure(proposal_figure)
+
+            # Rasterize all masks at full resolution: masked fraction per resolution shell, export as bitmap and mini-cbf
+            if event_imageview == '-FITWHAT-' and values_imageview['-FITWHAT-'] == "Masked fraction and mask export":
+                print('')
+                if headertwotheta != 0:
+                    print("Attention: resolution shells are calculated for an untilted detector (2Θ = 0)!")
+                try:
+                    mask_frame = autogui_images.load_frame(shown_image[0], shown_image[1], shown_image[2], shown_image[3])
+                    mask_shape = (imageheight, imagewidth) if mask_frame is None else mask_frame.shape
+                    detector_mask = autogui_masks.rasterize_mask(mask_shape, untrusted_rectangle_coords + dectris_gap_coords, untrusted_ellipse_coords, untrusted_quad_coords, mask_frame)
+                    print("Masked pixels:", int(detector_mask.sum()), "of", detector_mask.size, "(" + str("%.2f" % (100 * detector_mask.mean())) + " %)")
+                    for shell_low, shell_high, shell_fraction, shell_pixels in autogui_masks.shell_fractions(detector_mask, (x_imgval, y_imgval), float(graph_dist), float(graph_wl), float(graph_ysize)):
+                        print(str("%8.2f" % shell_low) + " - " + str("%5.2f" % shell_high) + " Å: " + str("%5.1f" % (100 * shell_fraction)) + " % masked")
+                    if os.path.isdir(values['-OUTF-']):
+                        mask_folder = values['-OUTF-']
+                    else:
+                        mask_folder = os.getcwd()
+                    autogui_masks.write_mask_bitmap(os.path.join(mask_folder, "autogui_mask.pbm"), detector_mask)
+                    autogui_masks.write_mask_cbf(os.path.join(mask_folder, "autogui_mask.cbf"), detector_mask)
+                    print("Mask exported to", os.path.join(mask_folder, "autogui_mask.pbm"), "and", os.path.join(mask_folder, "autogui_mask.cbf"))
+                except Exception as mask_error:
+                    print("Unable to rasterize masks:", mask_error)
+
             # Rectangular mask (=untrusted_rectangle for XDS)              
             if values_imageview['-FITWHAT-'] == "Rectangular mask (2 clicks)":
                 circlecoord1set = False
@@ -3975,26 +4260,79 @@ while True:
             print('nothing here yet')
 
 
-    # show log-txt in new window
-    if (event == '-RESMEN-') and (values['-RESMEN-'] == "Display log (new window)") :
-        if watch == True:
-            print('Still running, nothing there yet.')
+    # show log-txt in new window, paged and following the log while the job is running
+    if (event == '-LOGVIEW-') or ((event == '-RESMEN-') and (values['-RESMEN-'] == "Display log (new window)")) :
+        logpath = os.path.join(dumppath, "log.txt")
+        if os.path.exists(logpath) == False:
+            print('')
+            print('nothing here yet')
         else:
             logtitle = 'Data processing log from run ' + str(runnumber) + ' in ' + folder
             layout2 = [[sg.Text(logtitle, font = 'Arial 12')],
-                       [sg.Multiline(size=(160,30), key='-LOG-', autoscroll = True, do_not_clear = True, font ="Courier 9")],
+                       [sg.Multiline(size=(160,log_page_lines), key='-LOG-', autoscroll = False, do_not_clear = True, disabled = True, font ="Courier 9"),
+                        sg.Slider(range = (0, 0), default_value = 0, orientation = 'vertical', size = (24, 15), disable_number_display = True, enable_events = True, key = '-LSLIDE-')],
+                       [sg.Button('Top', key = '-LTOP-'), sg.Button('Page up', key = '-LUP-'), sg.Button('Page down', key = '-LDOWN-'), sg.Button('End', key = '-LEND-'),
+                        sg.Checkbox('Follow', default = watch, key = '-LFOLLOW-', tooltip = 'Show new lines of the log while the job is running'),
+                        sg.Text('', key = '-LPOS-', size = (40,1), text_color = theme_color)],
+                       [sg.Text('Search (regular expression):'), sg.Input('', key = '-LSEARCH-', size = (40,1)), sg.Button('Find', key = '-LFIND-', bind_return_key = True),
+                        sg.Button('Previous', key = '-LPREV-'), sg.Button('Next', key = '-LNEXT-'), sg.Text('', key = '-LMATCH-', size = (30,1), text_color = theme_color)],
                        [sg.Button('Close')]]
             
             window2 = sg.Window('Processing log', layout2, no_titlebar=False, grab_anywhere=False, finalize = True, location = (window.current_location()[0] + 200, window.current_location()[1] + 50 ))
-            log_read(filename)
+            log = autogui_logview.open_log(logpath)
+            match_line = None
+            first_line = 0
+            if watch == True:
+                first_line = autogui_logview.line_count(log)[0]
+            first_line = log_page(window2, log, first_line, match_line)
             while True:
-                event2, values2 = window2.read()
+                event2, values2 = window2.read(timeout = 1000)
                 if event2 == sg.WIN_CLOSED or event2 == 'Close':
+                    autogui_logview.close_log(log)
+                    log = None
                     window2.close()
                     layout2 = None
                     window2 = None
                     gc.collect()
                     break
+                # new lines or indexing still running
+                if event2 == sg.TIMEOUT_EVENT:
+                    grown = autogui_logview.refresh_log(log)
+                    if grown == True and values2['-LFOLLOW-'] == True:
+                        first_line = autogui_logview.line_count(log)[0]
+                    if grown == True or window2['-LPOS-'].get().endswith('(indexing...)'):
+                        first_line = log_page(window2, log, first_line, match_line)
+                    continue
+                if event2 in ('-LTOP-', '-LUP-', '-LSLIDE-', '-LFIND-', '-LPREV-', '-LNEXT-'):
+                    window2['-LFOLLOW-'].update(value = False)
+                if event2 == '-LTOP-':
+                    first_line = 0
+                if event2 == '-LUP-':
+                    first_line = first_line - log_page_lines
+                if event2 == '-LDOWN-':
+                    first_line = first_line + log_page_lines
+                if event2 == '-LEND-':
+                    first_line = autogui_logview.line_count(log)[0]
+                if event2 == '-LSLIDE-':
+                    first_line = int(values2['-LSLIDE-'])
+                if event2 in ('-LFIND-', '-LPREV-', '-LNEXT-') and values2['-LSEARCH-'] != '':
+                    # Find starts at the first line shown, Previous / Next at the last match
+                    if event2 == '-LFIND-' or match_line == None:
+                        from_line = first_line - 1 if event2 != '-LPREV-' else first_line
+                    else:
+                        from_line = match_line
+                    try:
+                        found = autogui_logview.search_log(log, values2['-LSEARCH-'], from_line, backwards = (event2 == '-LPREV-'))
+                    except re.error as error:
+                        window2['-LMATCH-'].update(value = 'Invalid expression: ' + str(error))
+                        continue
+                    if found == None:
+                        window2['-LMATCH-'].update(value = 'No more matches.')
+                    else:
+                        match_line = found
+                        first_line = found - 5
+                        window2['-LMATCH-'].update(value = 'Match in line ' + str(found + 1))
+                first_line = log_page(window2, log, first_line, match_line)
 
     # enable/disable data saving mode
     if (event == '-CLEANUP-') and (values['-CLEANUP-'] == True):
@@ -4035,7 +4373,10 @@ while True:
             csv_entry.append(proc_date)
             csv_entry.append(ds_name)
             window['-LOGBROWSER-'].update(disabled = False)
-            autoproc_function(bash_command)
+            if scan_runs != []:
+                scan_function()
+            else:
+                autoproc_function(bash_command)
             status = '  \u231b  Job no. ' + str(runnumber) + ' in ' + folder + ' is running.'
             window['-STAT-'].update(value = status, text_color = 'black', background_color = '#FFCB34')
             window['-STATICON-'].update(value = "\u231b", text_color = theme_color)
@@ -4049,6 +4390,60 @@ while True:
         else:
             window.write_event_value('-THREADOFF-', '') 
 
+    # parameter scan has finished: collect all outcomes into one table
+    if event == '-SCANDONE-' and killflag == True:
+        # aborted: the runs were killed, status and markers are already set
+        watch = False
+        refresh = False
+        HTML_log(runnumber, dumppath, refresh)
+        print('')
+        print('Parameter scan was aborted, no comparison table written.')
+        window['-RESBUTS-'].update(visible = True)
+        window['-RUN-'].update(disabled = False)
+        window['-RUN-'].update(button_color ="white on green")
+        scan_runs = []
+    if event == '-SCANDONE-' and killflag == False:
+        watch = False
+        refresh = False
+        HTML_log(runnumber, dumppath, refresh)
+        scan_rows = autogui_scan.scan_outcomes(scan_runs)
+        scan_table = os.path.join(os.path.dirname(dumppath), 'scan_' + os.path.basename(dumppath) + '.csv')
+        autogui_scan.write_scan_table(scan_table, scan_rows)
+        print('')
+        print(separator)
+        print('Parameter scan done, comparison table written to', scan_table)
+        for scan_row in scan_rows:
+            print(' | '.join(scan_row))
+        print(separator)
+        # one datasets.csv row per variant, also added to the results catalog
+        export_csv_rows(dumppath, csv_header, autogui_scan.scan_csv_rows(scan_runs, csv_entry[0], csv_entry[1]))
+        os.makedirs(os.path.join(dumppath, 'output-files'), exist_ok = True)
+        for marker in ('noblink.txt', 'stopped.txt'):
+            f = open(os.path.join(dumppath, 'output-files', marker), "w")
+            f.write ('Processing is done!')
+            f.close()
+        window['-RESBUTS-'].update(visible = True)
+        window['-RUN-'].update(disabled = False)
+        window['-RUN-'].update(button_color ="white on green")
+        window['-STATICON-'].update(value = "\u2714", text_color = 'darkgreen')
+        window['-TIME-'].update(text_color = "green")
+        window['-TMSG-'].update(value = "Finished after : ", text_color = "green")
+        status = ' \u2714  Parameter scan of job no. ' + str(runnumber) + ' in ' + folder + ' has finished.'
+        window['-STAT-'].update(value = status, text_color = 'white', background_color = 'green')
+        layout_scanres = [[sg.Table(scan_rows, autogui_scan.scan_header, num_rows = min(max(len(scan_rows), 2), 8), auto_size_columns = True, max_col_width = 40, font = "Helvetica 9", justification = "left")],
+                          [sg.Text(scan_table)],
+                          [sg.Button('Okay', highlight_colors = (theme_color, theme_color))]]
+        window_scanres = sg.Window('Parameter scan results', layout_scanres, no_titlebar=False, grab_anywhere=False, finalize = True, location = (window.current_location()[0] + 100, window.current_location()[1] + 50 ))
+        while True:
+            event_scanres, values_scanres = window_scanres.read(timeout = 100)
+            if event_scanres == sg.WIN_CLOSED or event_scanres == 'Okay':
+                window_scanres.close()
+                layout_scanres = None
+                window_scanres = None
+                gc.collect()
+                break
+        scan_runs = []
+
     # receive signal that processing has finished and finalize job    
     if event == '-THREADOFF-':
         time.sleep(0.5)
@@ -4177,6 +4572,44 @@ while True:
             print('Output files have been cleaned up.')         
 
 
+    # re-scale the integrated data of the last job with new cutoff criteria
+    if event == '-RESCALE-' and watch == False:
+        try:
+            previous_run = dumppath
+            dumppath, runnumber, integrated_path = autogui_rescale.prepare_rescale(previous_run)
+        except (ValueError, OSError) as rescale_error:
+            print('')
+            print(rescale_error)
+            status = '  Nothing to re-scale, integrated data not found!'
+            window['-STAT-'].update(value = status, text_color = 'red', background_color = '#D0D0D0')
+        else:
+            window['-TAB1-'].select()
+            window['-RESBUTS-'].update(visible = False)
+            window['-RUN-'].update(disabled = True)
+            window['-RUN-'].update(button_color ="white on grey")
+            killflag = False
+            window['-OUTPUT-'].update(value = '')
+            os.chdir(dumppath)
+            param_cut, cutmod = autogui_rescale.cutoff_parameters(values['-CUTSEL-'], values['-ISIGIVAL-'], values['-CCHALFVAL-'], values['-RPIMVAL-'])
+            auto_command = autogui_rescale.rescale_command(integrated_path, param_cut, ' '.join([param_R, param_Ano, param_ref, param_free, param_symm, param_cell, param_nthreads]))
+            bash_command = "(" + auto_command + ") | tee log.txt"
+            print('')
+            print(separator)
+            print('Re-scaling integrated data from', previous_run)
+            print ('Output will be found in: ' + dumppath)
+            print('')
+            print('Running re-scaling with command line:')
+            print(auto_command)
+            print('')
+            refresh = True
+            HTML_log(runnumber, dumppath, refresh)
+            watch = True
+            start_t = time.time()
+            timer_function(dumppath)
+            window['-TIME-'].update(text_color = theme_color)
+            window['-TMSG-'].update(value = "Elapsed time : ", text_color = theme_color)
+            window.write_event_value('-THREADON-', '')
+
     # run pointless
     if event == '-PTLESS-':
         if os.path.exists(isoout) == False:
@@ -4591,6 +5024,14 @@ while True:
             if values['-SGREF-'] == True:
                 if os.path.exists(values['-REF-']) == True:
                     param_ref = "-ref " + values['-REF-']
+                    try:
+                        ref_header = autogui_mtz.read_mtz_header(values['-REF-'])
+                        print('Reference MTZ:', ref_header.space_group, '(' + autogui_mtz.cell_text(ref_header) + ')')
+                        if autogui_mtz.free_r_label(ref_header) == '':
+                            print('Attention: the reference MTZ has no free R flag column!')
+                    except (ValueError, OSError, IndexError):
+                        print('')
+                        print('Attention: the reference file is not a readable MTZ file!')
                 else:
                     print('')
                     print('Reference MTZ not found!')
@@ -4651,16 +5092,7 @@ while True:
                 param_bad_imgs = ''
 
 
-            if values['-CUTSEL-'] == "CC(1/2)>=0.3 (default)":    
-                param_cut = ''
-                cutmod = False
-            elif values['-CUTSEL-'] == "I/sig(I)>=2.0, CC(1/2)>=0.3, Rpim<=0.6 (old default)":
-                param_cut = 'ScaleAnaISigmaCut_123="0.1:0.1 0.5:0.5 0.5:1.0 1.0:2.0" ScaleAnaRpimallCut_123="99.9999:99.9999 0.9:0.9 0.8:0.8 0.6:0.6" ScaleAnaCChalfCut_123="-1.0:-1.0 0.0:0.0 0.1:0.1 0.3:0.3"'
-                # as used until autoPROCVersion20220608
-                cutmod = True      
-            else:
-                param_cut = 'ScaleAnaRmergeCut_123="99.9999:99.9999" ScaleAnaRpimallCut_123="99.9999:99.9999 0.9:0.9 0.8:0.8 '+ values['-RPIMVAL-'] + ':' + values['-RPIMVAL-'] +'" ScaleAnaRmeasallCut_123="99.9999:99.9999" ScaleAnaISigmaCut_123="0.1:0.1 0.5:0.5 0.5:1.0 1.0:' + values['-ISIGIVAL-'] +'" ScaleAnaCompletenessCut_123="0.0:0.0" ScaleAnaCChalfCut_123="-1.0:-1.0 0.0:0.0 0.1:0.1 '+ values['-CCHALFVAL-'] + ':' + values['-CCHALFVAL-'] +'"'
-                cutmod = [values['-ISIGIVAL-'], values['-CCHALFVAL-'], values['-RPIMVAL-']]    
+            param_cut, cutmod = autogui_rescale.cutoff_parameters(values['-CUTSEL-'], values['-ISIGIVAL-'], values['-CCHALFVAL-'], values['-RPIMVAL-'])
 
             if values['-DETSEL-'] == "In-house: PILATUS 300K":
                 param_extra = inhouse_pars
@@ -4802,6 +5234,17 @@ while True:
             print('Running AutoPROC with command line:')
             print(auto_command)
             print('')
+            scan_runs = []
+            if values['-SCANON-'] == True and scan_grid.strip() != '':
+                try:
+                    scan_runs = autogui_scan.prepare_scan(auto_command, autogui_scan.parse_scan_grid(scan_grid), dumppath, param_nthreads.split()[-1])
+                except (ValueError, OSError) as scan_error:
+                    print('Parameter scan not possible:', scan_error)
+                    print('')
+                for scan_run in scan_runs:
+                    print('Scan variant (' + scan_run[0] + ') in ' + scan_run[1] + ':')
+                    print(scan_run[2])
+                    print('')
             #print(values) #(for debug)
             
             # start processing         
@@ -0,0 +1,212 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Unit cell clustering for AutoGUI batch and the results catalog.
+# Cells are compared as G6 vectors (a², b², c², 2bc cos(alpha), 2ac cos(beta), 2ab cos(gamma), Andrews & Bernstein),
+# the distance of two cells is the G6 distance relative to their mean G6 length. autoPROC reports conventional cells,
+# so they are made primitive (centering from the space group) and Niggli reduced (Krivy & Gruber) first, the same
+# lattice in another setting or space group then gives the same G6 vector. Single linkage clustering: the minimum spanning tree is built with Prim's
+# algorithm (one vectorized distance row per step, O(n²) time but only O(n) memory), cutting all edges longer than
+# the threshold gives the clusters. Cluster 1 is the largest.
+# Run "python autogui_cluster.py" for a benchmark, "python autogui_cluster.py catalog [space group]" to cluster
+# the datasets in the results catalog.
+
+import sys
+import time
+import numpy as np
+
+
+cluster_threshold = 0.02                    # maximum relative G6 distance of neighbours in a cluster
+niggli_tolerance = 1e-5                     # relative tolerance of the comparisons in the Niggli reduction
+
+# primitive cell vectors (rows) in conventional cell coordinates for the lattice centerings
+centering_matrices = {'P': np.eye(3),
+                      'C': np.array([[0.5, 0.5, 0], [-0.5, 0.5, 0], [0, 0, 1]]),
+                      'A': np.array([[1, 0, 0], [0, 0.5, 0.5], [0, -0.5, 0.5]]),
+                      'B': np.array([[0.5, 0, 0.5], [0, 1, 0], [-0.5, 0, 0.5]]),
+                      'I': np.array([[-0.5, 0.5, 0.5], [0.5, -0.5, 0.5], [0.5, 0.5, -0.5]]),
+                      'F': np.array([[0, 0.5, 0.5], [0.5, 0, 0.5], [0.5, 0.5, 0]]),
+                      'R': np.array([[2, 1, 1], [-1, 1, 1], [-1, -2, 1]]) / 3.0}
+
+
+# helper function to read a cell from the datasets.csv columns ("78.1, 78.1, 37.2" and "90.0, 90.0, 90.0"), None if it can't be read
+def parse_cell(lengths, angles):
+    try:
+        cell = [float(value) for value in (lengths + ',' + angles).replace('Å', '').replace('°', '').split(',')]
+    except ValueError:
+        return None
+    if len(cell) != 6:
+        return None
+    return cell
+
+# G6 vectors of cells (n x 6 array of a, b, c, alpha, beta, gamma).
+# With space groups the cells are made primitive and Niggli reduced first (unknown space groups are taken as primitive).
+def g6_vectors(cells, space_groups = None):
+    cells = np.asarray(cells, dtype = np.float64).reshape(-1, 6)
+    a, b, c = cells[:, 0], cells[:, 1], cells[:, 2]
+    cosines = np.cos(np.radians(cells[:, 3:]))
+    g6 = np.column_stack((a * a, b * b, c * c, 2 * b * c * cosines[:, 0], 2 * a * c * cosines[:, 1], 2 * a * b * cosines[:, 2]))
+    if space_groups == None:
+        return g6
+    return np.array([niggli_reduce(primitive_g6(vector, space_group, cell)) for vector, space_group, cell in zip(g6, space_groups, cells)]).reshape(-1, 6)
+
+# helper function for the lattice centering of a space group ("C 1 2 1" -> 'C', rhombohedral axes -> 'P')
+def centering(space_group, cell):
+    letter = space_group.strip()[:1].upper()
+    if letter in ('H', 'R'):
+        # hexagonal axes are centred, rhombohedral axes are primitive already
+        return 'R' if abs(cell[5] - 120) < 1 else 'P'
+    if letter in centering_matrices:
+        return letter
+    return 'P'
+
+# G6 vector of the primitive cell of a conventional cell
+def primitive_g6(g6, space_group, cell):
+    matrix = centering_matrices[centering(space_group, cell)]
+    metric = np.array([[g6[0], g6[5] / 2, g6[4] / 2], [g6[5] / 2, g6[1], g6[3] / 2], [g6[4] / 2, g6[3] / 2, g6[2]]])
+    metric = matrix @ metric @ matrix.T
+    return np.array([metric[0, 0], metric[1, 1], metric[2, 2], 2 * metric[1, 2], 2 * metric[0, 2], 2 * metric[0, 1]])
+
+# Niggli reduction of a G6 vector (A, B, C, xi, eta, zeta), Krivy & Gruber (1976) with the tolerances of Grosse-Kunstleve et al. (2004)
+def niggli_reduce(g6):
+    A, B, C, xi, eta, zeta = (float(value) for value in g6)
+    epsilon = niggli_tolerance * (A * B * C) ** (1 / 3.0)
+    lt = lambda x, y: x < y - epsilon
+    gt = lambda x, y: y < x - epsilon
+    sign = lambda x: 1 if x > 0 else -1
+    for step in range(1000):
+        # A1, A2: order the lengths
+        if gt(A, B) or (not gt(A, B) and not lt(A, B) and gt(abs(xi), abs(eta))):
+            A, B, xi, eta = B, A, eta, xi
+        if gt(B, C) or (not gt(B, C) and not lt(B, C) and gt(abs(eta), abs(zeta))):
+            B, C, eta, zeta = C, B, zeta, eta
+            continue
+        # A3, A4: all angles acute (xi * eta * zeta > 0) or all obtuse
+        positive = sum(gt(value, 0) for value in (xi, eta, zeta))
+        zero = sum(not gt(value, 0) and not lt(value, 0) for value in (xi, eta, zeta))
+        if positive == 3 or (zero == 0 and positive == 1):
+            xi, eta, zeta = abs(xi), abs(eta), abs(zeta)
+        else:
+            xi, eta, zeta = -abs(xi), -abs(eta), -abs(zeta)
+        # A5 - A8: shorten the cell
+        if gt(abs(xi), B) or (not lt(xi, B) and not gt(xi, B) and lt(2 * eta, zeta)) or (not lt(xi, -B) and not gt(xi, -B) and lt(zeta, 0)):
+            C, eta, xi = B + C - xi * sign(xi), eta - zeta * sign(xi), xi - 2 * B * sign(xi)
+            continue
+        if gt(abs(eta), A) or (not lt(eta, A) and not gt(eta, A) and lt(2 * xi, zeta)) or (not lt(eta, -A) and not gt(eta, -A) and lt(zeta, 0)):
+            C, xi, eta = A + C - eta * sign(eta), xi - zeta * sign(eta), eta - 2 * A * sign(eta)
+            continue
+        if gt(abs(zeta), A) or (not lt(zeta, A) and not gt(zeta, A) and lt(2 * xi, eta)) or (not lt(zeta, -A) and not gt(zeta, -A) and lt(eta, 0)):
+            B, xi, zeta = A + B - zeta * sign(zeta), xi - eta * sign(zeta), zeta - 2 * A * sign(zeta)
+            continue
+        total = xi + eta + zeta + A + B
+        if lt(total, 0) or (not lt(total, 0) and not gt(total, 0) and gt(2 * (A + eta) + zeta, 0)):
+            C, xi, eta = A + B + C + xi + eta + zeta, 2 * B + xi + zeta, 2 * A + eta + zeta
+            continue
+        break
+    return np.array([A, B, C, xi, eta, zeta])
+
+# relative G6 distances of one vector to all vectors
+def g6_distances(g6, g6_lengths, index):
+    return np.sqrt(((g6 - g6[index]) ** 2).sum(axis = 1)) / (0.5 * (g6_lengths + g6_lengths[index]))
+
+# minimum spanning tree (Prim): arrays parent, child, distance of the n - 1 edges
+def spanning_tree(g6):
+    number = g6.shape[0]
+    g6_lengths = np.sqrt((g6 ** 2).sum(axis = 1))
+    in_tree = np.zeros(number, dtype = bool)
+    nearest = np.full(number, np.inf)
+    nearest_parent = np.zeros(number, dtype = np.int64)
+    parents = np.zeros(max(number - 1, 0), dtype = np.int64)
+    children = np.zeros(max(number - 1, 0), dtype = np.int64)
+    distances = np.zeros(max(number - 1, 0))
+    current = 0
+    in_tree[0] = True
+    for step in range(number - 1):
+        distance = g6_distances(g6, g6_lengths, current)
+        closer = (distance < nearest) & ~in_tree
+        nearest[closer] = distance[closer]
+        nearest_parent[closer] = current
+        current = int(np.argmin(np.where(in_tree, np.inf, nearest)))
+        parents[step], children[step], distances[step] = nearest_parent[current], current, nearest[current]
+        in_tree[current] = True
+    return parents, children, distances
+
+# cluster cells by single linkage: cluster number per cell (1 = largest cluster). With space groups the cells are reduced first.
+def cluster_cells(cells, threshold = cluster_threshold, space_groups = None):
+    g6 = g6_vectors(cells, space_groups)
+    if g6.shape[0] == 0:
+        return np.zeros(0, dtype = np.int64)
+    parents, children, distances = spanning_tree(g6)
+    # the tree is built outwards from the first cell, so every child's parent already has its root
+    roots = np.arange(g6.shape[0])
+    for parent, child, distance in zip(parents, children, distances):
+        if distance <= threshold:
+            roots[child] = roots[parent]
+    root_ids, labels, sizes = np.unique(roots, return_inverse = True, return_counts = True)
+    # number clusters by size, ties by first member
+    order = np.lexsort((np.arange(sizes.size), -sizes))
+    cluster_numbers = np.empty(sizes.size, dtype = np.int64)
+    cluster_numbers[order] = np.arange(1, sizes.size + 1)
+    return cluster_numbers[labels]
+
+# summary of clusters: [(cluster, number of cells, mean cell), ...]
+def cluster_summary(cells, clusters):
+    cells = np.asarray(cells, dtype = np.float64).reshape(-1, 6)
+    summary = []
+    for cluster in np.unique(clusters):
+        members = clusters == cluster
+        summary.append((int(cluster), int(members.sum()), tuple(np.round(cells[members].mean(axis = 0), 2))))
+    return summary
+
+
+# benchmark with generated cells or clustering of catalog results
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'catalog':
+        import autogui_catalog
+        catalog_cells = autogui_catalog.dataset_cells(sys.argv[2] if len(sys.argv) > 2 else '')
+        catalog_cells = [entry + (parse_cell(entry[3], entry[4]),) for entry in catalog_cells]
+        catalog_cells = [entry for entry in catalog_cells if entry[5] != None]
+        cells = [entry[5] for entry in catalog_cells]
+        clusters = cluster_cells(cells, space_groups = [entry[2] for entry in catalog_cells])
+        for cluster, count, mean_cell in cluster_summary(cells, clusters):
+            print('Cluster', cluster, '(' + str(count) + ' datasets), mean cell', ' '.join(str(value) for value in mean_cell))
+            for entry, entry_cluster in zip(catalog_cells, clusters):
+                if entry_cluster == cluster:
+                    print('   ', entry[2], entry[1], entry[0])
+    else:
+        random = np.random.default_rng(7)
+        forms = np.array([[78.5, 78.5, 37.1, 90, 90, 90], [61.2, 72.3, 80.0, 90, 90, 90], [54.1, 58.9, 67.2, 90, 102.3, 90]])
+        for number in (100, 1000, 5000):
+            form_of_cell = random.choice(3, number, p = [0.8, 0.15, 0.05])
+            cells = forms[form_of_cell] * (1 + random.normal(0, 0.002, (number, 6)) * [1, 1, 1, 0, 0, 0])
+            # a few outliers with a longer c axis
+            outliers = random.choice(number, 5, replace = False)
+            cells[outliers, 2] *= 1.1
+            start = time.time()
+            clusters = cluster_cells(cells, space_groups = ['P 1 21 1'] * number)
+            print(number, 'cells clustered in', round(time.time() - start, 3), 's:', ', '.join(str(count) for cluster, count, mean_cell in cluster_summary(cells, clusters)))
+            expected = np.where(np.isin(np.arange(number), outliers), -1, form_of_cell)
+            for form in range(3):
+                assert np.unique(clusters[expected == form]).size == 1
+            assert not np.isin(clusters[outliers], clusters[expected >= 0]).any()
+        # the same lattice in another setting: C2 / I2, permuted orthorhombic axes, hexagonal / rhombohedral axes
+        assert np.allclose(g6_vectors([[100, 50, 60, 90, 110, 90]], ['C 1 2 1']), g6_vectors([[97.446, 50, 60, 90, 74.648, 90]], ['I 1 2 1']), rtol = 1e-3, atol = 1)
+        assert np.allclose(g6_vectors([[40, 50, 60, 90, 90, 90]], ['P 21 21 2']), g6_vectors([[60, 40, 50, 90, 90, 90]], ['P 2 21 21']))
+        assert np.allclose(g6_vectors([[100, 100, 80, 90, 90, 120]], ['H 3']), g6_vectors([[63.596, 63.596, 63.596, 103.666, 103.666, 103.666]], ['R 3']), rtol = 1e-3, atol = 1)
+        assert parse_cell('78.1, 78.1, 37.2', '90.0, 90.0, 120.0') == [78.1, 78.1, 37.2, 90.0, 90.0, 120.0] and parse_cell('N/A', 'N/A') == None
+        print('Cell clustering OK.')
@@ -0,0 +1,297 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Free R flag expansion of reference MTZ files for AutoGUI.
+# In-process: all unique reflections of the space group up to the new resolution are generated (symmetry operators
+# from the MTZ header, CCP4 reciprocal asymmetric units, systematic absences removed) and merged with the existing
+# reflections. The existing indices are not changed (phase and anomalous columns depend on them): if one is outside the
+# asymmetric unit chosen for the symmetry, ValueError is raised and the CCP4 programs have to be used. Existing free R flags are kept, new reflections get flags from a random generator with a fixed seed,
+# so the same input always gives the same flags.
+# With CCP4: unique -> cad -> freerflag -> mtzutils in a temporary folder, failing programs are reported.
+# Run "python autogui_freer.py" for a test on a generated MTZ file (and on MTZ files from unique for every Laue class
+# if CCP4 is set up).
+
+import os
+import re
+import time
+import shutil
+import tempfile
+import numpy as np
+import autogui_mtz
+import autogui_ccp4
+
+
+free_r_seed = 20250101
+
+
+# helper function to parse a symmetry operator ("-X+1/2,-Y,Z+1/2"): rotation (3x3 integers) and translation
+def parse_operator(operator):
+    rotation = np.zeros((3, 3), dtype = np.int64)
+    translation = np.zeros(3)
+    components = operator.upper().replace(' ', '').split(',')
+    if len(components) != 3:
+        raise ValueError('Unknown symmetry operator: ' + operator)
+    for row, component in enumerate(components):
+        for sign, term in re.findall(r'([+-]?)([^+-]+)', component):
+            factor = -1 if sign == '-' else 1
+            axis = re.search('[XYZ]', term)
+            if axis != None:
+                coefficient = term.replace(axis.group(0), '').replace('*', '')
+                rotation[row, 'XYZ'.index(axis.group(0))] += factor * (int(coefficient) if coefficient != '' else 1)
+            elif '/' in term:
+                numerator, denominator = term.split('/')
+                translation[row] += factor * float(numerator) / float(denominator)
+            else:
+                translation[row] += factor * float(term)
+    return rotation, translation
+
+# reciprocal asymmetric units of the Laue classes (CCP4 conventions)
+def asu_1b(h, k, l):
+    return (l > 0) | ((l == 0) & ((h > 0) | ((h == 0) & (k >= 0))))
+
+def asu_2_m(h, k, l):
+    return (k >= 0) & ((l > 0) | ((l == 0) & (h >= 0)))
+
+def asu_mmm(h, k, l):
+    return (h >= 0) & (k >= 0) & (l >= 0)
+
+def asu_4_m(h, k, l):
+    return (l >= 0) & (((h >= 0) & (k > 0)) | ((h == 0) & (k == 0)))
+
+def asu_4_mmm(h, k, l):
+    return (h >= k) & (k >= 0) & (l >= 0)
+
+def asu_3b(h, k, l):
+    return ((h >= 0) & (k > 0)) | ((h == 0) & (k == 0) & (l >= 0))
+
+def asu_3bm(h, k, l):
+    return (h >= k) & (k >= 0) & ((k > 0) | (l >= 0))
+
+def asu_3bmx(h, k, l):
+    return (h >= k) & (k >= 0) & ((h > k) | (l >= 0))
+
+def asu_6_mmm(h, k, l):
+    return (h >= k) & (k >= 0) & (l >= 0)
+
+def asu_m3b(h, k, l):
+    return (h >= 0) & (((l >= h) & (k > h)) | ((l == h) & (k == h)))
+
+def asu_m3bm(h, k, l):
+    return (k >= l) & (l >= h) & (h >= 0)
+
+asu_functions = [asu_1b, asu_2_m, asu_mmm, asu_4_m, asu_4_mmm, asu_3b, asu_3bm, asu_3bmx, asu_6_mmm, asu_m3b, asu_m3bm]
+
+# helper function to get the rotations of the Laue group (point group rotations and their inverses, applied to indices as h R)
+def laue_rotations(operators):
+    rotations = {}
+    for rotation, translation in operators:
+        for laue_rotation in (rotation, -rotation):
+            rotations[laue_rotation.tobytes()] = laue_rotation
+    return np.array(list(rotations.values()))
+
+# helper function to get symmetry equivalent indices: array (rotations, reflections, 3)
+def equivalents(hkl, rotations):
+    return np.einsum('ni,rij->rnj', hkl, rotations)
+
+# helper function to encode indices as one integer (indices up to +-1000)
+def index_keys(hkl):
+    hkl = np.asarray(hkl, dtype = np.int64) + 1024
+    return (hkl[..., 0] * 2048 + hkl[..., 1]) * 2048 + hkl[..., 2]
+
+# helper function to choose the asymmetric unit of a Laue group: every set of equivalent indices has exactly one member in it
+def choose_asu(rotations):
+    grid = np.stack(np.meshgrid(*(np.arange(-6, 7),) * 3, indexing = 'ij'), axis = -1).reshape(-1, 3)
+    grid = grid[np.any(grid != 0, axis = 1)]
+    equivalent = equivalents(grid, rotations)
+    keys = index_keys(equivalent)
+    for asu_function in asu_functions:
+        inside = asu_function(equivalent[..., 0], equivalent[..., 1], equivalent[..., 2])
+        members = np.sort(np.where(inside, keys, -1), axis = 0)
+        distinct = (members >= 0) & np.vstack((np.ones((1, members.shape[1]), dtype = bool), members[1:] != members[:-1]))
+        if (distinct.sum(axis = 0) == 1).all():
+            return asu_function
+    raise ValueError('No asymmetric unit found for the symmetry operators')
+
+# helper function to check that indices are in the asymmetric unit (count of indices outside it)
+def outside_asu(hkl, asu_function):
+    return int(np.count_nonzero(~asu_function(hkl[:, 0], hkl[:, 1], hkl[:, 2])))
+
+# helper function to find systematically absent reflections (index unchanged by an operator, but shifted phase)
+def systematic_absences(hkl, operators):
+    absent = np.zeros(hkl.shape[0], dtype = bool)
+    for rotation, translation in operators:
+        if not translation.any():
+            continue
+        unchanged = np.all(hkl @ rotation == hkl, axis = 1)
+        shift = hkl @ translation
+        absent |= unchanged & (np.abs(shift - np.round(shift)) > 1e-3)
+    return absent
+
+# generate all unique reflections of a space group up to a resolution (one plane of h at a time, even large cells fit in memory)
+def unique_reflections(cell, operators, resolution, asu_function):
+    limits = [int(cell[axis] / resolution) + 1 for axis in range(3)]
+    k, l = np.meshgrid(np.arange(-limits[1], limits[1] + 1), np.arange(-limits[2], limits[2] + 1), indexing = 'ij')
+    k = k.ravel()
+    l = l.ravel()
+    planes = []
+    for h in range(-limits[0], limits[0] + 1):
+        plane = np.column_stack((np.full(k.size, h), k, l))
+        plane = plane[asu_function(plane[:, 0], plane[:, 1], plane[:, 2]) & np.any(plane != 0, axis = 1)]
+        plane = plane[autogui_mtz.inverse_d_squared(plane, cell) <= 1 / resolution ** 2 + 1e-9]
+        planes.append(plane[~systematic_absences(plane, operators)])
+    return np.concatenate(planes)
+
+# expand a reference MTZ to a higher resolution in-process. Returns (reflections before, reflections added, number of flag values).
+def expand_free_flags(mtz_in, mtz_out, resolution, seed = free_r_seed):
+    mtz_header, reflections = autogui_mtz.read_mtz(mtz_in)
+    free_label = autogui_mtz.free_r_label(mtz_header)
+    if free_label == '':
+        raise ValueError('No free R flag column in ' + mtz_in)
+    labels = [column.label for column in mtz_header.columns]
+    free_column = labels.index(free_label)
+    operators = [parse_operator(operator) for operator in mtz_header.symmetry]
+    if operators == []:
+        operators = [parse_operator('X,Y,Z')]
+    rotations = laue_rotations(operators)
+    asu_function = choose_asu(rotations)
+    existing = reflections[:, :3].astype(np.int64)
+    outside = outside_asu(existing, asu_function)
+    if outside > 0:
+        raise ValueError(str(outside) + ' reflections outside the asymmetric unit ' + asu_function.__name__ + ' in ' + mtz_in)
+    generated = unique_reflections(mtz_header.cell, operators, float(resolution), asu_function)
+    new = generated[~np.isin(index_keys(generated), index_keys(existing))]
+    # existing flags stay, new reflections (and existing ones without flag) get flags from the same range
+    flags = reflections[:, free_column]
+    known_flags = flags[~np.isnan(flags)]
+    if known_flags.size > 0 and known_flags.max() >= 1:
+        flag_values = int(known_flags.max()) + 1
+    else:
+        flag_values = 20
+    random = np.random.default_rng(seed)
+    added = np.full((new.shape[0], len(labels)), np.nan, dtype = np.float32)
+    added[:, :3] = new
+    added[:, free_column] = random.integers(0, flag_values, new.shape[0])
+    missing = np.isnan(flags)
+    reflections[missing, free_column] = random.integers(0, flag_values, int(missing.sum()))
+    expanded = np.concatenate((reflections, added))
+    expanded = expanded[np.lexsort((expanded[:, 2], expanded[:, 1], expanded[:, 0]))]
+    autogui_mtz.write_mtz_data(mtz_out, mtz_header, mtz_header.columns, expanded)
+    return reflections.shape[0], new.shape[0], flag_values
+
+# expand a reference MTZ with the CCP4 programs (unique, cad, freerflag, mtzutils) in a temporary folder
+def expand_free_flags_ccp4(mtz_in, mtz_out, resolution):
+    mtz_header = autogui_mtz.read_mtz_header(mtz_in)
+    free_label = autogui_mtz.free_r_label(mtz_header)
+    if free_label == '':
+        raise ValueError('No free R flag column in ' + mtz_in)
+    mtz_in = os.path.abspath(mtz_in)
+    with tempfile.TemporaryDirectory(prefix = 'autogui_freer_') as folder:
+        autogui_ccp4.run_program(['unique', 'HKLOUT', 'unique.mtz'], folder, keywords = "TITLE  Reference MTZ expansion via AutoGUI\nLABOUT F=FUNI SIGF=SIGFUNI\nSYMMETRY '" + mtz_header.space_group + "'\nRESOL " + str(resolution) + "\nCELL " + autogui_mtz.cell_text(mtz_header) + "\nEND\n")
+        autogui_ccp4.run_program(['cad', 'HKLIN1', mtz_in, 'HKLIN2', 'unique.mtz', 'HKLOUT', 'cad.mtz'], folder, keywords = "LABIN FILE 1 ALLIN\nLABIN FILE 2 ALLIN\nEND\n")
+        autogui_ccp4.run_program(['freerflag', 'HKLIN', 'cad.mtz', 'HKLOUT', 'freer.mtz'], folder, keywords = "COMPLETE FREE=" + free_label + "\nEND\n")
+        autogui_ccp4.run_program(['mtzutils', 'HKLIN', 'freer.mtz', 'HKLOUT', 'expanded.mtz'], folder, keywords = "EXCLUDE FUNI SIGFUNI\nEND\n")
+        shutil.move(os.path.join(folder, 'expanded.mtz'), mtz_out)
+
+
+# test on a generated MTZ file
+if __name__ == '__main__':
+    test_folder = tempfile.mkdtemp()
+    cell = (61.2, 72.31, 80.004, 90.0, 90.0, 90.0)
+    symmetry = ('X,Y,Z', '-X+1/2,-Y,Z+1/2', '-X,Y+1/2,-Z+1/2', 'X+1/2,-Y+1/2,-Z')
+    operators = [parse_operator(operator) for operator in symmetry]
+    rotations = laue_rotations(operators)
+    asu_function = choose_asu(rotations)
+    assert asu_function == asu_mmm
+    low = unique_reflections(cell, operators, 3.0, asu_function)
+    random = np.random.default_rng(3)
+    reflections = np.column_stack((low, random.uniform(10, 1000, low.shape[0]), random.uniform(1, 10, low.shape[0]), random.integers(0, 20, low.shape[0])))
+    mtz_in = os.path.join(test_folder, 'reference.mtz')
+    mtz_out = os.path.join(test_folder, 'reference_expanded.mtz')
+    autogui_mtz.write_mtz(mtz_in, 'P 21 21 21', 19, cell, [('FP', 'F'), ('SIGFP', 'Q'), ('FreeR_flag', 'I')], reflections, symmetry = symmetry)
+    start = time.time()
+    before, added, flag_values = expand_free_flags(mtz_in, mtz_out, 1.5)
+    print('Expanded', before, 'reflections by', added, 'to 1.5 A in', round(time.time() - start, 2), 's,', flag_values, 'flag values')
+    mtz_header, expanded = autogui_mtz.read_mtz(mtz_out)
+    # same flags for existing reflections, expected number of reflections, no absences (h00, 0k0, 00l odd)
+    old_keys = index_keys(low)
+    new_keys = index_keys(expanded[:, :3].astype(np.int64))
+    kept = np.isin(new_keys, old_keys)
+    assert kept.sum() == low.shape[0]
+    order = np.argsort(old_keys)
+    assert (expanded[kept, 5][np.argsort(new_keys[kept])] == reflections[order, 5]).all()
+    assert np.isnan(expanded[~kept, 3]).all() and not np.isnan(expanded[:, 5]).any()
+    axial = (np.count_nonzero(expanded[:, :3], axis = 1) == 1) & (expanded[:, :3].sum(axis = 1) % 2 == 1)
+    assert not axial.any()
+    volume = cell[0] * cell[1] * cell[2]
+    expected = 4 / 3 * np.pi / 1.5 ** 3 * volume / 8
+    assert abs(expanded.shape[0] / expected - 1) < 0.05
+    # the same input gives the same flags
+    expand_free_flags(mtz_in, mtz_out + '2', 1.5)
+    assert (autogui_mtz.read_mtz(mtz_out + '2')[1][:, 5] == expanded[:, 5]).all()
+    # indices outside the asymmetric unit are not moved into it
+    autogui_mtz.write_mtz(mtz_in + '2', 'P 21 21 21', 19, cell, [('FP', 'F'), ('SIGFP', 'Q'), ('FreeR_flag', 'I')], reflections * [-1, 1, 1, 1, 1, 1], symmetry = symmetry)
+    try:
+        expand_free_flags(mtz_in + '2', mtz_out + '2', 1.5)
+        raise AssertionError('Reflections outside the asymmetric unit were accepted')
+    except ValueError as asu_error:
+        print(asu_error)
+    # hexagonal and monoclinic groups
+    for symmetry in (('X,Y,Z', '-Y,X-Y,Z+1/3', '-X+Y,-X,Z+2/3', 'Y,X,-Z', 'X-Y,-Y,-Z+2/3', '-X,-X+Y,-Z+1/3'), ('X,Y,Z', '-X,Y+1/2,-Z'), ('X,Y,Z', '-X,-Y,Z', '-Y,X,Z', 'Y,-X,Z')):
+        operators = [parse_operator(operator) for operator in symmetry]
+        print(choose_asu(laue_rotations(operators)).__name__, 'for', ' '.join(symmetry))
+    # asymmetric units against MTZ files written by unique, one space group of every Laue class
+    if shutil.which('unique') != None:
+        laue_classes = {'P 1': '61.2 72.31 80.004 80.5 101.5 95.2', 'P 1 2 1': '61.2 72.31 80.004 90 101.5 90', 'P 2 2 2': '61.2 72.31 80.004 90 90 90',
+                        'P 4': '61.2 61.2 80.004 90 90 90', 'P 4 2 2': '61.2 61.2 80.004 90 90 90', 'P 3': '61.2 61.2 80.004 90 90 120',
+                        'P 3 1 2': '61.2 61.2 80.004 90 90 120', 'P 3 2 1': '61.2 61.2 80.004 90 90 120', 'P 6': '61.2 61.2 80.004 90 90 120',
+                        'P 6 2 2': '61.2 61.2 80.004 90 90 120', 'P 2 3': '61.2 61.2 61.2 90 90 90', 'P 4 3 2': '61.2 61.2 61.2 90 90 90'}
+        for space_group, unique_cell in laue_classes.items():
+            autogui_ccp4.run_program(['unique', 'HKLOUT', 'unique.mtz'], test_folder, keywords = "LABOUT F=FUNI SIGF=SIGFUNI\nSYMMETRY '" + space_group + "'\nRESOL 4.0\nCELL " + unique_cell + "\nEND\n")
+            unique_header, unique_data = autogui_mtz.read_mtz(os.path.join(test_folder, 'unique.mtz'))
+            operators = [parse_operator(operator) for operator in unique_header.symmetry]
+            asu_function = choose_asu(laue_rotations(operators))
+            unique_hkl = unique_data[:, :3].astype(np.int64)
+            generated = unique_reflections(unique_header.cell, operators, 4.0, asu_function)
+            print(space_group + ':', asu_function.__name__, unique_hkl.shape[0], 'reflections from unique,', generated.shape[0], 'generated')
+            assert outside_asu(unique_hkl, asu_function) == 0
+            assert abs(generated.shape[0] - unique_hkl.shape[0]) <= 0.01 * unique_hkl.shape[0]
+    else:
+        print('CCP4 not set up, asymmetric units not checked against unique')
+    # CCP4 route with stub programs: each one checks its input files and writes its name and keywords to HKLOUT
+    stub_folder = os.path.join(test_folder, 'bin')
+    os.mkdir(stub_folder)
+    stub = '#!/bin/sh\nprogram=$(basename "$0")\noutput=""\nwhile [ $# -gt 0 ]; do\n    case "$1" in\n' + \
+           '        HKLIN|HKLIN1|HKLIN2) [ -f "$2" ] || { echo "$2 not found"; exit 1; } ;;\n        HKLOUT) output="$2" ;;\n    esac\n    shift\ndone\n' + \
+           '{ echo "$program"; cat; } > "$output"\n'
+    for program in ('unique', 'cad', 'freerflag', 'mtzutils'):
+        with open(os.path.join(stub_folder, program), 'wt') as stub_file:
+            stub_file.write(stub)
+        os.chmod(os.path.join(stub_folder, program), 0o755)
+    system_path = os.environ['PATH']
+    os.environ['PATH'] = stub_folder + os.pathsep + system_path
+    try:
+        expand_free_flags_ccp4(mtz_in, mtz_out + '3', 1.5)
+    finally:
+        os.environ['PATH'] = system_path
+    with open(mtz_out + '3', 'rt') as stub_output:
+        assert stub_output.read() == 'mtzutils\nEXCLUDE FUNI SIGFUNI\nEND\n'
+    shutil.rmtree(stub_folder)
+    for test_file in os.listdir(test_folder):
+        os.remove(os.path.join(test_folder, test_file))
+    os.rmdir(test_folder)
+    print('Free R flag expansion OK.')
@@ -0,0 +1,515 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Diffraction image reading and rendering for the image viewer of AutoGUI classic.
+# Mini-cbf (Pilatus/EIGER CBF) and EIGER HDF5 frames are decoded with NumPy and rendered with PIL,
+# so no temporary files and no external programs are needed. Other formats return None and
+# AutoGUI falls back to Adxv + ImageMagick. Uncompressed cbf files and contiguous (unchunked) EIGER data
+# are memory-mapped: the viewer pages in only the rows it shows, the full frame is never loaded.
+
+import os
+import re
+import io
+import mmap
+import base64
+import threading
+import collections
+import numpy as np
+from PIL import Image
+import autogui_cbf
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+try:
+    import hdf5plugin      # registers bitshuffle/LZ4 filters used by DECTRIS detectors
+except ImportError:
+    hdf5plugin = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+masked_value = -1            # pixels without data (module gaps, dead pixels) after reading
+overloaded_value = np.iinfo(np.int64).max        # overloaded pixels in summed EIGER frames
+eiger_layouts = {}
+frame_maps = collections.OrderedDict()      # memory maps of uncompressed image data (False if the data can't be mapped)
+frame_maps_limit = 64                       # every map keeps a file open
+map_band_rows = 224          # rows per band when a mapped frame is read for the pyramid (even and a multiple of 7)
+
+# least recently used caches with a byte budget: decoded frames (a summed 16M EIGER frame is ~145 MB)
+# and rendered images for the viewer (a few hundred kB each)
+image_caches = {'frames': collections.OrderedDict(), 'display': collections.OrderedDict()}
+cache_budgets = {'frames': 768 * 1024 * 1024, 'display': 64 * 1024 * 1024}
+# at most an eighth of the available memory on small machines and shared login nodes
+if psutil != None:
+    cache_budgets['frames'] = max(64 * 1024 * 1024, min(cache_budgets['frames'], psutil.virtual_memory().available // 8))
+cache_used = {'frames': 0, 'display': 0}
+cache_lock = threading.Lock()
+display_rendering = {}      # display key -> threading.Event of a render in progress (viewer and prefetch share it)
+
+# display colours: index 0-253 grey scale (spots dark), 254 overloaded pixels, 255 masked pixels
+display_palette = []
+for grey in range(254):
+    display_palette.extend([grey, grey, grey])
+display_palette.extend([255, 0, 0])
+display_palette.extend([176, 196, 222])
+
+
+# helper function to get an entry from a cache, None if it is not cached
+def cache_get(cache_name, key):
+    with cache_lock:
+        cache = image_caches[cache_name]
+        if key not in cache:
+            return None
+        cache.move_to_end(key)
+        return cache[key][0]
+
+# helper function to add an entry to a cache, the least recently used entries are dropped until it fits the budget
+def cache_put(cache_name, key, value, size):
+    if size > cache_budgets[cache_name]:
+        return
+    with cache_lock:
+        cache = image_caches[cache_name]
+        if key in cache:
+            cache_used[cache_name] = cache_used[cache_name] - cache.pop(key)[1]
+        cache[key] = (value, size)
+        cache_used[cache_name] = cache_used[cache_name] + size
+        while cache_used[cache_name] > cache_budgets[cache_name]:
+            cache_used[cache_name] = cache_used[cache_name] - cache.popitem(last = False)[1][1]
+
+# helper function to empty the caches
+def cache_clear():
+    with cache_lock:
+        for cache_name in image_caches:
+            image_caches[cache_name].clear()
+            cache_used[cache_name] = 0
+        frame_maps.clear()
+
+# helper function to identify image files by path, size and modification time (rewritten files are read again)
+def files_key(image):
+    if isinstance(image, str):
+        image = [image]
+    key = []
+    for image_path in image:
+        try:
+            image_stat = os.stat(image_path)
+            key.append((image_path, image_stat.st_size, image_stat.st_mtime_ns))
+        except OSError:
+            key.append((image_path, None, None))
+    return tuple(key)
+
+# helper function to read one image file, None if the format is not supported
+def read_image(image_path):
+    name = image_path
+    for suffix in ('.gz', '.bz2'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    if name.endswith('.cbf'):
+        return autogui_cbf.read_cbf(image_path)
+    return None
+
+# helper function to get the frame layout of EIGER data files: [(data file, first image number, number of frames, frames per chunk), ...]
+def eiger_layout(data_files):
+    layout_key = tuple(data_files)
+    if layout_key not in eiger_layouts:
+        layout = []
+        first_image = 1
+        for data_file in data_files:
+            with h5py.File(data_file, 'r') as h5file:
+                dataset = h5file['/entry/data/data']
+                frames = dataset.shape[0]
+                if dataset.chunks != None:
+                    chunk_frames = dataset.chunks[0]
+                else:
+                    chunk_frames = 1
+            layout.append((data_file, first_image, frames, chunk_frames))
+            first_image = first_image + frames
+        eiger_layouts[layout_key] = layout
+    return eiger_layouts[layout_key]
+
+# helper function to find the data file and frame (0-based) of an image number in EIGER data files
+def eiger_frame_location(data_files, image_number):
+    for data_file, first_image, frames, chunk_frames in eiger_layout(data_files):
+        if image_number < first_image + frames:
+            return data_file, image_number - first_image
+    return None, None
+
+# helper function to read (and sum) frames from EIGER HDF5 data files, None if h5py is not available.
+# The frame range may span several data files. Frames are read in blocks that follow the HDF5 chunks
+# (every chunk is decompressed once) into one reused buffer and added to a 64-bit sum.
+# Pixels without data in any frame become masked_value, pixels overloaded in any frame become overloaded_value.
+def read_eiger(data_files, image_number, number_of_frames = 1, overload = None):
+    if h5py == None:
+        return None
+    last_image = image_number + number_of_frames - 1
+    summed = None
+    for data_file, first_image, frames, chunk_frames in eiger_layout(data_files):
+        start = max(image_number, first_image) - first_image
+        stop = min(last_image, first_image + frames - 1) - first_image + 1
+        if start >= stop:
+            continue
+        with h5py.File(data_file, 'r') as h5file:
+            dataset = h5file['/entry/data/data']
+            if summed is None:
+                gap_value = np.iinfo(dataset.dtype).max
+                summed = np.zeros(dataset.shape[1:], dtype = np.int64)
+                peak = np.zeros(dataset.shape[1:], dtype = dataset.dtype)
+                buffer = np.empty((chunk_frames,) + dataset.shape[1:], dtype = dataset.dtype)
+            if buffer.shape[0] < chunk_frames:
+                buffer = np.empty((chunk_frames,) + dataset.shape[1:], dtype = dataset.dtype)
+            block_start = start
+            while block_start < stop:
+                block_stop = min(stop, (block_start // chunk_frames + 1) * chunk_frames)
+                block = buffer[:block_stop - block_start]
+                dataset.read_direct(block, np.s_[block_start:block_stop], np.s_[0:block_stop - block_start])
+                for frame in block:
+                    np.add(summed, frame, out = summed)
+                    np.maximum(peak, frame, out = peak)
+                block_start = block_stop
+    if summed is None:
+        return None
+    if overload != None:
+        summed[(peak >= overload) & (peak != gap_value)] = overloaded_value
+    summed[peak == gap_value] = masked_value
+    return summed
+
+# helper function to map the pixels of an uncompressed cbf file (x-CBF_NONE, 32 bit integers), None if the file can't be mapped
+def map_cbf(image_path):
+    if not image_path.endswith('.cbf'):
+        return None
+    with open(image_path, 'rb') as imagefile:
+        content = imagefile.read(65536)
+    binary_start = content.find(autogui_cbf.cbf_binary_start)
+    if binary_start < 0:
+        return None
+    header = content[:binary_start].decode('latin-1')
+    if re.search(r'conversions="?x-CBF_NONE', header) == None or re.search(r'signed 32-bit integer', header) == None:
+        return None
+    fastest = int(re.search(r'X-Binary-Size-Fastest-Dimension:\s*(\d+)', header).group(1))
+    second = int(re.search(r'X-Binary-Size-Second-Dimension:\s*(\d+)', header).group(1))
+    if re.search(r'BIG_ENDIAN', header) != None:
+        dtype = '>i4'
+    else:
+        dtype = '<i4'
+    return np.memmap(image_path, dtype = dtype, mode = 'r', offset = binary_start + 4, shape = (second, fastest))
+
+# helper function to map the frames of EIGER data files that are stored contiguous and uncompressed:
+# [(frames (memory map), first image number, number of frames), ...], None if any file can't be mapped
+def map_eiger(data_files):
+    if h5py == None:
+        return None
+    mapped_files = []
+    for data_file, first_image, frames, chunk_frames in eiger_layout(data_files):
+        with h5py.File(data_file, 'r') as h5file:
+            dataset = h5file['/entry/data/data']
+            if dataset.chunks != None or dataset.compression != None:
+                return None
+            offset = dataset.id.get_offset()
+            if offset == None:
+                return None
+            mapped_files.append((np.memmap(data_file, dtype = dataset.dtype, mode = 'r', offset = offset, shape = dataset.shape), first_image, frames))
+    return mapped_files
+
+# helper function to get the memory map of an image (file or list of EIGER data files) through frame_maps, None if it can't be mapped
+def map_image(image, image_key = None):
+    if image_key == None:
+        image_key = files_key(image)
+    with cache_lock:
+        frame_map = frame_maps.get(image_key)
+        if frame_map is not None:
+            frame_maps.move_to_end(image_key)
+    if frame_map is None:
+        try:
+            if isinstance(image, str):
+                frame_map = map_cbf(image)
+            else:
+                frame_map = map_eiger(image)
+        except (OSError, ValueError, KeyError, AttributeError):
+            frame_map = None
+        if frame_map is None:
+            frame_map = False
+        with cache_lock:
+            frame_maps[image_key] = frame_map
+            while len(frame_maps) > frame_maps_limit:
+                frame_maps.popitem(last = False)
+    if frame_map is False:
+        return None
+    return frame_map
+
+# helper function to drop the pages of a memory map that were read (they are reloaded from the file when needed again)
+def release_pages(frame_map):
+    if isinstance(frame_map, np.memmap):
+        frame_map = [(frame_map, None, None)]
+    for frames, first_image, frame_count in frame_map:
+        if getattr(frames, '_mmap', None) != None and hasattr(mmap, 'MADV_DONTNEED'):
+            frames._mmap.madvise(mmap.MADV_DONTNEED)
+
+# helper function to read a region of interest of a frame (rows and columns are (start, stop)), only the rows needed are
+# paged in for mapped images. Values follow read_image/read_eiger (masked_value, overloaded_value for summed EIGER frames).
+# Images that can't be mapped are decoded completely (through the cache).
+def read_region(image, image_number, number_of_frames, overload, rows, columns, image_key = None):
+    frame_map = map_image(image, image_key)
+    if frame_map is None:
+        frame = load_frame(image, image_number, number_of_frames, overload, image_key)
+        if frame is None:
+            return None
+        return frame[rows[0]:rows[1], columns[0]:columns[1]]
+    if isinstance(image, str):
+        return np.array(frame_map[rows[0]:rows[1], columns[0]:columns[1]], dtype = np.int32)
+    last_image = image_number + number_of_frames - 1
+    summed = None
+    for frames, first_image, frame_count in frame_map:
+        start = max(image_number, first_image) - first_image
+        stop = min(last_image, first_image + frame_count - 1) - first_image + 1
+        for frame_number in range(start, stop):
+            part = frames[frame_number, rows[0]:rows[1], columns[0]:columns[1]]
+            if summed is None:
+                gap_value = np.iinfo(frames.dtype).max
+                summed = np.zeros(part.shape, dtype = np.int64)
+                peak = np.zeros(part.shape, dtype = frames.dtype)
+            np.add(summed, part, out = summed)
+            np.maximum(peak, part, out = peak)
+    if summed is None:
+        return None
+    if overload != None:
+        summed[(peak >= overload) & (peak != gap_value)] = overloaded_value
+    summed[peak == gap_value] = masked_value
+    return summed
+
+# helper function to get the shape of a pyramid level (level 0 of a mapped image is a description, see map_pyramid)
+def level_shape(level):
+    if isinstance(level, dict):
+        return level['shape']
+    return level.shape
+
+# helper function to get a part of a pyramid level
+def level_region(level, rows, columns):
+    if isinstance(level, dict):
+        return read_region(level['image'], level['image_number'], level['number_of_frames'], level['overload'], rows, columns, level['image_key'])
+    return level[rows[0]:rows[1], columns[0]:columns[1]]
+
+# helper function to build the pyramid of a mapped image band by band, so the full frame is never in memory.
+# Level 0 stays on disk (a description for level_region) with a sample of every 7th pixel for the display strength.
+def map_pyramid(image, image_number, number_of_frames, overload, image_key, display_size = 800):
+    frame_map = map_image(image, image_key)
+    if isinstance(image, str):
+        shape = frame_map.shape
+    else:
+        shape = frame_map[0][0].shape[1:]
+    bands = []
+    samples = []
+    for band_start in range(0, shape[0], map_band_rows):
+        band = read_region(image, image_number, number_of_frames, overload, (band_start, min(shape[0], band_start + map_band_rows)), (0, shape[1]), image_key)
+        if band is None:
+            return None
+        samples.append(band[::7, ::7].copy())
+        bands.append(downsample_max(band))
+        release_pages(frame_map)
+    first_level = {'image': image, 'image_number': image_number, 'number_of_frames': number_of_frames, 'overload': overload,
+                   'image_key': image_key, 'shape': shape, 'sample': np.concatenate(samples)}
+    pyramid = [first_level, np.concatenate(bands)]
+    while max(pyramid[-1].shape) > display_size:
+        pyramid.append(downsample_max(pyramid[-1]))
+    return pyramid
+
+# helper function to get the count value shown black, from a sample of the whole frame (higher contrast shows weak spots darker)
+def display_strength(frame, contrast = 1.0):
+    if isinstance(frame, dict):
+        sample = frame['sample']
+    else:
+        sample = frame[::7, ::7]
+    sample = sample[sample >= 0]
+    if sample.size > 0:
+        return max(float(np.partition(sample, int(sample.size * 0.995))[int(sample.size * 0.995)]) * 2.0 / contrast, 4.0)
+    return 4.0
+
+# helper function to map counts to display colours (dark spots on white like Adxv) and resize to the display size.
+# box is the part of the frame to show (PIL resize box, fractions of pixels allowed).
+def colour_frame(frame, size, overload, strong, box = None, resample = Image.BOX):
+    darkness = np.clip(frame, 0, strong).astype(np.float32)
+    darkness *= np.float32(253.0 / strong)
+    index = 253 - np.asarray(Image.fromarray(darkness.astype(np.uint8), 'L').resize(size, resample, box))
+    # overloaded pixels stay visible even if they are a single pixel, masked areas are shown where they dominate
+    if overload != None:
+        overloaded = frame >= overload
+        if overloaded.any():
+            overloaded = np.asarray(Image.fromarray(overloaded.view(np.uint8) * np.uint8(255), 'L').resize(size, resample, box))
+            index[overloaded > 0] = 254
+    masked = frame < 0
+    if masked.any():
+        masked = np.asarray(Image.fromarray(masked.view(np.uint8) * np.uint8(255), 'L').resize(size, resample, box))
+        index[masked > 127] = 255
+    image = Image.fromarray(index, 'P')
+    image.putpalette(display_palette)
+    return image
+
+# helper function to halve a frame with the maximum of 2x2 pixel blocks (weak spots and overloads survive, masked only if the whole block is masked)
+def downsample_max(frame):
+    if frame.shape[0] % 2 == 1 or frame.shape[1] % 2 == 1:
+        frame = np.pad(frame, ((0, frame.shape[0] % 2), (0, frame.shape[1] % 2)), constant_values = masked_value)
+    return np.maximum(np.maximum(frame[0::2, 0::2], frame[0::2, 1::2]), np.maximum(frame[1::2, 0::2], frame[1::2, 1::2]))
+
+# helper function to build the image pyramid of a frame: full frame, then halved with block maxima down to the display size
+def build_pyramid(frame, display_size = 800):
+    pyramid = [frame]
+    while max(pyramid[-1].shape) > display_size:
+        pyramid.append(downsample_max(pyramid[-1]))
+    return pyramid
+
+# helper function to render a part of a frame from its pyramid. view = [x0, y0, x1, y1] in detector pixels (pixel edges),
+# the level used has at least one pixel per display pixel, so nothing is averaged over more than 2x2 pixels of a level
+def render_view(pyramid, view, size, overload = None, strong = None, contrast = 1.0):
+    if strong == None:
+        strong = display_strength(pyramid[0], contrast)
+    pixels_per_point = (view[2] - view[0]) / size[0]
+    level = 0
+    while level + 1 < len(pyramid) and 2 ** (level + 1) <= pixels_per_point:
+        level = level + 1
+    level_scale = 2 ** level
+    level_view = [coordinate / level_scale for coordinate in view]
+    x0 = max(0, int(np.floor(level_view[0])))
+    y0 = max(0, int(np.floor(level_view[1])))
+    x1 = min(level_shape(pyramid[level])[1], int(np.ceil(level_view[2])))
+    y1 = min(level_shape(pyramid[level])[0], int(np.ceil(level_view[3])))
+    part = level_region(pyramid[level], (y0, y1), (x0, x1))
+    box = (level_view[0] - x0, level_view[1] - y0, level_view[2] - x0, level_view[3] - y0)
+    # zoomed in further than one pixel per display pixel: show pixels as blocks
+    if pixels_per_point < 1:
+        resample = Image.NEAREST
+    else:
+        resample = Image.BOX
+    return colour_frame(part, size, overload, strong, box, resample)
+
+# helper function to get the size of a whole frame shrunk to the viewer size
+def fit_size(frame_shape, display_size = 800):
+    scale = display_size / max(frame_shape)
+    return (max(1, round(frame_shape[1] * scale)), max(1, round(frame_shape[0] * scale)))
+
+# helper function to render a whole frame for the viewer
+def render_frame(frame, overload = None, display_size = 800, contrast = 1.0):
+    return render_view(build_pyramid(frame, display_size), [0, 0, frame.shape[1], frame.shape[0]], fit_size(frame.shape, display_size), overload, None, contrast)
+
+# helper function to get a decoded frame through the cache. image is an image file or a list of EIGER data files,
+# for EIGER data number_of_frames frames starting at image_number are summed. Cached frames are read-only.
+def load_frame(image, image_number = 1, number_of_frames = 1, overload = None, image_key = None):
+    if image_key == None:
+        image_key = files_key(image)
+    if isinstance(image, str):
+        key = (image_key,)
+    else:
+        key = (image_key, image_number, number_of_frames, overload)
+    frame = cache_get('frames', key)
+    if frame is None:
+        if isinstance(image, str):
+            frame = read_image(image)
+        else:
+            frame = read_eiger(image, image_number, number_of_frames, overload)
+        if frame is None:
+            return None
+        frame.flags.writeable = False
+        cache_put('frames', key, frame, frame.nbytes)
+    return frame
+
+# helper function to get the viewer data of an image through the caches: (PNG data, image size), None if the format is not supported
+def load_display(image, image_number = 1, number_of_frames = 1, overload = None, contrast = 1.0, display_size = 800):
+    image_key = files_key(image)
+    key = (image_key, image_number, number_of_frames, overload, contrast, display_size)
+    rendered_data = cache_get('display', key)
+    if rendered_data != None:
+        return rendered_data
+    # an image that is rendered already (e.g. prefetched) is waited for instead of rendered a second time
+    with cache_lock:
+        rendering = display_rendering.get(key)
+        if rendering == None:
+            display_rendering[key] = threading.Event()
+    if rendering != None:
+        rendering.wait()
+        rendered_data = cache_get('display', key)
+        if rendered_data != None:
+            return rendered_data
+        return render_display(image, image_number, number_of_frames, overload, contrast, display_size, image_key, key)
+    try:
+        return render_display(image, image_number, number_of_frames, overload, contrast, display_size, image_key, key)
+    finally:
+        with cache_lock:
+            display_rendering.pop(key).set()
+
+# helper function to render the viewer data of an image and put it into the display cache
+def render_display(image, image_number, number_of_frames, overload, contrast, display_size, image_key, key):
+    pyramid = load_pyramid(image, image_number, number_of_frames, overload, image_key, display_size)
+    if pyramid == None:
+        return None
+    # summed EIGER frames carry their own overload marks
+    if overload != None and not isinstance(image, str):
+        overload = overloaded_value
+    frame_shape = level_shape(pyramid[0])
+    rendered_image = render_view(pyramid, [0, 0, frame_shape[1], frame_shape[0]], fit_size(frame_shape, display_size), overload, None, contrast)
+    rendered_data = (image_data(rendered_image), rendered_image.size)
+    cache_put('display', key, rendered_data, len(rendered_data[0]))
+    return rendered_data
+
+# helper function to get the pyramid of a frame through the cache
+def load_pyramid(image, image_number = 1, number_of_frames = 1, overload = None, image_key = None, display_size = 800):
+    if image_key == None:
+        image_key = files_key(image)
+    key = ('pyramid', image_key, image_number, number_of_frames, overload, display_size)
+    pyramid = cache_get('frames', key)
+    if pyramid == None:
+        # uncompressed images are read from their memory map, band by band
+        if map_image(image, image_key) is not None:
+            pyramid = map_pyramid(image, image_number, number_of_frames, overload, image_key, display_size)
+            if pyramid == None:
+                return None
+            cache_put('frames', key, pyramid, pyramid[0]['sample'].nbytes + sum(level.nbytes for level in pyramid[1:]))
+            return pyramid
+        # level 0 is the frame itself, it is counted (and evicted) in the frame cache, only the smaller levels are kept here
+        frame = load_frame(image, image_number, number_of_frames, overload, image_key)
+        if frame is None:
+            return None
+        levels = cache_get('frames', key + ('levels',))
+        if levels == None:
+            levels = build_pyramid(frame, display_size)[1:]
+            cache_put('frames', key + ('levels',), levels, sum(level.nbytes for level in levels))
+        pyramid = [frame] + levels
+    return pyramid
+
+# helper function to get the viewer data of a part of an image (zoomed view) through the caches: (PNG data, image size),
+# None if the format is not supported. The contrast is taken from the whole frame, so it does not change while zooming.
+def load_view(image, image_number, number_of_frames, overload, view, size, contrast = 1.0):
+    image_key = files_key(image)
+    key = (image_key, image_number, number_of_frames, overload, contrast, tuple(view), tuple(size))
+    rendered_data = cache_get('display', key)
+    if rendered_data == None:
+        pyramid = load_pyramid(image, image_number, number_of_frames, overload, image_key)
+        if pyramid == None:
+            return None
+        if overload != None and not isinstance(image, str):
+            overload = overloaded_value
+        rendered_image = render_view(pyramid, view, size, overload, None, contrast)
+        rendered_data = (image_data(rendered_image), rendered_image.size)
+        cache_put('display', key, rendered_data, len(rendered_data[0]))
+    return rendered_data
+
+# helper function to turn a rendered image into data for the image viewer (sg.Graph.draw_image)
+def image_data(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format = 'PNG', compress_level = 1)
+    return base64.b64encode(buffer.getvalue())
@@ -0,0 +1,225 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Log viewer backend for AutoGUI classic.
+# The log is memory-mapped, line starts are indexed in the background (numpy search for newlines, a few MB at a
+# time), so the first page can be shown right away even for very large logs. Only the requested lines are decoded.
+# Appended data is picked up by refresh_log (the file is mapped again when it has grown). A log that was rewritten
+# (another file, shorter, or its first or last indexed bytes changed) is indexed again from the start. Regular expression search runs on the mapped bytes in both directions.
+# Run "python autogui_logview.py" for a test with a generated 200 MB log.
+
+import os
+import re
+import mmap
+import threading
+import numpy as np
+
+
+index_chunk = 8 * 1024 * 1024               # bytes indexed per step
+search_chunk = 4 * 1024 * 1024              # bytes searched per step backwards
+fingerprint_size = 4096                     # bytes compared at the start and the end of the mapped log to detect rewrites
+
+
+# open a log: state dict used by the other functions. The first chunk is indexed right away, the rest by index_thread.
+def open_log(log_path):
+    log = {'path': log_path, 'file': open(log_path, 'rb'), 'map': None, 'size': 0, 'offsets': np.zeros(1, dtype = np.int64),
+           'indexed': 0, 'lock': threading.Lock(), 'closed': False, 'identity': None, 'fingerprint': None}
+    map_log(log)
+    index_step(log)
+    threading.Thread(target=index_thread, args=(log,), daemon=True).start()
+    return log
+
+# helper function to map the log file as it is now (empty files can't be mapped)
+def map_log(log):
+    file_stat = os.fstat(log['file'].fileno())
+    size = file_stat.st_size
+    old_map = log['map']
+    log['map'] = mmap.mmap(log['file'].fileno(), 0, access = mmap.ACCESS_READ) if size > 0 else None
+    log['size'] = size
+    log['identity'] = (file_stat.st_dev, file_stat.st_ino)
+    log['fingerprint'] = log_fingerprint(log['file'].fileno(), size)
+    if old_map != None:
+        old_map.close()
+
+# helper function for the first and last bytes of the first size bytes of a file
+def log_fingerprint(file_descriptor, size):
+    length = min(size, fingerprint_size)
+    return (os.pread(file_descriptor, length, 0), os.pread(file_descriptor, length, size - length))
+
+# helper function to index the next chunk of the log, False if everything is indexed
+def index_step(log):
+    with log['lock']:
+        if log['closed'] or log['indexed'] >= log['size']:
+            return False
+        start = log['indexed']
+        end = min(start + index_chunk, log['size'])
+        chunk = np.frombuffer(log['map'], dtype = np.uint8, count = end - start, offset = start)
+        newlines = np.flatnonzero(chunk == 10) + start + 1
+        del chunk
+        # a newline as last byte of the file doesn't start a line yet
+        log['offsets'] = np.concatenate((log['offsets'], newlines[newlines < log['size']]))
+        log['indexed'] = end
+        return True
+
+# thread to index the rest of the log
+def index_thread(log):
+    while index_step(log):
+        pass
+
+# check the log for appended data: True if it changed. A rewritten log is indexed again from the start.
+def refresh_log(log):
+    try:
+        file_stat = os.stat(log['path'])
+        size = file_stat.st_size
+        # a rerun may write a new log.txt (other file) or truncate and write the old one again (same file, even if it gets larger)
+        rewritten = (file_stat.st_dev, file_stat.st_ino) != log['identity'] or size < log['size']
+        if rewritten == False and log['size'] > 0:
+            with open(log['path'], 'rb') as log_file:
+                rewritten = log_fingerprint(log_file.fileno(), log['size']) != log['fingerprint']
+    except OSError:
+        return False
+    if rewritten == False and size == log['size']:
+        return False
+    with log['lock']:
+        if rewritten == True:
+            log['file'].close()
+            log['file'] = open(log['path'], 'rb')
+            log['offsets'] = np.zeros(1, dtype = np.int64)
+            log['indexed'] = 0
+        elif log['indexed'] == log['size'] and log['size'] > 0 and log['offsets'][-1] != log['size'] and log['map'][log['size'] - 1] == 10:
+            # the last line was complete, the appended data starts a new one
+            log['offsets'] = np.append(log['offsets'], log['size'])
+        map_log(log)
+    threading.Thread(target=index_thread, args=(log,), daemon=True).start()
+    return True
+
+# number of lines indexed so far and whether indexing is done
+def line_count(log):
+    return log['offsets'].size if log['size'] > 0 else 0, log['indexed'] >= log['size']
+
+# text of count lines from first_line (0-based)
+def page_text(log, first_line, count):
+    with log['lock']:
+        offsets = log['offsets']
+        if log['map'] == None or first_line >= offsets.size:
+            return ''
+        first_line = max(first_line, 0)
+        start = offsets[first_line]
+        end = offsets[first_line + count] if first_line + count < offsets.size else (log['indexed'] if log['indexed'] < log['size'] else log['size'])
+        return log['map'][start:end].decode('utf-8', errors = 'replace').rstrip('\n')
+
+# helper function for the line of a byte position
+def line_of(log, position):
+    return int(np.searchsorted(log['offsets'], position, side = 'right')) - 1
+
+# line number of the next match of a regular expression after (or before) a line, None if there is none.
+# ^ and $ match at line starts and ends.
+def search_log(log, pattern, from_line, backwards = False):
+    regex = re.compile(pattern.encode('utf-8'), re.MULTILINE)
+    with log['lock']:
+        if log['map'] == None:
+            return None
+        offsets = log['offsets']
+        if backwards == False:
+            start = offsets[from_line + 1] if from_line + 1 < offsets.size else log['indexed']
+            found = regex.search(log['map'], start, log['indexed'])
+            return None if found == None else line_of(log, found.start())
+        end = offsets[min(max(from_line, 0), offsets.size - 1)]
+        while end > 0:
+            start = max(end - search_chunk, 0)
+            # search from a line start, a match can't be cut at the beginning
+            start = offsets[line_of(log, start)]
+            last = None
+            for last in regex.finditer(log['map'], start, end):
+                pass
+            if last != None:
+                return line_of(log, last.start())
+            end = start
+    return None
+
+# close a log
+def close_log(log):
+    with log['lock']:
+        log['closed'] = True
+        if log['map'] != None:
+            log['map'].close()
+            log['map'] = None
+        log['file'].close()
+
+
+# test with a generated log
+if __name__ == '__main__':
+    import time
+    import tempfile
+    log_path = os.path.join(tempfile.mkdtemp(), 'log.txt')
+    block = ''.join(' %8d  Refining cell and orientation, cycle %d of this block  ...........\n' % (number, number % 7) for number in range(100000))
+    with open(log_path, 'w') as log_file:
+        for repeat in range(int(200e6 / len(block)) + 1):
+            log_file.write(block)
+        log_file.write('  High resolution limit   1.83  1.86\n')
+    start = time.time()
+    log = open_log(log_path)
+    first_page = page_text(log, 0, 30)
+    print('Opened', round(os.path.getsize(log_path) / 1e6), 'MB log, first page after', round((time.time() - start) * 1000, 1), 'ms')
+    assert first_page.splitlines()[0].strip().startswith('0  Refining')
+    while line_count(log)[1] == False:
+        time.sleep(0.05)
+    lines = line_count(log)[0]
+    print('Indexed', lines, 'lines after', round(time.time() - start, 2), 's')
+    assert lines == (int(200e6 / len(block)) + 1) * 100000 + 1
+    assert page_text(log, lines - 1, 30) == '  High resolution limit   1.83  1.86'
+    start = time.time()
+    found = search_log(log, r'High resolution limit\s+[\d.]+', 0)
+    print('Search forward over the whole log in', round(time.time() - start, 2), 's')
+    assert found == lines - 1
+    start = time.time()
+    assert search_log(log, r'^\s+5\s', lines - 1, backwards = True) == lines - 1 - 100000 + 5
+    print('Search backwards in', round((time.time() - start) * 1000, 1), 'ms')
+    assert search_log(log, 'no such line', 0) == None and search_log(log, 'no such line', lines - 1, backwards = True) == None
+    # appended lines, partial last line and a rewritten log
+    with open(log_path, 'a') as log_file:
+        log_file.write('appended line\npartial')
+    assert refresh_log(log)
+    while line_count(log)[1] == False:
+        time.sleep(0.05)
+    assert page_text(log, lines, 5) == 'appended line\npartial'
+    with open(log_path, 'w') as log_file:
+        log_file.write('new log\n')
+    assert refresh_log(log)
+    while line_count(log)[1] == False:
+        time.sleep(0.05)
+    assert line_count(log)[0] == 1 and page_text(log, 0, 30) == 'new log'
+    assert refresh_log(log) == False
+    # a rerun that writes the same file again and gets past the old size, and a new file of the same size
+    with open(log_path, 'w') as log_file:
+        log_file.write('rerun 1\nrerun 2\n')
+    assert refresh_log(log)
+    while line_count(log)[1] == False:
+        time.sleep(0.05)
+    assert line_count(log)[0] == 2 and page_text(log, 0, 30) == 'rerun 1\nrerun 2'
+    with open(log_path + '.new', 'w') as log_file:
+        log_file.write('rerun A\nrerun B\n')
+    os.replace(log_path + '.new', log_path)
+    assert refresh_log(log)
+    while line_count(log)[1] == False:
+        time.sleep(0.05)
+    assert line_count(log)[0] == 2 and page_text(log, 0, 30) == 'rerun A\nrerun B'
+    close_log(log)
+    os.remove(log_path)
+    os.rmdir(os.path.dirname(log_path))
+    print('Log viewer OK.')
@@ -0,0 +1,413 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Detector masks for AutoGUI: automatic detection of beam stop and shadows, rasterization and export of masks.
+# A few frames of a sweep are summed and averaged in blocks of pixels. Every block is compared with the
+# background expected at its distance from the beam (median of all blocks at that distance), blocks far below
+# it are shadowed. Connected shadowed areas are turned into the untrusted regions AutoGUI already uses for
+# XDS: an ellipse for the beam stop, quadrilaterals (or rectangles) for its arm and other shadows.
+# Coordinates are pixel positions (x = column, y = row) like the click coordinates of the image viewer.
+# Drawn and detected regions can be rasterized into a full resolution mask (pixels with their centre inside a region),
+# e.g. for the masked fraction per resolution shell or to export the mask as bitmap or mini-cbf.
+# Run "python autogui_masks.py" for a test and a benchmark on a 16M sized frame.
+
+import os
+import re
+import math
+import time
+import numpy as np
+import autogui_images
+import autogui_cbf
+
+
+# helper function to sum frames, pixels without data in any of them are masked (< 0)
+def sum_frames(frames):
+    summed = None
+    for frame in frames:
+        if frame is None:
+            continue
+        if summed is None:
+            summed = np.zeros(frame.shape, dtype = np.int64)
+            masked = np.zeros(frame.shape, dtype = bool)
+        summed += np.maximum(frame, 0)
+        masked |= frame < 0
+    if summed is not None:
+        summed[masked] = autogui_images.masked_value
+    return summed
+
+# helper function to read a few frames spread over a sweep and sum them. image is a list of EIGER data files or a
+# list of image files (one per frame).
+def read_sweep_sum(image, number_of_images, frames_to_sum = 5):
+    numbers = sorted(set(np.linspace(1, max(1, number_of_images), min(frames_to_sum, max(1, number_of_images))).round().astype(int)))
+    if len(image) > 0 and re.search(r'\.h5$', image[0]) != None:
+        return sum_frames(autogui_images.read_eiger(image, int(number)) for number in numbers)
+    return sum_frames(autogui_images.read_image(image[int(number) - 1]) for number in numbers if int(number) <= len(image))
+
+# helper function to read the beam centre (pixels) from the header of a mini-cbf file or an EIGER master file, None if not found
+def header_beamcentre(image_path):
+    if re.search(r'\.h5$', image_path) != None:
+        if autogui_images.h5py == None:
+            return None
+        try:
+            with autogui_images.h5py.File(image_path, 'r') as h5file:
+                return (float(h5file['/entry/instrument/detector/beam_center_x'][()]), float(h5file['/entry/instrument/detector/beam_center_y'][()]))
+        except (KeyError, OSError):
+            return None
+    content = autogui_cbf.read_content(image_path)
+    binary_start = content.find(autogui_cbf.cbf_binary_start)
+    header = content[:binary_start].decode('latin-1')
+    beam = re.search(r'Beam_xy\s*\(\s*([-\d.]+)\s*,\s*([-\d.]+)\s*\)', header)
+    if beam == None:
+        return None
+    return (float(beam.group(1)), float(beam.group(2)))
+
+# helper function to average a frame in blocks of block x block pixels: mean of pixels with data and fraction of pixels with data
+def block_means(frame, block):
+    rows = frame.shape[0] // block * block
+    columns = frame.shape[1] // block * block
+    part = frame[:rows, :columns].reshape(rows // block, block, columns // block, block)
+    valid = part >= 0
+    pixels = valid.sum(axis = (1, 3))
+    sums = np.where(valid, part, 0).sum(axis = (1, 3), dtype = np.float64)
+    means = sums / np.maximum(pixels, 1)
+    return means, pixels / float(block * block)
+
+# helper function to extend areas over runs of up to max_run unknown blocks (module gaps) between two marked blocks
+def bridge_gaps(marked, unknown, max_run):
+    bridged = marked.copy()
+    for axis in (0, 1):
+        size = marked.shape[axis]
+        for run in range(1, max_run + 1):
+            # blocks i .. i + run - 1 unknown, block i - 1 and block i + run marked
+            if size <= run + 1:
+                continue
+            before = np.take(marked, np.arange(0, size - run - 1), axis = axis)
+            after = np.take(marked, np.arange(run + 1, size), axis = axis)
+            inside = np.ones(before.shape, dtype = bool)
+            for step in range(1, run + 1):
+                inside &= np.take(unknown, np.arange(step, size - run - 1 + step), axis = axis)
+            fill = before & after & inside
+            for step in range(1, run + 1):
+                index = [slice(None), slice(None)]
+                index[axis] = slice(step, size - run - 1 + step)
+                bridged[tuple(index)] |= fill
+    return bridged
+
+# helper function to label connected areas of marked blocks (4-neighbourhood): label per block, -1 for unmarked blocks
+def label_areas(marked):
+    number = np.full(marked.shape, -1, dtype = np.int64)
+    positions = np.flatnonzero(marked.ravel())
+    number.ravel()[positions] = np.arange(positions.size)
+    edges = []
+    for first, second in ((number[:, :-1], number[:, 1:]), (number[:-1, :], number[1:, :])):
+        connected = (first >= 0) & (second >= 0)
+        edges.append((first[connected], second[connected]))
+    first = np.concatenate([edge[0] for edge in edges])
+    second = np.concatenate([edge[1] for edge in edges])
+    # hooking and pointer jumping until every area points to its lowest block
+    parent = np.arange(positions.size)
+    while True:
+        parent_first = parent[first]
+        parent_second = parent[second]
+        lower = np.minimum(parent_first, parent_second)
+        higher = np.maximum(parent_first, parent_second)
+        different = lower != higher
+        if not different.any():
+            break
+        np.minimum.at(parent, higher[different], lower[different])
+        while True:
+            jumped = parent[parent]
+            if (jumped == parent).all():
+                break
+            parent = jumped
+    labels = np.full(marked.shape, -1, dtype = np.int64)
+    labels.ravel()[positions] = parent
+    return labels
+
+# helper function to put a box along the main direction of a set of points (pixel positions) with a margin.
+# Returns the corners in drawing order.
+def oriented_box(x, y, margin):
+    centre_x = x.mean()
+    centre_y = y.mean()
+    if x.size > 1:
+        eigenvalues, eigenvectors = np.linalg.eigh(np.cov(np.vstack((x - centre_x, y - centre_y))))
+        direction = eigenvectors[:, np.argmax(eigenvalues)]
+    else:
+        direction = np.array([1.0, 0.0])
+    normal = np.array([-direction[1], direction[0]])
+    along = (x - centre_x) * direction[0] + (y - centre_y) * direction[1]
+    across = (x - centre_x) * normal[0] + (y - centre_y) * normal[1]
+    corners = []
+    for along_value, across_value in ((along.min() - margin, across.min() - margin), (along.max() + margin, across.min() - margin),
+                                      (along.max() + margin, across.max() + margin), (along.min() - margin, across.max() + margin)):
+        corners.append((centre_x + along_value * direction[0] + across_value * normal[0], centre_y + along_value * direction[1] + across_value * normal[1]))
+    return corners, math.degrees(math.atan2(direction[1], direction[0]))
+
+# detect beam stop and shadows on a (summed) frame. Returns the proposals in the formats of AutoGUI classic:
+# {'ellipses': [[x1, x2, y1, y2], ...], 'rectangles': [[x1, x2, y1, y2], ...], 'quads': [[(x, y) x 4], ...]},
+# quadrilateral corners are stored in the order the viewer draws them (0, 1, 3, 2).
+def detect_shadows(frame, centre, block = 8, threshold = 0.5, min_blocks = 6, min_counts = 20):
+    proposals = {'ellipses': [], 'rectangles': [], 'quads': []}
+    height, width = frame.shape
+    means, valid_fraction = block_means(frame, block)
+    known = valid_fraction >= 0.5
+    block_x = (np.arange(means.shape[1]) + 0.5) * block - 0.5
+    block_y = (np.arange(means.shape[0]) + 0.5) * block - 0.5
+    radius = np.sqrt((block_y[:, None] - centre[1]) ** 2 + (block_x[None, :] - centre[0]) ** 2) / block
+    radius_bin = radius.astype(np.int64)
+    # expected background: median of the blocks at the same distance (shadows cover less than half of a circle)
+    order = np.lexsort((means[known], radius_bin[known]))
+    sorted_bins = radius_bin[known][order]
+    sorted_means = means[known][order]
+    bins = radius_bin.max() + 1
+    starts = np.searchsorted(sorted_bins, np.arange(bins), side = 'left')
+    ends = np.searchsorted(sorted_bins, np.arange(bins), side = 'right')
+    filled = ends > starts
+    median = np.zeros(bins)
+    median[filled] = sorted_means[(starts[filled] + ends[filled] - 1) // 2]
+    # inside the beam stop the median is the shadow itself: use the level just outside it (the scatter maximum close to the beam)
+    inner_bins = max(3, int(0.15 * bins))
+    edge = int(np.argmax(median[:inner_bins]))
+    expected = median.copy()
+    expected[:edge] = median[edge]
+    expected_block = expected[radius_bin]
+    usable = known & (expected_block * block * block * valid_fraction >= min_counts)
+    shadow = usable & (means < threshold * expected_block)
+    # arms crossing module gaps stay in one piece
+    shadow = bridge_gaps(shadow, ~known, max(1, 40 // block))
+    labels = label_areas(shadow)
+    if (labels >= 0).any():
+        area_labels, area_sizes = np.unique(labels[labels >= 0], return_counts = True)
+    else:
+        area_labels, area_sizes = np.array([], dtype = np.int64), np.array([], dtype = np.int64)
+    # beam stop: most of the blocks inside the edge are shadowed
+    inside = radius_bin < edge
+    beamstop_labels = set()
+    if edge > 0 and (inside & known).any() and shadow[inside & known].mean() >= 0.5:
+        beamstop_radius = (edge + 1) * block
+        proposals['ellipses'].append([round(centre[0] - beamstop_radius), round(centre[0] + beamstop_radius), round(centre[1] - beamstop_radius), round(centre[1] + beamstop_radius)])
+        beamstop_labels = set(np.unique(labels[inside & (labels >= 0)]).tolist())
+        # the arm starts at the beam stop: blocks just outside it belong to the same area
+        beamstop_labels |= set(np.unique(labels[(radius_bin >= edge) & (radius_bin <= edge + 2) & (labels >= 0)]).tolist())
+    for area_label, area_size in zip(area_labels, area_sizes):
+        rows, columns = np.nonzero(labels == area_label)
+        if area_label in beamstop_labels:
+            outside = radius[rows, columns] > edge + 1
+            rows = rows[outside]
+            columns = columns[outside]
+            if rows.size < min_blocks:
+                continue
+        elif area_size < min_blocks:
+            continue
+        corners, angle = oriented_box(block_x[columns], block_y[rows], block)
+        # boxes along the detector axes become rectangles
+        if min(abs(angle) % 90, 90 - abs(angle) % 90) < 2:
+            x_values = [corner[0] for corner in corners]
+            y_values = [corner[1] for corner in corners]
+            proposals['rectangles'].append([max(0, round(min(x_values))), min(width - 1, round(max(x_values))), max(0, round(min(y_values))), min(height - 1, round(max(y_values)))])
+        else:
+            corners = [(min(width - 1, max(0, round(corner[0]))), min(height - 1, max(0, round(corner[1])))) for corner in corners]
+            proposals['quads'].append([corners[0], corners[1], corners[3], corners[2]])
+    return proposals
+
+# helper function to turn proposals into autoPROC parameters (XDS UNTRUSTED_* keywords), like AutoGUI classic does for drawn masks
+def untrusted_parameters(proposals):
+    parameters = []
+    for rectangle in proposals['rectangles']:
+        parameters.append('autoPROC_XdsKeyword_UNTRUSTED_RECTANGLE="' + ' '.join(str(value) for value in rectangle) + '"')
+    for ellipse in proposals['ellipses']:
+        parameters.append('autoPROC_XdsKeyword_UNTRUSTED_ELLIPSE="' + ' '.join(str(value) for value in ellipse) + '"')
+    for quad in proposals['quads']:
+        parameters.append('autoPROC_XdsKeyword_UNTRUSTED_QUADRILATERAL="' + ' '.join(str(quad[corner][0]) + ' ' + str(quad[corner][1]) for corner in (0, 1, 3, 2)) + '"')
+    return ' '.join(parameters)
+
+# helper function to get the pixels (rows or columns) whose centres (index + 0.5) lie between two coordinates
+def pixel_range(low, high, size):
+    start = max(0, int(math.ceil(min(low, high) - 0.5)))
+    end = min(size, int(math.floor(max(low, high) - 0.5)) + 1)
+    return start, max(start, end)
+
+# helper function to mask the pixels of consecutive rows between a start and an end x coordinate per row (NaN = nothing)
+def fill_spans(mask, first_row, starts, ends):
+    valid = ~np.isnan(starts)
+    if not valid.any():
+        return
+    column_start, column_end = pixel_range(np.nanmin(starts), np.nanmax(ends), mask.shape[1])
+    if column_end <= column_start:
+        return
+    centres = np.arange(column_start, column_end) + 0.5
+    with np.errstate(invalid = 'ignore'):
+        inside = (centres >= starts[:, None]) & (centres <= ends[:, None])
+    mask[first_row:first_row + starts.size, column_start:column_end] |= inside
+
+# helper function to mask a rectangle [x1, x2, y1, y2]
+def rasterize_rectangle(mask, rectangle):
+    column_start, column_end = pixel_range(rectangle[0], rectangle[1], mask.shape[1])
+    row_start, row_end = pixel_range(rectangle[2], rectangle[3], mask.shape[0])
+    mask[row_start:row_end, column_start:column_end] = True
+
+# helper function to mask an ellipse given by its bounding box [x1, x2, y1, y2]
+def rasterize_ellipse(mask, ellipse):
+    centre_x = (ellipse[0] + ellipse[1]) / 2
+    centre_y = (ellipse[2] + ellipse[3]) / 2
+    half_x = abs(ellipse[1] - ellipse[0]) / 2
+    half_y = abs(ellipse[3] - ellipse[2]) / 2
+    row_start, row_end = pixel_range(centre_y - half_y, centre_y + half_y, mask.shape[0])
+    if row_end <= row_start or half_y == 0:
+        return
+    y = np.arange(row_start, row_end) + 0.5
+    half_width = half_x * np.sqrt(np.clip(1 - ((y - centre_y) / half_y) ** 2, 0, None))
+    fill_spans(mask, row_start, centre_x - half_width, centre_x + half_width)
+
+# helper function to mask a quadrilateral stored in the order of the viewer (corners 0, 1, 3, 2 along the outline),
+# pixels with their centre inside (even-odd rule, so crossed outlines work like XDS)
+def rasterize_quad(mask, quad):
+    outline = [quad[0], quad[1], quad[3], quad[2]]
+    y_values = [corner[1] for corner in outline]
+    row_start, row_end = pixel_range(min(y_values), max(y_values), mask.shape[0])
+    if row_end <= row_start:
+        return
+    y = np.arange(row_start, row_end) + 0.5
+    crossings = np.full((y.size, 4), np.nan)
+    for edge in range(4):
+        x0, y0 = outline[edge]
+        x1, y1 = outline[(edge + 1) % 4]
+        if y0 == y1:
+            continue
+        crossing = (np.minimum(y0, y1) <= y) & (y < np.maximum(y0, y1))
+        crossings[crossing, edge] = x0 + (y[crossing] - y0) * (x1 - x0) / (y1 - y0)
+    crossings.sort(axis = 1)
+    fill_spans(mask, row_start, crossings[:, 0], crossings[:, 1])
+    fill_spans(mask, row_start, crossings[:, 2], crossings[:, 3])
+
+# build the full resolution mask (True = masked) from the untrusted regions of AutoGUI classic. Pixels without data
+# in frame (module gaps, dead pixels: < 0) are masked as well.
+def rasterize_mask(shape, rectangles = (), ellipses = (), quads = (), frame = None):
+    mask = np.zeros(shape, dtype = bool)
+    if frame is not None:
+        mask |= frame < 0
+    for rectangle in rectangles:
+        rasterize_rectangle(mask, rectangle)
+    for ellipse in ellipses:
+        rasterize_ellipse(mask, ellipse)
+    for quad in quads:
+        rasterize_quad(mask, quad)
+    return mask
+
+# masked fraction of the detector in resolution shells of equal reciprocal volume (untilted detector).
+# distance and pixel_size in mm, wavelength in Angstrom. Returns [(low resolution, high resolution, masked fraction, pixels), ...]
+def shell_fractions(mask, centre, distance, wavelength, pixel_size, shells = 10):
+    y = (np.arange(mask.shape[0], dtype = np.float32) + 0.5 - centre[1]) ** 2
+    x = (np.arange(mask.shape[1], dtype = np.float32) + 0.5 - centre[0]) ** 2
+    radius = np.sqrt(y[:, None] + x[None, :]) * pixel_size
+    # 1 / d^3 grows with the reciprocal volume
+    inverse_cube = (2 * np.sin(0.5 * np.arctan(radius / distance)) / wavelength) ** 3
+    highest = inverse_cube.max()
+    shell = np.minimum((inverse_cube / highest * shells).astype(np.int64), shells - 1).ravel()
+    pixels = np.bincount(shell, minlength = shells)
+    masked = np.bincount(shell, weights = mask.ravel(), minlength = shells)
+    results = []
+    for number in range(shells):
+        low = float('inf') if number == 0 else (highest * number / shells) ** (-1 / 3)
+        high = (highest * (number + 1) / shells) ** (-1 / 3)
+        results.append((low, high, masked[number] / pixels[number] if pixels[number] > 0 else 0.0, int(pixels[number])))
+    return results
+
+# helper function to write a mask as mini-cbf (masked pixels -1 like module gaps, all other pixels 0)
+def write_mask_cbf(mask_path, mask):
+    autogui_cbf.write_cbf(mask_path, np.where(mask, autogui_images.masked_value, 0).astype(np.int32))
+
+# helper function to write a mask as portable bitmap (PBM, 1 bit per pixel, masked pixels black)
+def write_mask_bitmap(mask_path, mask):
+    with open(mask_path, 'wb') as maskfile:
+        maskfile.write(('P4\n' + str(mask.shape[1]) + ' ' + str(mask.shape[0]) + '\n').encode('ascii'))
+        maskfile.write(np.packbits(mask, axis = 1).tobytes())
+
+# helper function to read a mask written by write_mask_bitmap
+def read_mask_bitmap(mask_path):
+    with open(mask_path, 'rb') as maskfile:
+        content = maskfile.read()
+    header = re.match(rb'P4\s+(\d+)\s+(\d+)\s', content)
+    width = int(header.group(1))
+    height = int(header.group(2))
+    packed = np.frombuffer(content[header.end():], dtype = np.uint8).reshape(height, -1)
+    return np.unpackbits(packed, axis = 1)[:, :width].astype(bool)
+
+
+# test and benchmark
+if __name__ == '__main__':
+    random = np.random.default_rng(5)
+    centre = (2071.4, 2213.8)
+    rows, columns = np.mgrid[0:4371, 0:4150].astype(np.float32)
+    radius = np.hypot(columns - centre[0], rows - centre[1])
+    expected = 3 + 30 * np.exp(-radius / 700)
+    # beam stop (radius 70), its arm towards the upper right (20 degrees, 36 pixels wide) and a shadow at the left edge
+    arm_angle = math.radians(-20)
+    along = (columns - centre[0]) * math.cos(arm_angle) + (rows - centre[1]) * math.sin(arm_angle)
+    across = -(columns - centre[0]) * math.sin(arm_angle) + (rows - centre[1]) * math.cos(arm_angle)
+    shadowed = (radius < 70) | ((along > 0) & (np.abs(across) < 18))
+    expected = np.where(shadowed, 0.05 * expected, expected)
+    expected[1500:1700, :300] *= 0.1
+    frames = []
+    for frame_number in range(5):
+        frame = random.poisson(expected).astype(np.int32)
+        frame[:, 1028:1040] = -1
+        frame[550:588, :] = -1
+        frames.append(frame)
+    start = time.time()
+    summed = sum_frames(frames)
+    sum_time = time.time() - start
+    start = time.time()
+    proposals = detect_shadows(summed, centre)
+    detect_time = time.time() - start
+    print('Proposals:', proposals)
+    print(untrusted_parameters(proposals))
+    print('Summing 5 frames:', round(sum_time, 2), 's, detection:', round(detect_time, 2), 's')
+    assert len(proposals['ellipses']) == 1 and len(proposals['quads']) == 1 and len(proposals['rectangles']) == 1
+    ellipse = proposals['ellipses'][0]
+    assert abs((ellipse[1] - ellipse[0]) / 2 - 70) < 3 * 8
+    print('Shadow detection OK.')
+    # rasterization of 30 regions on the same frame
+    regions = {'rectangles': [], 'ellipses': [], 'quads': []}
+    for region in range(10):
+        x, y = random.uniform(200, 3900), random.uniform(200, 4100)
+        regions['rectangles'].append([x, x + random.uniform(10, 300), y, y + random.uniform(10, 300)])
+        regions['ellipses'].append([x - 100, x + 100, y - 60, y + 60])
+        regions['quads'].append([(x, y), (x + 400, y + 30), (x - 20, y + 50), (x + 380, y + 80)])
+    regions['quads'].extend(proposals['quads'])
+    timings = []
+    for repeat in range(5):
+        start = time.time()
+        mask = rasterize_mask(frame.shape, regions['rectangles'], regions['ellipses'], regions['quads'])
+        timings.append(time.time() - start)
+    single = rasterize_mask(frame.shape, ellipses = [[1000, 1400, 1000, 1200]])
+    assert abs(single.sum() / (math.pi * 200 * 100) - 1) < 0.01
+    single = rasterize_mask(frame.shape, rectangles = [[10, 20, 30, 35]])
+    assert single.sum() == 50
+    print('Rasterizing', sum(len(value) for value in regions.values()), 'regions:', round(min(timings) * 1000, 1), 'ms (best of 5),', round(100 * mask.mean(), 2), '% masked')
+    start = time.time()
+    fractions = shell_fractions(mask | (frame < 0), centre, 200.0, 1.0, 0.075)
+    print('Masked fraction per shell (' + str(round(time.time() - start, 2)) + ' s):')
+    for low, high, fraction, pixels in fractions:
+        print('  ' + ('%7.2f' % low) + ' - ' + ('%5.2f' % high) + ' A: ' + ('%5.1f' % (100 * fraction)) + ' %')
+    write_mask_bitmap('/tmp/autogui_mask_test.pbm', mask)
+    assert (read_mask_bitmap('/tmp/autogui_mask_test.pbm') == mask).all()
+    write_mask_cbf('/tmp/autogui_mask_test.cbf', mask)
+    assert ((autogui_cbf.read_cbf('/tmp/autogui_mask_test.cbf') < 0) == mask).all()
+    print('Bitmap:', os.path.getsize('/tmp/autogui_mask_test.pbm'), 'bytes, CBF:', os.path.getsize('/tmp/autogui_mask_test.cbf'), 'bytes')
+    print('Mask export OK.')
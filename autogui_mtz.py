@@ -0,0 +1,254 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# MTZ file reading for AutoGUI (reference MTZ files), no CCP4 programs needed.
+# An MTZ file starts with "MTZ ", the position of the header (in 4-byte words, 1 = first word) and the machine stamp
+# (byte order of numbers). The header behind the reflection data consists of 80 character records
+# (VERS, TITLE, NCOL, CELL, SYMINF, RESO, COLUMN, ...) up to MTZENDOF. Only the header is read, never the reflections.
+# Files with more than 2 GB of data store a 64-bit header position behind the machine stamp.
+# Reflections of merged MTZ files can be read and written as NumPy arrays (reference MTZ expansion).
+# Run "python autogui_mtz.py" for tests on generated MTZ files.
+
+import os
+import re
+import math
+import time
+import struct
+import tempfile
+import collections
+import numpy as np
+
+
+MtzColumn = collections.namedtuple('MtzColumn', ['label', 'type', 'minimum', 'maximum', 'dataset'])
+# cell: (a, b, c, alpha, beta, gamma). resolution: (low, high) in Angstrom. columns: [MtzColumn, ...].
+# symmetry: symmetry operators as text ("-X+1/2,-Y,Z+1/2"). records: all header records, order: byte order of the numbers.
+MtzHeader = collections.namedtuple('MtzHeader', ['title', 'space_group', 'space_group_number', 'cell', 'resolution', 'reflections', 'columns',
+                                                 'symmetry', 'records', 'order'])
+
+mtz_record_length = 80
+
+
+# helper function to get the byte order of numbers from the machine stamp ('<' little endian, '>' big endian)
+def byte_order(machine_stamp):
+    if (machine_stamp[0] >> 4) == 1:
+        return '>'
+    return '<'
+
+# helper function to split an MTZ record into words, quoted text stays one word
+def record_words(record):
+    return [quoted if quoted != '' else plain for quoted, plain in re.findall(r"'([^']*)'|(\S+)", record)]
+
+# read the header of an MTZ file, raises ValueError if the file is not an MTZ file
+def read_mtz_header(mtz_path):
+    with open(mtz_path, 'rb') as mtzfile:
+        start = mtzfile.read(24)
+        if len(start) < 12 or start[:4] != b'MTZ ':
+            raise ValueError('Not an MTZ file: ' + mtz_path)
+        order = byte_order(start[8:12])
+        header_word = struct.unpack(order + 'i', start[4:8])[0]
+        if header_word == -1:
+            header_word = struct.unpack(order + 'q', start[16:24])[0]
+        mtzfile.seek((header_word - 1) * 4)
+        # the header is a few kB, batch headers of unmerged files follow it
+        records = []
+        while True:
+            block = mtzfile.read(mtz_record_length * 64)
+            if block == b'':
+                raise ValueError('MTZ header has no end (MTZENDOF): ' + mtz_path)
+            for position in range(0, len(block) - mtz_record_length + 1, mtz_record_length):
+                record = block[position:position + mtz_record_length].decode('latin-1')
+                if record.startswith('MTZENDOF'):
+                    return parse_records(records, order)
+                records.append(record)
+
+# helper function to turn the header records into an MtzHeader
+def parse_records(records, order = '<'):
+    title = ''
+    space_group = ''
+    space_group_number = None
+    cell = None
+    resolution = None
+    reflections = None
+    columns = []
+    symmetry = []
+    for record in records:
+        keyword = record[:4]
+        words = record_words(record)
+        if keyword == 'TITL':
+            title = record[6:].strip()
+        elif keyword == 'NCOL':
+            reflections = int(words[2])
+        elif keyword == 'CELL':
+            cell = tuple(float(value) for value in words[1:7])
+        elif keyword == 'SYMI':
+            # SYMINF nsym nsymp lattice number 'name' point group
+            space_group_number = int(words[4])
+            space_group = words[5]
+        elif keyword == 'RESO':
+            # stored as 1/d^2
+            limits = sorted(float(value) for value in words[1:3])
+            resolution = tuple(1 / math.sqrt(limit) if limit > 0 else float('inf') for limit in limits)
+        elif keyword == 'COLU':
+            dataset = int(words[5]) if len(words) > 5 else 0
+            columns.append(MtzColumn(words[1], words[2], float(words[3]), float(words[4]), dataset))
+        elif keyword == 'SYMM':
+            symmetry.append(record[4:].strip())
+    return MtzHeader(title, space_group, space_group_number, cell, resolution, reflections, columns, symmetry, records, order)
+
+# helper function to find the free R flag column: type I with "free" in the label, '' if there is none
+def free_r_label(mtz_header):
+    for column in mtz_header.columns:
+        if re.search('free', column.label, re.IGNORECASE) != None and column.type == 'I':
+            return column.label
+    for column in mtz_header.columns:
+        if re.search('free', column.label, re.IGNORECASE) != None:
+            return column.label
+    return ''
+
+# helper function to get the cell as text for CCP4 programs ("a b c alpha beta gamma")
+def cell_text(mtz_header):
+    return ' '.join(str(round(value, 4)) for value in mtz_header.cell)
+
+# read the reflections of a merged MTZ file: (MtzHeader, reflections as float32 array with one column per MTZ column)
+def read_mtz(mtz_path):
+    mtz_header = read_mtz_header(mtz_path)
+    values = mtz_header.reflections * len(mtz_header.columns)
+    reflections = np.fromfile(mtz_path, dtype = mtz_header.order + 'f4', count = values, offset = 80)
+    if reflections.size < values:
+        raise ValueError('MTZ file is truncated: ' + mtz_path)
+    return mtz_header, reflections.reshape(mtz_header.reflections, len(mtz_header.columns)).astype(np.float32)
+
+# helper function to get 1/d^2 of reflections (rows of h, k, l) for a cell
+def inverse_d_squared(hkl, cell):
+    a, b, c = cell[:3]
+    alpha, beta, gamma = (math.radians(angle) for angle in cell[3:])
+    metric = np.array([[a * a, a * b * math.cos(gamma), a * c * math.cos(beta)],
+                       [a * b * math.cos(gamma), b * b, b * c * math.cos(alpha)],
+                       [a * c * math.cos(beta), b * c * math.cos(alpha), c * c]])
+    reciprocal_metric = np.linalg.inv(metric)
+    hkl = np.asarray(hkl, dtype = np.float64)
+    return np.einsum('ni,ij,nj->n', hkl, reciprocal_metric, hkl)
+
+# helper function to write header records and reflections (data starts at word 21, optional padding makes large sparse files)
+def write_records(mtz_path, records, reflections, order = '<', padding = 0):
+    data = np.ascontiguousarray(reflections, dtype = order + 'f4').tobytes()
+    header_word = 21 + len(data) // 4 + padding // 4
+    # machine stamp: IEEE numbers, little or big endian
+    if order == '<':
+        machine_stamp = bytes([0x44, 0x41, 0, 0])
+    else:
+        machine_stamp = bytes([0x11, 0x11, 0, 0])
+    with open(mtz_path, 'wb') as mtzfile:
+        mtzfile.write(b'MTZ ' + struct.pack(order + 'i', header_word) + machine_stamp + b'\x00' * 68)
+        mtzfile.write(data)
+        mtzfile.seek((header_word - 1) * 4)
+        mtzfile.write(''.join(record.ljust(mtz_record_length)[:mtz_record_length] for record in records + ['MTZENDOF']).encode('latin-1'))
+
+# helper function to get the COLUMN, NCOL and RESO records for reflections (missing values are NaN)
+def reflection_records(columns, reflections, cell):
+    column_records = []
+    for number, column in enumerate(columns):
+        values = reflections[:, number]
+        values = values[~np.isnan(values)]
+        minimum = float(values.min()) if values.size > 0 else 0.0
+        maximum = float(values.max()) if values.size > 0 else 0.0
+        column_records.append('COLUMN ' + column.label.ljust(30) + ' ' + column.type + ' ' + '%17.4f' % minimum + ' ' + '%17.4f' % maximum + ' ' + str(column.dataset).rjust(4))
+    ncol_record = 'NCOL ' + str(len(columns)).rjust(8) + ' ' + str(reflections.shape[0]).rjust(12) + ' ' + '0'.rjust(8)
+    inverse_squared = inverse_d_squared(reflections[:, :3], cell) if reflections.shape[0] > 0 else np.zeros(1)
+    reso_record = 'RESO ' + '%.6f' % inverse_squared.min() + ' ' + '%.6f' % inverse_squared.max()
+    return column_records, ncol_record, reso_record
+
+# write a merged MTZ file with the header of another one (title, cell, symmetry, datasets), columns and reflections may change
+def write_mtz_data(mtz_path, mtz_header, columns, reflections):
+    column_records, ncol_record, reso_record = reflection_records(columns, reflections, mtz_header.cell)
+    records = []
+    for record in mtz_header.records:
+        keyword = record[:4]
+        if keyword == 'NCOL':
+            records.append(ncol_record)
+        elif keyword == 'RESO':
+            records.append(reso_record)
+        elif keyword == 'VALM':
+            records.append('VALM NAN')
+        elif keyword == 'COLU':
+            if column_records != []:
+                records.extend(column_records)
+                column_records = []
+        elif keyword not in ('COLS', 'COLG'):
+            records.append(record)
+    write_records(mtz_path, records, reflections)
+
+# helper function to write a merged MTZ file (for tests): columns H K L plus the given ones, reflections as rows of numbers
+def write_mtz(mtz_path, space_group, space_group_number, cell, columns, reflections, order = '<', padding = 0, symmetry = ('X,Y,Z',)):
+    columns = [MtzColumn(label, column_type, 0.0, 0.0, 0) for label, column_type in [('H', 'H'), ('K', 'H'), ('L', 'H')]] + [MtzColumn(label, column_type, 0.0, 0.0, 1) for label, column_type in columns]
+    reflections = np.array(reflections, dtype = np.float32).reshape(-1, len(columns))
+    column_records, ncol_record, reso_record = reflection_records(columns, reflections, cell)
+    records = ['VERS MTZ:V1.1', 'TITLE AutoGUI test', ncol_record, 'CELL ' + ' '.join('%10.4f' % value for value in cell), 'SORT    1   2   3   0   0',
+               "SYMINF " + str(len(symmetry)).rjust(3) + ' ' + str(len(symmetry)).rjust(3) + ' ' + space_group[0] + ' ' + str(space_group_number).rjust(5) + " '" + space_group + "' PG1"]
+    records.extend('SYMM ' + operator for operator in symmetry)
+    records.extend([reso_record, 'VALM NAN'] + column_records)
+    records.extend(['NDIF        1', 'PROJECT       1 autogui', 'CRYSTAL       1 autogui', 'DATASET       1 autogui'])
+    write_records(mtz_path, records, reflections, order, padding)
+
+
+# tests on generated MTZ files
+if __name__ == '__main__':
+    test_folder = tempfile.mkdtemp()
+    cell = (51.2, 62.31, 70.004, 90.0, 90.0, 90.0)
+    reflections = [(h, k, l, 100.0 + h, 5.0, float((h + k + l) % 20 == 0)) for h in range(1, 8) for k in range(0, 8) for l in range(0, 8)]
+    columns = [('FP', 'F'), ('SIGFP', 'Q'), ('FreeR_flag', 'I')]
+    for order in ('<', '>'):
+        mtz_path = os.path.join(test_folder, 'test' + ('_le' if order == '<' else '_be') + '.mtz')
+        write_mtz(mtz_path, 'P 21 21 21', 19, cell, columns, reflections, order)
+        mtz_header = read_mtz_header(mtz_path)
+        assert mtz_header.space_group == 'P 21 21 21' and mtz_header.space_group_number == 19
+        assert mtz_header.cell == cell and mtz_header.reflections == len(reflections)
+        assert [column.label for column in mtz_header.columns] == ['H', 'K', 'L', 'FP', 'SIGFP', 'FreeR_flag']
+        assert free_r_label(mtz_header) == 'FreeR_flag'
+        assert abs(mtz_header.resolution[1] - 1 / math.sqrt((7 / cell[0]) ** 2 + (7 / cell[1]) ** 2 + (7 / cell[2]) ** 2)) < 0.001
+        mtz_header, mtz_reflections = read_mtz(mtz_path)
+        assert (mtz_reflections == np.array(reflections, dtype = np.float32)).all()
+    # reflections written with the header of another file
+    copy_path = os.path.join(test_folder, 'copy.mtz')
+    write_mtz_data(copy_path, mtz_header, mtz_header.columns, mtz_reflections[:100])
+    copy_header, copy_reflections = read_mtz(copy_path)
+    assert copy_header.reflections == 100 and copy_header.space_group == 'P 21 21 21' and (copy_reflections == mtz_reflections[:100]).all()
+    print('Header:', mtz_header)
+    print('Cell for CCP4:', cell_text(mtz_header))
+    # a 500 MB file (sparse): only the header is read
+    large_path = os.path.join(test_folder, 'large.mtz')
+    write_mtz(large_path, 'C 1 2 1', 5, cell, [('IMEAN', 'J'), ('SIGIMEAN', 'Q'), ('FREE', 'I')], reflections, '<', 500 * 1024 * 1024)
+    start = time.time()
+    mtz_header = read_mtz_header(large_path)
+    read_time = time.time() - start
+    assert mtz_header.space_group == 'C 1 2 1' and free_r_label(mtz_header) == 'FREE'
+    print('Header of a', round(os.path.getsize(large_path) / 1024 / 1024), 'MB file read in', round(read_time * 1000, 2), 'ms')
+    # no free R flags and not an MTZ file
+    write_mtz(mtz_path, 'P 1', 1, cell, [('FP', 'F')], [reflection[:4] for reflection in reflections[:10]])
+    assert free_r_label(read_mtz_header(mtz_path)) == ''
+    with open(mtz_path, 'wb') as mtzfile:
+        mtzfile.write(b'not an mtz file')
+    try:
+        read_mtz_header(mtz_path)
+        raise AssertionError('ValueError expected')
+    except ValueError:
+        pass
+    for test_file in os.listdir(test_folder):
+        os.remove(os.path.join(test_folder, test_file))
+    os.rmdir(test_folder)
+    print('MTZ header tests OK.')
@@ -0,0 +1,100 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Re-scale only: new high resolution cutoffs without reprocessing the images.
+# The integrated reflections of a finished run (XDS_ASCII.HKL, kept in "useful_files") are converted to an unmerged
+# MTZ with POINTLESS and scaled again with autoPROC's aP_scale (scaling, merging and STARANISO) in a new run folder
+# next to the old one ("autoproc_<n+1>"). Indexing and integration are skipped, which takes minutes instead of the
+# full processing time.
+
+import os
+import re
+import shutil
+
+
+pointless = "pointless"                     # path to/ command to run Pointless
+ap_scale = "aP_scale"                       # path to/ command to run aP_scale from autoPROC
+old_cutoff_param = 'ScaleAnaISigmaCut_123="0.1:0.1 0.5:0.5 0.5:1.0 1.0:2.0" ScaleAnaRpimallCut_123="99.9999:99.9999 0.9:0.9 0.8:0.8 0.6:0.6" ScaleAnaCChalfCut_123="-1.0:-1.0 0.0:0.0 0.1:0.1 0.3:0.3"' # as used until autoPROCVersion20220608
+cutoff_selections = ["CC(1/2)>=0.3 (default)", "I/sig(I)>=2.0, CC(1/2)>=0.3, Rpim<=0.6 (old default)", "Custom values for I/sig(I), CC(1/2), Rpim"]
+integrated_files = ["XDS_ASCII.HKL"]
+
+
+# autoPROC parameters for the high resolution cutoff criteria and the cutmod value for the finish message
+def cutoff_parameters(selection, isigi, cchalf, rpim):
+    if selection == cutoff_selections[0]:
+        return '', False
+    if selection == cutoff_selections[1]:
+        return old_cutoff_param, True
+    param_cut = 'ScaleAnaRmergeCut_123="99.9999:99.9999" ScaleAnaRpimallCut_123="99.9999:99.9999 0.9:0.9 0.8:0.8 '+ rpim + ':' + rpim +'" ScaleAnaRmeasallCut_123="99.9999:99.9999" ScaleAnaISigmaCut_123="0.1:0.1 0.5:0.5 0.5:1.0 1.0:' + isigi +'" ScaleAnaCompletenessCut_123="0.0:0.0" ScaleAnaCChalfCut_123="-1.0:-1.0 0.0:0.0 0.1:0.1 '+ cchalf + ':' + cchalf +'"'
+    return param_cut, [isigi, cchalf, rpim]
+
+# integrated reflections of a finished run, None if there are none
+def find_integrated(run_folder):
+    for subfolder in ("useful_files", "output-files"):
+        for integrated_file in integrated_files:
+            integrated_path = os.path.join(run_folder, subfolder, integrated_file)
+            if os.path.exists(integrated_path):
+                return integrated_path
+    return None
+
+# create the next run folder next to a finished run ("autoproc_3" -> "autoproc_4"): (run folder, run number)
+def next_run_folder(run_folder):
+    run_folder = os.path.abspath(run_folder)
+    run_name = re.match(r'(.*_)(\d+)$', os.path.basename(run_folder))
+    if run_name == None:
+        prefix, runnumber = os.path.basename(run_folder) + '_', 1
+    else:
+        prefix, runnumber = run_name.group(1), int(run_name.group(2))
+    while True:
+        new_folder = os.path.join(os.path.dirname(run_folder), prefix + str(runnumber))
+        if os.path.exists(new_folder):
+            runnumber += 1
+        else:
+            # "output-files" is left to aP_scale, like to "process"
+            os.makedirs(os.path.join(new_folder, "useful_files"))
+            return new_folder, runnumber
+
+# prepare a re-scale run of a finished run: (new run folder, run number, integrated reflections). ValueError if nothing was integrated.
+def prepare_rescale(run_folder):
+    integrated_path = find_integrated(run_folder)
+    if integrated_path == None:
+        raise ValueError('No integrated reflections (XDS_ASCII.HKL) found in ' + run_folder)
+    new_folder, runnumber = next_run_folder(run_folder)
+    # the integrated reflections go with the new run, the old run may get cleaned up
+    new_integrated = os.path.join(new_folder, "useful_files", os.path.basename(integrated_path))
+    shutil.copy(integrated_path, new_integrated)
+    with open(os.path.join(new_folder, "rescaled_from.txt"), "w") as source_note:
+        source_note.write(os.path.abspath(run_folder) + '\n')
+    return new_folder, runnumber, new_integrated
+
+# command line to re-scale integrated reflections in a prepared run folder (run it there), parameters as for "process"
+def rescale_command(integrated_path, param_cut = '', parameters = ''):
+    unmerged = "useful_files/rescale_unmerged.mtz"
+    convert = pointless + " xdsin " + integrated_path + " hklout " + unmerged + " > useful_files/rescale_pointless.log"
+    scale = ' '.join([ap_scale, "-mtz", unmerged, "-d output-files", param_cut, parameters])
+    return convert + " && " + ' '.join(scale.split())
+
+# copy the scaled MTZs of a finished re-scale run like after processing: [copied files]
+def collect_outputs(run_folder):
+    copied = []
+    for output_file, copy_name in (("truncate-unique.mtz", "isotropic.mtz"), ("staraniso_alldata-unique.mtz", "anisotropic.mtz")):
+        output_path = os.path.join(run_folder, "output-files", output_file)
+        if os.path.exists(output_path):
+            shutil.copy(output_path, os.path.join(run_folder, copy_name))
+            copied.append(os.path.join(run_folder, copy_name))
+    return copied
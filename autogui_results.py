@@ -0,0 +1,182 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Processing results for AutoGUI classic and batch.
+# autoPROC writes ISPyB-style XML summaries to "output-files" (autoPROC.xml for the isotropic data,
+# autoPROC_staraniso.xml for the anisotropic data from STARANISO). They are read with an incremental XML parser
+# into a ProcessingResult with overall, inner and outer shell statistics. If the XML files are missing, space group,
+# cell and resolution limits are taken from the autoPROC log (last "finishing" section) like before, without a
+# STARANISO summary only the ellipsoid limits are. The number of processed sweeps is counted in the XML summary
+# (one integration per sweep) or in the log (one finishing section per sweep and one for the merged data).
+
+import os
+import re
+import collections
+import xml.etree.ElementTree as ElementTree
+
+
+ShellStatistics = collections.namedtuple('ShellStatistics', ['low_resolution', 'high_resolution', 'completeness', 'multiplicity', 'cc_half', 'rpim', 'i_over_sigma',
+                                                             'anomalous_completeness', 'anomalous_multiplicity', 'cc_anomalous'])
+# source: 'xml' or 'log'. cell: (a, b, c, alpha, beta, gamma). resolution: isotropic high resolution limit.
+# ellipsoid_limits: [(limit, direction), ...] of the ellipsoid fitted to the diffraction cut-off (STARANISO).
+# shells / anisotropic_shells: {'overall': ShellStatistics, 'innerShell': ..., 'outerShell': ...} (empty from the log)
+# sweeps: number of processed sweeps (0 if unknown)
+ProcessingResult = collections.namedtuple('ProcessingResult', ['source', 'space_group', 'cell', 'resolution', 'ellipsoid_limits', 'shells', 'anisotropic_shells', 'sweeps'])
+
+xml_file_names = ['autoPROC.xml', 'autoPROC_staraniso.xml']
+cell_tags = ['refinedCell_a', 'refinedCell_b', 'refinedCell_c', 'refinedCell_alpha', 'refinedCell_beta', 'refinedCell_gamma']
+shell_tags = {'resolutionLimitLow': 'low_resolution', 'resolutionLimitHigh': 'high_resolution', 'completeness': 'completeness', 'multiplicity': 'multiplicity',
+              'ccHalf': 'cc_half', 'rPimWithinIPlusIMinus': 'rpim', 'meanIOverSigI': 'i_over_sigma', 'anomalousCompleteness': 'anomalous_completeness',
+              'anomalousMultiplicity': 'anomalous_multiplicity', 'ccAnomalous': 'cc_anomalous'}
+
+
+# helper function to convert a number from a summary file, None if it is missing
+def to_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+# helper function to read an autoPROC XML summary: {'space_group', 'cell', 'shells', 'ellipsoid', 'sweeps'}
+def read_xml(xml_path):
+    summary = {'space_group': None, 'cell': {}, 'shells': {}, 'ellipsoid': {}, 'sweeps': 0}
+    statistics = {}
+    for event, element in ElementTree.iterparse(xml_path, events = ('end',)):
+        tag = element.tag
+        if tag == 'spaceGroup':
+            summary['space_group'] = (element.text or '').strip()
+        elif tag in cell_tags:
+            summary['cell'][tag] = to_float(element.text)
+        elif tag in shell_tags or tag == 'scalingStatisticsType':
+            statistics[tag] = element.text
+        elif tag.startswith('resolutionEllipsoid'):
+            summary['ellipsoid'][tag] = to_float(element.text)
+        elif tag == 'AutoProcScalingStatistics':
+            shell = (statistics.get('scalingStatisticsType') or 'overall').strip()
+            summary['shells'][shell] = ShellStatistics(**{field: to_float(statistics.get(tag_name)) for tag_name, field in shell_tags.items()})
+            statistics = {}
+        elif tag == 'AutoProcIntegration':
+            summary['sweeps'] += 1
+        # the summary elements are small, but nothing is kept after it has been read
+        if len(element) > 0 or tag == 'AutoProcScalingStatistics':
+            element.clear()
+    return summary
+
+# helper function to get the ellipsoid limits of a STARANISO summary: [(limit, direction), ...]
+def xml_ellipsoid_limits(ellipsoid):
+    limits = []
+    for axis in (1, 2, 3):
+        limit = ellipsoid.get('resolutionEllipsoidValue' + str(axis))
+        if limit == None:
+            continue
+        direction = [ellipsoid.get('resolutionEllipsoidAxis' + str(axis) + str(component)) for component in (1, 2, 3)]
+        if None in direction:
+            direction_text = ''
+        else:
+            direction_text = '(' + ', '.join('%.3f' % component for component in direction) + ')'
+        limits.append((limit, direction_text))
+    return limits
+
+# read the results of a processing run from the XML summaries in its output folder, None if there are none
+def results_from_xml(output_folder):
+    summaries = {}
+    for xml_file_name in xml_file_names:
+        xml_path = os.path.join(output_folder, xml_file_name)
+        if os.path.exists(xml_path):
+            try:
+                summaries[xml_file_name] = read_xml(xml_path)
+            except (ElementTree.ParseError, OSError):
+                pass
+    isotropic = summaries.get('autoPROC.xml') or summaries.get('autoPROC_staraniso.xml')
+    if isotropic == None or isotropic['space_group'] in (None, '') or len(isotropic['cell']) < 6 or 'overall' not in isotropic['shells']:
+        return None
+    anisotropic = summaries.get('autoPROC_staraniso.xml', {'shells': {}, 'ellipsoid': {}})
+    return ProcessingResult('xml', isotropic['space_group'], tuple(isotropic['cell'][tag] for tag in cell_tags), isotropic['shells']['overall'].high_resolution,
+                            xml_ellipsoid_limits(anisotropic['ellipsoid']), isotropic['shells'], anisotropic['shells'], isotropic['sweeps'])
+
+# read space group, cell and resolution limits from the last "finishing" section of an autoPROC log, None if they are not found
+def results_from_log(log_path):
+    log_pattern1 = re.compile(r"\s*===== finishing processed and scaled data from XDS")
+    log_pattern2 = re.compile(r"\s*Spacegroup name\s+")
+    log_pattern3 = re.compile(r"\s*Unit cell parameters\s+")
+    log_pattern4 = re.compile(r"\s*High resolution limit\s+")
+    log_pattern5 = re.compile(r"\s*Diffraction limits & principal axes of ellipsoid fitted to diffraction cut-off surface:")
+    # only the lines after the last finishing section are needed
+    section = None
+    sections = 0
+    with open(log_path, 'rt', errors = 'replace') as log:
+        for line in log:
+            if log_pattern1.search(line) != None:
+                section = []
+                sections += 1
+            elif section != None:
+                section.append(line.rstrip('\n'))
+    if section == None:
+        return None
+    space_group = None
+    cell = None
+    resolution = None
+    ellipsoid_limits = []
+    ellipsoid_line = None
+    for line_number, line in enumerate(section):
+        if space_group == None:
+            if log_pattern2.search(line) != None:
+                space_group = re.split(log_pattern2, line)[1]
+        elif cell == None:
+            if log_pattern3.search(line) != None:
+                cell = tuple(to_float(value) for value in re.split(r'\s+', re.split(log_pattern3, line)[1])[:6])
+        elif resolution == None:
+            if log_pattern4.search(line) != None:
+                resolution = to_float(re.split(r'\s+', re.split(log_pattern4, line)[1])[2])
+        elif ellipsoid_line == None:
+            if log_pattern5.search(line) != None:
+                ellipsoid_line = line_number
+        # the 3 lines after the heading: limit, principal axis (3 values) and its direction in reciprocal cell axes
+        elif len(ellipsoid_limits) < 3 and line.strip() != '':
+            values = re.split(r'\s\s+', line)
+            direction = re.sub("_", "", values[5]) if len(values) > 5 else ''
+            ellipsoid_limits.append((to_float(values[1]), direction))
+    if space_group == None or cell == None or None in cell or resolution == None:
+        return None
+    # several sweeps: one finishing section per sweep and one for the merged data
+    sweeps = sections - 1 if sections >= 2 else 1
+    return ProcessingResult('log', space_group, cell, resolution, ellipsoid_limits, {}, {}, sweeps)
+
+# read the results of a processing run: XML summaries in output_folder, the log if they are missing. None if neither can be read.
+def processing_results(output_folder, log_path):
+    results = results_from_xml(output_folder)
+    if (results == None or results.ellipsoid_limits == [] or results.sweeps == 0) and os.path.exists(log_path):
+        try:
+            log_results = results_from_log(log_path)
+        except (OSError, IndexError):
+            log_results = None
+        # without STARANISO summary only the ellipsoid limits are taken from the log (and the sweeps if the XML has no integrations)
+        if results == None:
+            results = log_results
+        elif log_results != None:
+            if results.ellipsoid_limits == []:
+                results = results._replace(ellipsoid_limits = log_results.ellipsoid_limits)
+            if results.sweeps == 0:
+                results = results._replace(sweeps = log_results.sweeps)
+    return results
+
+# helper function for text of a number from the results ('N/A' if missing)
+def result_text(value, digits = 3):
+    if value == None:
+        return 'N/A'
+    return str(round(value, digits))
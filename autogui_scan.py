@@ -0,0 +1,164 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Parameter scan for AutoGUI classic: several variants of one processing job at the same time.
+# The scan grid has one line per parameter with the values to try separated by "|", e.g.
+#     beam: 1532 1543 | 1540 1550
+#     symm: P212121 | P21212
+#     R: 50 2.0 | 50 1.8
+# All combinations are run (at most max_variants), each in its own run folder next to the first one, with the
+# threads of the job divided between them. Known parameters (beam, symm, cell, R, M) replace the ones of the job,
+# "extra" is appended as is, "-" keeps the value of the job. The outcomes are collected into one comparison table.
+# Run "python autogui_scan.py" for a test of the grid parsing.
+
+import os
+import re
+import csv
+import itertools
+import subprocess
+import autogui_results
+import autogui_rescale
+
+
+max_variants = 8
+# parameter: (pattern of the value in the job's command line, format of the new value)
+scan_parameters = {'beam': (r'(?<!\S)(beam|BeamCentreFrom)="[^"]*"', 'beam="{}"'),
+                   'symm': (r'(?<!\S)symm="[^"]*"', 'symm="{}"'),
+                   'cell': (r'(?<!\S)cell="[^"]*"', 'cell="{}"'),
+                   'R': (r'(?<!\S)-R\s+\S+\s+\S+', '-R {}'),
+                   'M': (r'(?<!\S)-M\s+\S+', '-M {}'),
+                   'extra': (None, '{}')}
+scan_header = ['Variant', 'Run folder', 'Space group', 'Cell', 'Resolution [Å]', 'Completeness (outer)', 'CC(1/2) (outer)', 'I/sig(I) (outer)', 'Rpim (overall)']
+
+
+# parse a scan grid: [[(parameter, value), ...], ...] with all combinations. ValueError for unknown parameters or too many variants.
+def parse_scan_grid(grid_text):
+    parameter_values = []
+    for line in grid_text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line == '':
+            continue
+        if ':' not in line:
+            raise ValueError('Scan grid line without ":": ' + line)
+        parameter, values = line.split(':', 1)
+        parameter = parameter.strip()
+        if parameter not in scan_parameters:
+            raise ValueError('Unknown scan parameter "' + parameter + '", use one of: ' + ', '.join(scan_parameters))
+        parameter_values.append([(parameter, value.strip()) for value in values.split('|')])
+    variants = [list(variant) for variant in itertools.product(*parameter_values)]
+    if len(variants) > max_variants:
+        raise ValueError(str(len(variants)) + ' variants in the scan grid, at most ' + str(max_variants) + ' can be run at the same time.')
+    return variants
+
+# helper function for a short description of a variant
+def variant_label(variant):
+    return ', '.join(parameter + '=' + value for parameter, value in variant if value not in ('', '-')) or 'as set'
+
+# command line of a variant: job's command with replaced parameters and its share of the threads.
+# The output goes to output-files in the variant's own run folder (classic sets an absolute "-d" to the first one).
+def variant_command(base_command, variant, nthreads):
+    command = re.sub(r'(?<!\S)-d\s+\S+', '-d output-files', base_command)
+    if re.search(r'(?<!\S)-nthreads\s+\d+', command) != None:
+        command = re.sub(r'(?<!\S)-nthreads\s+\d+', '-nthreads ' + str(nthreads), command)
+    else:
+        command = command + ' -nthreads ' + str(nthreads)
+    for parameter, value in variant:
+        if value in ('', '-'):
+            continue
+        pattern, value_format = scan_parameters[parameter]
+        if pattern != None:
+            command = re.sub(pattern, '', command)
+        command = command + ' ' + value_format.format(value)
+    return ' '.join(command.split())
+
+# prepare the runs of a scan: [(label, folder, command), ...]. The first variant runs in first_folder, the others in new folders next to it.
+def prepare_scan(base_command, variants, first_folder, nthreads):
+    threads = max(1, int(nthreads) // len(variants))
+    scan_runs = []
+    folder = first_folder
+    for number, variant in enumerate(variants):
+        if number > 0:
+            folder = autogui_rescale.next_run_folder(first_folder)[0]
+        scan_runs.append((variant_label(variant), folder, variant_command(base_command, variant, threads)))
+    return scan_runs
+
+# start all runs of a scan, output of each run goes to log.txt in its folder: [process, ...]
+def start_scan(scan_runs):
+    return [subprocess.Popen(command + ' > log.txt 2>&1', cwd = folder, shell = True, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL) for label, folder, command in scan_runs]
+
+# collect the outcomes of a finished scan into table rows (scan_header), MTZs are copied like after processing
+def scan_outcomes(scan_runs):
+    rows = []
+    for label, folder, command in scan_runs:
+        autogui_rescale.collect_outputs(folder)
+        results = autogui_results.processing_results(os.path.join(folder, 'output-files'), os.path.join(folder, 'log.txt'))
+        if results == None:
+            rows.append([label, os.path.basename(folder), 'failed', '', '', '', '', '', ''])
+            continue
+        outer = results.shells.get('outerShell')
+        overall = results.shells.get('overall')
+        cell = ' '.join(autogui_results.result_text(value, 2) for value in results.cell)
+        rows.append([label, os.path.basename(folder), results.space_group, cell, autogui_results.result_text(results.resolution, 2),
+                     autogui_results.result_text(outer.completeness if outer != None else None, 1), autogui_results.result_text(outer.cc_half if outer != None else None),
+                     autogui_results.result_text(outer.i_over_sigma if outer != None else None, 1), autogui_results.result_text(overall.rpim if overall != None else None)])
+    return rows
+
+# rows for datasets.csv (and the results catalog) of a finished scan, one per variant:
+# Date;Dataset;Success;Space group;Cell dimensions;Cell angles;Isotropic limit;Anisotropic limits;Command line
+def scan_csv_rows(scan_runs, proc_date, dataset):
+    rows = []
+    for label, folder, command in scan_runs:
+        name = dataset + ' [' + label + ']'
+        results = autogui_results.processing_results(os.path.join(folder, 'output-files'), os.path.join(folder, 'log.txt'))
+        if results == None:
+            rows.append([proc_date, name, 'False', 'N/A', 'N/A', 'N/A', 'N/A', 'N/A', command])
+            continue
+        cell = [autogui_results.result_text(value) for value in results.cell]
+        anisotropic = ', '.join(autogui_results.result_text(limit) for limit, direction in results.ellipsoid_limits) or 'N/A'
+        rows.append([proc_date, name, 'True', results.space_group, ', '.join(cell[:3]), ', '.join(cell[3:]), autogui_results.result_text(results.resolution), anisotropic, command])
+    return rows
+
+# write the comparison table as CSV
+def write_scan_table(csv_path, rows):
+    with open(csv_path, 'w', newline = '') as csv_file:
+        table_writer = csv.writer(csv_file)
+        table_writer.writerow(scan_header)
+        table_writer.writerows(rows)
+
+
+# test of the grid parsing and command lines
+if __name__ == '__main__':
+    base_command = 'process -h5 /data/x_master.h5 -d output-files -R 50 2.2 symm="P222" -M LowResOrTricky beam="1000 1000" -nthreads 16 AutoProcSmallFootprint="yes"'
+    variants = parse_scan_grid('beam: 1532 1543 | -\nsymm: P212121 | P21212  # screw axes\nR: 50 1.8\n')
+    assert len(variants) == 4
+    for variant in variants:
+        print(variant_label(variant) + ':', variant_command(base_command, variant, 4))
+    assert variant_command(base_command, variants[0], 4).count('beam=') == 1
+    assert '-R 50 2.2' not in variant_command(base_command, variants[0], 4) and '-nthreads 4' in variant_command(base_command, variants[0], 4)
+    assert 'beam="1000 1000"' in variant_command(base_command, variants[2], 4)
+    # classic: absolute output folder of the first run, no "-nthreads" if the thread field is empty
+    classic_command = 'process -h5 /data/x_master.h5 -d /data/processing/x_run_01/output-files -R 50 2.2 AutoProcSmallFootprint="yes"'
+    command = variant_command(classic_command, variants[1], 4)
+    print(command)
+    assert '-d output-files' in command and '/data/processing' not in command and command.count('-nthreads 4') == 1
+    try:
+        parse_scan_grid('symm: P1 | P2 | P3\nR: 1 2 | 1 3 | 1 4')
+        raise AssertionError('too many variants accepted')
+    except ValueError as scan_error:
+        print(scan_error)
+    print('Scan grid OK.')
@@ -0,0 +1,192 @@
+# This file is part of AutoGUI.
+# Copyright 2025 Peer Lukat
+# Peer.Lukat@helmholtz-hzi.de
+# Helmholtz-Centre for Infection Research, Structure & Function of Proteins
+#
+#    AutoGUI is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    any later version.
+#
+#    AutoGUI is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with AutoGUI.  If not, see <http://www.gnu.org/licenses/>.
+
+# Resolution shell statistics store for AutoGUI batch.
+# The statistics per resolution shell are read from XDS' CORRECT.LP (last table "SUBSET OF INTENSITY DATA WITH
+# SIGNAL/NOISE >= -3.0 AS FUNCTION OF RESOLUTION") and kept in one NumPy file per batch (shell_statistics.npz):
+# one array per column with the shells of all datasets one after the other, 'offsets' marks where each dataset
+# starts ('datasets' has the names), 'total_<column>' has the overall values per dataset. Comparing or ranking
+# datasets is done on these arrays, without reading the logs again.
+# Run "python autogui_shells.py" for a test with generated CORRECT.LP files.
+
+import os
+import re
+import numpy as np
+
+
+shell_columns = ['resolution', 'observed', 'unique', 'possible', 'completeness', 'r_observed', 'r_expected', 'compared', 'i_over_sigma',
+                 'r_meas', 'cc_half', 'anomalous_correlation', 'sig_ano', 'n_ano']
+store_name = 'shell_statistics.npz'
+correct_heading = re.compile(r'SUBSET OF INTENSITY DATA WITH SIGNAL/NOISE >= -3.0 AS FUNCTION OF RESOLUTION')
+
+
+# helper function to convert a table value ("99.1%", "99.9*"), NaN if it is missing
+def table_value(text):
+    try:
+        return float(text.rstrip('%*'))
+    except ValueError:
+        return np.nan
+
+# read the last resolution table of CORRECT.LP: (shells, total) as arrays with shell_columns, None if there is none
+def read_correct_lp(correct_path):
+    table = None
+    with open(correct_path, 'rt', errors = 'replace') as correct_lp:
+        for line in correct_lp:
+            if correct_heading.search(line) != None:
+                table = []
+                total = None
+            elif table != None and total == None:
+                values = line.split()
+                if len(values) < 10:
+                    continue
+                if values[0] == 'total':
+                    total = [np.inf] + [table_value(value) for value in values[1:]]
+                    total = (total + [np.nan] * len(shell_columns))[:len(shell_columns)]
+                elif re.match(r'^\d+\.\d+$', values[0]) != None:
+                    row = [table_value(value) for value in values]
+                    table.append((row + [np.nan] * len(shell_columns))[:len(shell_columns)])
+    if table == None or table == [] or total == None:
+        return None
+    return np.array(table, dtype = np.float32), np.array(total, dtype = np.float32)
+
+# find CORRECT.LP of a run (copy in "useful_files" first), None if there is none
+def find_correct_lp(run_folder):
+    for subfolder in ('useful_files', 'output-files'):
+        correct_path = os.path.join(run_folder, subfolder, 'CORRECT.LP')
+        if os.path.exists(correct_path):
+            return correct_path
+    return None
+
+# read a store: dict of arrays (an empty store if the file does not exist)
+def load_store(store_path):
+    if not os.path.exists(store_path):
+        store = {'datasets': np.array([], dtype = str), 'offsets': np.zeros(1, dtype = np.int64)}
+        for column in shell_columns:
+            store[column] = np.zeros(0, dtype = np.float32)
+            store['total_' + column] = np.zeros(0, dtype = np.float32)
+        return store
+    with np.load(store_path, allow_pickle = False) as stored:
+        return {name: stored[name] for name in stored.files}
+
+# add the shell statistics of a dataset to a store (replaces an older entry with the same name). Returns the number of shells, 0 if none were found.
+def add_dataset(store_path, dataset_name, run_folder):
+    correct_path = find_correct_lp(run_folder)
+    statistics = None if correct_path == None else read_correct_lp(correct_path)
+    if statistics == None:
+        return 0
+    shells, total = statistics
+    store = remove_dataset(load_store(store_path), dataset_name)
+    store['datasets'] = np.append(store['datasets'], dataset_name)
+    store['offsets'] = np.append(store['offsets'], store['offsets'][-1] + shells.shape[0])
+    for column_number, column in enumerate(shell_columns):
+        store[column] = np.concatenate((store[column], shells[:, column_number]))
+        store['total_' + column] = np.append(store['total_' + column], total[column_number]).astype(np.float32)
+    # write next to the store and replace it, a batch that is stopped never leaves a broken file
+    temporary_path = store_path + '.tmp.npz'
+    np.savez(temporary_path, **store)
+    os.replace(temporary_path, store_path)
+    return shells.shape[0]
+
+# helper function to drop a dataset from a store
+def remove_dataset(store, dataset_name):
+    matches = np.flatnonzero(store['datasets'] == dataset_name)
+    if matches.size == 0:
+        return store
+    number = matches[0]
+    start, end = store['offsets'][number], store['offsets'][number + 1]
+    store['datasets'] = np.delete(store['datasets'], number)
+    store['offsets'] = np.concatenate((store['offsets'][:number + 1], store['offsets'][number + 2:] - (end - start)))
+    for column in shell_columns:
+        store[column] = np.concatenate((store[column][:start], store[column][end:]))
+        store['total_' + column] = np.delete(store['total_' + column], number)
+    return store
+
+# shells of one dataset: {column: array}
+def dataset_shells(store, dataset_name):
+    number = np.flatnonzero(store['datasets'] == dataset_name)[0]
+    start, end = store['offsets'][number], store['offsets'][number + 1]
+    return {column: store[column][start:end] for column in shell_columns}
+
+# value of a column in the outer (highest resolution) shell of every dataset
+def outer_shell(store, column):
+    return store[column][store['offsets'][1:] - 1]
+
+# value of a column at the first shell of every dataset reaching a resolution (NaN if the data don't reach it)
+def at_resolution(store, column, resolution):
+    reached = store['resolution'] <= resolution
+    dataset_of_shell = np.repeat(np.arange(store['datasets'].size), np.diff(store['offsets']))
+    values = np.full(store['datasets'].size, np.nan, dtype = np.float32)
+    first = np.unique(dataset_of_shell[reached], return_index = True)
+    values[first[0]] = store[column][np.flatnonzero(reached)[first[1]]]
+    return values
+
+# dataset names ranked by a column (overall values unless outer = True), best first
+def rank_datasets(store, column, outer = False, lower_is_better = False):
+    values = outer_shell(store, column) if outer else store['total_' + column]
+    order = np.argsort(values if lower_is_better else -values, kind = 'stable')
+    # missing values last
+    order = np.concatenate((order[~np.isnan(values[order])], order[np.isnan(values[order])]))
+    return [(str(store['datasets'][number]), float(values[number])) for number in order]
+
+
+# test with generated CORRECT.LP files
+if __name__ == '__main__':
+    import tempfile
+    import time
+    test_folder = tempfile.mkdtemp()
+    store_path = os.path.join(test_folder, store_name)
+    random = np.random.default_rng(1)
+    names = []
+    for number in range(300):
+        run_folder = os.path.join(test_folder, 'run_' + str(number))
+        os.makedirs(os.path.join(run_folder, 'useful_files'))
+        limits = np.linspace(6.0, random.uniform(1.2, 3.0), 10)
+        with open(os.path.join(run_folder, 'useful_files', 'CORRECT.LP'), 'w') as correct_lp:
+            for repeat in range(2):
+                correct_lp.write(' SUBSET OF INTENSITY DATA WITH SIGNAL/NOISE >= -3.0 AS FUNCTION OF RESOLUTION\n')
+                correct_lp.write(' RESOLUTION     NUMBER OF REFLECTIONS    COMPLETENESS R-FACTOR  R-FACTOR COMPARED I/SIGMA   R-meas  CC(1/2)  Anomal  SigAno   Nano\n')
+                correct_lp.write('   LIMIT     OBSERVED  UNIQUE  POSSIBLE     OF DATA   observed  expected                                      Corr\n\n')
+                for shell, limit in enumerate(limits):
+                    correct_lp.write('%9.2f %11d %7d %9d %10.1f%% %9.1f%% %8.1f%% %8d %7.2f %9.1f%% %8.1f* %5d %8.3f %7d\n' % (limit, 5000, 800, 810, 99.0 - shell, 3.0 + shell * repeat, 3.5, 5000, 40.0 - 4 * shell, 3.6, 99.9 - shell * 7, -5, 0.8, 500))
+                correct_lp.write('    total       50000    8000      8100       98.8%%       5.0%%      5.1%%    50000   20.00      5.4%%    %.1f*   -3    0.800    5000\n\n' % random.uniform(90, 100))
+        names.append('dataset_' + str(number))
+    start = time.time()
+    for number, name in enumerate(names):
+        assert add_dataset(store_path, name, os.path.join(test_folder, 'run_' + str(number))) == 10
+    print('Stored 300 datasets in', round(time.time() - start, 2), 's,', os.path.getsize(store_path), 'bytes')
+    store = load_store(store_path)
+    start = time.time()
+    ranking = rank_datasets(store, 'cc_half')
+    best_outer = rank_datasets(store, 'resolution', outer = True, lower_is_better = True)
+    cc_at_2 = at_resolution(store, 'cc_half', 2.0)
+    print('Ranked in', round((time.time() - start) * 1000, 2), 'ms. Best CC(1/2):', ranking[0], 'best resolution:', best_outer[0])
+    assert ranking[0][1] >= ranking[-1][1] and best_outer[0][1] <= best_outer[-1][1]
+    assert np.isnan(cc_at_2).sum() == (outer_shell(store, 'resolution') > 2.0).sum()
+    shells = dataset_shells(store, 'dataset_7')
+    assert shells['completeness'][0] == 99.0 and shells['r_observed'][3] == 6.0
+    # adding a dataset again replaces it
+    add_dataset(store_path, 'dataset_7', os.path.join(test_folder, 'run_8'))
+    store = load_store(store_path)
+    assert store['datasets'].size == 300 and store['offsets'][-1] == 3000 and store['datasets'][-1] == 'dataset_7'
+    for root, folders, files in os.walk(test_folder, topdown = False):
+        for file_name in files:
+            os.remove(os.path.join(root, file_name))
+        for folder_name in folders:
+            os.rmdir(os.path.join(root, folder_name))
+    os.rmdir(test_folder)
+    print('Shell statistics store OK.')